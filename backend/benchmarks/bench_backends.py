@@ -0,0 +1,80 @@
+"""Benchmark the torch and ONNX Runtime inference backends on CPU.
+
+Builds a randomly initialized YOLO model from its architecture file (no
+download needed; timings do not depend on the weights), exports it to ONNX and
+times a full ``predict`` call (preprocessing, forward pass and NMS) for both
+backends at several batch sizes.
+
+Usage:
+    python benchmarks/bench_backends.py --model yolov8n.yaml --batch-sizes 1 4 8
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np  # noqa: E402
+from ultralytics import YOLO  # noqa: E402
+
+from yolo_api.backends import (  # noqa: E402
+    InferenceBackend,
+    OnnxRuntimeBackend,
+    UltralyticsBackend,
+)
+
+
+def time_ms(backend: InferenceBackend, images: list[np.ndarray], repeat: int) -> float:
+    """Return the mean time per batch over repeat runs in ms."""
+    backend.predict(images, 0.25, 0.45)  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        backend.predict(images, 0.25, 0.45)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pt_path = Path(tmp) / "model.pt"
+        YOLO(args.model).save(str(pt_path))
+        onnx_path = Path(
+            YOLO(str(pt_path)).export(format="onnx", dynamic=True, imgsz=args.imgsz)
+        )
+
+        backends: dict[str, InferenceBackend] = {
+            "torch": UltralyticsBackend.load(pt_path),
+            "onnxruntime": OnnxRuntimeBackend(
+                onnx_path, intra_op_threads=args.threads
+            ),
+        }
+
+        rng = np.random.default_rng(0)
+        print(f"model={args.model} imgsz={args.imgsz} image=640x480")
+        print(f"{'batch':>5} {'backend':>12} {'ms/batch':>10} {'ms/image':>10}")
+        for batch_size in args.batch_sizes:
+            images = [
+                rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+                for _ in range(batch_size)
+            ]
+            for name, backend in backends.items():
+                batch_ms = time_ms(backend, images, args.repeat)
+                print(
+                    f"{batch_size:>5} {name:>12} {batch_ms:>10.2f} "
+                    f"{batch_ms / batch_size:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="yolov8n.yaml")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--threads", type=int, default=0, help="ONNX Runtime intra-op threads"
+    )
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+"""Benchmark /health latency while the inference path is saturated.
+
+Injects a fake model whose forward pass takes a fixed time into the global
+inference manager, keeps the predict endpoint saturated with concurrent
+requests, and samples /health latency in parallel. With inference running on
+the dedicated executor the health check latency should stay flat.
+
+Usage:
+    python benchmarks/bench_health_latency.py --forward-ms 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import base64
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from yolo_api.inference import inference_manager  # noqa: E402
+from yolo_api.main import app  # noqa: E402
+from yolo_api.models import ModelInfo  # noqa: E402
+
+MODEL_ID = "bench_model"
+
+
+class SlowModel:
+    """Model stand-in whose forward pass blocks for a fixed time."""
+
+    def __init__(self, forward_ms: float) -> None:
+        self.forward_s = forward_ms / 1000
+
+    def predict(self, source: Any, **kwargs: Any) -> list[Any]:
+        time.sleep(self.forward_s)
+        count = len(source) if isinstance(source, list) else 1
+        return [type("Result", (), {"boxes": None})() for _ in range(count)]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the given percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def sample_health(client: AsyncClient, duration: float) -> list[float]:
+    """Hit /health sequentially for a duration and return latencies in ms."""
+    latencies: list[float] = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        response = await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def saturate(client: AsyncClient, payload: dict[str, Any], stop: asyncio.Event) -> int:
+    """Send predict requests back to back until stopped."""
+    sent = 0
+    while not stop.is_set():
+        response = await client.post("/api/inference/predict", json=payload)
+        assert response.status_code == 200, response.text
+        sent += 1
+    return sent
+
+
+def summarize(name: str, latencies: list[float]) -> None:
+    """Print latency percentiles."""
+    print(
+        f"{name:<12} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.2f}ms "
+        f"p99={percentile(latencies, 99):7.2f}ms "
+        f"max={max(latencies):7.2f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    inference_manager.models[MODEL_ID] = SlowModel(args.forward_ms)
+    inference_manager.model_info[MODEL_ID] = ModelInfo(
+        model_id=MODEL_ID,
+        name="Benchmark",
+        yolo_version="v8",
+        model_size="n",
+        classes=[],
+        created_at="2024-01-01T00:00:00",  # type: ignore[arg-type]
+    )
+
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), color="gray").save(buffer, format="JPEG")
+    payload = {"model_id": MODEL_ID, "image": base64.b64encode(buffer.getvalue()).decode()}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle = await sample_health(client, args.duration)
+
+        stop = asyncio.Event()
+        workers = [
+            asyncio.create_task(saturate(client, payload, stop))
+            for _ in range(args.concurrency)
+        ]
+        await asyncio.sleep(0.5)  # Let the inference queue fill up
+        loaded = await sample_health(client, args.duration)
+        stop.set()
+        predictions = sum(await asyncio.gather(*workers))
+
+    print(f"forward={args.forward_ms}ms concurrency={args.concurrency}")
+    summarize("idle", idle)
+    summarize("saturated", loaded)
+    print(f"predictions completed during run: {predictions}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forward-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
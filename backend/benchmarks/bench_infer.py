@@ -0,0 +1,291 @@
+"""Micro-benchmark the stages of InferenceManager.infer with a tiny model.
+
+Builds a randomly initialized YOLO model from its architecture file (no
+download needed; timings do not depend on the weights), encodes synthetic
+JPEG and PNG images at several resolutions and times each stage of the
+inference hot path separately:
+
+    base64      base64 decoding of the request payload
+    validate    header parsing and dimension checks
+    decode      pixel decoding to a BGR array
+    predict     forward pass including pre-processing and NMS
+    parse       scaling detections and building Detection objects
+    serialize   building the InferenceResponse and dumping it to JSON
+    total       InferenceManager.infer end to end
+
+A randomly initialized model detects nothing, so parse and serialize run on
+--detections synthetic boxes instead of the model output.
+
+Results are written as JSON to --output. Record them as a baseline with
+--save-baseline and compare later runs against it with --baseline: stages
+whose median got slower by more than --tolerance (and by more than
+--min-delta-ms) are reported as regressions and the script exits with code 1.
+Baselines only compare meaningfully on the machine they were recorded on.
+
+Usage:
+    python benchmarks/bench_infer.py --save-baseline benchmarks/baselines/infer.json
+    python benchmarks/bench_infer.py --baseline benchmarks/baselines/infer.json
+"""
+
+import argparse
+import base64
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from ultralytics import YOLO  # noqa: E402
+
+from yolo_api.backends import UltralyticsBackend  # noqa: E402
+from yolo_api.imaging import decode_image  # noqa: E402
+from yolo_api.inference import InferenceManager  # noqa: E402
+from yolo_api.models import InferenceResponse, ModelInfo  # noqa: E402
+from yolo_api.postprocess import DetectionArrays  # noqa: E402
+
+MODEL_ID = "bench_model"
+CLASS_NAMES = [f"class{i}" for i in range(80)]
+STAGES = ("base64", "validate", "decode", "predict", "parse", "serialize", "total")
+
+
+def make_image(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Create a BGR test image: gradient background, filled boxes, mild noise."""
+    y, x = np.mgrid[0:height, 0:width]
+    image = np.stack(
+        [x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)],
+        axis=-1,
+    ).astype(np.uint8)
+    for _ in range(20):
+        x1, x2 = sorted(rng.integers(0, width, 2))
+        y1, y2 = sorted(rng.integers(0, height, 2))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness=-1)
+    noise = rng.integers(-8, 8, image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def encode(image: np.ndarray, image_format: str) -> bytes:
+    """Encode a BGR image as JPEG (quality 90) or PNG."""
+    params = [cv2.IMWRITE_JPEG_QUALITY, 90] if image_format == "jpeg" else []
+    ok, buffer = cv2.imencode(f".{image_format}", image, params)
+    assert ok
+    return buffer.tobytes()
+
+
+def make_detections(count: int, width: int, height: int) -> DetectionArrays:
+    """Create random detections inside an image."""
+    rng = np.random.default_rng(count)
+    xy = rng.random((count, 2), dtype=np.float32) * [width * 0.9, height * 0.9]
+    wh = rng.random((count, 2), dtype=np.float32) * [width * 0.1, height * 0.1] + 1
+    return DetectionArrays(
+        xyxy=np.concatenate([xy, xy + wh], axis=1).astype(np.float32),
+        conf=rng.random(count, dtype=np.float32),
+        cls=rng.integers(0, len(CLASS_NAMES), count),
+    )
+
+
+def measure(func: Callable[[], Any], repeat: int) -> list[float]:
+    """Return the duration of each of repeat calls in ms, after a warm-up."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Median, p90, mean and min of samples in ms."""
+    p90 = statistics.quantiles(samples, n=10)[-1] if len(samples) > 1 else samples[0]
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p90_ms": round(p90, 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "min_ms": round(min(samples), 4),
+    }
+
+
+def bench_case(
+    manager: InferenceManager, image_bytes: bytes, args: argparse.Namespace
+) -> dict[str, dict[str, float]]:
+    """Time every stage for one encoded image."""
+    image_b64 = base64.b64encode(image_bytes).decode()
+    target_size = manager.decode_target_size(MODEL_ID)
+    decoded = decode_image(image_bytes, target_size)
+    width, height = decoded.original_size
+    detections = make_detections(args.detections, *decoded.array.shape[1::-1])
+    parsed = detections.scaled(*decoded.scale).to_detections(CLASS_NAMES)
+
+    samples: dict[str, list[float]] = {"validate": [], "decode": []}
+    for _ in range(args.repeat):
+        timings = decode_image(image_bytes, target_size).timings
+        samples["validate"].append(timings["header"])
+        samples["decode"].append(timings["decode"])
+    samples["base64"] = measure(lambda: manager.decode_base64(image_b64), args.repeat)
+    samples["predict"] = measure(
+        lambda: manager.predict_batch(
+            MODEL_ID, [decoded.array], args.confidence, 0.45
+        ),
+        args.repeat,
+    )
+    samples["parse"] = measure(
+        lambda: detections.scaled(*decoded.scale).to_detections(CLASS_NAMES),
+        args.repeat,
+    )
+    samples["serialize"] = measure(
+        lambda: InferenceResponse(
+            detections=parsed,
+            inference_time=1.0,
+            image_size=(width, height),
+            timings={"base64": 1.0, "header": 1.0, "decode": 1.0, "forward": 1.0},
+        ).model_dump_json(),
+        args.repeat,
+    )
+    samples["total"] = measure(
+        lambda: manager.infer(MODEL_ID, image_b64, args.confidence), args.repeat
+    )
+    return {stage: summarize(samples[stage]) for stage in STAGES}
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], args: argparse.Namespace
+) -> list[str]:
+    """Print stage medians against the baseline and return the regressions."""
+    for key in ("model", "imgsz", "detections", "machine"):
+        if results["meta"].get(key) != baseline["meta"].get(key):
+            print(
+                f"warning: baseline {key}={baseline['meta'].get(key)!r} differs "
+                f"from this run ({results['meta'].get(key)!r})"
+            )
+    header = f"{'case':<16} {'stage':<10} {'baseline':>10} {'current':>10}"
+    print(f"\n{header} {'change':>8}")
+    regressions = []
+    compared = 0
+    for case, stages in results["cases"].items():
+        for stage, stats in stages.items():
+            base = baseline["cases"].get(case, {}).get(stage)
+            if base is None:
+                continue
+            compared += 1
+            before, after = base["median_ms"], stats["median_ms"]
+            change = (after - before) / before if before else 0.0
+            regressed = change > args.tolerance and after - before > args.min_delta_ms
+            flag = "  REGRESSION" if regressed else ""
+            print(
+                f"{case:<16} {stage:<10} {before:>10.3f} {after:>10.3f} "
+                f"{change:>+7.0%}{flag}"
+            )
+            if regressed:
+                regressions.append(f"{case} {stage}: {before:.3f}ms -> {after:.3f}ms")
+    if not compared:
+        print("warning: no case of this run is in the baseline")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the benchmark and return the exit code."""
+    # Per-request log lines would flood the output and the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    manager = InferenceManager()
+    with tempfile.TemporaryDirectory() as tmp:
+        pt_path = Path(tmp) / "model.pt"
+        YOLO(args.model).save(str(pt_path))
+        backend = UltralyticsBackend.load(pt_path, imgsz=args.imgsz)
+        manager.models.put(MODEL_ID, backend)
+    manager.model_info[MODEL_ID] = ModelInfo(
+        model_id=MODEL_ID,
+        name="Benchmark",
+        yolo_version="v8",
+        model_size="n",
+        classes=CLASS_NAMES,
+        created_at=datetime.now(),
+    )
+
+    rng = np.random.default_rng(0)
+    cases: dict[str, dict[str, dict[str, float]]] = {}
+    print(f"model={args.model} imgsz={args.imgsz} repeat={args.repeat} (median ms)")
+    print(f"{'case':<16} " + " ".join(f"{stage:>9}" for stage in STAGES))
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        image = make_image(width, height, rng)
+        for image_format in args.formats:
+            case = f"{image_format}-{size}"
+            cases[case] = bench_case(manager, encode(image, image_format), args)
+            medians = " ".join(
+                f"{cases[case][stage]['median_ms']:>9.3f}" for stage in STAGES
+            )
+            print(f"{case:<16} {medians}")
+
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "model": args.model,
+            "imgsz": args.imgsz,
+            "repeat": args.repeat,
+            "detections": args.detections,
+            "machine": f"{platform.machine()} {platform.processor()}".strip(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "cases": cases,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nresults written to {args.output}")
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"baseline saved to {args.save_baseline}")
+
+    if not args.baseline:
+        return 0
+    regressions = compare(results, json.loads(args.baseline.read_text()), args)
+    for regression in regressions:
+        print(f"FAIL: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="yolov8n.yaml")
+    parser.add_argument("--imgsz", type=int, default=320)
+    parser.add_argument(
+        "--sizes", nargs="+", default=["320x240", "640x480", "1280x720", "1920x1080"]
+    )
+    parser.add_argument(
+        "--formats", nargs="+", choices=["jpeg", "png"], default=["jpeg", "png"]
+    )
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--confidence", type=float, default=0.25)
+    parser.add_argument("--detections", type=int, default=100)
+    parser.add_argument(
+        "--output", type=Path, default=Path("benchmarks/results/bench_infer.json")
+    )
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slowdown of a stage median reported as a regression",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.25,
+        help="Ignore slowdowns smaller than this (timer noise on fast stages)",
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,702 @@
+"""Load-test the API end to end with a configurable traffic mix.
+
+Starts the app under uvicorn on a free local port (or targets --url) and
+prepares fixtures through the API itself: a tiny randomly initialized model
+uploaded with /api/inference/upload-model (no download needed) and, for
+status polling and WebSocket subscribers, an offline inference job over
+synthetic images. Then it sends either
+
+* a weighted mix of operations (--mix) at a fixed concurrency (closed loop,
+  --concurrency) or at a fixed Poisson arrival rate (open loop, --rate), or
+* recorded traffic from a JSONL file (--replay).
+
+Operations:
+    predict          POST /api/inference/predict (base64 JSON)
+    predict_binary   POST /api/inference/predict/binary (raw image body)
+    list_models      GET /api/inference/models
+    job_status       GET /api/inference/jobs/{job_id}
+    training_status  GET /api/training/status/{job_id} (needs --training-job)
+    health           GET /health
+
+Predictions draw an image from --image-sizes and are reported per size.
+--ws-subscribers keeps WebSocket connections to the inference job's progress
+feed open during the run and measures connect time and ping/pong round trips.
+In open-loop mode latency counts from each request's scheduled send time, so
+requests delayed by an overloaded client are not hidden.
+
+Replay files hold one JSON object per line, for example:
+    {"at": 0.5, "method": "POST", "path": "/api/inference/predict",
+     "json": {"model_id": "{model_id}", "image": "{image:640x480}"}}
+"at" is the send time in seconds from the start, divided by --replay-speed
+(without it requests are sent back to back at --concurrency). The
+placeholders {model_id}, {job_id} and {image:WxH} are filled from the
+fixtures. Logs of the server itself (YOLO_LOG_FORMAT=json) replay directly:
+their request_started lines are sent with synthetic images for predictions.
+
+Reports throughput, error rate and latency percentiles per operation and
+writes them as JSON to --output. --in-process drives the app through its
+ASGI interface instead of a server (no WebSocket subscribers).
+
+Usage:
+    python benchmarks/bench_load.py --mix predict=8,list_models=1,job_status=1 \\
+        --concurrency 16 --duration 30 --ws-subscribers 20
+    python benchmarks/bench_load.py --mix predict=1 --rate 40 --duration 30
+    python benchmarks/bench_load.py --replay traffic.jsonl --replay-speed 2
+    python benchmarks/bench_load.py --url http://localhost:8000 --model-id <id>
+"""
+
+import argparse
+import asyncio
+import base64
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import cv2
+import httpx
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+OPERATIONS = (
+    "predict",
+    "predict_binary",
+    "list_models",
+    "job_status",
+    "training_status",
+    "health",
+)
+# Path segments that identify a resource, collapsed when naming replayed calls
+ID_SEGMENT = re.compile(
+    r"^(uploaded_)?[0-9a-f]{8}(-?[0-9a-f]{4}){0,3}(-?[0-9a-f]{12})?$"
+)
+
+
+@dataclass
+class Call:
+    """One HTTP request to send."""
+
+    op: str
+    method: str
+    path: str
+    json: Any = None
+    content: bytes | None = None
+    params: dict[str, str] | None = None
+    at: float | None = None  # Send time in seconds from the start (replay)
+
+
+@dataclass
+class Fixtures:
+    """Resources the traffic refers to."""
+
+    model_id: str
+    job_id: str | None
+    training_job: str | None
+    images: dict[str, bytes]  # "WxH" -> JPEG
+    images_b64: dict[str, str] = field(default_factory=dict)
+
+    def image(self, size: str | None = None) -> bytes:
+        """JPEG of the given size (the first configured one if None)."""
+        size = size or next(iter(self.images))
+        if size not in self.images:
+            width, height = (int(v) for v in size.split("x"))
+            self.images[size] = make_jpeg(width, height)
+        return self.images[size]
+
+    def image_b64(self, size: str | None = None) -> str:
+        """Base64 encoded JPEG of the given size."""
+        size = size or next(iter(self.images))
+        if size not in self.images_b64:
+            self.images_b64[size] = base64.b64encode(self.image(size)).decode()
+        return self.images_b64[size]
+
+
+class Recorder:
+    """Latencies and outcomes per operation."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.statuses: dict[str, Counter[str]] = defaultdict(Counter)
+        self.dropped = 0  # Open-loop sends skipped at --max-in-flight
+        self.ws_updates = 0  # Progress messages received by subscribers
+
+    def record(self, op: str, latency_ms: float, status: int | str, ok: bool) -> None:
+        """Record one completed call."""
+        self.statuses[op][str(status)] += 1
+        if ok:
+            self.latencies[op].append(latency_ms)
+        else:
+            self.errors[op] += 1
+
+    def report(self, elapsed: float) -> dict[str, Any]:
+        """Summarize the run."""
+        operations = {}
+        for op in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[op])
+            count = len(latencies) + self.errors[op]
+            operations[op] = {
+                "count": count,
+                "errors": self.errors[op],
+                "error_rate": round(self.errors[op] / count, 4),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                **{
+                    f"p{pct:g}_ms": round(percentile(latencies, pct), 2)
+                    for pct in (50, 90, 99)
+                },
+                "max_ms": round(latencies[-1], 2) if latencies else None,
+                "statuses": dict(self.statuses[op]),
+            }
+        total = sum(stats["count"] for stats in operations.values())
+        errors = sum(self.errors.values())
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": total,
+            "throughput_rps": round((total - errors) / elapsed, 2),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "dropped": self.dropped,
+            "ws_updates": self.ws_updates,
+            "operations": operations,
+        }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Return the given percentile of sorted samples (nan when empty)."""
+    if not ordered:
+        return float("nan")
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    """Encode a synthetic test image as JPEG."""
+    rng = np.random.default_rng(width * height)
+    image = np.full((height, width, 3), 114, dtype=np.uint8)
+    for _ in range(10):
+        x1, x2 = sorted(int(v) for v in rng.integers(0, width, 2))
+        y1, y2 = sorted(int(v) for v in rng.integers(0, height, 2))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness=-1)
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert ok
+    return buffer.tobytes()
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse ``op=weight,...`` into weights per operation."""
+    weights = {}
+    for item in mix.split(","):
+        op, _, weight = item.strip().partition("=")
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown operation {op!r}, expected one of {OPERATIONS}")
+        weights[op] = float(weight or 1)
+    return weights
+
+
+def make_call(op: str, fixtures: Fixtures, rng: random.Random) -> Call:
+    """Build a request for an operation of the mix."""
+    if op in ("predict", "predict_binary"):
+        size = rng.choice(list(fixtures.images))
+        if op == "predict":
+            body = {"model_id": fixtures.model_id, "image": fixtures.image_b64(size)}
+            return Call(f"predict {size}", "POST", "/api/inference/predict", json=body)
+        return Call(
+            f"predict_binary {size}",
+            "POST",
+            "/api/inference/predict/binary",
+            content=fixtures.image(size),
+            params={"model_id": fixtures.model_id},
+        )
+    if op == "list_models":
+        return Call(op, "GET", "/api/inference/models")
+    if op == "job_status":
+        return Call(op, "GET", f"/api/inference/jobs/{fixtures.job_id}")
+    if op == "training_status":
+        return Call(op, "GET", f"/api/training/status/{fixtures.training_job}")
+    return Call(op, "GET", "/health")
+
+
+def fill(value: Any, fixtures: Fixtures) -> Any:
+    """Replace fixture placeholders in a replayed request body."""
+    if isinstance(value, dict):
+        return {key: fill(item, fixtures) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, fixtures) for item in value]
+    if not isinstance(value, str):
+        return value
+    match = re.fullmatch(r"\{image(?::(\d+x\d+))?\}", value)
+    if match:
+        return fixtures.image_b64(match.group(1))
+    return value.replace("{model_id}", fixtures.model_id).replace(
+        "{job_id}", fixtures.job_id or ""
+    )
+
+
+def replay_op(method: str, path: str) -> str:
+    """Name a replayed call by its route, with resource IDs collapsed."""
+    segments = ["{id}" if ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+def load_replay(path: Path, fixtures: Fixtures) -> tuple[list[Call], int]:
+    """Read recorded traffic.
+
+    Returns:
+        Calls in file order and the number of records that cannot be replayed
+    """
+    calls: list[Call] = []
+    skipped = 0
+    first_timestamp: float | None = None
+    for line in path.read_text().splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record.get("event") == "request_started":
+            # Server log line: no body recorded, predictions get a test image
+            timestamp = datetime.fromisoformat(record["timestamp"]).timestamp()
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            call = Call(
+                replay_op(record["method"], record["path"]),
+                record["method"],
+                record["path"],
+                at=timestamp - first_timestamp,
+            )
+            if call.path == "/api/inference/predict":
+                body = {"model_id": "{model_id}", "image": "{image}"}
+                call.json = fill(body, fixtures)
+            elif call.path == "/api/inference/predict/binary":
+                call.content = fixtures.image()
+                call.params = {"model_id": fixtures.model_id}
+            elif call.method != "GET":
+                skipped += 1
+                continue
+        elif "path" in record:
+            method = record.get("method", "GET").upper()
+            content = record.get("content_b64")
+            call = Call(
+                record.get("op") or replay_op(method, record["path"]),
+                method,
+                fill(record["path"], fixtures),
+                json=fill(record.get("json"), fixtures),
+                content=base64.b64decode(content) if content else None,
+                params=fill(record.get("params"), fixtures),
+                at=record.get("at"),
+            )
+        else:
+            skipped += 1
+            continue
+        calls.append(call)
+    return calls, skipped
+
+
+async def send(
+    client: httpx.AsyncClient,
+    call: Call,
+    recorder: Recorder,
+    start: float | None = None,
+) -> None:
+    """Send one call and record its latency and outcome."""
+    start = start if start is not None else time.perf_counter()
+    try:
+        response = await client.request(
+            call.method,
+            call.path,
+            json=call.json,
+            content=call.content,
+            params=call.params,
+        )
+        await response.aread()
+        status: int | str = response.status_code
+        ok = response.is_success
+    except httpx.HTTPError as e:
+        status, ok = type(e).__name__, False
+    recorder.record(call.op, (time.perf_counter() - start) * 1000, status, ok)
+
+
+async def closed_loop(
+    client: httpx.AsyncClient,
+    next_call: Callable[[], Call | None],
+    recorder: Recorder,
+    concurrency: int,
+    duration: float,
+) -> None:
+    """Keep concurrency requests in flight until the duration is over."""
+    end = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < end:
+            call = next_call()
+            if call is None:
+                return
+            await send(client, call, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(
+    client: httpx.AsyncClient,
+    schedule: Iterator[tuple[float, Call]],
+    recorder: Recorder,
+    max_in_flight: int,
+) -> None:
+    """Send each call at its scheduled offset, whatever the response times."""
+    start = time.perf_counter()
+    in_flight: set[asyncio.Task[None]] = set()
+    for offset, call in schedule:
+        send_at = start + offset
+        await asyncio.sleep(max(0.0, send_at - time.perf_counter()))
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1
+            continue
+        task = asyncio.create_task(send(client, call, recorder, start=send_at))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    await asyncio.gather(*in_flight)
+
+
+def poisson_schedule(
+    next_call: Callable[[], Call | None], rate: float, duration: float, seed: int
+) -> Iterator[tuple[float, Call]]:
+    """Offsets of requests arriving at a mean rate per second."""
+    rng = random.Random(seed)
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        call = next_call()
+        if call is None:
+            return
+        yield offset, call
+        offset += rng.expovariate(rate)
+
+
+async def subscriber(url: str, recorder: Recorder, ping_interval: float) -> None:
+    """Follow a progress feed, measuring connects and ping round trips."""
+    import websockets
+
+    while True:
+        start = time.perf_counter()
+        try:
+            async with websockets.connect(url) as websocket:
+                await websocket.recv()  # Initial status
+                connect_ms = (time.perf_counter() - start) * 1000
+                recorder.record("ws connect", connect_ms, 101, True)
+                while True:
+                    await asyncio.sleep(ping_interval)
+                    start = time.perf_counter()
+                    await websocket.send("ping")
+                    while await websocket.recv() != "pong":
+                        recorder.ws_updates += 1
+                    ping_ms = (time.perf_counter() - start) * 1000
+                    recorder.record("ws ping", ping_ms, "pong", True)
+        except (OSError, websockets.WebSocketException) as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            recorder.record("ws connect", elapsed_ms, type(e).__name__, False)
+            await asyncio.sleep(ping_interval)
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def server_env(data_dir: str, overrides: list[str]) -> dict[str, str]:
+    """Environment of the app under test, with its data in data_dir."""
+    env = dict(os.environ)
+    paths = [str(SRC_DIR), env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(path for path in paths if path)
+    env["YOLO_TRAINING_DIR"] = f"{data_dir}/training"
+    env["YOLO_INFERENCE_JOBS_DIR"] = f"{data_dir}/inference_jobs"
+    env["YOLO_MODEL_CACHE_DIR"] = f"{data_dir}/models"
+    # Rejections under overload are counted here, not logged one by one
+    env["YOLO_LOG_LEVEL"] = "ERROR"
+    for override in overrides:
+        key, _, value = override.partition("=")
+        env[key] = value
+    return env
+
+
+@asynccontextmanager
+async def local_server(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Start the app under uvicorn and connect a client to it."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        port = free_port()
+        command = [sys.executable, "-m", "uvicorn", "yolo_api.main:app"]
+        command += ["--host", "127.0.0.1", "--port", str(port)]
+        command += ["--log-level", "warning"]
+        process = subprocess.Popen(command, env=server_env(data_dir, args.server_env))
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            async with httpx.AsyncClient(
+                base_url=base_url, timeout=args.timeout, limits=client_limits(args)
+            ) as client:
+                deadline = time.perf_counter() + 60
+                while True:
+                    if process.poll() is not None:
+                        raise RuntimeError(f"server exited with {process.returncode}")
+                    try:
+                        if (await client.get("/health")).is_success:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    if time.perf_counter() > deadline:
+                        raise RuntimeError("server did not become healthy in 60s")
+                    await asyncio.sleep(0.2)
+                yield client
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+@asynccontextmanager
+async def remote_server(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Connect a client to an already running server."""
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=args.timeout, limits=client_limits(args)
+    ) as client:
+        yield client
+
+
+@asynccontextmanager
+async def in_process(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    """Run the app in this process and call it through ASGI."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Settings are read when the app is imported
+        os.environ.update(server_env(data_dir, args.server_env))
+        sys.path.insert(0, str(SRC_DIR))
+        from yolo_api.main import app
+
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://loadtest",
+                timeout=args.timeout,
+            ) as client:
+                yield client
+
+
+def client_limits(args: argparse.Namespace) -> httpx.Limits:
+    """Connection pool large enough for the offered load."""
+    connections = max(args.concurrency, args.max_in_flight if args.rate else 0, 10)
+    return httpx.Limits(max_connections=connections)
+
+
+async def prepare(
+    client: httpx.AsyncClient, args: argparse.Namespace, needs_job: bool
+) -> Fixtures:
+    """Upload a tiny model and start an inference job through the API."""
+    images = {}
+    for size in args.image_sizes:
+        width, height = (int(v) for v in size.split("x"))
+        images[size] = make_jpeg(width, height)
+
+    model_id = args.model_id
+    if model_id is None:
+        from ultralytics import YOLO
+
+        with tempfile.TemporaryDirectory() as tmp:
+            weights = Path(tmp) / "model.pt"
+            YOLO(args.model).save(str(weights))
+            response = await client.post(
+                "/api/inference/upload-model",
+                files={"file": ("loadtest.pt", weights.read_bytes())},
+                data={"model_name": "Load test"},
+            )
+        response.raise_for_status()
+        model_id = response.json()["model_id"]
+    (await client.post(f"/api/inference/load/{model_id}")).raise_for_status()
+
+    job_id = args.job_id
+    if job_id is None and needs_job:
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            for index in range(args.job_images):
+                size = args.image_sizes[index % len(args.image_sizes)]
+                zf.writestr(f"image_{index:05d}.jpg", images[size])
+        response = await client.post(
+            "/api/inference/jobs",
+            files={"archive": ("images.zip", archive.getvalue())},
+            data={"model_id": model_id},
+        )
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+    return Fixtures(model_id, job_id, args.training_job, images)
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print the per-operation table."""
+    print(
+        f"{'operation':<36} {'count':>7} {'err%':>6} {'rps':>8} "
+        f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"
+    )
+    for op, stats in report["operations"].items():
+        print(
+            f"{op:<36} {stats['count']:>7} {stats['error_rate']:>6.1%} "
+            f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+            f"{stats['p90_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+            f"{stats['max_ms'] or float('nan'):>8.1f}"
+        )
+        failures = {s: n for s, n in stats["statuses"].items() if not s.startswith("2")}
+        if failures and stats["errors"]:
+            print(f"{'':<36} errors by status: {failures}")
+    print(
+        f"total: {report['requests']} requests in {report['duration_s']}s, "
+        f"{report['throughput_rps']} ok/s, {report['error_rate']:.1%} errors, "
+        f"{report['dropped']} dropped, {report['ws_updates']} ws updates"
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run the load test and return the exit code."""
+    weights = parse_mix(args.mix)
+    needs_job = bool(args.ws_subscribers or args.replay) or "job_status" in weights
+    connect = remote_server if args.url else local_server
+    if args.in_process:
+        connect = in_process
+    recorder = Recorder()
+    async with connect(args) as client:
+        fixtures = await prepare(client, args, needs_job)
+        calls: list[Call] = []
+        if args.replay:
+            # Loaded first: image sizes it refers to are warmed up as well
+            calls, skipped = load_replay(args.replay, fixtures)
+            print(f"replaying {len(calls)} requests ({skipped} records skipped)")
+        rng = random.Random(args.seed)
+        ops, op_weights = list(weights), list(weights.values())
+
+        def next_mix_call() -> Call:
+            return make_call(rng.choices(ops, op_weights)[0], fixtures, rng)
+
+        # The first requests pay for lazy initialization (and the first one
+        # of each image size for its batch queue): keep them out
+        warmup = Recorder()
+        warmup_calls = [
+            make_call(op, replace(fixtures, images={size: image}), rng)
+            for op in ops
+            for size, image in fixtures.images.items()
+        ]
+        warmup_calls += [next_mix_call() for _ in range(args.warmup)]
+        for call in warmup_calls:
+            await send(client, call, warmup)
+
+        subscribers = []
+        if args.ws_subscribers:
+            ws_base = str(client.base_url).replace("http", "ws", 1).rstrip("/")
+            url = f"{ws_base}/ws/inference/jobs/{fixtures.job_id}"
+            subscribers = [
+                asyncio.create_task(subscriber(url, recorder, args.ws_ping_interval))
+                for _ in range(args.ws_subscribers)
+            ]
+
+        start = time.perf_counter()
+        if args.replay:
+            if all(call.at is not None for call in calls):
+                schedule = ((call.at / args.replay_speed, call) for call in calls)
+                await open_loop(client, schedule, recorder, args.max_in_flight)
+            else:
+                pending = iter(calls)
+                await closed_loop(
+                    client,
+                    lambda: next(pending, None),
+                    recorder,
+                    args.concurrency,
+                    float("inf"),
+                )
+        elif args.rate:
+            schedule = poisson_schedule(
+                next_mix_call, args.rate, args.duration, args.seed
+            )
+            await open_loop(client, schedule, recorder, args.max_in_flight)
+        else:
+            await closed_loop(
+                client, next_mix_call, recorder, args.concurrency, args.duration
+            )
+        elapsed = time.perf_counter() - start
+
+        for task in subscribers:
+            task.cancel()
+        await asyncio.gather(*subscribers, return_exceptions=True)
+
+    report = recorder.report(elapsed)
+    report["config"] = {
+        key: str(value) if isinstance(value, Path) else value
+        for key, value in vars(args).items()
+    }
+    print_report(report)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"results written to {args.output}")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        rate, limit = report["error_rate"], args.max_error_rate
+        print(f"FAIL: error rate {rate:.1%} > {limit:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Test a running server instead of starting one")
+    target.add_argument(
+        "--in-process", action="store_true", help="Call the app through ASGI"
+    )
+    parser.add_argument(
+        "--server-env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Setting of the started app, e.g. YOLO_BATCH_MAX_SIZE=16",
+    )
+    parser.add_argument("--mix", default="predict=8,list_models=1,job_status=1")
+    parser.add_argument("--image-sizes", nargs="+", default=["640x480", "1280x720"])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rate", type=float, help="Open loop: mean requests per second")
+    load.add_argument("--replay", type=Path, help="JSONL file of recorded requests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--ws-subscribers", type=int, default=0)
+    parser.add_argument("--ws-ping-interval", type=float, default=1.0)
+    parser.add_argument("--model", default="yolov8n.yaml")
+    parser.add_argument("--model-id", help="Use this model instead of uploading one")
+    parser.add_argument("--job-id", help="Inference job to poll and subscribe to")
+    parser.add_argument("--job-images", type=int, default=200)
+    parser.add_argument("--training-job", help="Training job for training_status")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument(
+        "--output", type=Path, default=Path("benchmarks/results/bench_load.json")
+    )
+    args = parser.parse_args()
+    if args.in_process and args.ws_subscribers:
+        parser.error("--ws-subscribers needs a server (drop --in-process)")
+    if args.ws_subscribers and importlib.util.find_spec("websockets") is None:
+        parser.error("--ws-subscribers needs the websockets package")
+    if "training_status" in parse_mix(args.mix) and not args.training_job:
+        parser.error("training_status in --mix needs --training-job")
+    sys.exit(asyncio.run(main(args)))
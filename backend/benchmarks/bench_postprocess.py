@@ -0,0 +1,96 @@
+"""Benchmark detection post-processing at 10, 100 and 1000 detections.
+
+Compares the previous per-box loop (``boxes[i]`` indexing, one ``.cpu().numpy()``
+per box and validated pydantic objects) with the vectorized path in
+``yolo_api.postprocess``, both starting from an ultralytics ``Boxes`` object.
+
+Usage:
+    python benchmarks/bench_postprocess.py --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import torch  # noqa: E402
+from ultralytics.engine.results import Boxes  # noqa: E402
+
+from yolo_api.models import BoundingBox, Detection  # noqa: E402
+from yolo_api.postprocess import DetectionArrays  # noqa: E402
+
+CLASS_NAMES = [f"class{i}" for i in range(80)]
+
+
+def make_boxes(count: int) -> Boxes:
+    """Create random ultralytics Boxes with the given number of detections."""
+    generator = torch.Generator().manual_seed(count)
+    xy = torch.rand((count, 2), generator=generator) * 600
+    wh = torch.rand((count, 2), generator=generator) * 100 + 1
+    conf = torch.rand((count, 1), generator=generator)
+    cls = torch.randint(0, 80, (count, 1), generator=generator).float()
+    return Boxes(torch.cat([xy, xy + wh, conf, cls], dim=1), orig_shape=(720, 1280))
+
+
+def per_box_loop(boxes: Any, class_names: list[str]) -> list[Detection]:
+    """Post-processing as implemented before vectorization."""
+    detections: list[Detection] = []
+    for i in range(len(boxes)):
+        box = boxes[i]
+        class_id = int(box.cls[0])
+        conf = float(box.conf[0])
+        xyxy = box.xyxy[0].cpu().numpy()
+        class_name = (
+            class_names[class_id] if class_id < len(class_names) else f"class_{class_id}"
+        )
+        detections.append(
+            Detection(
+                class_id=class_id,
+                class_name=class_name,
+                confidence=conf,
+                bbox=BoundingBox(
+                    x1=float(xyxy[0]),
+                    y1=float(xyxy[1]),
+                    x2=float(xyxy[2]),
+                    y2=float(xyxy[3]),
+                ),
+            )
+        )
+    return detections
+
+
+def vectorized(boxes: Any, class_names: list[str]) -> list[Detection]:
+    """Post-processing through DetectionArrays."""
+    return DetectionArrays.from_boxes(boxes).to_detections(class_names)
+
+
+def time_ms(func: Any, boxes: Boxes, repeat: int) -> float:
+    """Return the mean time of func over repeat runs in ms."""
+    func(boxes, CLASS_NAMES)  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(boxes, CLASS_NAMES)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    print(f"{'detections':>10} {'per-box ms':>12} {'vectorized ms':>14} {'speedup':>8}")
+    for count in args.counts:
+        boxes = make_boxes(count)
+        assert [d.model_dump() for d in per_box_loop(boxes, CLASS_NAMES)] == [
+            d.model_dump() for d in vectorized(boxes, CLASS_NAMES)
+        ]
+        legacy = time_ms(per_box_loop, boxes, args.repeat)
+        fast = time_ms(vectorized, boxes, args.repeat)
+        print(f"{count:>10} {legacy:>12.3f} {fast:>14.3f} {legacy / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,172 @@
+"""Benchmark API process startup: import time per module and first /health.
+
+Every run starts a fresh interpreter. Import times come from
+``python -X importtime``. The time to the first /health response is measured
+from spawning a process that imports the app, runs its startup (lifespan) and
+sends one request through the ASGI interface, so no server or network is
+involved. Heavy ML packages (torch, ultralytics, onnxruntime) imported while
+starting are reported, since they cost seconds per worker.
+
+Pass budgets to exit with code 1 when startup regresses.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --max-health-ms 2500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+HEAVY_MODULES = ("torch", "ultralytics", "onnxruntime")
+
+FIRST_HEALTH = """
+import asyncio
+import sys
+
+from httpx import ASGITransport, AsyncClient
+
+from yolo_api.main import app
+
+
+async def first_health() -> None:
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+        heavy = [m for m in {heavy!r} if m in sys.modules]
+        print("HEALTH", response.status_code, ",".join(heavy), flush=True)
+
+
+asyncio.run(first_health())
+"""
+
+
+def child_env(data_dir: str) -> dict[str, str]:
+    """Environment of a benchmarked process, with its data in data_dir."""
+    env = dict(os.environ)
+    paths = [str(SRC_DIR), env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(path for path in paths if path)
+    env["YOLO_TRAINING_DIR"] = f"{data_dir}/training"
+    env["YOLO_INFERENCE_JOBS_DIR"] = f"{data_dir}/inference_jobs"
+    env["YOLO_MODEL_CACHE_DIR"] = f"{data_dir}/models"
+    # The background import would only compete with the measured request
+    env["YOLO_PREIMPORT_ML_RUNTIME"] = "false"
+    env["YOLO_LOG_LEVEL"] = "WARNING"
+    return env
+
+
+def import_times(env: dict[str, str]) -> dict[str, float]:
+    """Import the app once and return the cumulative ms per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import yolo_api.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def first_health(env: dict[str, str]) -> tuple[float, list[str]]:
+    """Return ms from process spawn to the first /health response.
+
+    Also returns the heavy modules imported by then.
+    """
+    script = FIRST_HEALTH.format(heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", script], env=env, stdout=subprocess.PIPE, text=True
+    )
+    assert process.stdout is not None
+    for line in process.stdout:
+        if line.startswith("HEALTH "):
+            break
+    elapsed = (time.perf_counter() - start) * 1000
+    process.wait()
+    _, status, heavy = (line.strip() + " ").split(" ", 2)
+    if status != "200":
+        raise RuntimeError(f"/health failed: {line!r}")
+    return elapsed, [name for name in heavy.strip().split(",") if name]
+
+
+def main(args: argparse.Namespace) -> int:
+    """Run the benchmark and return the exit code."""
+    per_module: dict[str, list[float]] = defaultdict(list)
+    health: list[float] = []
+    heavy: set[str] = set()
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = child_env(data_dir)
+        for _ in range(args.runs):
+            for name, ms in import_times(env).items():
+                per_module[name].append(ms)
+            elapsed, imported = first_health(env)
+            health.append(elapsed)
+            heavy.update(imported)
+
+    medians = {name: statistics.median(times) for name, times in per_module.items()}
+    total_ms = medians["yolo_api.main"]
+    print(f"runs={args.runs} (median cumulative import time per module)")
+    own = sorted(
+        (name for name in medians if name.startswith("yolo_api")),
+        key=medians.__getitem__,
+        reverse=True,
+    )
+    for name in own:
+        print(f"  {name:<28} {medians[name]:8.1f}ms")
+    third_party = sorted(
+        (
+            name
+            for name in medians
+            if "." not in name and not name.startswith("yolo_api")
+        ),
+        key=medians.__getitem__,
+        reverse=True,
+    )[: args.top]
+    print(f"slowest top-level packages (top {args.top}):")
+    for name in third_party:
+        print(f"  {name:<28} {medians[name]:8.1f}ms")
+
+    health_ms = statistics.median(health)
+    print(f"import yolo_api.main        {total_ms:8.1f}ms")
+    print(f"spawn to first /health      {health_ms:8.1f}ms (max {max(health):.1f}ms)")
+    print(f"heavy modules at startup    {', '.join(sorted(heavy)) or 'none'}")
+
+    failures = []
+    if args.max_import_ms and total_ms > args.max_import_ms:
+        failures.append(f"import took {total_ms:.1f}ms > {args.max_import_ms}ms")
+    if args.max_health_ms and health_ms > args.max_health_ms:
+        failures.append(
+            f"first /health took {health_ms:.1f}ms > {args.max_health_ms}ms"
+        )
+    if heavy and not args.allow_heavy:
+        failures.append(f"heavy modules imported at startup: {sorted(heavy)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=0.0)
+    parser.add_argument("--max-health-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--allow-heavy",
+        action="store_true",
+        help="Do not fail when torch/ultralytics/onnxruntime load at startup",
+    )
+    sys.exit(main(parser.parse_args()))
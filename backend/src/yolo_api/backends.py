@@ -0,0 +1,460 @@
+"""Pluggable model execution backends."""
+
+import ast
+import importlib.util
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+
+from .config import settings
+from .exceptions import UnsupportedModelTaskError
+from .imaging import letterbox, to_input_tensor
+from .logging_config import logger
+from .metrics import record_stage, timed_stage
+from .model_cache import estimate_model_bytes
+from .postprocess import Candidates, DetectionArrays, head_candidates
+
+
+class InferenceBackend(ABC):
+    """Runs forward passes of one loaded model.
+
+    Backends take decoded BGR images and return detections in the coordinates
+    of each input image, so batching, caching and the API do not depend on
+    the runtime that executes the model.
+    """
+
+    name: ClassVar[str]
+
+    @abstractmethod
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        """Run one forward pass over a batch of images.
+
+        Args:
+            images: Decoded BGR image arrays
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+
+        Returns:
+            Detection arrays for each image, in input order
+        """
+
+    @property
+    @abstractmethod
+    def supports_candidates(self) -> bool:
+        """Whether ``forward_candidates`` can run this model."""
+
+    @abstractmethod
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        """Run one forward pass and keep the pre-NMS candidates of each image.
+
+        Only called when ``supports_candidates`` is true.
+
+        Args:
+            images: Decoded BGR image arrays
+            floor: Lowest confidence threshold the candidates must support
+
+        Returns:
+            Candidates for each image, in input order
+        """
+
+    @property
+    def input_size(self) -> int | None:
+        """Square input size the model letterboxes images to, if known."""
+        return None
+
+    @property
+    def class_names(self) -> list[str]:
+        """Class names embedded in the model, if any."""
+        return []
+
+    def size_bytes(self, model_path: Path | None = None) -> int:
+        """Estimate the resident memory of the loaded model."""
+        if model_path is not None and model_path.exists():
+            return model_path.stat().st_size
+        return 0
+
+
+class UltralyticsBackend(InferenceBackend):
+    """Runs models through ultralytics ``YOLO`` (PyTorch weights and others)."""
+
+    name = "torch"
+
+    def __init__(self, model: Any, imgsz: int | None = None) -> None:
+        """Initialize with a loaded model.
+
+        Args:
+            model: Ultralytics YOLO model
+            imgsz: Input size to run at (default: the model's own)
+        """
+        self.model = model
+        self.imgsz = imgsz
+
+    @classmethod
+    def load(cls, model_path: Path, imgsz: int | None = None) -> "UltralyticsBackend":
+        """Load weights with ultralytics.
+
+        Args:
+            model_path: Weights file (.pt, .onnx, .torchscript, ...)
+            imgsz: Input size to run at (default: the model's own)
+
+        Returns:
+            Backend wrapping the loaded model
+        """
+        from ultralytics import YOLO  # type: ignore[attr-defined]
+
+        return cls(YOLO(str(model_path)), imgsz=imgsz)
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        """Run one forward pass over a batch of images."""
+        kwargs = {"imgsz": self.imgsz} if self.imgsz else {}
+        results = self.model.predict(
+            images if len(images) > 1 else images[0],
+            conf=confidence,
+            iou=iou,
+            verbose=False,
+            **kwargs,
+        )
+        # Per-image averages of the batch, as measured by the predictor
+        speed = getattr(results[0], "speed", None) if results else None
+        if isinstance(speed, dict):
+            for stage, key in (
+                ("preprocess", "preprocess"),
+                ("forward", "inference"),
+                ("nms", "postprocess"),
+            ):
+                if isinstance(speed.get(key), (int, float)):
+                    record_stage(stage, speed[key] * len(results))
+        return [DetectionArrays.from_boxes(result.boxes) for result in results]
+
+    @property
+    def supports_candidates(self) -> bool:
+        """Whether the model is a detection model wrapped in ultralytics ``Model``.
+
+        Only ``Model`` exposes its predictor, and only detection heads decode
+        to boxes and class scores (segmentation and pose heads add mask
+        coefficients and keypoints).
+        """
+        from ultralytics.engine.model import Model
+
+        return isinstance(self.model, Model) and self.model.task == "detect"
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        """Run the predictor's model directly and decode its raw head output."""
+        import torch
+
+        if not self.supports_candidates:
+            raise UnsupportedModelTaskError(
+                self.name, getattr(self.model, "task", "unknown")
+            )
+        predictor = self.model.predictor
+        if predictor is None:
+            # The first predict call sets up the predictor and its AutoBackend
+            self.predict(images[:1], floor, 0.5)
+            predictor = self.model.predictor
+        backend = predictor.model
+        imgsz = max(predictor.imgsz)
+        # Dynamic-shape formats take stride-aligned rectangles, like predict()
+        dynamic = backend.format == "pt" or getattr(backend, "dynamic", False)
+        stride = int(backend.stride) if dynamic else None
+
+        with timed_stage("preprocess"):
+            boxes = [letterbox(image, imgsz, stride) for image in images]
+            if len({box.image.shape for box in boxes}) > 1:
+                boxes = [letterbox(image, imgsz) for image in images]
+            batch = torch.from_numpy(to_input_tensor([box.image for box in boxes]))
+            batch = batch.to(backend.device)
+        with timed_stage("forward"), torch.inference_mode():
+            output = backend(batch.half() if backend.fp16 else batch)
+            if isinstance(output, (list, tuple)):
+                output = output[0]
+            output = output.float().cpu().numpy()
+
+        end2end = bool(getattr(backend, "end2end", False))
+        num_classes = len(self.class_names) or None
+        with timed_stage("nms"):
+            return [
+                head_candidates(
+                    prediction,
+                    floor,
+                    box.gain,
+                    box.pad,
+                    image.shape[:2],
+                    end2end,
+                    num_classes,
+                )
+                for prediction, box, image in zip(output, boxes, images, strict=True)
+            ]
+
+    @property
+    def input_size(self) -> int | None:
+        """Configured input size, else the training size in the model overrides."""
+        if self.imgsz:
+            return self.imgsz
+        overrides = getattr(self.model, "overrides", None)
+        imgsz = overrides.get("imgsz") if isinstance(overrides, dict) else None
+        if isinstance(imgsz, (list, tuple)) and imgsz:
+            imgsz = max(imgsz)
+        return int(imgsz) if isinstance(imgsz, int) else None
+
+    @property
+    def class_names(self) -> list[str]:
+        """Class names of the model."""
+        names = getattr(self.model, "names", None)
+        return [names[i] for i in sorted(names)] if isinstance(names, dict) else []
+
+    def size_bytes(self, model_path: Path | None = None) -> int:
+        """Parameter and buffer bytes of the torch module."""
+        return estimate_model_bytes(self.model, model_path)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """Runs exported ONNX models on a dedicated ONNX Runtime session.
+
+    Pre- and post-processing are done here in NumPy: images are letterboxed
+    and stacked into one NCHW batch, and the raw head output is decoded with
+    vectorized class-aware NMS. No torch code runs on this path.
+
+    Only detection heads are decoded: exports of other tasks (segmentation,
+    pose, ...) carry mask or keypoint rows and are rejected with
+    ``UnsupportedModelTaskError``.
+    """
+
+    name = "onnxruntime"
+
+    def __init__(
+        self,
+        model_path: Path,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int | None = None,
+        imgsz: int | None = None,
+    ) -> None:
+        """Create the inference session.
+
+        Args:
+            model_path: Exported .onnx file
+            intra_op_threads: Threads inside one operator (0 = runtime default)
+            inter_op_threads: Threads across independent operators
+            imgsz: Input size for graphs with dynamic height and width
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = (
+            intra_op_threads
+            if intra_op_threads is not None
+            else settings.onnx_intra_op_threads
+        )
+        options.inter_op_num_threads = (
+            inter_op_threads
+            if inter_op_threads is not None
+            else settings.onnx_inter_op_threads
+        )
+        providers = ["CPUExecutionProvider"]
+        if (
+            settings.default_device == "cuda"
+            and "CUDAExecutionProvider" in ort.get_available_providers()
+        ):
+            providers.insert(0, "CUDAExecutionProvider")
+
+        self.model_path = model_path
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=providers
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._input_dtype = (
+            np.float16 if model_input.type == "tensor(float16)" else np.float32
+        )
+        batch, _, height, width = model_input.shape
+        # Models exported without dynamic axes only accept a fixed batch
+        self._max_batch = batch if isinstance(batch, int) else None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self._metadata = metadata
+        # Exports without ultralytics metadata are assumed to be detectors
+        task = metadata.get("task", "detect")
+        if task != "detect":
+            raise UnsupportedModelTaskError(self.name, task)
+        # Class score rows; any rows after them are not class scores
+        self._num_classes = len(self.class_names) or None
+        self._end2end = metadata.get("end2end") == "True"
+        if isinstance(height, int) and isinstance(width, int):
+            self._imgsz = max(height, width)
+            self._stride: int | None = None
+        else:
+            exported = _literal(metadata.get("imgsz"))
+            self._imgsz = imgsz or (
+                max(exported)
+                if isinstance(exported, list)
+                else settings.default_image_size
+            )
+            # Dynamic height and width accept stride-aligned rectangles
+            stride = _literal(metadata.get("stride"))
+            self._stride = stride if isinstance(stride, int) else 32
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        """Run one forward pass over a batch of images."""
+        candidates = self.forward_candidates(images, confidence)
+        with timed_stage("nms"):
+            return [c.select(confidence, iou) for c in candidates]
+
+    @property
+    def supports_candidates(self) -> bool:
+        """The raw head output is always available."""
+        return True
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        """Run one forward pass and keep the pre-NMS candidates of each image."""
+        chunk = self._max_batch or len(images)
+        results: list[Candidates] = []
+        for start in range(0, len(images), chunk):
+            results.extend(self._forward_chunk(images[start : start + chunk], floor))
+        return results
+
+    def _forward_chunk(self, images: list[np.ndarray], floor: float) -> list[Candidates]:
+        """Run a batch no larger than the model accepts."""
+        with timed_stage("preprocess"):
+            boxes = [letterbox(image, self._imgsz, self._stride) for image in images]
+            if len({box.image.shape for box in boxes}) > 1:
+                # Mixed aspect ratios only stack as squares
+                boxes = [letterbox(image, self._imgsz) for image in images]
+            batch = to_input_tensor([box.image for box in boxes], self._input_dtype)
+        with timed_stage("forward"):
+            output = self.session.run(None, {self._input_name: batch})[0]
+        with timed_stage("nms"):
+            return [
+                head_candidates(
+                    prediction,
+                    floor,
+                    box.gain,
+                    box.pad,
+                    image.shape[:2],
+                    self._end2end,
+                    self._num_classes,
+                )
+                for prediction, box, image in zip(output, boxes, images, strict=True)
+            ]
+
+    @property
+    def input_size(self) -> int | None:
+        """Input size of the exported graph."""
+        return self._imgsz
+
+    @property
+    def class_names(self) -> list[str]:
+        """Class names stored in the export metadata."""
+        names = _literal(self._metadata.get("names"))
+        return [str(names[i]) for i in sorted(names)] if isinstance(names, dict) else []
+
+
+def _literal(value: str | None) -> Any:
+    """Parse a Python literal stored as ONNX metadata (None if absent/invalid)."""
+    if value is None:
+        return None
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def onnxruntime_available() -> bool:
+    """Check whether the optional onnxruntime dependency is installed."""
+    return importlib.util.find_spec("onnxruntime") is not None
+
+
+def as_backend(model: Any) -> InferenceBackend:
+    """Wrap a bare ultralytics model in a backend (backends pass through)."""
+    return model if isinstance(model, InferenceBackend) else UltralyticsBackend(model)
+
+
+def select_weights(model_path: Path) -> Path:
+    """Pick the weights file to serve for the configured backend.
+
+    With ``inference_backend="auto"`` the fastest format recorded in the
+    post-training benchmark is served; without a benchmark an exported
+    ``.onnx`` next to the PyTorch weights is preferred when onnxruntime is
+    installed. With ``"onnxruntime"`` the weights are exported on first use.
+
+    Args:
+        model_path: PyTorch weights (.pt) or an .onnx file
+
+    Returns:
+        Path of the weights to load
+    """
+    if model_path.suffix == ".onnx" or settings.inference_backend == "torch":
+        return model_path
+    if settings.inference_backend == "auto":
+        from .export import load_benchmark
+
+        benchmark = load_benchmark(model_path.parent)
+        if benchmark is not None:
+            fastest = model_path.parent / benchmark.formats.get(
+                benchmark.fastest, model_path.name
+            )
+            if fastest.exists() and (
+                fastest.suffix != ".onnx" or onnxruntime_available()
+            ):
+                return fastest
+    onnx_path = model_path.with_suffix(".onnx")
+    if onnx_path.exists() and onnxruntime_available():
+        return onnx_path
+    if settings.inference_backend == "onnxruntime":
+        return export_onnx(model_path)
+    return model_path
+
+
+def export_onnx(model_path: Path) -> Path:
+    """Export PyTorch weights to ONNX with a dynamic batch axis.
+
+    Args:
+        model_path: PyTorch weights (.pt)
+
+    Returns:
+        Path of the exported .onnx file (next to the weights)
+    """
+    from ultralytics import YOLO  # type: ignore[attr-defined]
+
+    logger.info("onnx_export_started", model_path=str(model_path))
+    exported = Path(YOLO(str(model_path)).export(format="onnx", dynamic=True))
+    logger.info("onnx_export_completed", onnx_path=str(exported))
+    return exported
+
+
+def load_backend(model_path: Path) -> InferenceBackend:
+    """Load weights with the backend configured for their format.
+
+    Args:
+        model_path: Weights file to load
+
+    Returns:
+        Loaded backend
+    """
+    if model_path.suffix == ".onnx" and (
+        settings.inference_backend == "onnxruntime"
+        or (settings.inference_backend == "auto" and onnxruntime_available())
+    ):
+        try:
+            return OnnxRuntimeBackend(model_path)
+        except UnsupportedModelTaskError as e:
+            # Ultralytics decodes the heads of every task it exports
+            logger.info(
+                "onnx_backend_fallback", model_path=str(model_path), task=e.task
+            )
+    return UltralyticsBackend.load(model_path)
@@ -0,0 +1,537 @@
+"""Dynamic micro-batching for inference requests."""
+
+import asyncio
+import math
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .config import settings
+from .exceptions import DeadlineExceededError, ServiceOverloadedError
+from .executor import InferenceExecutor, inference_executor
+from .logging_config import logger
+from .metrics import Histogram
+from .postprocess import DetectionArrays
+from .workers import model_host
+
+# (model_id, images, confidence, iou[, cache_keys=...]) -> detections per image
+BatchRunner = Callable[..., list[DetectionArrays]]
+
+
+@dataclass
+class BatchResult:
+    """Result delivered to a single request of a batch."""
+
+    detections: DetectionArrays
+    inference_time: float  # Forward pass time of the whole batch in ms
+    batch_size: int
+    queue_time: float  # Time spent waiting for the batch in ms
+
+
+@dataclass
+class _PendingRequest:
+    """Request waiting in a model queue."""
+
+    image: np.ndarray
+    confidence: float
+    iou: float
+    future: "asyncio.Future[BatchResult]"
+    cache_key: str | None = None
+    deadline: float | None = None  # time.perf_counter() the client gives up at
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchScheduler:
+    """Collects concurrent requests per model and runs them as one batch.
+
+    Each model gets its own queue and consumer task. The consumer takes the
+    first waiting request, keeps collecting until either the batch is full or
+    ``max_wait_ms`` has elapsed since that request arrived, then runs the whole
+    batch through a single forward pass. To keep tail latency bounded, the
+    effective batch size shrinks when the measured per-image forward cost
+    would push a batch past ``latency_budget_ms``.
+
+    Admission control bounds each queue: a request is rejected up front when
+    ``max_queue_depth`` requests are already waiting or running, or when the
+    backlog ahead of it would keep it queued longer than ``max_queue_ms``.
+    Requests that still outwait ``max_queue_ms`` are shed before their batch
+    runs instead of spending a forward pass on an answer that comes too late.
+    The same happens to requests past their own deadline, and to requests
+    whose caller stopped waiting (client disconnected).
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+        latency_budget_ms: float | None = None,
+        executor: InferenceExecutor | None = None,
+        max_queue_depth: int | None = None,
+        max_queue_ms: float | None = None,
+        concurrency: Callable[[str], int] | None = None,
+    ) -> None:
+        """Initialize batch scheduler.
+
+        Args:
+            runner: Blocking function running one batch for a model
+            max_batch_size: Maximum number of images per forward pass
+            max_wait_ms: Maximum time the first request waits for a batch
+            latency_budget_ms: Target upper bound for queue wait plus forward time
+            executor: Thread pool running the batches (default: inference_executor)
+            max_queue_depth: Requests queued or running per model (0 = unlimited)
+            max_queue_ms: Maximum queue wait of a request (0 = unlimited)
+            concurrency: Batches a model can run at once (default: 1 each)
+        """
+        self.runner = runner
+        self.executor = executor or inference_executor
+        self.concurrency = concurrency or (lambda model_id: 1)
+        self.max_batch_size = max_batch_size or settings.batch_max_size
+        self.max_wait_ms = (
+            max_wait_ms if max_wait_ms is not None else settings.batch_max_wait_ms
+        )
+        self.latency_budget_ms = latency_budget_ms or settings.batch_latency_budget_ms
+        self.max_queue_depth = (
+            max_queue_depth
+            if max_queue_depth is not None
+            else settings.admission_max_queue_depth
+        )
+        self.max_queue_ms = (
+            max_queue_ms
+            if max_queue_ms is not None
+            else settings.admission_max_queue_ms
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queues: dict[str, asyncio.Queue[_PendingRequest]] = {}
+        self._workers: dict[str, asyncio.Task[None]] = {}
+        self._batches: set[asyncio.Task[None]] = set()  # Batches being run
+        self._per_image_ms: dict[str, float] = {}  # EWMA forward cost per image
+        self._depth: dict[str, int] = {}  # Requests queued or running per model
+        self._rejected: dict[str, dict[str, int]] = {}
+        self._queue_wait: dict[str, Histogram] = {}
+        self._compute: dict[str, dict[str, float]] = {}
+
+    async def submit(
+        self,
+        model_id: str,
+        image: np.ndarray,
+        confidence: float = 0.25,
+        iou: float = 0.45,
+        cache_key: str | None = None,
+        deadline: float | None = None,
+    ) -> BatchResult:
+        """Queue an image for the next batch of a model and wait for its result.
+
+        Args:
+            model_id: Model identifier
+            image: Decoded BGR image array
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+            cache_key: Image digest under which the runner caches pre-NMS outputs
+            deadline: ``time.perf_counter()`` after which the result is useless
+
+        Returns:
+            BatchResult for this image
+
+        Raises:
+            ServiceOverloadedError: If the model queue is full, or the request
+                would wait (or has waited) longer than the max queue time
+            DeadlineExceededError: If the deadline passed before the result
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queue_for(model_id)
+        self._admit(model_id)
+        pending = _PendingRequest(
+            image=image,
+            confidence=confidence,
+            iou=iou,
+            future=loop.create_future(),
+            cache_key=cache_key,
+            deadline=deadline,
+        )
+        self._depth[model_id] = self._depth.get(model_id, 0) + 1
+        try:
+            queue.put_nowait(pending)
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.perf_counter())
+                await asyncio.wait({pending.future}, timeout=timeout)
+                if not pending.future.done():
+                    pending.future.set_exception(
+                        DeadlineExceededError("waiting for inference")
+                    )
+            return await pending.future
+        finally:
+            # Tells the consumer nobody waits for the result anymore
+            pending.future.cancel()
+            self._depth[model_id] = max(0, self._depth[model_id] - 1)
+
+    @contextmanager
+    def reserve(self, model_id: str, images: int) -> Iterator[None]:
+        """Admit work that runs a model outside its queue, like tiled requests.
+
+        The request passes the same admission checks as a queued one, and its
+        images count towards the model's queue depth while the block runs, so
+        requests behind it see the load.
+
+        Args:
+            model_id: Model identifier
+            images: Images the work runs through the model
+
+        Raises:
+            ServiceOverloadedError: If the model queue is over its limits
+        """
+        self._admit(model_id)
+        self._depth[model_id] = self._depth.get(model_id, 0) + images
+        try:
+            yield
+        finally:
+            self._depth[model_id] = max(0, self._depth.get(model_id, 0) - images)
+
+    def effective_batch_size(self, model_id: str) -> int:
+        """Largest batch that should still finish within the latency budget.
+
+        Args:
+            model_id: Model identifier
+
+        Returns:
+            Batch size limit for the next batch of this model
+        """
+        per_image_ms = self._per_image_ms.get(model_id)
+        if not per_image_ms:
+            return self.max_batch_size
+        available_ms = self.latency_budget_ms - self.max_wait_ms
+        return max(1, min(self.max_batch_size, int(available_ms // per_image_ms)))
+
+    def estimated_wait_ms(self, model_id: str, position: int) -> float:
+        """Expected queue wait of a request behind ``position - 1`` others.
+
+        Args:
+            model_id: Model identifier
+            position: 1-based position of the request in the model queue
+
+        Returns:
+            Forward time of the full batches ahead, which run in parallel on
+            the model's replicas, plus the batching window (only the window
+            until the model's forward cost is measured)
+        """
+        per_image_ms = self._per_image_ms.get(model_id, 0.0)
+        batch_size = self.effective_batch_size(model_id)
+        parallel = max(1, self.concurrency(model_id))
+        rounds_ahead = (position - 1) // (batch_size * parallel)
+        return rounds_ahead * batch_size * per_image_ms + self.max_wait_ms
+
+    def retry_after(self, model_id: str) -> int:
+        """Seconds until the current backlog of a model should have drained."""
+        depth = self._depth.get(model_id, 0)
+        drain_ms = depth * self._per_image_ms.get(model_id, 0.0)
+        drain_ms /= max(1, self.concurrency(model_id))
+        return max(1, math.ceil(drain_ms / 1000))
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth, batch sizing and admission counters per model."""
+        return {
+            model_id: {
+                "queue_depth": self._depth.get(model_id, 0),
+                "per_image_ms": round(self._per_image_ms.get(model_id, 0.0), 2),
+                "effective_batch_size": self.effective_batch_size(model_id),
+                "estimated_wait_ms": round(
+                    self.estimated_wait_ms(
+                        model_id, self._depth.get(model_id, 0) + 1
+                    ),
+                    2,
+                ),
+                "rejected": self._rejected_counts(model_id),
+                "queue_wait_ms": self._wait_histogram(model_id).snapshot(),
+                "compute": {
+                    name: round(value, 2)
+                    for name, value in self._compute_counts(model_id).items()
+                },
+            }
+            for model_id in self._queues
+        }
+
+    def queue_depths(self) -> dict[str, int]:
+        """Requests queued or running per model."""
+        return dict(self._depth)
+
+    def queue_wait_histograms(self) -> dict[str, Histogram]:
+        """Queue wait histogram per model."""
+        return dict(self._queue_wait)
+
+    async def close(self) -> None:
+        """Cancel all consumer tasks and fail requests still waiting."""
+        tasks = [*self._workers.values(), *self._batches]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for queue in self._queues.values():
+            while not queue.empty():
+                pending = queue.get_nowait()
+                if not pending.future.done():
+                    pending.future.cancel()
+        self._workers.clear()
+        self._queues.clear()
+
+    def _queue_for(self, model_id: str) -> asyncio.Queue[_PendingRequest]:
+        """Get the queue of a model, starting its consumer on first use."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and tasks are bound to the loop that created them
+            self._loop = loop
+            self._queues.clear()
+            self._workers.clear()
+            self._depth.clear()
+        if model_id not in self._queues:
+            self._queues[model_id] = asyncio.Queue()
+        worker = self._workers.get(model_id)
+        if worker is None or worker.done():
+            self._workers[model_id] = asyncio.create_task(self._consume(model_id))
+        return self._queues[model_id]
+
+    def _admit(self, model_id: str) -> None:
+        """Reject a new request if the model backlog is over its limits."""
+        depth = self._depth.get(model_id, 0)
+        wait_ms = self.estimated_wait_ms(model_id, depth + 1)
+        if self.max_queue_depth and depth >= self.max_queue_depth:
+            self._reject(
+                model_id,
+                "queue_full",
+                f"{depth} requests queued (limit {self.max_queue_depth})",
+            )
+        if self.max_queue_ms and wait_ms > self.max_queue_ms:
+            self._reject(
+                model_id,
+                "queue_time",
+                f"expected queue wait {wait_ms:.0f}ms "
+                f"exceeds {self.max_queue_ms:.0f}ms",
+            )
+
+    def _reject(self, model_id: str, reason: str, detail: str) -> None:
+        """Count a rejection and raise it."""
+        rejected = self._rejected_counts(model_id)
+        rejected[reason] += 1
+        retry_after = self.retry_after(model_id)
+        logger.warning(
+            "inference_rejected",
+            model_id=model_id,
+            reason=reason,
+            queue_depth=self._depth.get(model_id, 0),
+            retry_after=retry_after,
+        )
+        raise ServiceOverloadedError(model_id, detail, retry_after)
+
+    def _rejected_counts(self, model_id: str) -> dict[str, int]:
+        """Rejections of a model by reason."""
+        return self._rejected.setdefault(
+            model_id, {"queue_full": 0, "queue_time": 0, "expired": 0}
+        )
+
+    def _wait_histogram(self, model_id: str) -> Histogram:
+        """Queue wait histogram of a model."""
+        return self._queue_wait.setdefault(model_id, Histogram())
+
+    def _compute_counts(self, model_id: str) -> dict[str, float]:
+        """Forward passes skipped (saved) or run for no reader (wasted)."""
+        return self._compute.setdefault(
+            model_id,
+            {
+                "saved_cancelled": 0,
+                "saved_deadline": 0,
+                "saved_expired": 0,
+                "saved_forward_ms": 0.0,  # Estimated from the per-image cost
+                "wasted_cancelled": 0,
+                "wasted_deadline": 0,
+                "wasted_forward_ms": 0.0,
+            },
+        )
+
+    def _drop(self, model_id: str, pending: _PendingRequest) -> bool:
+        """Fail or discard a queued request that should not run.
+
+        Requests are dropped when their caller stopped waiting, their
+        deadline passed, or they waited past the max queue time.
+
+        Returns:
+            True if the request was dropped and must not run
+        """
+        now = time.perf_counter()
+        if pending.future.done():
+            reason = "deadline" if self._timed_out(pending) else "cancelled"
+        elif pending.deadline is not None and now > pending.deadline:
+            reason = "deadline"
+            pending.future.set_exception(DeadlineExceededError("while queued"))
+        elif self.max_queue_ms and (now - pending.enqueued_at) * 1000 > (
+            self.max_queue_ms
+        ):
+            reason = "expired"
+            waited_ms = (now - pending.enqueued_at) * 1000
+            try:
+                self._reject(
+                    model_id,
+                    "expired",
+                    f"waited {waited_ms:.0f}ms in queue "
+                    f"(limit {self.max_queue_ms:.0f}ms)",
+                )
+            except ServiceOverloadedError as e:
+                pending.future.set_exception(e)
+        else:
+            return False
+        compute = self._compute_counts(model_id)
+        compute[f"saved_{reason}"] += 1
+        compute["saved_forward_ms"] += self._per_image_ms.get(model_id, 0.0)
+        return True
+
+    @staticmethod
+    def _timed_out(pending: _PendingRequest) -> bool:
+        """Whether a finished request was failed by its deadline."""
+        future = pending.future
+        return not future.cancelled() and isinstance(
+            future.exception(), DeadlineExceededError
+        )
+
+    def _wasted(self, model_id: str, pending: _PendingRequest, cost_ms: float) -> bool:
+        """Account a forward pass whose result nobody will read.
+
+        Returns:
+            True if the caller stopped waiting or the deadline passed
+        """
+        if pending.future.done():
+            reason = "deadline" if self._timed_out(pending) else "cancelled"
+        elif pending.deadline is not None and time.perf_counter() > pending.deadline:
+            reason = "deadline"
+            pending.future.set_exception(DeadlineExceededError("during inference"))
+        else:
+            return False
+        compute = self._compute_counts(model_id)
+        compute[f"wasted_{reason}"] += 1
+        compute["wasted_forward_ms"] += cost_ms
+        return True
+
+    async def _collect(self, model_id: str) -> list[_PendingRequest]:
+        """Wait for the next batch of requests of a model."""
+        queue = self._queues[model_id]
+        first = await queue.get()
+        while self._drop(model_id, first):
+            first = await queue.get()
+        batch = [first]
+        limit = self.effective_batch_size(model_id)
+        deadline = first.enqueued_at + self.max_wait_ms / 1000
+
+        while len(batch) < limit:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # Window closed, but still take whatever is already queued
+                while len(batch) < limit and not queue.empty():
+                    batch.append(queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return [pending for pending in batch if not self._drop(model_id, pending)]
+
+    async def _consume(self, model_id: str) -> None:
+        """Consumer loop running the batches of a single model.
+
+        Up to ``concurrency(model_id)`` batches run at once (one per model
+        replica); the next batch is collected only when one can start.
+        """
+        running: set[asyncio.Task[None]] = set()
+        while True:
+            while len(running) >= max(1, self.concurrency(model_id)):
+                _, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+            batch = await self._collect(model_id)
+            if not batch:
+                continue
+            task = asyncio.create_task(self._run_batch(model_id, batch))
+            running.add(task)
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, model_id: str, batch: list[_PendingRequest]) -> None:
+        """Run the forward passes of one batch and deliver the results."""
+        try:
+            await self._run_groups(model_id, batch)
+        finally:
+            # Only left pending when the scheduler is closed mid-batch
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.cancel()
+
+    async def _run_groups(self, model_id: str, batch: list[_PendingRequest]) -> None:
+        """Split a batch by IoU and run each group as one forward pass."""
+        started_at = time.perf_counter()
+        wait_histogram = self._wait_histogram(model_id)
+        for pending in batch:
+            wait_histogram.observe((started_at - pending.enqueued_at) * 1000)
+
+        # NMS IoU cannot be applied after the fact, so requests with a
+        # different IoU go in separate forward passes. Confidence can: run
+        # at the lowest threshold of the group and filter per request.
+        groups: dict[float, list[_PendingRequest]] = {}
+        for pending in batch:
+            groups.setdefault(pending.iou, []).append(pending)
+
+        for iou, queued in groups.items():
+            # Callers may have given up while earlier groups ran
+            group = [p for p in queued if not self._drop(model_id, p)]
+            if not group:
+                continue
+            confidence = min(p.confidence for p in group)
+            images = [p.image for p in group]
+            cache_keys = [p.cache_key for p in group]
+            kwargs = {"cache_keys": cache_keys} if any(cache_keys) else {}
+            group_start = time.perf_counter()
+            try:
+                results = await self.executor.run(
+                    self.runner, model_id, images, confidence, iou, **kwargs
+                )
+            except Exception as e:
+                for pending in group:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            forward_ms = (time.perf_counter() - group_start) * 1000
+            self._record_cost(model_id, forward_ms / len(group))
+
+            for pending, detections in zip(group, results, strict=True):
+                if self._wasted(model_id, pending, forward_ms / len(group)):
+                    continue
+                if pending.confidence > confidence:
+                    detections = detections.filter(pending.confidence)
+                pending.future.set_result(
+                    BatchResult(
+                        detections=detections,
+                        inference_time=forward_ms,
+                        batch_size=len(group),
+                        queue_time=(started_at - pending.enqueued_at) * 1000,
+                    )
+                )
+
+        logger.debug(
+            "batch_completed",
+            model_id=model_id,
+            batch_size=len(batch),
+            duration_ms=round((time.perf_counter() - started_at) * 1000, 2),
+        )
+
+    def _record_cost(self, model_id: str, per_image_ms: float) -> None:
+        """Update the moving average forward cost per image of a model."""
+        previous = self._per_image_ms.get(model_id)
+        self._per_image_ms[model_id] = (
+            per_image_ms if previous is None else 0.8 * previous + 0.2 * per_image_ms
+        )
+
+
+# Global batch scheduler instance
+batch_scheduler = BatchScheduler(
+    model_host.predict_batch, concurrency=model_host.replica_count
+)
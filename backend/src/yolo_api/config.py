@@ -42,6 +42,31 @@ class Settings(BaseSettings):
         default=640, ge=320, le=1280, description="Default image size"
     )
 
+    # Offline Inference Jobs
+    inference_jobs_dir: Path = Field(
+        default=Path("/tmp/yolo_inference_jobs"),
+        description="Directory for offline inference jobs",
+    )
+    inference_job_source_root: Path | None = Field(
+        default=None,
+        description="Server directory jobs may read images from (None = uploads only)",
+    )
+    max_concurrent_inference_jobs: int = Field(
+        default=1, ge=1, le=10, description="Maximum concurrent inference jobs"
+    )
+    inference_job_batch_size: int = Field(
+        default=16, ge=1, le=128, description="Images per forward pass of a job"
+    )
+    inference_job_decode_workers: int = Field(
+        default=4, ge=1, le=32, description="Threads decoding images ahead of the model"
+    )
+    inference_job_max_images: int = Field(
+        default=100000, ge=1, le=10000000, description="Maximum images per job"
+    )
+    inference_job_max_archive_mb: int = Field(
+        default=20480, ge=1, description="Maximum extracted size of a job archive"
+    )
+
     # CORS Configuration
     cors_origins: list[str] = Field(
         default=[
@@ -75,6 +100,65 @@ class Settings(BaseSettings):
         description="Directory for caching YOLO models",
     )
 
+    model_cache_budget_mb: int = Field(
+        default=4096,
+        ge=0,
+        description="Memory budget for loaded inference models in MB (0 = unlimited)",
+    )
+    model_idle_ttl_s: float = Field(
+        default=1800.0,
+        ge=0,
+        description="Unload models unused for this many seconds (0 = never)",
+    )
+    pinned_models: list[str] = Field(
+        default=[], description="Model IDs that are never evicted from the cache"
+    )
+    model_replicas: int = Field(
+        default=1,
+        ge=1,
+        le=16,
+        description="Copies of each model running batches in parallel (thread mode)",
+    )
+
+    preload_models: list[str] = Field(
+        default=[], description="Model IDs loaded and warmed up at startup"
+    )
+    warmup_runs: int = Field(
+        default=2, ge=0, le=20, description="Dummy forward passes when warming up a model"
+    )
+    warmup_trained_models: bool = Field(
+        default=True,
+        description="Load and warm up a model as soon as its training completes",
+    )
+    preimport_ml_runtime: bool = Field(
+        default=True,
+        description="Import ultralytics/torch in the background after startup",
+    )
+
+    # Post-training Export
+    export_after_training: bool = Field(
+        default=True,
+        description="Export trained models and benchmark the formats for serving",
+    )
+    export_formats: list[Literal["onnx", "torchscript"]] = Field(
+        default=["onnx", "torchscript"], description="Formats exported after training"
+    )
+    export_benchmark_batch_sizes: list[int] = Field(
+        default=[1, 4], description="Batch sizes measured by the serving benchmark"
+    )
+    export_benchmark_imgsz: list[int] = Field(
+        default=[], description="Image sizes measured besides the training size"
+    )
+    export_benchmark_runs: int = Field(
+        default=5, ge=1, le=100, description="Timed runs per benchmark configuration"
+    )
+    quantization_calibration_images: int = Field(
+        default=100,
+        ge=1,
+        le=10000,
+        description="Validation images used to calibrate INT8 quantization",
+    )
+
     # Security
     max_upload_size_mb: int = Field(
         default=100, ge=1, le=1000, description="Maximum upload size in MB"
@@ -82,7 +166,100 @@ class Settings(BaseSettings):
 
     # Performance
     worker_threads: int = Field(
-        default=4, ge=1, le=16, description="Number of worker threads"
+        default=4, ge=1, le=16, description="Number of inference worker threads"
+    )
+    inference_mode: Literal["thread", "process"] = Field(
+        default="thread",
+        description="Run models in the API process or in separate worker processes",
+    )
+    process_workers: int = Field(
+        default=2, ge=1, le=16, description="Number of inference worker processes"
+    )
+
+    # Inference Backend
+    inference_backend: Literal["auto", "torch", "onnxruntime"] = Field(
+        default="auto",
+        description="Model runtime: auto uses ONNX Runtime for .onnx weights when installed",
+    )
+    onnx_intra_op_threads: int = Field(
+        default=0, ge=0, le=64, description="ONNX Runtime intra-op threads (0 = auto)"
+    )
+    onnx_inter_op_threads: int = Field(
+        default=1, ge=1, le=16, description="ONNX Runtime inter-op threads"
+    )
+
+    # Image Decoding
+    reduced_jpeg_decode: bool = Field(
+        default=True,
+        description="Decode large JPEGs at 1/2, 1/4 or 1/8 scale when the model input allows",
+    )
+
+    # Inference Batching
+    batch_max_size: int = Field(
+        default=8, ge=1, le=64, description="Maximum images per inference batch"
+    )
+    batch_max_wait_ms: float = Field(
+        default=5.0,
+        ge=0,
+        le=1000,
+        description="Maximum time a request waits for its batch to fill",
+    )
+    batch_latency_budget_ms: float = Field(
+        default=500.0,
+        ge=1,
+        le=60000,
+        description="Target bound for batch wait plus forward time",
+    )
+
+    # Admission Control
+    admission_max_queue_depth: int = Field(
+        default=64,
+        ge=0,
+        le=100000,
+        description="Maximum requests queued or running per model (0 = unlimited)",
+    )
+    admission_max_queue_ms: float = Field(
+        default=2000.0,
+        ge=0,
+        le=600000,
+        description="Maximum queue wait before a request is rejected (0 = unlimited)",
+    )
+
+    batch_predict_max_images: int = Field(
+        default=64,
+        ge=1,
+        le=1024,
+        description="Maximum images per batch predict request",
+    )
+
+    # Prediction Cache
+    prediction_cache_entries: int = Field(
+        default=256,
+        ge=0,
+        le=100000,
+        description="Images whose pre-NMS outputs are cached for re-thresholding (0 = off)",
+    )
+    prediction_cache_mb: int = Field(
+        default=64, ge=1, le=4096, description="Memory budget of the prediction cache"
+    )
+
+    # Image Store
+    image_store_mb: int = Field(
+        default=256, ge=1, le=16384, description="Memory budget of stored images"
+    )
+    image_store_ttl_seconds: int = Field(
+        default=600,
+        ge=1,
+        le=86400,
+        description="Seconds a stored image is kept after its last use",
+    )
+
+    # Tiled Inference
+    tiling_max_tiles: int = Field(
+        default=64, ge=1, le=1024, description="Maximum tiles per tiled inference call"
+    )
+    tiling_batch_size: int = Field(
+        default=16, ge=1, le=128, description="Tiles per forward pass"
     )
 
     model_config = SettingsConfigDict(
@@ -96,11 +273,9 @@ class Settings(BaseSettings):
     def ensure_directories(self) -> None:
         """Ensure required directories exist."""
         self.training_dir.mkdir(parents=True, exist_ok=True)
+        self.inference_jobs_dir.mkdir(parents=True, exist_ok=True)
         self.model_cache_dir.mkdir(parents=True, exist_ok=True)
 
 
-# Global settings instance
+# Global settings instance (directories are created at server startup)
 settings = Settings()
-
-# Ensure directories on module import
-settings.ensure_directories()
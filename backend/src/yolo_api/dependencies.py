@@ -4,6 +4,7 @@ from typing import Annotated, Any
 
 from fastapi import Depends
 
+from .inference_jobs import InferenceJobManager
 from .logging_config import logger
 from .training import TrainingManager
 
@@ -35,6 +36,24 @@ def get_training_manager() -> TrainingManager:
 TrainingManagerDep = Annotated[TrainingManager, Depends(get_training_manager)]
 
 
+# Inference Job Manager Dependency
+def get_inference_job_manager() -> InferenceJobManager:
+    """Get the offline inference job manager instance.
+
+    Returns:
+        InferenceJobManager instance
+    """
+    from .inference_jobs import inference_job_manager
+
+    return inference_job_manager
+
+
+# Type alias for dependency injection
+InferenceJobManagerDep = Annotated[
+    InferenceJobManager, Depends(get_inference_job_manager)
+]
+
+
 # Logger Dependency (for endpoints that need structured logging)
 def get_logger() -> Any:
     """Get the structured logger instance.
@@ -92,6 +92,24 @@ class TrainingStopError(YOLOAPIException):
         self.reason = reason
 
 
+class QuantizationError(YOLOAPIException):
+    """Cannot quantize a trained model."""
+
+    def __init__(self, job_id: str, reason: str) -> None:
+        """Initialize with job ID and reason.
+
+        Args:
+            job_id: The training job ID
+            reason: Why the model cannot be quantized
+        """
+        super().__init__(
+            message=f"Cannot quantize model of training job '{job_id}': {reason}",
+            status_code=400,
+        )
+        self.job_id = job_id
+        self.reason = reason
+
+
 class DatasetValidationError(YOLOAPIException):
     """Dataset validation failed."""
 
@@ -188,6 +206,22 @@ class InferenceError(YOLOAPIException):
         )
 
 
+class UnsupportedModelTaskError(InferenceError):
+    """Model task cannot be served by a backend."""
+
+    def __init__(self, backend: str, task: str) -> None:
+        """Initialize with backend and model task.
+
+        Args:
+            backend: Name of the backend
+            task: Task recorded in the model (e.g. "segment", "pose")
+        """
+        super().__init__(
+            f"The {backend} backend only decodes detection heads, not '{task}'"
+        )
+        self.task = task
+
+
 class InvalidImageError(YOLOAPIException):
     """Image data is invalid."""
 
@@ -202,3 +236,99 @@ class InvalidImageError(YOLOAPIException):
             status_code=400,
         )
         self.details = message
+
+
+class ServiceOverloadedError(YOLOAPIException):
+    """Inference request rejected to protect the latency of queued requests."""
+
+    def __init__(self, model_id: str, reason: str, retry_after: int) -> None:
+        """Initialize with model ID, reason and retry delay.
+
+        Args:
+            model_id: Model whose queue is overloaded
+            reason: Why the request was not admitted
+            retry_after: Seconds after which the client should retry
+        """
+        super().__init__(
+            message=f"Model '{model_id}' is overloaded: {reason}. "
+            f"Retry after {retry_after}s",
+            status_code=503,
+        )
+        self.model_id = model_id
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(YOLOAPIException):
+    """Inference request ran past the deadline set by the client."""
+
+    def __init__(self, stage: str) -> None:
+        """Initialize with the stage at which the deadline passed.
+
+        Args:
+            stage: Where the request was when the deadline passed
+        """
+        super().__init__(
+            message=f"Request deadline exceeded {stage}",
+            status_code=504,
+        )
+        self.stage = stage
+
+
+class ClientDisconnectedError(YOLOAPIException):
+    """Client closed the connection before its inference completed."""
+
+    def __init__(self) -> None:
+        """Initialize with the nginx "client closed request" status."""
+        super().__init__(
+            message="Client closed the connection, inference cancelled",
+            status_code=499,
+        )
+
+
+class ImageNotFoundError(YOLOAPIException):
+    """Stored image not found."""
+
+    def __init__(self, image_id: str) -> None:
+        """Initialize with image ID.
+
+        Args:
+            image_id: ID of the image that was not found
+        """
+        super().__init__(
+            message=f"Image '{image_id}' not found or expired",
+            status_code=404,
+        )
+        self.image_id = image_id
+
+
+class InferenceJobNotFoundError(YOLOAPIException):
+    """Offline inference job not found."""
+
+    def __init__(self, job_id: str) -> None:
+        """Initialize with job ID.
+
+        Args:
+            job_id: ID of the inference job that was not found
+        """
+        super().__init__(
+            message=f"Inference job '{job_id}' not found",
+            status_code=404,
+        )
+        self.job_id = job_id
+
+
+class InferenceJobError(YOLOAPIException):
+    """Offline inference job cannot be created or changed."""
+
+    def __init__(self, job_id: str | None, reason: str) -> None:
+        """Initialize with job ID and reason.
+
+        Args:
+            job_id: ID of the inference job (None before it is created)
+            reason: Why the operation is not possible
+        """
+        prefix = f"Inference job '{job_id}': " if job_id else "Inference job: "
+        super().__init__(message=prefix + reason, status_code=400)
+        self.job_id = job_id
+        self.reason = reason
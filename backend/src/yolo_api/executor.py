@@ -0,0 +1,99 @@
+"""Dedicated thread pool for blocking inference work."""
+
+import asyncio
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+class InferenceExecutor:
+    """Bounded thread pool that keeps model loading, decoding and forward
+    passes off the asyncio event loop.
+
+    The pool is separate from the training executor and from the default
+    loop executor, so a saturated inference path never starves training
+    jobs, health checks or WebSocket handlers.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        """Initialize inference executor.
+
+        Args:
+            max_workers: Number of threads (default: settings.worker_threads)
+        """
+        self.max_workers = max_workers or settings.worker_threads
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool, created on first use and after shutdown."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="yolo-inference",
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function in the pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._submitted += 1
+        try:
+            return await loop.run_in_executor(
+                self.executor, functools.partial(self._call, func, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._submitted -= 1
+
+    def _call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Invoke func inside a worker thread while tracking activity."""
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Return pool size, running and queued task counts."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": max(0, self._submitted - self._running),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread pool.
+
+        Args:
+            wait: Wait for running tasks to finish
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+# Global inference executor instance
+inference_executor = InferenceExecutor()
@@ -0,0 +1,226 @@
+"""Post-training export and serving benchmark of trained models."""
+
+import os
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import cast
+
+import numpy as np
+
+from .backends import (
+    InferenceBackend,
+    OnnxRuntimeBackend,
+    UltralyticsBackend,
+    onnxruntime_available,
+)
+from .config import settings
+from .exceptions import UnsupportedModelTaskError
+from .logging_config import logger
+from .models import FormatBenchmark, ServingBenchmark, ServingFormat
+
+BENCHMARK_FILE = "benchmark.json"
+
+# Formats exported with a fixed input shape; they only run at the export size
+_STATIC_FORMATS = {"torchscript"}
+
+
+def export_formats(
+    weights_path: Path, formats: Sequence[str], imgsz: int
+) -> dict[ServingFormat, Path]:
+    """Export PyTorch weights to CPU serving formats.
+
+    Formats that fail to export (e.g. a missing optional dependency) are
+    logged and skipped.
+
+    Args:
+        weights_path: PyTorch weights (best.pt)
+        formats: Export formats ("onnx", "torchscript")
+        imgsz: Input size for formats with a static shape
+
+    Returns:
+        Format -> weights path, always including "torch" for the .pt itself
+    """
+    from ultralytics import YOLO  # type: ignore[attr-defined]
+
+    exported: dict[ServingFormat, Path] = {"torch": weights_path}
+    for fmt in formats:
+        start_time = time.perf_counter()
+        try:
+            kwargs = {"dynamic": True} if fmt == "onnx" else {}
+            model = YOLO(str(weights_path))
+            path = Path(model.export(format=fmt, imgsz=imgsz, **kwargs))
+        except Exception as e:
+            logger.warning("model_export_failed", format=fmt, error=str(e))
+            continue
+        exported[cast(ServingFormat, fmt)] = path
+        logger.info(
+            "model_exported",
+            format=fmt,
+            path=str(path),
+            export_time_ms=round((time.perf_counter() - start_time) * 1000, 2),
+        )
+    return exported
+
+
+def load_format(fmt: str, path: Path, imgsz: int | None = None) -> InferenceBackend:
+    """Load an exported model with the backend that serves its format.
+
+    Args:
+        fmt: Export format
+        path: Weights file
+        imgsz: Input size to run at (default: the model's own)
+
+    Returns:
+        Loaded backend
+    """
+    if fmt == "onnx" and onnxruntime_available():
+        try:
+            return OnnxRuntimeBackend(path, imgsz=imgsz)
+        except UnsupportedModelTaskError:
+            pass  # Served by ultralytics, so benchmarked with it
+    return UltralyticsBackend.load(path, imgsz=imgsz)
+
+
+def benchmark_backend(
+    backend: InferenceBackend, batch_size: int, runs: int
+) -> tuple[float, float]:
+    """Time full predict calls on random 640x480 images.
+
+    Args:
+        backend: Loaded backend
+        batch_size: Images per call
+        runs: Timed calls after one warm-up call
+
+    Returns:
+        Tuple of (mean latency per batch in ms, throughput in images/s)
+    """
+    rng = np.random.default_rng(0)
+    images = [
+        rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(batch_size)
+    ]
+    backend.predict(images, 0.25, 0.45)  # Warm up
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        backend.predict(images, 0.25, 0.45)
+    latency_ms = (time.perf_counter() - start_time) / runs * 1000
+    return latency_ms, batch_size * 1000 / latency_ms
+
+
+def fastest_format(results: list[FormatBenchmark], imgsz: int) -> str:
+    """Pick the format with the lowest mean per-image latency at the serving size.
+
+    Only formats that succeeded at every batch size are considered.
+
+    Args:
+        results: Benchmark results
+        imgsz: Serving image size
+
+    Returns:
+        Fastest format ("torch" when nothing else qualifies)
+    """
+    per_image: dict[str, list[float]] = {}
+    failed: set[str] = set()
+    for result in results:
+        if result.imgsz != imgsz:
+            continue
+        if result.latency_ms is None:
+            failed.add(result.format)
+            continue
+        per_image.setdefault(result.format, []).append(
+            result.latency_ms / result.batch_size
+        )
+    scores = {
+        fmt: sum(values) / len(values)
+        for fmt, values in per_image.items()
+        if fmt not in failed
+    }
+    return min(scores, key=scores.__getitem__) if scores else "torch"
+
+
+def export_and_benchmark(weights_path: Path, imgsz: int) -> ServingBenchmark:
+    """Export trained weights and benchmark every format on this host.
+
+    The table is written to ``benchmark.json`` next to the weights, where
+    ``select_weights`` picks up the fastest format when the model is loaded.
+
+    Args:
+        weights_path: PyTorch weights (best.pt)
+        imgsz: Image size the model was trained at and is served at
+
+    Returns:
+        The benchmark table
+    """
+    exported = export_formats(weights_path, settings.export_formats, imgsz)
+    sizes = sorted({imgsz, *settings.export_benchmark_imgsz})
+
+    results: list[FormatBenchmark] = []
+    for fmt, path in exported.items():
+        for size in sizes:
+            try:
+                if fmt in _STATIC_FORMATS and size != imgsz:
+                    raise ValueError(f"Static input shape exported at imgsz={imgsz}")
+                backend = load_format(fmt, path, imgsz=size)
+            except Exception as e:
+                results.extend(
+                    FormatBenchmark(
+                        format=fmt, imgsz=size, batch_size=batch_size, error=str(e)
+                    )
+                    for batch_size in settings.export_benchmark_batch_sizes
+                )
+                continue
+            for batch_size in settings.export_benchmark_batch_sizes:
+                try:
+                    latency_ms, fps = benchmark_backend(
+                        backend, batch_size, settings.export_benchmark_runs
+                    )
+                    result = FormatBenchmark(
+                        format=fmt,
+                        imgsz=size,
+                        batch_size=batch_size,
+                        latency_ms=round(latency_ms, 2),
+                        throughput_fps=round(fps, 2),
+                    )
+                except Exception as e:
+                    result = FormatBenchmark(
+                        format=fmt, imgsz=size, batch_size=batch_size, error=str(e)
+                    )
+                results.append(result)
+
+    benchmark = ServingBenchmark(
+        created_at=datetime.now(),
+        imgsz=imgsz,
+        cpu_count=os.cpu_count() or 1,
+        formats={fmt: path.name for fmt, path in exported.items()},
+        results=results,
+        fastest=fastest_format(results, imgsz),
+    )
+    benchmark_path = weights_path.parent / BENCHMARK_FILE
+    benchmark_path.write_text(benchmark.model_dump_json(indent=2))
+    logger.info(
+        "serving_benchmark_completed",
+        weights=str(weights_path),
+        fastest=benchmark.fastest,
+        formats=list(exported),
+    )
+    return benchmark
+
+
+def load_benchmark(weights_dir: Path) -> ServingBenchmark | None:
+    """Read the benchmark table stored next to trained weights.
+
+    Args:
+        weights_dir: Directory containing best.pt
+
+    Returns:
+        The benchmark table, or None if missing or unreadable
+    """
+    path = weights_dir / BENCHMARK_FILE
+    if not path.exists():
+        return None
+    try:
+        return ServingBenchmark.model_validate_json(path.read_text())
+    except ValueError as e:
+        logger.warning("serving_benchmark_invalid", path=str(path), error=str(e))
+        return None
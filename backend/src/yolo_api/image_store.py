@@ -0,0 +1,174 @@
+"""Server-side store of decoded images referenced by ``image_id``."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from .config import settings
+from .exceptions import ImageNotFoundError, ResourceLimitError
+from .imaging import DecodedImage, decode_image
+from .prediction_cache import image_digest
+
+
+@dataclass
+class StoredImage:
+    """A validated, full-resolution decode kept for repeated predictions."""
+
+    image_id: str
+    decoded: DecodedImage  # Read-only pixels shared by every request
+    digest: str  # Content hash of the encoded image (prediction cache key)
+    nbytes: int  # Memory held by the pixels and encoded bytes
+    expires_at: float  # time.monotonic() deadline, extended on every use
+
+    def decode(self, target_size: int | None = None) -> DecodedImage:
+        """Return the stored pixels in place of decoding.
+
+        Args:
+            target_size: Ignored; the full-resolution decode serves all models
+
+        Returns:
+            DecodedImage sharing the stored array, without stage timings
+        """
+        return DecodedImage(
+            array=self.decoded.array, original_size=self.decoded.original_size
+        )
+
+
+class ImageStore:
+    """LRU of decoded images bounded by a TTL and a memory budget.
+
+    Images are decoded and validated once at upload; predict requests that
+    reference the ``image_id`` reuse the pixels and the content hash.
+    """
+
+    def __init__(
+        self, max_mb: int | None = None, ttl_seconds: int | None = None
+    ) -> None:
+        """Initialize image store.
+
+        Args:
+            max_mb: Memory budget of the stored images in MB
+            ttl_seconds: Seconds an image is kept after its last use
+        """
+        budget_mb = max_mb if max_mb is not None else settings.image_store_mb
+        self.max_bytes = budget_mb * 1024 * 1024
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else settings.image_store_ttl_seconds
+        )
+        self._images: OrderedDict[str, StoredImage] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, image_bytes: bytes) -> StoredImage:
+        """Validate, decode and store an image.
+
+        Blocking; run in the inference executor.
+
+        Args:
+            image_bytes: Encoded image file content
+
+        Returns:
+            The stored image
+
+        Raises:
+            InvalidImageError: If image is invalid or too large
+            ResourceLimitError: If the image alone exceeds the memory budget
+        """
+        decoded = decode_image(image_bytes)
+        decoded.array.flags.writeable = False
+        nbytes = decoded.array.nbytes
+        if nbytes > self.max_bytes:
+            raise ResourceLimitError(
+                f"Decoded image needs {nbytes / 1024 / 1024:.1f}MB, "
+                f"image store holds {self.max_bytes / 1024 / 1024:.0f}MB"
+            )
+        image = StoredImage(
+            image_id=uuid.uuid4().hex,
+            decoded=decoded,
+            digest=image_digest(image_bytes),
+            nbytes=nbytes,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._expire()
+            while self._images and self._bytes + nbytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+            self._images[image.image_id] = image
+            self._bytes += nbytes
+        return image
+
+    def get(self, image_id: str) -> StoredImage:
+        """Look up an image and extend its TTL.
+
+        Args:
+            image_id: ID returned by ``put``
+
+        Returns:
+            The stored image
+
+        Raises:
+            ImageNotFoundError: If the image expired, was evicted or never existed
+        """
+        with self._lock:
+            self._expire()
+            image = self._images.get(image_id)
+            if image is None:
+                raise ImageNotFoundError(image_id)
+            self._images.move_to_end(image_id)
+            image.expires_at = time.monotonic() + self.ttl_seconds
+            return image
+
+    def delete(self, image_id: str) -> None:
+        """Remove an image.
+
+        Args:
+            image_id: ID returned by ``put``
+
+        Raises:
+            ImageNotFoundError: If the image is not stored
+        """
+        with self._lock:
+            image = self._images.pop(image_id, None)
+            if image is None:
+                raise ImageNotFoundError(image_id)
+            self._bytes -= image.nbytes
+
+    def expires_at(self, image: StoredImage) -> datetime:
+        """Wall-clock time an image expires if it is not used again."""
+        return datetime.now() + timedelta(seconds=image.expires_at - time.monotonic())
+
+    def _expire(self) -> None:
+        """Drop expired images (least recently used come first)."""
+        now = time.monotonic()
+        while self._images:
+            image = next(iter(self._images.values()))
+            if image.expires_at > now:
+                break
+            del self._images[image.image_id]
+            self._bytes -= image.nbytes
+            self.expirations += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return stored image count and memory use."""
+        with self._lock:
+            self._expire()
+            return {
+                "images": len(self._images),
+                "memory_used_mb": round(self._bytes / 1024 / 1024, 2),
+                "memory_budget_mb": round(self.max_bytes / 1024 / 1024, 2),
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Global image store instance
+image_store = ImageStore()
@@ -0,0 +1,243 @@
+"""Image decoding for inference."""
+
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .exceptions import InvalidImageError
+
+# Security limits
+MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_IMAGE_DIMENSION = 4096  # 4K pixels
+MIN_IMAGE_DIMENSION = 32  # Minimum reasonable size
+
+# File types picked up when scanning datasets and image archives
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+# Decode straight to 3-channel BGR uint8 and keep the stored pixel layout
+# (no EXIF rotation), matching the image size reported to clients.
+_IMREAD_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+# DCT-domain downscale factors supported by libjpeg, largest first
+_REDUCED_JPEG_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8 | cv2.IMREAD_IGNORE_ORIENTATION,
+    4: cv2.IMREAD_REDUCED_COLOR_4 | cv2.IMREAD_IGNORE_ORIENTATION,
+    2: cv2.IMREAD_REDUCED_COLOR_2 | cv2.IMREAD_IGNORE_ORIENTATION,
+}
+
+
+@dataclass
+class DecodedImage:
+    """Decoded image ready for the model."""
+
+    array: np.ndarray  # BGR uint8, shape (height, width, 3)
+    original_size: tuple[int, int]  # (width, height) of the source image
+    timings: dict[str, float] = field(default_factory=dict)  # Stage -> ms
+    reduction: int = 1  # JPEG downscale factor applied while decoding
+
+    @property
+    def scale(self) -> tuple[float, float]:
+        """Factors mapping array coordinates back to the source image (x, y)."""
+        height, width = self.array.shape[:2]
+        return self.original_size[0] / width, self.original_size[1] / height
+
+
+@dataclass
+class Letterbox:
+    """Image resized with unchanged aspect ratio and padded to the model input."""
+
+    image: np.ndarray  # BGR uint8, shape (height, width, 3)
+    gain: float  # Resize factor applied to the source image
+    pad: tuple[int, int]  # (left, top) padding in pixels
+
+
+def letterbox(
+    image: np.ndarray, size: int, stride: int | None = None, pad_value: int = 114
+) -> Letterbox:
+    """Resize an image to fit the model input and pad the remainder.
+
+    Matches the preprocessing YOLO models are trained with: the long side is
+    scaled to ``size`` and the image is centered on a gray canvas. The canvas
+    is square unless ``stride`` is given, in which case the short side is only
+    padded up to a multiple of the stride (for models with dynamic input
+    shapes), saving compute on non-square images.
+
+    Args:
+        image: BGR uint8 image
+        size: Model input size in pixels
+        stride: Pad the short side to a multiple of this instead of to size
+        pad_value: Gray level of the padding
+
+    Returns:
+        Letterbox with the padded image and the transform to undo it
+    """
+    height, width = image.shape[:2]
+    gain = min(size / height, size / width)
+    new_width, new_height = round(width * gain), round(height * gain)
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(
+            image, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+    pad_width, pad_height = size - new_width, size - new_height
+    if stride:
+        pad_width, pad_height = pad_width % stride, pad_height % stride
+    left, top = pad_width // 2, pad_height // 2
+    canvas = np.full(
+        (new_height + pad_height, new_width + pad_width, 3), pad_value, dtype=np.uint8
+    )
+    canvas[top : top + new_height, left : left + new_width] = image
+    return Letterbox(image=canvas, gain=gain, pad=(left, top))
+
+
+def to_input_tensor(
+    images: list[np.ndarray], dtype: type[np.floating] = np.float32
+) -> np.ndarray:
+    """Stack letterboxed BGR images into a normalized NCHW RGB batch.
+
+    Args:
+        images: BGR uint8 images of equal shape
+        dtype: Floating point type of the model input
+
+    Returns:
+        Array of shape (N, 3, H, W) with values in [0, 1]
+    """
+    # Channel flip and transpose are views; the cast does the only copy
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2).astype(dtype)
+    batch *= 1 / 255
+    return batch
+
+
+def read_image_header(image_bytes: bytes) -> tuple[str | None, tuple[int, int]]:
+    """Read image format and dimensions without decoding pixels.
+
+    Args:
+        image_bytes: Encoded image file content
+
+    Returns:
+        Tuple of (PIL format name such as "JPEG", size as (width, height))
+
+    Raises:
+        InvalidImageError: If the format is not recognized
+    """
+    try:
+        # Image.open only parses the header; pixel data is decoded lazily
+        with Image.open(BytesIO(image_bytes)) as image:
+            return image.format, image.size
+    except (OSError, Image.UnidentifiedImageError) as e:
+        raise InvalidImageError(
+            f"Invalid or unsupported image format: {str(e)[:100]}"
+        ) from e
+
+
+def validate_image_size(width: int, height: int) -> None:
+    """Check image dimensions against the security limits.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Raises:
+        InvalidImageError: If the image is too small or too large
+    """
+    if width < MIN_IMAGE_DIMENSION or height < MIN_IMAGE_DIMENSION:
+        raise InvalidImageError(
+            f"Image too small: {width}x{height} "
+            f"(min {MIN_IMAGE_DIMENSION}x{MIN_IMAGE_DIMENSION})"
+        )
+
+    if width > MAX_IMAGE_DIMENSION or height > MAX_IMAGE_DIMENSION:
+        raise InvalidImageError(
+            f"Image too large: {width}x{height} "
+            f"(max {MAX_IMAGE_DIMENSION}x{MAX_IMAGE_DIMENSION})"
+        )
+
+
+def jpeg_reduction(size: tuple[int, int], target_size: int | None) -> int:
+    """Pick the largest JPEG downscale factor that still covers the model input.
+
+    The model letterboxes the long side to ``target_size``, so decoding at
+    1/2, 1/4 or 1/8 scale loses nothing as long as the reduced long side stays
+    at or above it.
+
+    Args:
+        size: Source image size as (width, height)
+        target_size: Model input size, or None to always decode at full size
+
+    Returns:
+        Downscale factor (1, 2, 4 or 8)
+    """
+    if not target_size:
+        return 1
+    long_side = max(size)
+    for factor in _REDUCED_JPEG_FLAGS:
+        if long_side // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_image(image_bytes: bytes, target_size: int | None = None) -> DecodedImage:
+    """Validate and decode an encoded image in a single pass.
+
+    The header is read first so oversized or malformed images are rejected
+    before any pixel data is decoded. Pixels are then decoded once, directly
+    into the BGR uint8 layout the model expects. JPEGs much larger than the
+    model input are decoded at reduced resolution in the DCT domain; use
+    ``DecodedImage.scale`` to map coordinates back to the source image.
+
+    Args:
+        image_bytes: Encoded image file content
+        target_size: Model input size enabling reduced JPEG decoding
+
+    Returns:
+        DecodedImage with the pixel array and per-stage timings
+
+    Raises:
+        InvalidImageError: If image is invalid or too large
+    """
+    timings: dict[str, float] = {}
+
+    if len(image_bytes) > MAX_IMAGE_SIZE:
+        size_mb = len(image_bytes) / 1024 / 1024
+        raise InvalidImageError(f"Image too large: {size_mb:.1f}MB (max 10MB)")
+
+    start = time.perf_counter()
+    image_format, (width, height) = read_image_header(image_bytes)
+    validate_image_size(width, height)
+    timings["header"] = (time.perf_counter() - start) * 1000
+
+    reduction = 1
+    if image_format == "JPEG":
+        reduction = jpeg_reduction((width, height), target_size)
+    flags = _REDUCED_JPEG_FLAGS[reduction] if reduction > 1 else _IMREAD_FLAGS
+
+    start = time.perf_counter()
+    array = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), flags)
+    if array is None:
+        # Formats OpenCV cannot read (e.g. GIF) go through PIL instead
+        array = _decode_with_pil(image_bytes)
+        reduction = 1
+    timings["decode"] = (time.perf_counter() - start) * 1000
+
+    return DecodedImage(
+        array=array,
+        original_size=(width, height),
+        timings=timings,
+        reduction=reduction,
+    )
+
+
+def _decode_with_pil(image_bytes: bytes) -> np.ndarray:
+    """Decode with PIL into a BGR uint8 array."""
+    try:
+        with Image.open(BytesIO(image_bytes)) as image:
+            rgb = np.asarray(image.convert("RGB"))
+    except (OSError, Image.UnidentifiedImageError, ValueError) as e:
+        raise InvalidImageError(
+            f"Invalid or unsupported image format: {str(e)[:100]}"
+        ) from e
+    # Reverse the channel axis in place of a separate cvtColor copy
+    return np.ascontiguousarray(rgb[:, :, ::-1])
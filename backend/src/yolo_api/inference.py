@@ -1,16 +1,16 @@
 """Inference management for YOLO models."""
 
 import base64
+import threading
 import time
 from datetime import datetime
-from io import BytesIO
+from functools import partial
 from typing import Any
 
-import cv2
 import numpy as np
 import yaml
-from PIL import Image
 
+from .backends import as_backend, load_backend, select_weights
 from .config import settings
 from .exceptions import (
     InferenceError,
@@ -19,8 +19,16 @@ from .exceptions import (
     ModelNotFoundError,
     ModelNotReadyError,
 )
+from .imaging import DecodedImage, decode_image
 from .logging_config import logger
-from .models import BoundingBox, Detection, InferenceResponse, ModelInfo
+from .metrics import collect_stages, observe_stages, timed_stage
+from .model_cache import ModelCache
+from .model_registry import ModelRegistry
+from .models import InferenceResponse, ModelInfo
+from .postprocess import DetectionArrays
+from .prediction_cache import CANDIDATE_FLOOR, PredictionCache
+from .quantization import INT8_VARIANT, INT8_WEIGHTS, split_variant
+from .replicas import ReplicaPool
 
 
 class InferenceManager:
@@ -28,31 +36,53 @@ class InferenceManager:
 
     def __init__(self) -> None:
         """Initialize inference manager."""
-        self.models: dict[str, Any] = {}  # model_id -> loaded YOLO model
+        self.models = ModelCache()  # model_id -> loaded InferenceBackend (LRU)
         self.model_info: dict[str, ModelInfo] = {}  # model_id -> model metadata
+        self._load_locks: dict[str, threading.Lock] = {}
+        # Replica counts set at runtime, kept across unloads and evictions
+        self._replica_counts: dict[str, int] = {}
+        self._registry: ModelRegistry | None = None
+        # Pre-NMS outputs of recent images for re-thresholding
+        self.prediction_cache = PredictionCache()
+
+    def is_loaded(self, model_id: str) -> bool:
+        """Check whether a model is loaded (counts a cache hit or miss)."""
+        return self.models.get(model_id) is not None
 
     def load_model(self, model_id: str) -> None:
         """Load a trained YOLO model into memory.
 
         Args:
-            model_id: Training job ID (used as model identifier)
+            model_id: Training job ID (used as model identifier), optionally
+                with a variant suffix (``<job_id>:int8``)
 
         Raises:
             ModelNotFoundError: If model directory doesn't exist
             ModelFileNotFoundError: If model file not found
             ModelNotReadyError: If model failed to load
         """
+        # Concurrent requests for the same model wait for a single load
+        with self._load_locks.setdefault(model_id, threading.Lock()):
+            self._load_model(model_id)
+
+    def _load_model(self, model_id: str) -> None:
+        """Load a model while holding its load lock."""
         # Check if already loaded
         if model_id in self.models:
             logger.info("model_already_loaded", model_id=model_id)
             return
 
         # Check if it's an uploaded model or trained model
-        uploaded_dir = settings.training_dir / "uploaded_models" / model_id
-        model_dir = settings.training_dir / model_id
+        base_id, variant = split_variant(model_id)
+        uploaded_dir = settings.training_dir / "uploaded_models" / base_id
+        model_dir = settings.training_dir / base_id
 
         is_uploaded = uploaded_dir.exists()
 
+        if variant and (is_uploaded or variant != INT8_VARIANT):
+            # Only trained models have quantized variants
+            raise ModelNotFoundError(model_id)
+
         if is_uploaded:
             # Handle uploaded model
             import json
@@ -100,7 +130,7 @@ class InferenceManager:
 
             # Read project name from training config
             import json
-            model_name = f"Model {model_id}"
+            model_name = f"Model {base_id}"
             config_path = model_dir / "training_config.json"
             if config_path.exists():
                 try:
@@ -110,12 +140,30 @@ class InferenceManager:
                 except Exception:
                     pass
 
-        # Load YOLO model
-        try:
-            from ultralytics import YOLO  # type: ignore[attr-defined]
+            if variant:
+                model_path = model_path.parent / INT8_WEIGHTS
+                if not model_path.exists():
+                    raise ModelFileNotFoundError(model_id, str(model_path))
+                model_name = f"{model_name} (INT8)"
 
-            model = YOLO(str(model_path))
-            self.models[model_id] = model
+        # Load model with the backend configured for its format
+        try:
+            start_time = time.perf_counter()
+            model_path = select_weights(model_path)
+            backend = load_backend(model_path)
+            pool = ReplicaPool(
+                partial(load_backend, model_path),
+                self._replica_counts.get(model_id, settings.model_replicas),
+                primary=backend,
+            )
+            load_time = (time.perf_counter() - start_time) * 1000
+            self.models.put(
+                model_id,
+                pool,
+                size_bytes=pool.size_bytes(model_path),
+                load_time_ms=load_time,
+            )
+            class_names = class_names or backend.class_names
 
             # Store model info
             self.model_info[model_id] = ModelInfo(
@@ -134,6 +182,9 @@ class InferenceManager:
                 model_path=str(model_path),
                 num_classes=len(class_names),
                 is_uploaded=is_uploaded,
+                backend=backend.name,
+                replicas=pool.size,
+                load_time_ms=round(load_time, 2),
             )
 
         except Exception as e:
@@ -151,11 +202,272 @@ class InferenceManager:
         Args:
             model_id: Model identifier
         """
+        self.prediction_cache.drop_model(model_id)
         if model_id in self.models:
             del self.models[model_id]
-            del self.model_info[model_id]
+            self.model_info.pop(model_id, None)
             logger.info("model_unloaded", model_id=model_id)
 
+    def set_replicas(self, model_id: str, replicas: int) -> None:
+        """Change how many copies of a model serve batches in parallel.
+
+        Applies to the loaded model right away and to later loads of it.
+
+        Args:
+            model_id: Model identifier
+            replicas: Number of replicas (at least 1)
+
+        Raises:
+            InferenceError: If the loaded model cannot be replicated
+        """
+        self._replica_counts[model_id] = replicas
+        pool = self.models.peek(model_id)
+        if pool is None:
+            return
+        if not isinstance(pool, ReplicaPool):
+            raise InferenceError(f"Model '{model_id}' cannot be replicated")
+        pool.resize(replicas)
+        self.models.update_size(model_id, pool.size_bytes())
+        logger.info("model_replicas_set", model_id=model_id, replicas=pool.size)
+
+    def replica_count(self, model_id: str) -> int:
+        """Number of replicas of a model that can run batches in parallel."""
+        pool = self.models.peek(model_id)
+        return pool.size if isinstance(pool, ReplicaPool) else 1
+
+    def replica_stats(self) -> dict[str, dict[str, Any]]:
+        """Return replica usage per loaded model."""
+        return {
+            model_id: pool.stats()
+            for model_id in self.models
+            if isinstance(pool := self.models.peek(model_id), ReplicaPool)
+        }
+
+    def pin(self, model_id: str) -> None:
+        """Exempt a model from cache eviction."""
+        self.models.pin(model_id)
+
+    def unpin(self, model_id: str) -> None:
+        """Make a model evictable again."""
+        self.models.unpin(model_id)
+
+    def warmup(self, model_id: str, runs: int | None = None) -> float:
+        """Run dummy forward passes so lazy setup happens before real traffic.
+
+        Args:
+            model_id: Model identifier (must be loaded)
+            runs: Number of forward passes (default: settings.warmup_runs)
+
+        Returns:
+            Total warm-up time in milliseconds
+        """
+        runs = settings.warmup_runs if runs is None else runs
+        imgsz = self.model_input_size(model_id)
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            self.predict_batch(model_id, [dummy])
+        warmup_time = (time.perf_counter() - start_time) * 1000
+
+        logger.info(
+            "model_warmed_up",
+            model_id=model_id,
+            runs=runs,
+            imgsz=imgsz,
+            warmup_time_ms=round(warmup_time, 2),
+        )
+        return warmup_time
+
+    def preload(self, model_id: str) -> None:
+        """Load a model and warm it up.
+
+        Args:
+            model_id: Model identifier
+
+        Raises:
+            ModelNotFoundError: If model directory doesn't exist
+            ModelFileNotFoundError: If model file not found
+            ModelNotReadyError: If model failed to load
+        """
+        self.load_model(model_id)
+        self.warmup(model_id)
+
+    def model_input_size(self, model_id: str) -> int:
+        """Input size a model letterboxes images to.
+
+        Args:
+            model_id: Model identifier
+
+        Returns:
+            Input size in pixels (the trained imgsz, else default_image_size)
+        """
+        model = self.models.peek(model_id)
+        imgsz = as_backend(model).input_size if model is not None else None
+        return imgsz or settings.default_image_size
+
+    def decode_target_size(self, model_id: str) -> int | None:
+        """Target size for reduced JPEG decoding of images for a model.
+
+        Args:
+            model_id: Model identifier
+
+        Returns:
+            Model input size, or None when reduced decoding is disabled
+        """
+        if not settings.reduced_jpeg_decode:
+            return None
+        return self.model_input_size(model_id)
+
+    def decode_image(
+        self, image_b64: str, target_size: int | None = None
+    ) -> DecodedImage:
+        """Decode and validate a base64 encoded image.
+
+        Args:
+            image_b64: Base64 encoded image
+            target_size: Model input size enabling reduced JPEG decoding
+
+        Returns:
+            DecodedImage with the BGR array, original size and stage timings
+
+        Raises:
+            InvalidImageError: If image is invalid or too large
+        """
+        start = time.perf_counter()
+        image_bytes = self.decode_base64(image_b64)
+        base64_ms = (time.perf_counter() - start) * 1000
+
+        decoded = self.decode_image_bytes(image_bytes, target_size)
+        decoded.timings = {"base64": base64_ms, **decoded.timings}
+        return decoded
+
+    def decode_base64(self, image_b64: str) -> bytes:
+        """Decode a base64 encoded image to its file content.
+
+        Args:
+            image_b64: Base64 encoded image
+
+        Returns:
+            Encoded image bytes
+
+        Raises:
+            InvalidImageError: If the base64 encoding is invalid
+        """
+        try:
+            return base64.b64decode(image_b64, validate=True)
+        except Exception as e:
+            raise InvalidImageError(
+                f"Invalid base64 encoding: {str(e)[:100]}"
+            ) from e
+
+    def decode_image_bytes(
+        self, image_bytes: bytes, target_size: int | None = None
+    ) -> DecodedImage:
+        """Decode and validate raw encoded image bytes (JPEG, PNG, ...).
+
+        Args:
+            image_bytes: Encoded image file content
+            target_size: Model input size enabling reduced JPEG decoding
+
+        Returns:
+            DecodedImage with the BGR array, original size and stage timings
+
+        Raises:
+            InvalidImageError: If image is invalid or too large
+        """
+        return decode_image(image_bytes, target_size)
+
+    def predict_batch(
+        self,
+        model_id: str,
+        images: list[np.ndarray],
+        confidence: float = 0.25,
+        iou: float = 0.45,
+        cache_keys: list[str | None] | None = None,
+    ) -> list[DetectionArrays]:
+        """Run one forward pass over a batch of decoded images.
+
+        Args:
+            model_id: Model identifier
+            images: Decoded BGR image arrays
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+            cache_keys: Image digests whose pre-NMS outputs are cached for
+                ``predict_cached`` (None entries are not cached)
+
+        Returns:
+            Detection arrays for each image, in input order
+
+        Raises:
+            ModelNotFoundError: If model not loaded
+            InferenceError: If inference fails
+        """
+        try:
+            model = self.models[model_id]
+        except KeyError:
+            if model_id not in self.model_info:
+                raise ModelNotFoundError(model_id) from None
+            # Evicted from the cache while the request was queued
+            self.load_model(model_id)
+            model = self.models[model_id]
+
+        backend = as_backend(model)
+        try:
+            with collect_stages() as stages:
+                if not (
+                    cache_keys
+                    and self.prediction_cache.enabled
+                    and backend.supports_candidates
+                ):
+                    results = backend.predict(images, confidence, iou)
+                else:
+                    candidates = backend.forward_candidates(images, CANDIDATE_FLOOR)
+                    imgsz = self.model_input_size(model_id)
+                    for key, image_candidates in zip(
+                        cache_keys, candidates, strict=True
+                    ):
+                        if key is not None:
+                            self.prediction_cache.put(
+                                (model_id, imgsz, key), image_candidates
+                            )
+                    with timed_stage("nms"):
+                        results = [c.select(confidence, iou) for c in candidates]
+        except Exception as e:
+            logger.error(
+                "inference_failed",
+                model_id=model_id,
+                batch_size=len(images),
+                error=str(e),
+                exc_info=True,
+            )
+            raise InferenceError(str(e)) from e
+        observe_stages(model_id, stages)
+        return results
+
+    def predict_cached(
+        self, model_id: str, cache_key: str, confidence: float, iou: float
+    ) -> tuple[DetectionArrays, tuple[int, int]] | None:
+        """Re-threshold the cached pre-NMS outputs of an image.
+
+        Args:
+            model_id: Model identifier
+            cache_key: Digest of the encoded image
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+
+        Returns:
+            Tuple of (detections, (height, width) of the image the model saw),
+            or None if the image is not cached for this model
+        """
+        if not self.prediction_cache.enabled:
+            return None
+        key = (model_id, self.model_input_size(model_id), cache_key)
+        candidates = self.prediction_cache.get(key)
+        if candidates is None:
+            return None
+        return candidates.select(confidence, iou), candidates.shape
+
     def infer(
         self,
         model_id: str,
@@ -183,238 +495,53 @@ class InferenceManager:
         if model_id not in self.models:
             raise ModelNotFoundError(model_id)
 
-        model = self.models[model_id]
-        model_metadata = self.model_info[model_id]
-
-        # Security limits
-        MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
-        MAX_IMAGE_DIMENSION = 4096  # 4K pixels
-        MIN_IMAGE_DIMENSION = 32  # Minimum reasonable size
-
-        try:
-            # Decode base64 image with validation
-            try:
-                image_bytes = base64.b64decode(image_b64, validate=True)
-            except Exception as e:
-                raise InvalidImageError(
-                    f"Invalid base64 encoding: {str(e)[:100]}"
-                ) from e
-
-            # Check decoded size
-            if len(image_bytes) > MAX_IMAGE_SIZE:
-                size_mb = len(image_bytes) / 1024 / 1024
-                raise InvalidImageError(
-                    f"Image too large: {size_mb:.1f}MB (max 10MB)"
-                )
-
-            # Validate image format
-            try:
-                image = Image.open(BytesIO(image_bytes))
-                image.verify()  # Verify it's a valid image
-                # Reopen after verify (verify() invalidates the image)
-                image = Image.open(BytesIO(image_bytes))
-            except (OSError, Image.UnidentifiedImageError) as e:
-                raise InvalidImageError(
-                    f"Invalid or unsupported image format: {str(e)[:100]}"
-                ) from e
-
-            # Validate image dimensions
-            width, height = image.size
-            if width < MIN_IMAGE_DIMENSION or height < MIN_IMAGE_DIMENSION:
-                raise InvalidImageError(
-                    f"Image too small: {width}x{height} "
-                    f"(min {MIN_IMAGE_DIMENSION}x{MIN_IMAGE_DIMENSION})"
-                )
-
-            if width > MAX_IMAGE_DIMENSION or height > MAX_IMAGE_DIMENSION:
-                raise InvalidImageError(
-                    f"Image too large: {width}x{height} "
-                    f"(max {MAX_IMAGE_DIMENSION}x{MAX_IMAGE_DIMENSION})"
-                )
-
-            # Convert to numpy array
-            image_np = np.array(image)
-
-            # Convert RGB to BGR for OpenCV
-            if len(image_np.shape) == 3 and image_np.shape[2] == 3:
-                image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
-
-            original_size = (width, height)
-
-            # Run inference
-            start_time = time.time()
-            results = model.predict(
-                image_np,
-                conf=confidence,
-                iou=iou,
-                verbose=False,
-            )
-            inference_time = (time.time() - start_time) * 1000  # Convert to ms
-
-            # Parse results
-            detections: list[Detection] = []
-            if len(results) > 0:
-                result = results[0]
-                boxes = result.boxes
-
-                for i in range(len(boxes)):
-                    box = boxes[i]
-                    class_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    xyxy = box.xyxy[0].cpu().numpy()
-
-                    class_name = (
-                        model_metadata.classes[class_id]
-                        if class_id < len(model_metadata.classes)
-                        else f"class_{class_id}"
-                    )
-
-                    detection = Detection(
-                        class_id=class_id,
-                        class_name=class_name,
-                        confidence=conf,
-                        bbox=BoundingBox(
-                            x1=float(xyxy[0]),
-                            y1=float(xyxy[1]),
-                            x2=float(xyxy[2]),
-                            y2=float(xyxy[3]),
-                        ),
-                    )
-                    detections.append(detection)
+        decoded = self.decode_image(image_b64, self.decode_target_size(model_id))
+        original_size = decoded.original_size
+
+        # Run inference
+        start_time = time.time()
+        arrays = self.predict_batch(model_id, [decoded.array], confidence, iou)[0]
+        # Reduced JPEG decodes are mapped back to source coordinates
+        detections = arrays.scaled(*decoded.scale).to_detections(
+            self.model_info[model_id].classes
+        )
+        inference_time = (time.time() - start_time) * 1000  # Convert to ms
+
+        logger.info(
+            "inference_completed",
+            model_id=model_id,
+            num_detections=len(detections),
+            inference_time_ms=round(inference_time, 2),
+            image_size=f"{original_size[0]}x{original_size[1]}",
+        )
+
+        return InferenceResponse(
+            detections=detections,
+            inference_time=inference_time,
+            image_size=original_size,
+            timings={**decoded.timings, "forward": inference_time},
+        )
+
+    @property
+    def registry(self) -> ModelRegistry:
+        """Index of the models in the training directory."""
+        if self._registry is None or self._registry.root != settings.training_dir:
+            self._registry = ModelRegistry(settings.training_dir)
+        return self._registry
+
+    def list_models(self, latest_only: bool = True) -> list[ModelInfo]:
+        """List available models from the model registry.
 
-            logger.info(
-                "inference_completed",
-                model_id=model_id,
-                num_detections=len(detections),
-                inference_time_ms=round(inference_time, 2),
-                image_size=f"{original_size[0]}x{original_size[1]}",
-            )
-
-            return InferenceResponse(
-                detections=detections,
-                inference_time=inference_time,
-                image_size=original_size,
-            )
-
-        except InvalidImageError:
-            # Re-raise image validation errors without wrapping
-            raise
-        except Exception as e:
-            logger.error(
-                "inference_failed",
-                model_id=model_id,
-                error=str(e),
-                exc_info=True,
-            )
-            raise InferenceError(str(e)) from e
-
-    def list_models(self) -> list[ModelInfo]:
-        """List all available models.
+        Args:
+            latest_only: Only include the latest trained model (plus its INT8
+                variant) besides the uploaded models
 
         Returns:
-            List of ModelInfo objects (only the latest trained model + uploaded models)
+            List of ModelInfo objects, newest trained models first
         """
-        available_models: list[ModelInfo] = []
-
-        # Scan training directory for the LATEST completed model only
-        if settings.training_dir.exists():
-            latest_model: tuple[ModelInfo, float] | None = None  # (model_info, timestamp)
-
-            for model_dir in settings.training_dir.iterdir():
-                if not model_dir.is_dir():
-                    continue
-
-                model_id = model_dir.name
-                model_path = model_dir / "training" / "weights" / "best.pt"
-
-                if model_path.exists():
-                    # Get modification timestamp
-                    mtime = model_path.stat().st_mtime
-
-                    # Load basic info without loading the full model
-                    data_yaml_path = model_dir / "dataset" / "data.yaml"
-                    class_names: list[str] = []
-
-                    if data_yaml_path.exists():
-                        try:
-                            with open(data_yaml_path) as f:
-                                data_config = yaml.safe_load(f)
-                                class_names = data_config.get("names", [])
-                        except Exception:
-                            pass
-
-                    # Read project name, YOLO version, and model size from training config
-                    import json
-                    project_name = f"Model {model_id}"
-                    yolo_version = "v8"  # default
-                    model_size = "n"     # default
-                    config_path = model_dir / "training_config.json"
-                    if config_path.exists():
-                        try:
-                            with open(config_path) as f:
-                                config_data = json.load(f)
-                                project_name = config_data.get("name", project_name)
-                                yolo_version = config_data.get("yolo_version", yolo_version)
-                                model_size = config_data.get("model_size", model_size)
-                        except Exception:
-                            pass
-
-                    model_info = ModelInfo(
-                        model_id=model_id,
-                        name=project_name,
-                        yolo_version=yolo_version,
-                        model_size=model_size,
-                        classes=class_names,
-                        created_at=datetime.fromtimestamp(mtime),
-                        metrics=None,
-                    )
-
-                    # Keep track of the latest model
-                    if latest_model is None or mtime > latest_model[1]:
-                        latest_model = (model_info, mtime)
-
-            # Add only the latest trained model
-            if latest_model is not None:
-                available_models.append(latest_model[0])
-
-        # Scan uploaded_models directory
-        uploaded_dir = settings.training_dir / "uploaded_models"
-        if uploaded_dir.exists():
-            import json
-            for model_dir in uploaded_dir.iterdir():
-                if not model_dir.is_dir():
-                    continue
-
-                model_id = model_dir.name
-
-                # Check for .pt or .onnx file
-                pt_path = model_dir / "model.pt"
-                onnx_path = model_dir / "model.onnx"
-                model_path = pt_path if pt_path.exists() else onnx_path if onnx_path.exists() else None
-
-                if model_path:
-                    # Read metadata
-                    metadata_path = model_dir / "metadata.json"
-                    model_name = f"Uploaded {model_id}"
-                    if metadata_path.exists():
-                        try:
-                            with open(metadata_path) as f:
-                                metadata = json.load(f)
-                                model_name = metadata.get("name", model_name)
-                        except Exception:
-                            pass
-
-                    model_info = ModelInfo(
-                        model_id=model_id,
-                        name=f"📁 {model_name}",  # Prefix to indicate uploaded model
-                        yolo_version="v8",
-                        model_size="custom",
-                        classes=[],  # Unknown classes for uploaded models
-                        created_at=datetime.fromtimestamp(model_path.stat().st_mtime),
-                        metrics=None,
-                    )
-                    available_models.append(model_info)
-
+        registry = self.registry
+        registry.sync()
+        available_models = registry.models(latest_only=latest_only)
         logger.info("listed_models", total=len(available_models))
         return available_models
 
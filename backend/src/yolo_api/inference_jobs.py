@@ -0,0 +1,704 @@
+"""Offline inference jobs over image archives and server directories."""
+
+import asyncio
+import json
+import shutil
+import tarfile
+import time
+import uuid
+import zipfile
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from .config import settings
+from .exceptions import (
+    DatasetExtractionError,
+    DatasetValidationError,
+    InferenceJobError,
+)
+from .imaging import IMAGE_SUFFIXES, DecodedImage, decode_image
+from .logging_config import logger
+from .models import InferenceJobRequest, InferenceJobStatus
+
+JOB_FILE = "job.json"
+MANIFEST_FILE = "images.txt"
+CHECKPOINT_FILE = "checkpoint.json"
+RESULTS_JSONL = "results.jsonl"
+RESULTS_COCO = "results.json"
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# One decoded image, or why it could not be decoded
+DecodeResult = DecodedImage | Exception
+
+
+def archive_suffix(filename: str) -> str | None:
+    """Return the archive type of an uploaded file name, if supported."""
+    name = filename.lower()
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)), None)
+
+
+def _check_member_path(name: str) -> None:
+    """Reject absolute paths and path traversal in archive members."""
+    if name.startswith("/") or Path(name).is_absolute() or ".." in Path(name).parts:
+        raise DatasetValidationError(
+            f"Invalid path in archive (path traversal attempt): {name}"
+        )
+
+
+def extract_archive(archive_path: Path, dest: Path) -> None:
+    """Extract a ZIP or tar archive of images with security checks.
+
+    Args:
+        archive_path: Uploaded archive
+        dest: Directory to extract into
+
+    Raises:
+        DatasetValidationError: If the archive fails the security checks
+        DatasetExtractionError: If the archive cannot be read
+    """
+    max_files = settings.inference_job_max_images * 2
+    max_bytes = settings.inference_job_max_archive_mb * 1024 * 1024
+    dest.mkdir(parents=True, exist_ok=True)
+
+    try:
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as zf:
+                infos = zf.infolist()
+                if len(infos) > max_files:
+                    raise DatasetValidationError(
+                        f"Too many files in archive: {len(infos)} (max {max_files})"
+                    )
+                if sum(info.file_size for info in infos) > max_bytes:
+                    raise DatasetValidationError(
+                        f"Extracted size exceeds {max_bytes // 1024 // 1024}MB"
+                    )
+                for info in infos:
+                    _check_member_path(info.filename)
+                zf.extractall(dest)
+            return
+
+        with tarfile.open(archive_path) as tf:
+            # Only regular files: links and devices could escape dest
+            members = [member for member in tf.getmembers() if member.isfile()]
+            if len(members) > max_files:
+                raise DatasetValidationError(
+                    f"Too many files in archive: {len(members)} (max {max_files})"
+                )
+            if sum(member.size for member in members) > max_bytes:
+                raise DatasetValidationError(
+                    f"Extracted size exceeds {max_bytes // 1024 // 1024}MB"
+                )
+            for member in members:
+                _check_member_path(member.name)
+            tf.extractall(dest, members=members, filter="data")
+    except tarfile.ReadError as e:
+        raise DatasetExtractionError(f"Invalid or corrupted archive: {e}") from e
+    except zipfile.BadZipFile as e:
+        raise DatasetExtractionError(f"Invalid or corrupted ZIP file: {e}") from e
+    except (DatasetValidationError, DatasetExtractionError):
+        raise
+    except Exception as e:
+        raise DatasetExtractionError(f"Failed to extract archive: {e}") from e
+
+
+def list_images(source: Path) -> list[str]:
+    """List images under a directory in a stable order.
+
+    Args:
+        source: Directory to scan recursively
+
+    Returns:
+        Paths relative to ``source``, sorted
+    """
+    return sorted(
+        path.relative_to(source).as_posix()
+        for path in source.rglob("*")
+        if path.is_file()
+        and path.suffix.lower() in IMAGE_SUFFIXES
+        and not path.name.startswith(".")
+    )
+
+
+def _decode_file(path: Path, target_size: int | None) -> DecodeResult:
+    """Decode an image file, returning the error instead of raising."""
+    try:
+        return decode_image(path.read_bytes(), target_size)
+    except Exception as e:
+        return e
+
+
+def decode_ahead(
+    pool: ThreadPoolExecutor,
+    source: Path,
+    files: list[str],
+    target_size: int | None,
+    batch_size: int,
+) -> Iterator[list[tuple[str, DecodeResult]]]:
+    """Decode images on a worker pool, yielding them in order as batches.
+
+    Two batches are in flight, so the next batch is decoded while the model
+    runs the current one, and memory stays bounded for any number of images.
+
+    Args:
+        pool: Decode worker threads
+        source: Directory the file paths are relative to
+        files: Relative image paths in processing order
+        target_size: Model input size enabling reduced JPEG decoding
+        batch_size: Images per batch
+
+    Yields:
+        Lists of (relative path, decoded image or error)
+    """
+    remaining = iter(files)
+    pending: deque[tuple[str, Future[DecodeResult]]] = deque()
+
+    def submit_batch() -> None:
+        for name in islice(remaining, batch_size):
+            pending.append(
+                (name, pool.submit(_decode_file, source / name, target_size))
+            )
+
+    submit_batch()
+    submit_batch()
+    while pending:
+        batch = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+        submit_batch()
+        yield [(name, future.result()) for name, future in batch]
+
+
+def write_coco(
+    results_path: Path, output_path: Path, class_names: list[str]
+) -> None:
+    """Convert per-image JSON lines into one COCO detection file.
+
+    Args:
+        results_path: JSONL results of the job
+        output_path: COCO JSON file to write
+        class_names: Class names of the model (category IDs are class IDs)
+    """
+    images: list[dict[str, Any]] = []
+    annotations: list[dict[str, Any]] = []
+    with results_path.open() as lines:
+        for line in lines:
+            result = json.loads(line)
+            if "error" in result:
+                continue
+            image_id = len(images) + 1
+            width, height = result["image_size"]
+            images.append(
+                {
+                    "id": image_id,
+                    "file_name": result["file"],
+                    "width": width,
+                    "height": height,
+                }
+            )
+            for detection in result["detections"]:
+                box = detection["bbox"]
+                w, h = box["x2"] - box["x1"], box["y2"] - box["y1"]
+                annotations.append(
+                    {
+                        "id": len(annotations) + 1,
+                        "image_id": image_id,
+                        "category_id": detection["class_id"],
+                        "bbox": [box["x1"], box["y1"], w, h],
+                        "area": w * h,
+                        "score": detection["confidence"],
+                        "iscrowd": 0,
+                    }
+                )
+    coco = {
+        "images": images,
+        "annotations": annotations,
+        "categories": [
+            {"id": class_id, "name": name} for class_id, name in enumerate(class_names)
+        ],
+    }
+    output_path.write_text(json.dumps(coco))
+
+
+class InferenceJobManager:
+    """Manages offline inference jobs.
+
+    A job extracts an uploaded archive (or reads a server directory), then
+    streams its images through decode workers into batched predictions.
+    Results are appended to ``results.jsonl`` and a checkpoint is written
+    after every batch, so stopped, failed or interrupted jobs resume where
+    they left off.
+    """
+
+    def __init__(
+        self,
+        work_dir: Path | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        self.work_dir = work_dir or settings.inference_jobs_dir
+        self.jobs: dict[str, InferenceJobStatus] = {}
+        self.requests: dict[str, InferenceJobRequest] = {}
+        self.callbacks: dict[str, list[Callable[[dict[str, Any]], Awaitable[None]]]] = {}
+        self._pending_messages: dict[str, list[dict[str, Any]]] = {}
+        self._stop_requested: set[str] = set()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.max_concurrent_inference_jobs,
+            thread_name_prefix="inference-job",
+        )
+
+    def register_callback(
+        self, job_id: str, callback: Callable[[dict[str, Any]], Awaitable[None]]
+    ) -> None:
+        """Register a callback for job updates."""
+        self.callbacks.setdefault(job_id, []).append(callback)
+
+    async def _notify(self, job_id: str, message: dict[str, Any]) -> None:
+        """Notify all callbacks for a job, logging failures."""
+        for callback in self.callbacks.get(job_id, []):
+            try:
+                await callback(message)
+            except Exception as e:
+                logger.error(
+                    "callback_notification_failed",
+                    job_id=job_id,
+                    message_type=message.get("type"),
+                    error=str(e),
+                    exc_info=True,
+                )
+
+    def _post(self, job_id: str, message: dict[str, Any]) -> None:
+        """Queue a message from the job thread for the event loop."""
+        self._pending_messages.setdefault(job_id, []).append(message)
+
+    def resolve_source_dir(self, source_dir: str) -> Path:
+        """Resolve a server directory a job may read images from.
+
+        Args:
+            source_dir: Directory path, absolute or relative to the source root
+
+        Returns:
+            Resolved directory
+
+        Raises:
+            InferenceJobError: If server directories are disabled, or the
+                directory is missing or outside the source root
+        """
+        root = settings.inference_job_source_root
+        if root is None:
+            raise InferenceJobError(
+                None,
+                "server directories are disabled; set "
+                "YOLO_INFERENCE_JOB_SOURCE_ROOT or upload an archive",
+            )
+        root = root.resolve()
+        path = (root / source_dir).resolve()
+        if not path.is_relative_to(root):
+            raise InferenceJobError(None, f"'{source_dir}' is outside the source root")
+        if not path.is_dir():
+            raise InferenceJobError(None, f"'{source_dir}' is not a directory")
+        return path
+
+    async def start_job(
+        self,
+        request: InferenceJobRequest,
+        archive: BinaryIO | None = None,
+        archive_name: str = "",
+    ) -> str:
+        """Create an inference job and start it in the background.
+
+        Args:
+            request: Model, thresholds, source directory and output format
+            archive: Uploaded ZIP or tar archive of images (instead of
+                ``request.source_dir``)
+            archive_name: File name of the upload, for its archive type
+
+        Returns:
+            Job ID
+
+        Raises:
+            InferenceJobError: If the source is missing, ambiguous or invalid
+        """
+        if (archive is None) == (request.source_dir is None):
+            raise InferenceJobError(
+                None, "provide exactly one of an archive upload and source_dir"
+            )
+        suffix = archive_suffix(archive_name) if archive is not None else None
+        if archive is not None and suffix is None:
+            raise InferenceJobError(
+                None, f"archive must be one of {', '.join(ARCHIVE_SUFFIXES)}"
+            )
+        if request.source_dir is not None:
+            self.resolve_source_dir(request.source_dir)
+
+        job_id = str(uuid.uuid4())
+        job_dir = self.work_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / JOB_FILE).write_text(request.model_dump_json(indent=2))
+        if archive is not None:
+            # The upload is only readable during the request; keep a copy
+            with (job_dir / f"archive{suffix}").open("wb") as target:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, shutil.copyfileobj, archive, target
+                )
+
+        self.requests[job_id] = request
+        self.jobs[job_id] = InferenceJobStatus(
+            job_id=job_id,
+            status="pending",
+            model_id=request.model_id,
+            output_format=request.output_format,
+        )
+        self._launch(job_id)
+        return job_id
+
+    def resume_job(self, job_id: str) -> bool:
+        """Continue a stopped or failed job from its last checkpoint.
+
+        Returns:
+            False if the job is not resumable
+        """
+        status = self.jobs.get(job_id)
+        if status is None or status.status not in ("stopped", "failed"):
+            return False
+        status.status = "pending"
+        status.error = None
+        self._launch(job_id)
+        return True
+
+    def _launch(self, job_id: str) -> None:
+        """Run a pending job in the background."""
+        self._stop_requested.discard(job_id)
+        asyncio.create_task(self._run_job(job_id))
+
+    def stop_job(self, job_id: str) -> bool:
+        """Stop a job after the batch in progress (it can be resumed).
+
+        Returns:
+            False if the job is not pending or running
+        """
+        status = self.jobs.get(job_id)
+        if status is None or status.status not in ("pending", "running"):
+            return False
+        self._stop_requested.add(job_id)
+        return True
+
+    def get_status(self, job_id: str) -> InferenceJobStatus | None:
+        """Get inference job status."""
+        return self.jobs.get(job_id)
+
+    def results_path(self, job_id: str) -> Path:
+        """Path of the job's result file in its output format."""
+        coco = self.jobs[job_id].output_format == "coco"
+        return self.work_dir / job_id / (RESULTS_COCO if coco else RESULTS_JSONL)
+
+    def cleanup_job(self, job_id: str) -> bool:
+        """Delete a job and its files.
+
+        Returns:
+            False if the job is still pending or running
+        """
+        status = self.jobs.get(job_id)
+        if status is not None and status.status in ("pending", "running"):
+            return False
+        job_dir = self.work_dir / job_id
+        if job_dir.exists():
+            shutil.rmtree(job_dir)
+        self.jobs.pop(job_id, None)
+        self.requests.pop(job_id, None)
+        self.callbacks.pop(job_id, None)
+        self._pending_messages.pop(job_id, None)
+        return True
+
+    def restore_jobs(self) -> None:
+        """Register jobs found on disk, e.g. after a restart.
+
+        Jobs that were pending or running when the server stopped come back
+        as ``stopped`` and can be resumed from their checkpoint.
+        """
+        if not self.work_dir.exists():
+            return
+        for job_file in self.work_dir.glob(f"*/{JOB_FILE}"):
+            job_id = job_file.parent.name
+            if job_id in self.jobs:
+                continue
+            try:
+                request = InferenceJobRequest.model_validate_json(job_file.read_text())
+                status = self._load_checkpoint(job_id)[1] or InferenceJobStatus(
+                    job_id=job_id,
+                    status="stopped",
+                    model_id=request.model_id,
+                    output_format=request.output_format,
+                )
+            except ValueError as e:
+                logger.warning("inference_job_unreadable", job_id=job_id, error=str(e))
+                continue
+            if status.status in ("pending", "running"):
+                status.status = "stopped"
+            self.requests[job_id] = request
+            self.jobs[job_id] = status
+        logger.info("inference_jobs_restored", jobs=len(self.jobs))
+
+    def _load_checkpoint(self, job_id: str) -> tuple[int, InferenceJobStatus | None]:
+        """Read the results offset and status of the last checkpoint."""
+        path = self.work_dir / job_id / CHECKPOINT_FILE
+        if not path.exists():
+            return 0, None
+        checkpoint = json.loads(path.read_text())
+        return checkpoint["offset"], InferenceJobStatus.model_validate(
+            checkpoint["status"]
+        )
+
+    def _save_checkpoint(self, job_id: str, offset: int) -> None:
+        """Atomically record how far the results file is complete."""
+        path = self.work_dir / job_id / CHECKPOINT_FILE
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "offset": offset,
+                    "status": self.jobs[job_id].model_dump(mode="json"),
+                }
+            )
+        )
+        tmp_path.replace(path)
+
+    def _prepare_source(self, job_id: str) -> tuple[Path, list[str]]:
+        """Extract the archive and list the images on the first run.
+
+        The image list is written once, so a resumed job processes the same
+        images in the same order as the run that wrote the checkpoint.
+        """
+        job_dir = self.work_dir / job_id
+        request = self.requests[job_id]
+        if request.source_dir is not None:
+            source = self.resolve_source_dir(request.source_dir)
+        else:
+            source = job_dir / "images"
+            archives = [job_dir / f"archive{suffix}" for suffix in ARCHIVE_SUFFIXES]
+            for archive_path in archives:
+                if archive_path.exists():
+                    self._post(job_id, {"type": "log", "data": "Extracting archive..."})
+                    extract_archive(archive_path, source)
+                    archive_path.unlink()
+
+        manifest = job_dir / MANIFEST_FILE
+        if manifest.exists():
+            return source, manifest.read_text().splitlines()
+        files = list_images(source)
+        if not files:
+            raise InferenceJobError(job_id, "no images found in the source")
+        if len(files) > settings.inference_job_max_images:
+            raise InferenceJobError(
+                job_id,
+                f"{len(files)} images exceed the limit of "
+                f"{settings.inference_job_max_images}",
+            )
+        manifest.write_text("\n".join(files) + "\n")
+        return source, files
+
+    def _run_sync(self, job_id: str) -> None:
+        """Process the job's remaining images (runs in thread pool)."""
+        from .workers import model_host
+
+        request = self.requests[job_id]
+        status = self.jobs[job_id]
+        job_dir = self.work_dir / job_id
+        source, files = self._prepare_source(job_id)
+
+        offset, checkpoint = self._load_checkpoint(job_id)
+        if checkpoint is not None:
+            status.processed_images = checkpoint.processed_images
+            status.failed_images = checkpoint.failed_images
+            status.detections = checkpoint.detections
+        status.total_images = len(files)
+        status.started_at = status.started_at or datetime.now()
+
+        if not model_host.is_loaded(request.model_id):
+            model_host.load_model(request.model_id)
+        class_names = model_host.model_info[request.model_id].classes
+        # Tiles need the full resolution, so no reduced JPEG decoding
+        target_size = (
+            None
+            if request.tiling is not None
+            else model_host.decode_target_size(request.model_id)
+        )
+
+        remaining = files[status.processed_images :]
+        self._post(
+            job_id,
+            {
+                "type": "log",
+                "data": f"Processing {len(remaining)} of {len(files)} images",
+            },
+        )
+        start_time = time.perf_counter()
+        processed_at_start = status.processed_images
+
+        results_path = job_dir / RESULTS_JSONL
+        results_path.touch()
+        pool = ThreadPoolExecutor(
+            max_workers=settings.inference_job_decode_workers,
+            thread_name_prefix="inference-job-decode",
+        )
+        try:
+            with results_path.open("r+b") as results:
+                # Drop lines written after the last checkpoint
+                results.truncate(offset)
+                results.seek(offset)
+                batches = decode_ahead(
+                    pool,
+                    source,
+                    remaining,
+                    target_size,
+                    settings.inference_job_batch_size,
+                )
+                for batch in batches:
+                    if job_id in self._stop_requested:
+                        break
+                    lines = self._predict_batch(request, batch, class_names)
+                    results.write(
+                        "".join(json.dumps(line) + "\n" for line in lines).encode()
+                    )
+                    results.flush()
+
+                    status.processed_images += len(batch)
+                    status.failed_images += sum("error" in line for line in lines)
+                    status.detections += sum(
+                        len(line.get("detections", ())) for line in lines
+                    )
+                    status.progress = status.processed_images / len(files) * 100
+                    elapsed = time.perf_counter() - start_time
+                    status.images_per_second = round(
+                        (status.processed_images - processed_at_start) / elapsed, 2
+                    )
+                    self._save_checkpoint(job_id, results.tell())
+                    self._post(
+                        job_id,
+                        {"type": "status", "data": status.model_dump(mode="json")},
+                    )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if job_id in self._stop_requested:
+            status.status = "stopped"
+        else:
+            if request.output_format == "coco":
+                write_coco(results_path, job_dir / RESULTS_COCO, class_names)
+            status.status = "completed"
+            status.progress = 100.0
+            status.completed_at = datetime.now()
+        self._save_checkpoint(job_id, results_path.stat().st_size)
+        logger.info(
+            "inference_job_finished",
+            job_id=job_id,
+            status=status.status,
+            processed_images=status.processed_images,
+            failed_images=status.failed_images,
+            images_per_second=status.images_per_second,
+        )
+
+    def _predict_batch(
+        self,
+        request: InferenceJobRequest,
+        batch: list[tuple[str, DecodeResult]],
+        class_names: list[str],
+    ) -> list[dict[str, Any]]:
+        """Run the decoded images of a batch through the model.
+
+        Args:
+            request: Model, thresholds and tiling of the job
+            batch: (relative path, decoded image or decode error) pairs
+            class_names: Class names of the model
+
+        Returns:
+            One result line per image, in batch order
+        """
+        from .tiling import predict_tiled
+        from .workers import model_host
+
+        decoded = [image for _, image in batch if isinstance(image, DecodedImage)]
+        arrays = [image.array for image in decoded]
+        if request.tiling is not None:
+            predict = partial(model_host.predict_batch, request.model_id)
+            detections = [
+                predict_tiled(
+                    predict, array, request.tiling, request.confidence, request.iou
+                )[0]
+                for array in arrays
+            ]
+        elif arrays:
+            detections = model_host.predict_batch(
+                request.model_id, arrays, request.confidence, request.iou
+            )
+        else:
+            detections = []
+
+        found = iter(detections)
+        lines: list[dict[str, Any]] = []
+        for name, image in batch:
+            if not isinstance(image, DecodedImage):
+                lines.append({"file": name, "error": str(image)})
+                continue
+            objects = next(found).scaled(*image.scale).to_detections(class_names)
+            lines.append(
+                {
+                    "file": name,
+                    "image_size": image.original_size,
+                    "detections": [detection.model_dump() for detection in objects],
+                }
+            )
+        return lines
+
+    async def _process_pending_messages(self, job_id: str) -> None:
+        """Forward messages from the job thread until the job finishes."""
+        while True:
+            await asyncio.sleep(1)  # Check every second
+
+            status = self.jobs.get(job_id)
+            if status is None:
+                break
+            messages = self._pending_messages.pop(job_id, [])
+            for message in messages:
+                await self._notify(job_id, message)
+            if status.status not in ("pending", "running"):
+                break
+
+    async def _run_job(self, job_id: str) -> None:
+        """Run an inference job (async wrapper)."""
+        status = self.jobs[job_id]
+        status.status = "running"
+        await self._notify(job_id, {"type": "status", "data": {"status": "running"}})
+        processor_task = asyncio.create_task(self._process_pending_messages(job_id))
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run_sync, job_id
+            )
+        except Exception as e:
+            logger.error(
+                "inference_job_failed", job_id=job_id, error=str(e), exc_info=True
+            )
+            status.status = "failed"
+            status.error = str(e)
+            self._post(job_id, {"type": "error", "data": {"error": str(e)}})
+            if (self.work_dir / job_id).exists():
+                offset, _ = self._load_checkpoint(job_id)
+                self._save_checkpoint(job_id, offset)
+        finally:
+            self._stop_requested.discard(job_id)
+        await processor_task
+        for message in self._pending_messages.pop(job_id, []):
+            await self._notify(job_id, message)
+        await self._notify(
+            job_id,
+            {
+                "type": "status",
+                "data": {"status": status.status, "progress": status.progress},
+            },
+        )
+
+
+# Global inference job manager instance
+inference_job_manager = InferenceJobManager()
@@ -1,41 +1,131 @@
 """FastAPI main application."""
 
+import asyncio
+import importlib
 import time
 import uuid
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable, Coroutine
 from contextlib import asynccontextmanager
-from typing import Any
+from datetime import datetime
+from functools import partial
+from typing import Any, TypeVar
 
 import structlog
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, BackgroundTasks, UploadFile, File, Form
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from pydantic import ValidationError
 from starlette.background import BackgroundTask
 
+from .batching import batch_scheduler
 from .config import settings
-from .dependencies import TrainingManagerDep
+from .dependencies import InferenceJobManagerDep, TrainingManagerDep
 from .exceptions import (
+    ClientDisconnectedError,
+    DeadlineExceededError,
     InferenceError,
+    InferenceJobError,
+    InferenceJobNotFoundError,
+    InvalidImageError,
     ModelFileNotFoundError,
     ModelNotFoundError,
     ModelNotReadyError,
+    QuantizationError,
+    ResourceLimitError,
+    ServiceOverloadedError,
     TrainingNotFoundError,
     TrainingStopError,
     YOLOAPIException,
 )
+from .executor import inference_executor
+from .export import load_benchmark
+from .image_store import StoredImage, image_store
+from .imaging import MAX_IMAGE_SIZE, DecodedImage, read_image_header
 from .inference import inference_manager
+from .inference_jobs import inference_job_manager
 from .logging_config import logger
+from .metrics import (
+    REQUEST_LATENCY,
+    STAGE_LATENCY,
+    Gauge,
+    observe_stages,
+    render_prometheus,
+)
 from .models import (
+    BatchPredictRequest,
+    BatchPredictResult,
+    ImageUploadRequest,
+    InferenceJobRequest,
+    InferenceJobStatus,
+    InferenceParams,
     InferenceRequest,
     InferenceResponse,
     ListModelsResponse,
+    ReplicasRequest,
     StartTrainingRequest,
     StartTrainingResponse,
+    StoredImageResponse,
+    TilingParams,
     TrainingStatus,
     WSMessage,
 )
+from .prediction_cache import image_digest
+from .quantization import load_quantization_report
+from .tiling import count_tiles, predict_tiled
+from .workers import model_host, worker_pool
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Deadline-Ms"
+
+
+async def _evict_idle_models() -> None:
+    """Periodically unload models idle for longer than the cache TTL."""
+    ttl = settings.model_idle_ttl_s
+    if not ttl:
+        return
+    while True:
+        await asyncio.sleep(min(60.0, max(1.0, ttl / 4)))
+        inference_manager.models.evict_idle()
+
+
+async def _preload_models(pending: set[str]) -> None:
+    """Load and warm up the configured models, marking each one done."""
+    for model_id in list(pending):
+        try:
+            await inference_executor.run(model_host.preload, model_id)
+        except Exception as e:
+            logger.error("model_preload_failed", model_id=model_id, error=str(e))
+        finally:
+            pending.discard(model_id)
+    logger.info("model_preload_completed", models=settings.preload_models)
+
+
+async def _preimport_ml_runtime() -> None:
+    """Import ultralytics (and torch) in the background after startup.
+
+    The import takes seconds, so it is kept off the startup path; doing it
+    right after means the first model load or training job does not wait
+    for it either.
+    """
+    if not settings.preimport_ml_runtime:
+        return
+    start_time = time.perf_counter()
+    try:
+        await inference_executor.run(importlib.import_module, "ultralytics")
+    except ImportError as e:
+        logger.warning("ml_runtime_import_failed", error=str(e))
+        return
+    logger.info(
+        "ml_runtime_imported",
+        import_time_ms=round((time.perf_counter() - start_time) * 1000, 2),
+    )
 
 
 @asynccontextmanager
@@ -51,8 +141,23 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         log_format=settings.log_format,
         log_level=settings.log_level,
     )
+    settings.ensure_directories()
+    ml_import = asyncio.create_task(_preimport_ml_runtime())
+    if settings.inference_mode == "process":
+        await inference_executor.run(worker_pool.start)
+    inference_job_manager.restore_jobs()
+    idle_eviction = asyncio.create_task(_evict_idle_models())
+    # Readiness stays false until every preloaded model is warm
+    app.state.warming_up = set(settings.preload_models)
+    preload = asyncio.create_task(_preload_models(app.state.warming_up))
     yield
     # Shutdown
+    ml_import.cancel()
+    preload.cancel()
+    idle_eviction.cancel()
+    await batch_scheduler.close()
+    inference_executor.shutdown(wait=False)
+    worker_pool.close()
     logger.info("server_shutdown")
 
 
@@ -83,6 +188,7 @@ async def request_tracking_middleware(
     # Generate request ID
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
+    request.state.received_at = time.perf_counter()  # Start of request deadlines
 
     # Add request ID to structlog context
     structlog.contextvars.clear_contextvars()
@@ -102,6 +208,13 @@ async def request_tracking_middleware(
 
     # Log request completion
     duration = time.time() - start_time
+    # Labelled by route template, so path parameters do not add series
+    route = request.scope.get("route")
+    REQUEST_LATENCY.labels(
+        request.method,
+        getattr(route, "path", "unmatched"),
+        str(response.status_code),
+    ).observe(duration * 1000)
     logger.info(
         "request_completed",
         method=request.method,
@@ -136,6 +249,9 @@ async def yolo_exception_handler(
         status_code=exc.status_code,
         path=str(request.url.path),
     )
+    headers = None
+    if isinstance(exc, ServiceOverloadedError):
+        headers = {"Retry-After": str(exc.retry_after)}
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -144,6 +260,7 @@ async def yolo_exception_handler(
             "status_code": exc.status_code,
             "path": str(request.url.path),
         },
+        headers=headers,
     )
 
 
@@ -262,6 +379,80 @@ async def health() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness endpoint.
+
+    Reports 503 until the models listed in ``preload_models`` are loaded and
+    warmed up, so load balancers only route traffic to warm instances.
+    """
+    warming_up = sorted(getattr(app.state, "warming_up", set()))
+    if warming_up:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "pending_models": warming_up},
+        )
+    return JSONResponse(content={"status": "ready"})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    training: TrainingManagerDep, jobs: InferenceJobManagerDep
+) -> PlainTextResponse:
+    """Metrics in the Prometheus text exposition format.
+
+    Exposes latency histograms per route and per inference stage and model
+    (base64, decode, queue, preprocess, forward, nms, serialize), and gauges
+    of loaded models, queue depths, running jobs and WebSocket subscribers.
+    """
+    stages = STAGE_LATENCY.children()
+    for model_id, histogram in batch_scheduler.queue_wait_histograms().items():
+        stages[(model_id, "queue")] = histogram
+
+    loaded = (
+        worker_pool.model_info
+        if settings.inference_mode == "process"
+        else inference_manager.models
+    )
+    gauges = [
+        Gauge(
+            "yolo_models_loaded", "Models loaded for inference", (), {(): len(loaded)}
+        ),
+        Gauge(
+            "yolo_batch_queue_depth",
+            "Requests queued or running per model",
+            ("model_id",),
+            {(m,): depth for m, depth in batch_scheduler.queue_depths().items()},
+        ),
+        Gauge(
+            "yolo_training_jobs_running",
+            "Training jobs running",
+            (),
+            {(): sum(job.status == "running" for job in training.jobs.values())},
+        ),
+        Gauge(
+            "yolo_inference_jobs_running",
+            "Offline inference jobs running",
+            (),
+            {(): sum(job.status == "running" for job in jobs.jobs.values())},
+        ),
+        Gauge(
+            "yolo_websocket_subscribers",
+            "Open WebSocket connections following a job",
+            ("channel",),
+            {
+                ("training",): sum(map(len, training.callbacks.values())),
+                ("inference_job",): sum(map(len, jobs.callbacks.values())),
+            },
+        ),
+    ]
+    content = render_prometheus(
+        [(REQUEST_LATENCY, REQUEST_LATENCY.children()), (STAGE_LATENCY, stages)],
+        gauges,
+    )
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/training/start", response_model=StartTrainingResponse)
 async def start_training(
     request: StartTrainingRequest,
@@ -437,6 +628,8 @@ async def get_training_results(
     # Check if results exist
     results_png = training_dir / "results.png"
     confusion_matrix = training_dir / "confusion_matrix.png"
+    benchmark = load_benchmark(training_dir / "weights")
+    quantization = load_quantization_report(training_dir / "weights")
 
     results: dict[str, Any] = {
         "job_id": job_id,
@@ -448,11 +641,79 @@ async def get_training_results(
             "best_model": (training_dir / "weights" / "best.pt").exists(),
             "last_model": (training_dir / "weights" / "last.pt").exists(),
         },
+        # Export formats timed on this host (None until the export finishes)
+        "benchmark": benchmark.model_dump(mode="json") if benchmark else None,
+        "quantization": (
+            quantization.model_dump(mode="json") if quantization else None
+        ),
     }
 
     return results
 
 
+@app.post("/api/training/{job_id}/quantize", status_code=202)
+async def quantize_model(
+    job_id: str,
+    manager: TrainingManagerDep,
+) -> dict[str, str]:
+    """Quantize a trained model to INT8 in the background.
+
+    Calibrates on the job's validation images and re-runs mAP before and
+    after. When done, the variant is served as model ID ``<job_id>:int8``.
+
+    Raises:
+        TrainingNotFoundError: If training job doesn't exist
+        ModelNotReadyError: If training is not completed
+        QuantizationError: If onnxruntime is missing or a run is in progress
+    """
+    from .backends import onnxruntime_available
+
+    status = manager.get_status(job_id)
+    if not status:
+        raise TrainingNotFoundError(job_id)
+
+    if status.status != "completed":
+        raise ModelNotReadyError(job_id, status.status)
+
+    if not onnxruntime_available():
+        raise QuantizationError(job_id, "onnxruntime is not installed")
+
+    if not manager.start_quantization(job_id):
+        raise QuantizationError(job_id, "quantization already in progress")
+
+    return {
+        "message": f"Quantization of training job {job_id} started",
+        "model_id": f"{job_id}:int8",
+    }
+
+
+@app.get("/api/training/{job_id}/quantization")
+async def get_quantization(
+    job_id: str,
+    manager: TrainingManagerDep,
+) -> dict[str, Any]:
+    """Get the status and report of a job's INT8 quantization.
+
+    Raises:
+        TrainingNotFoundError: If training job doesn't exist
+    """
+    if not manager.get_status(job_id):
+        raise TrainingNotFoundError(job_id)
+
+    weights_dir = manager.work_dir / job_id / "training" / "weights"
+    report = load_quantization_report(weights_dir)
+    status = manager.quantizations.get(job_id) or (
+        "completed" if report else "not_started"
+    )
+    return {
+        "job_id": job_id,
+        "status": status,
+        "error": manager.quantization_errors.get(job_id),
+        # Report of the last successful run (accuracy delta and speedup)
+        "report": report.model_dump(mode="json") if report else None,
+    }
+
+
 @app.get("/api/training/list")
 async def list_training_jobs(
     manager: TrainingManagerDep,
@@ -485,13 +746,17 @@ async def list_training_jobs(
 
 
 @app.get("/api/inference/models", response_model=ListModelsResponse)
-async def list_available_models() -> ListModelsResponse:
+async def list_available_models(latest_only: bool = True) -> ListModelsResponse:
     """List all available trained models for inference.
 
+    Args:
+        latest_only: Only list the latest trained model besides the uploaded
+            ones (pass false to list every trained model)
+
     Returns:
         ListModelsResponse with list of available models
     """
-    models = inference_manager.list_models()
+    models = inference_manager.list_models(latest_only=latest_only)
     logger.info("list_inference_models", total=len(models))
     return ListModelsResponse(models=models, total=len(models))
 
@@ -551,6 +816,7 @@ async def upload_model(
         }
         metadata_path = model_dir / "metadata.json"
         metadata_path.write_text(json.dumps(metadata, indent=2, ensure_ascii=False))
+        inference_manager.registry.update(model_id)
 
         logger.info("model_uploaded", model_id=model_id, name=model_name, file_type=file_ext)
         return {
@@ -579,7 +845,7 @@ async def load_model(model_id: str) -> dict[str, str]:
         ModelFileNotFoundError: If model file not found
         ModelNotReadyError: If model failed to load
     """
-    inference_manager.load_model(model_id)
+    await inference_executor.run(model_host.load_model, model_id)
     logger.info("model_loaded_api", model_id=model_id)
     return {"message": f"Model '{model_id}' loaded successfully"}
 
@@ -594,17 +860,196 @@ async def unload_model(model_id: str) -> dict[str, str]:
     Returns:
         Success message
     """
-    inference_manager.unload_model(model_id)
+    await inference_executor.run(model_host.unload_model, model_id)
     logger.info("model_unloaded_api", model_id=model_id)
     return {"message": f"Model '{model_id}' unloaded successfully"}
 
 
-@app.post("/api/inference/predict", response_model=InferenceResponse)
-async def run_inference(request: InferenceRequest) -> InferenceResponse:
-    """Run inference on an image.
+@app.post("/api/inference/pin/{model_id}")
+async def pin_model(model_id: str) -> dict[str, str]:
+    """Pin a model so the cache never evicts it.
+
+    The model is loaded if it is not resident yet.
+
+    Args:
+        model_id: Model identifier
+
+    Returns:
+        Success message
+
+    Raises:
+        ModelNotFoundError: If model doesn't exist
+    """
+    await inference_executor.run(model_host.load_model, model_id)
+    await inference_executor.run(model_host.pin, model_id)
+    logger.info("model_pinned", model_id=model_id)
+    return {"message": f"Model '{model_id}' pinned"}
+
+
+@app.post("/api/inference/unpin/{model_id}")
+async def unpin_model(model_id: str) -> dict[str, str]:
+    """Allow the cache to evict a previously pinned model.
+
+    Args:
+        model_id: Model identifier
+
+    Returns:
+        Success message
+    """
+    await inference_executor.run(model_host.unpin, model_id)
+    logger.info("model_unpinned", model_id=model_id)
+    return {"message": f"Model '{model_id}' unpinned"}
+
+
+@app.post("/api/inference/replicas/{model_id}")
+async def set_model_replicas(model_id: str, request: ReplicasRequest) -> dict[str, Any]:
+    """Change how many copies of a model serve batches in parallel.
+
+    The model is loaded if it is not resident yet. The count is kept for
+    later loads of the model.
 
     Args:
-        request: InferenceRequest with model_id, image, confidence, and iou
+        model_id: Model identifier
+        request: Number of replicas
+
+    Returns:
+        Replica usage of the model
+
+    Raises:
+        HTTPException: If models run in worker processes
+        ModelNotFoundError: If model doesn't exist
+    """
+    if settings.inference_mode == "process":
+        raise HTTPException(
+            status_code=400,
+            detail="Replicas apply to the thread inference mode; "
+            "process mode scales with YOLO_PROCESS_WORKERS",
+        )
+    await inference_executor.run(inference_manager.load_model, model_id)
+    await inference_executor.run(
+        inference_manager.set_replicas, model_id, request.replicas
+    )
+    return {"model_id": model_id, **inference_manager.replica_stats()[model_id]}
+
+
+@app.get("/api/inference/stats")
+async def inference_stats() -> dict[str, Any]:
+    """Get model cache, batching and executor statistics.
+
+    Returns:
+        Counters for sizing the model cache budget and inference workers
+    """
+    stats: dict[str, Any] = {
+        "cache": inference_manager.models.stats(),
+        "batching": batch_scheduler.stats(),
+        "executor": inference_executor.stats(),
+        "image_store": image_store.stats(),
+    }
+    if settings.inference_mode == "process":
+        stats["workers"] = await inference_executor.run(worker_pool.stats)
+    else:
+        stats["prediction_cache"] = inference_manager.prediction_cache.stats()
+        stats["replicas"] = inference_manager.replica_stats()
+    return stats
+
+
+def _request_deadline(request: Request, params: InferenceParams) -> float | None:
+    """Absolute deadline of a request from its ``deadline_ms`` or header.
+
+    Args:
+        request: HTTP request, timestamped on arrival by the middleware
+        params: Inference parameters, whose ``deadline_ms`` wins over the header
+
+    Returns:
+        ``time.perf_counter()`` deadline, or None without a time budget
+
+    Raises:
+        HTTPException: If the header is not a positive number
+    """
+    budget_ms = params.deadline_ms
+    header = request.headers.get(DEADLINE_HEADER)
+    if budget_ms is None and header is not None:
+        try:
+            budget_ms = float(header)
+        except ValueError:
+            budget_ms = 0
+        if not budget_ms > 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{DEADLINE_HEADER} must be a positive number of ms",
+            )
+    if budget_ms is None:
+        return None
+    received_at = getattr(request.state, "received_at", time.perf_counter())
+    return received_at + budget_ms / 1000
+
+
+async def _cancel_on_disconnect(
+    request: Request, work: Coroutine[Any, Any, T]
+) -> T:
+    """Run a request's work, cancelling it if the client disconnects first.
+
+    Cancelling drops the image from its model queue, so no forward pass is
+    spent on a result nobody reads.
+
+    Args:
+        request: HTTP request whose connection is watched
+        work: Coroutine producing the response
+
+    Returns:
+        Result of the work
+
+    Raises:
+        ClientDisconnectedError: If the client went away before the result
+    """
+
+    async def wait_for_disconnect() -> None:
+        # The body is already read, so the next message is the disconnect
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            logger.info("inference_client_disconnected", path=request.url.path)
+            raise ClientDisconnectedError()
+        return task.result()
+    finally:
+        task.cancel()
+        watcher.cancel()
+
+
+def _check_deadline(deadline: float | None, stage: str) -> None:
+    """Raise DeadlineExceededError if the deadline has passed."""
+    if deadline is not None and time.perf_counter() > deadline:
+        raise DeadlineExceededError(stage)
+
+
+def _identify_image(image: bytes) -> tuple[str, tuple[int, int]]:
+    """Hash an encoded image and read its (width, height) from the header.
+
+    Pixels are only decoded on a cache miss.
+    """
+    return image_digest(image), read_image_header(image)[1]
+
+
+async def _predict(
+    params: InferenceParams,
+    image: bytes | str | StoredImage,
+    deadline: float | None = None,
+) -> InferenceResponse:
+    """Load the model if needed, decode the image and run it through a batch.
+
+    Images seen before by the same model are re-thresholded from the
+    prediction cache without decoding or a forward pass.
+
+    Args:
+        params: Model selection and thresholds
+        image: Encoded image file content, a base64 string of it, or an
+            image from the image store (already decoded)
+        deadline: ``time.perf_counter()`` after which the client gives up
 
     Returns:
         InferenceResponse with detections and inference time
@@ -613,36 +1058,698 @@ async def run_inference(request: InferenceRequest) -> InferenceResponse:
         ModelNotFoundError: If model not loaded
         InvalidImageError: If image is invalid
         InferenceError: If inference fails
+        ServiceOverloadedError: If the model queue is over its admission limits
+        DeadlineExceededError: If the deadline passed before the result
     """
     try:
-        # Auto-load model if not already loaded
-        if request.model_id not in inference_manager.models:
-            logger.info("auto_loading_model", model_id=request.model_id)
-            inference_manager.load_model(request.model_id)
-
-        result = inference_manager.infer(
-            model_id=request.model_id,
-            image_b64=request.image,
-            confidence=request.confidence,
-            iou=request.iou,
+        # Auto-load model if not already loaded (counts a cache hit or miss)
+        if not model_host.is_loaded(params.model_id):
+            logger.info("auto_loading_model", model_id=params.model_id)
+            await inference_executor.run(model_host.load_model, params.model_id)
+
+        timings: dict[str, float] = {}
+        decode: Callable[[int | None], DecodedImage]
+        if isinstance(image, StoredImage):
+            decode = image.decode
+            digest = image.digest
+            original_size = image.decoded.original_size
+        else:
+            if isinstance(image, str):
+                start_time = time.perf_counter()
+                image = await inference_executor.run(
+                    inference_manager.decode_base64, image
+                )
+                timings["base64"] = (time.perf_counter() - start_time) * 1000
+                observe_stages(params.model_id, {"base64": timings["base64"]})
+            image_bytes = image
+
+            def decode(target_size: int | None) -> DecodedImage:
+                decoded = inference_manager.decode_image_bytes(
+                    image_bytes, target_size
+                )
+                # Header parsing and pixel decoding
+                observe_stages(
+                    params.model_id, {"decode": sum(decoded.timings.values())}
+                )
+                decoded.timings = {**timings, **decoded.timings}
+                return decoded
+
+        class_names = model_host.model_info[params.model_id].classes
+        if params.tiling is not None:
+            _check_deadline(deadline, "before decoding")
+            return await _predict_tiled(
+                params, params.tiling, decode, class_names, deadline
+            )
+
+        cache_key = None
+        if settings.prediction_cache_entries:
+            if isinstance(image, bytes):
+                digest, original_size = await inference_executor.run(
+                    _identify_image, image
+                )
+            cache_key = digest
+            cached = await _predict_from_cache(
+                params, cache_key, original_size, class_names, timings
+            )
+            if cached is not None:
+                return cached
+
+        _check_deadline(deadline, "before decoding")
+        decoded = await inference_executor.run(
+            decode, model_host.decode_target_size(params.model_id)
+        )
+
+        # Concurrent requests for the same model share one forward pass
+        batch = await batch_scheduler.submit(
+            params.model_id,
+            decoded.array,
+            confidence=params.confidence,
+            iou=params.iou,
+            cache_key=cache_key,
+            deadline=deadline,
+        )
+        serialize_start = time.perf_counter()
+        result = InferenceResponse(
+            # Reduced JPEG decodes are mapped back to source coordinates
+            detections=batch.detections.scaled(*decoded.scale).to_detections(
+                class_names
+            ),
+            inference_time=batch.inference_time,
+            image_size=decoded.original_size,
+            batch_size=batch.batch_size,
+            timings={
+                **decoded.timings,
+                "queue": batch.queue_time,
+                "forward": batch.inference_time,
+            },
+        )
+        observe_stages(
+            params.model_id,
+            {"serialize": (time.perf_counter() - serialize_start) * 1000},
         )
 
         logger.info(
             "inference_api_success",
-            model_id=request.model_id,
+            model_id=params.model_id,
             detections=len(result.detections),
             inference_time_ms=round(result.inference_time, 2),
+            batch_size=batch.batch_size,
+            queue_time_ms=round(batch.queue_time, 2),
         )
 
         return result
 
-    except (ModelNotFoundError, ModelFileNotFoundError, ModelNotReadyError):
+    except (
+        ModelNotFoundError,
+        ModelFileNotFoundError,
+        ModelNotReadyError,
+        InvalidImageError,
+        InferenceError,
+        ResourceLimitError,
+        ServiceOverloadedError,
+        DeadlineExceededError,
+    ):
         raise
     except Exception as e:
         logger.error("inference_api_error", error=str(e), exc_info=True)
         raise InferenceError(str(e)) from e
 
 
+async def _predict_from_cache(
+    params: InferenceParams,
+    cache_key: str,
+    original_size: tuple[int, int],
+    class_names: list[str],
+    timings: dict[str, float],
+) -> InferenceResponse | None:
+    """Answer a request from the cached pre-NMS outputs of its image.
+
+    Args:
+        params: Model selection and thresholds
+        cache_key: Digest of the encoded image
+        original_size: (width, height) of the source image
+        class_names: Class names of the model
+        timings: Stages already spent on the request, in ms
+
+    Returns:
+        InferenceResponse, or None if the image is not cached for the model
+    """
+    start_time = time.perf_counter()
+    cached = await inference_executor.run(
+        model_host.predict_cached,
+        params.model_id,
+        cache_key,
+        params.confidence,
+        params.iou,
+    )
+    if cached is None:
+        return None
+    detections, (height, width) = cached
+    # The model may have seen a reduced JPEG decode; map back to the source
+    scale = (original_size[0] / width, original_size[1] / height)
+    cache_time = (time.perf_counter() - start_time) * 1000
+
+    result = InferenceResponse(
+        detections=detections.scaled(*scale).to_detections(class_names),
+        inference_time=0.0,
+        image_size=original_size,
+        batch_size=1,
+        timings={**timings, "cache": cache_time},
+        cache_hit=True,
+    )
+    logger.info(
+        "inference_cache_hit",
+        model_id=params.model_id,
+        detections=len(result.detections),
+        cache_time_ms=round(cache_time, 2),
+    )
+    return result
+
+
+async def _predict_tiled(
+    params: InferenceParams,
+    tiling: TilingParams,
+    decode: Callable[[int | None], DecodedImage],
+    class_names: list[str],
+    deadline: float | None = None,
+) -> InferenceResponse:
+    """Run a full-resolution image as batches of overlapping tiles.
+
+    Tiles bypass the micro-batcher, since one request already fills its
+    batches, but not admission control: the tiles count towards the model's
+    queue depth while they run. The deadline is checked between tile batches.
+
+    Args:
+        params: Model selection and thresholds
+        tiling: Tile size and overlap
+        decode: Blocking callable decoding the image for a model input size
+        class_names: Class names of the model
+        deadline: ``time.perf_counter()`` after which the client gives up
+
+    Returns:
+        InferenceResponse with merged detections and per-batch tile timings
+
+    Raises:
+        ServiceOverloadedError: If the model queue is over its admission limits
+        DeadlineExceededError: If the deadline passed before the result
+    """
+    # Tiles need the full resolution, so no reduced JPEG decoding
+    decoded = await inference_executor.run(decode, None)
+    _check_deadline(deadline, "before inference")
+    tiles = count_tiles(*decoded.array.shape[:2], tiling)
+    with batch_scheduler.reserve(params.model_id, tiles):
+        start_time = time.perf_counter()
+        detections, stats = await inference_executor.run(
+            predict_tiled,
+            partial(model_host.predict_batch, params.model_id),
+            decoded.array,
+            tiling,
+            params.confidence,
+            params.iou,
+            deadline=deadline,
+        )
+    total_time = (time.perf_counter() - start_time) * 1000
+    forward_time = sum(stats.batch_times)
+
+    result = InferenceResponse(
+        detections=detections.scaled(*decoded.scale).to_detections(class_names),
+        inference_time=forward_time,
+        image_size=decoded.original_size,
+        batch_size=stats.tiles,
+        timings={
+            **decoded.timings,
+            "forward": forward_time,
+            "merge": max(total_time - forward_time, 0.0),
+        },
+        tiling=stats,
+    )
+    logger.info(
+        "tiled_inference_success",
+        model_id=params.model_id,
+        detections=len(result.detections),
+        tiles=stats.tiles,
+        grid=stats.grid,
+        per_tile_ms=stats.per_tile_ms,
+        inference_time_ms=round(forward_time, 2),
+    )
+    return result
+
+
+async def _read_image_body(request: Request) -> tuple[bytes, dict[str, Any]]:
+    """Read a binary image upload and its parameters.
+
+    Args:
+        request: Raw ``application/octet-stream`` or ``multipart/form-data``
+            request with the image in an ``image`` file field
+
+    Returns:
+        Tuple of (encoded image bytes, query and form fields)
+
+    Raises:
+        InvalidImageError: If the body is missing or too large
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        # Allow a little room for multipart boundaries and form fields
+        if int(content_length) > MAX_IMAGE_SIZE + 64 * 1024:
+            raise InvalidImageError(
+                f"Image too large: {int(content_length) / 1024 / 1024:.1f}MB (max 10MB)"
+            )
+
+    fields: dict[str, Any] = dict(request.query_params)
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("image")
+        if upload is None or isinstance(upload, str):
+            raise InvalidImageError("multipart body must contain an 'image' file")
+        image_bytes = await upload.read()
+        fields.update(
+            {key: value for key, value in form.items() if isinstance(value, str)}
+        )
+    else:
+        image_bytes = await request.body()
+
+    if not image_bytes:
+        raise InvalidImageError("Empty request body")
+    return image_bytes, fields
+
+
+@app.post("/api/inference/predict", response_model=InferenceResponse)
+async def run_inference(
+    request: InferenceRequest, http_request: Request
+) -> InferenceResponse:
+    """Run inference on an image.
+
+    The work is cancelled if the client disconnects, and dropped with 504 if
+    it is still queued after ``deadline_ms`` (or the ``X-Deadline-Ms`` header).
+
+    Args:
+        request: InferenceRequest with model_id, image (or image_id of a
+            stored image), confidence, and iou
+        http_request: HTTP request carrying the deadline header and connection
+
+    Returns:
+        InferenceResponse with detections and inference time
+
+    Raises:
+        ModelNotFoundError: If model not loaded
+        ImageNotFoundError: If the stored image expired or does not exist
+        InvalidImageError: If image is invalid
+        InferenceError: If inference fails
+        ServiceOverloadedError: If the model queue is over its admission limits
+        DeadlineExceededError: If the deadline passed before the result
+        ClientDisconnectedError: If the client went away before the result
+    """
+    deadline = _request_deadline(http_request, request)
+    image: str | StoredImage = (
+        image_store.get(request.image_id)
+        if request.image_id is not None
+        else request.image  # type: ignore[assignment]
+    )
+    return await _cancel_on_disconnect(
+        http_request, _predict(request, image, deadline)
+    )
+
+
+@app.post(
+    "/api/inference/images", response_model=StoredImageResponse, status_code=201
+)
+async def store_image(request: Request) -> StoredImageResponse:
+    """Store a decoded image for repeated inference.
+
+    Accepts a JSON body ``{"image": "<base64>"}`` or the raw and multipart
+    uploads of ``/api/inference/predict/binary``. The image is validated and
+    decoded once; predict requests then pass ``image_id`` instead of the
+    image to compare models and thresholds without re-uploading it.
+
+    Returns:
+        StoredImageResponse with the image ID and its expiry
+
+    Raises:
+        InvalidImageError: If the body is missing, too large or not an image
+        ResourceLimitError: If the image exceeds the image store budget
+    """
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            upload = ImageUploadRequest.model_validate(await request.json())
+        except ValueError as e:
+            raise InvalidImageError(f"Invalid JSON body: {str(e)[:100]}") from e
+        image_bytes = await inference_executor.run(
+            inference_manager.decode_base64, upload.image
+        )
+    else:
+        image_bytes, _ = await _read_image_body(request)
+
+    image = await inference_executor.run(image_store.put, image_bytes)
+    logger.info(
+        "image_stored",
+        image_id=image.image_id,
+        image_size=image.decoded.original_size,
+        memory_mb=round(image.nbytes / 1024 / 1024, 2),
+    )
+    return StoredImageResponse(
+        image_id=image.image_id,
+        image_size=image.decoded.original_size,
+        memory_bytes=image.nbytes,
+        expires_at=image_store.expires_at(image),
+    )
+
+
+@app.delete("/api/inference/images/{image_id}")
+async def delete_image(image_id: str) -> dict[str, str]:
+    """Remove a stored image before it expires.
+
+    Args:
+        image_id: ID returned by ``POST /api/inference/images``
+
+    Returns:
+        Success message
+
+    Raises:
+        ImageNotFoundError: If the image is not stored
+    """
+    image_store.delete(image_id)
+    return {"message": f"Image {image_id} deleted"}
+
+
+@app.post("/api/inference/predict/binary", response_model=InferenceResponse)
+async def run_inference_binary(request: Request) -> InferenceResponse:
+    """Run inference on a binary image upload.
+
+    Accepts either a raw ``application/octet-stream`` body with ``model_id``,
+    ``confidence`` and ``iou`` as query parameters, or ``multipart/form-data``
+    with the image in an ``image`` file field and the parameters as form fields
+    (falling back to query parameters). The bytes go straight to the decoder
+    without the base64 step of ``/api/inference/predict``.
+
+    Returns:
+        InferenceResponse with detections and inference time
+
+    Raises:
+        InvalidImageError: If the body is missing, too large or not an image
+        ModelNotFoundError: If model not loaded
+        InferenceError: If inference fails
+        ServiceOverloadedError: If the model queue is over its admission limits
+        DeadlineExceededError: If the deadline passed before the result
+        ClientDisconnectedError: If the client went away before the result
+    """
+    image_bytes, fields = await _read_image_body(request)
+    params = InferenceParams.model_validate(fields)
+    deadline = _request_deadline(request, params)
+    return await _cancel_on_disconnect(
+        request, _predict(params, image_bytes, deadline)
+    )
+
+
+@app.post("/api/inference/predict/batch")
+async def run_inference_batch(request: Request) -> StreamingResponse:
+    """Run inference on many images in one call, streaming results as NDJSON.
+
+    Accepts ``multipart/form-data`` with the images in repeated ``images``
+    file fields and the parameters as form or query fields, or a JSON
+    ``BatchPredictRequest`` with base64 ``images`` and stored ``image_ids``.
+    Images are submitted together, so the batch scheduler runs them through
+    the model in full batches. One ``BatchPredictResult`` line is written per
+    image as soon as it completes, in completion order; a failed image
+    yields an error line without aborting the others.
+
+    Returns:
+        StreamingResponse of ``application/x-ndjson`` lines
+
+    Raises:
+        InvalidImageError: If the body carries no images or is too large
+        ResourceLimitError: If the request has too many images
+        ModelNotFoundError: If the model does not exist
+    """
+    max_images = settings.batch_predict_max_images
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_images * (MAX_IMAGE_SIZE + 64 * 1024):
+            raise InvalidImageError(
+                f"Request too large: {int(content_length) / 1024 / 1024:.1f}MB"
+            )
+
+    items: list[tuple[BatchPredictResult, bytes | str | None]] = []
+    params: InferenceParams
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form(max_files=max_images)
+        fields: dict[str, Any] = dict(request.query_params)
+        fields.update(
+            {key: value for key, value in form.items() if isinstance(value, str)}
+        )
+        params = InferenceParams.model_validate(fields)
+        for upload in form.getlist("images"):
+            if isinstance(upload, str):
+                raise InvalidImageError("'images' fields must be files")
+            line = BatchPredictResult(index=len(items), filename=upload.filename)
+            items.append((line, await upload.read()))
+    else:
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise InvalidImageError(f"Invalid JSON body: {str(e)[:100]}") from e
+        batch = BatchPredictRequest.model_validate(body)
+        params = batch
+        for image in batch.images:
+            items.append((BatchPredictResult(index=len(items)), image))
+        for image_id in batch.image_ids:
+            line = BatchPredictResult(index=len(items), image_id=image_id)
+            items.append((line, None))
+
+    if not items:
+        raise InvalidImageError("Batch contains no images")
+    if len(items) > max_images:
+        raise ResourceLimitError(
+            f"{len(items)} images exceed the batch limit of {max_images}"
+        )
+
+    # Fail the whole request up front for an unknown model
+    if not model_host.is_loaded(params.model_id):
+        await inference_executor.run(model_host.load_model, params.model_id)
+
+    deadline = _request_deadline(request, params)
+    return StreamingResponse(
+        _stream_batch(params, items, deadline), media_type="application/x-ndjson"
+    )
+
+
+async def _stream_batch(
+    params: InferenceParams,
+    items: list[tuple[BatchPredictResult, bytes | str | None]],
+    deadline: float | None = None,
+) -> AsyncIterator[str]:
+    """Predict all images concurrently and yield one NDJSON line per image.
+
+    Args:
+        params: Model selection and thresholds shared by all images
+        items: Result line stub and image (bytes, base64 or None for a
+            stored image) of each request image
+        deadline: ``time.perf_counter()`` deadline shared by all images
+
+    Yields:
+        Serialized ``BatchPredictResult`` lines in completion order
+    """
+    # Enough images in flight to fill one batch while the next is decoded
+    in_flight = asyncio.Semaphore(2 * settings.batch_max_size)
+
+    async def predict_one(
+        line: BatchPredictResult, image: bytes | str | None
+    ) -> BatchPredictResult:
+        async with in_flight:
+            try:
+                if image is None:
+                    line.result = await _predict(
+                        params, image_store.get(line.image_id or ""), deadline
+                    )
+                else:
+                    line.result = await _predict(params, image, deadline)
+            except YOLOAPIException as e:
+                line.error, line.message = e.__class__.__name__, e.message
+        return line
+
+    start_time = time.perf_counter()
+    tasks = [asyncio.create_task(predict_one(*item)) for item in items]
+    errors = 0
+    try:
+        for next_line in asyncio.as_completed(tasks):
+            line = await next_line
+            errors += line.error is not None
+            yield line.model_dump_json() + "\n"
+    finally:
+        # Stop the remaining images when the client disconnects
+        for task in tasks:
+            task.cancel()
+
+    logger.info(
+        "batch_inference_success",
+        model_id=params.model_id,
+        images=len(items),
+        errors=errors,
+        total_time_ms=round((time.perf_counter() - start_time) * 1000, 2),
+    )
+
+
+# ============================================================================
+# Offline Inference Job Endpoints
+# ============================================================================
+
+
+@app.post("/api/inference/jobs", status_code=202)
+async def start_inference_job(
+    request: Request,
+    manager: InferenceJobManagerDep,
+) -> dict[str, str]:
+    """Start an offline inference job over many images.
+
+    Accepts ``multipart/form-data`` with a ZIP or tar archive of images in
+    the ``archive`` file field and ``InferenceJobRequest`` fields as form or
+    query fields, or a JSON ``InferenceJobRequest`` with ``source_dir`` to
+    read a server directory. Progress is sent over
+    ``/ws/inference/jobs/{job_id}``.
+
+    Returns:
+        Job ID and message
+
+    Raises:
+        InferenceJobError: If the image source is missing or invalid
+        ModelNotFoundError: If the model does not exist
+    """
+    archive, archive_name = None, ""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form(max_files=1)
+        fields: dict[str, Any] = dict(request.query_params)
+        fields.update(
+            {key: value for key, value in form.items() if isinstance(value, str)}
+        )
+        job_request = InferenceJobRequest.model_validate(fields)
+        upload = form.get("archive")
+        if upload is not None and not isinstance(upload, str):
+            archive, archive_name = upload.file, upload.filename or ""
+    else:
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise InferenceJobError(None, f"invalid JSON body: {str(e)[:100]}") from e
+        job_request = InferenceJobRequest.model_validate(body)
+
+    # Fail before extracting anything for an unknown model
+    if not model_host.is_loaded(job_request.model_id):
+        await inference_executor.run(model_host.load_model, job_request.model_id)
+
+    job_id = await manager.start_job(job_request, archive, archive_name)
+    logger.info(
+        "inference_job_started",
+        job_id=job_id,
+        model_id=job_request.model_id,
+        source="archive" if archive is not None else "directory",
+        output_format=job_request.output_format,
+    )
+    return {"job_id": job_id, "message": f"Inference job {job_id} started"}
+
+
+@app.get("/api/inference/jobs")
+async def list_inference_jobs(manager: InferenceJobManagerDep) -> dict[str, Any]:
+    """List all offline inference jobs."""
+    jobs = [status.model_dump(mode="json") for status in manager.jobs.values()]
+    return {"jobs": jobs, "total": len(jobs)}
+
+
+@app.get("/api/inference/jobs/{job_id}", response_model=InferenceJobStatus)
+async def get_inference_job(
+    job_id: str,
+    manager: InferenceJobManagerDep,
+) -> InferenceJobStatus:
+    """Get offline inference job status.
+
+    Raises:
+        InferenceJobNotFoundError: If the job doesn't exist
+    """
+    status = manager.get_status(job_id)
+    if not status:
+        raise InferenceJobNotFoundError(job_id)
+    return status
+
+
+@app.post("/api/inference/jobs/{job_id}/stop")
+async def stop_inference_job(
+    job_id: str,
+    manager: InferenceJobManagerDep,
+) -> dict[str, str]:
+    """Stop an offline inference job after the batch in progress.
+
+    Raises:
+        InferenceJobNotFoundError: If the job doesn't exist
+        InferenceJobError: If the job is not running
+    """
+    if not manager.get_status(job_id):
+        raise InferenceJobNotFoundError(job_id)
+    if not manager.stop_job(job_id):
+        raise InferenceJobError(job_id, "job is not running")
+    return {"message": f"Inference job {job_id} stopping"}
+
+
+@app.post("/api/inference/jobs/{job_id}/resume")
+async def resume_inference_job(
+    job_id: str,
+    manager: InferenceJobManagerDep,
+) -> dict[str, str]:
+    """Resume a stopped or failed offline inference job from its checkpoint.
+
+    Raises:
+        InferenceJobNotFoundError: If the job doesn't exist
+        InferenceJobError: If the job is not stopped or failed
+    """
+    if not manager.get_status(job_id):
+        raise InferenceJobNotFoundError(job_id)
+    if not manager.resume_job(job_id):
+        raise InferenceJobError(job_id, "only stopped or failed jobs can resume")
+    return {"message": f"Inference job {job_id} resumed"}
+
+
+@app.get("/api/inference/jobs/{job_id}/results")
+async def download_inference_job_results(
+    job_id: str,
+    manager: InferenceJobManagerDep,
+) -> FileResponse:
+    """Download the results of a completed job (JSONL or COCO JSON).
+
+    Raises:
+        InferenceJobNotFoundError: If the job doesn't exist
+        InferenceJobError: If the job has not completed
+    """
+    status = manager.get_status(job_id)
+    if not status:
+        raise InferenceJobNotFoundError(job_id)
+    if status.status != "completed":
+        raise InferenceJobError(job_id, f"results are not ready ({status.status})")
+
+    path = manager.results_path(job_id)
+    return FileResponse(
+        path=path,
+        filename=f"inference_{job_id}{path.suffix}",
+        media_type="application/x-ndjson"
+        if status.output_format == "jsonl"
+        else "application/json",
+    )
+
+
+@app.delete("/api/inference/jobs/{job_id}")
+async def delete_inference_job(
+    job_id: str,
+    manager: InferenceJobManagerDep,
+) -> dict[str, str]:
+    """Delete an offline inference job and its files.
+
+    Raises:
+        InferenceJobError: If the job is still running
+    """
+    if not manager.cleanup_job(job_id):
+        raise InferenceJobError(job_id, "stop the job before deleting it")
+    return {"message": f"Inference job {job_id} deleted"}
+
+
 # ============================================================================
 # WebSocket Endpoints
 # ============================================================================
@@ -710,6 +1817,60 @@ async def training_websocket(websocket: WebSocket, job_id: str) -> None:
             ]
 
 
+@app.websocket("/ws/inference/jobs/{job_id}")
+async def inference_job_websocket(websocket: WebSocket, job_id: str) -> None:
+    """WebSocket endpoint for offline inference job progress."""
+    from .dependencies import get_inference_job_manager
+
+    manager = get_inference_job_manager()
+
+    await websocket.accept()
+
+    status = manager.get_status(job_id)
+    if not status:
+        await websocket.close(code=1008, reason="Inference job not found")
+        return
+
+    async def send_update(message: dict[str, Any]) -> None:
+        ws_message = WSMessage(
+            type=message.get("type", "log"),
+            job_id=job_id,
+            data=message.get("data"),
+        )
+        await websocket.send_json(ws_message.model_dump())
+
+    manager.register_callback(job_id, send_update)
+    try:
+        await send_update({"type": "status", "data": status.model_dump(mode="json")})
+
+        while True:
+            try:
+                data = await websocket.receive_text()
+
+                if data == "ping":
+                    await websocket.send_text("pong")
+                elif data == "status":
+                    current_status = manager.get_status(job_id)
+                    if current_status:
+                        await send_update(
+                            {
+                                "type": "status",
+                                "data": current_status.model_dump(mode="json"),
+                            }
+                        )
+
+            except WebSocketDisconnect:
+                break
+
+    except Exception as e:
+        logger.error("websocket_error", error=str(e), job_id=job_id)
+    finally:
+        if job_id in manager.callbacks:
+            manager.callbacks[job_id] = [
+                cb for cb in manager.callbacks[job_id] if cb != send_update
+            ]
+
+
 if __name__ == "__main__":
     import uvicorn
 
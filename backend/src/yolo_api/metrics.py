@@ -0,0 +1,286 @@
+"""In-process metrics shared by the inference components."""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+# Upper bounds in ms, from cache hits to requests stuck behind a slow model
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _Shard:
+    """Bucket counts and sum written by a single thread."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram:
+    """Fixed-bucket histogram of observations.
+
+    Counts are kept per bucket, so recording is O(log buckets) and memory
+    does not grow with traffic. Quantiles are estimated as the upper bound
+    of the bucket they fall in.
+
+    Every thread records into its own shard, so observing takes no lock and
+    threads never contend on the hot path; reads add the shards up. A read
+    racing with an observation may miss it, which is fine for monitoring.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        """Initialize histogram.
+
+        Args:
+            buckets: Increasing bucket upper bounds; larger values go to +Inf
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._shards: list[_Shard] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Only taken by a thread's first observation
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard.counts[bisect_left(self.buckets, value)] += 1
+        shard.sum += value
+
+    def totals(self) -> tuple[list[int], float]:
+        """Return the observations per bucket (+Inf last) and their sum."""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for shard in list(self._shards):
+            for index, count in enumerate(shard.counts):
+                counts[index] += count
+            total += shard.sum
+        return counts, total
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.totals()[0])
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Upper bound of the bucket holding the quantile (inf past the last
+            bucket), or None without observations
+        """
+        return self._quantile(self.totals()[0], q)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return cumulative bucket counts, total and quantile estimates."""
+        counts, total = self.totals()
+        cumulative: dict[str, int] = {}
+        seen = 0
+        for bound, count in zip(self.buckets, counts, strict=False):
+            seen += count
+            cumulative[f"{bound:g}"] = seen
+        cumulative["+Inf"] = sum(counts)
+        quantiles = {
+            f"p{q * 100:g}": self._quantile(counts, q) for q in (0.5, 0.95, 0.99)
+        }
+        return {
+            "buckets": cumulative,
+            "count": cumulative["+Inf"],
+            "sum": round(total, 2),
+            # JSON has no infinity
+            **{
+                name: "+Inf" if value == float("inf") else value
+                for name, value in quantiles.items()
+            },
+        }
+
+    def _quantile(self, counts: list[int], q: float) -> float | None:
+        """Estimate a quantile from bucket counts."""
+        observations = sum(counts)
+        if not observations:
+            return None
+        rank = q * observations
+        seen = 0
+        for bound, count in zip(self.buckets, counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def _new_shard(self) -> _Shard:
+        """Create the shard of the calling thread."""
+        shard = _Shard(len(self.buckets) + 1)
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS_MS,
+    ) -> None:
+        """Initialize histogram family.
+
+        Args:
+            name: Metric name, exported in seconds (observations are in ms)
+            documentation: Help text of the metric
+            labelnames: Names of the labels distinguishing the histograms
+            buckets: Bucket upper bounds in ms
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._children: dict[tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        """Histogram of the given label values, created on first use."""
+        histogram = self._children.get(values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._children.setdefault(values, Histogram(self.buckets))
+        return histogram
+
+    def children(self) -> dict[tuple[str, ...], Histogram]:
+        """Histograms by label values."""
+        return dict(self._children)
+
+
+@dataclass
+class Gauge:
+    """Values read when the metrics are scraped, by label values."""
+
+    name: str
+    documentation: str
+    labelnames: tuple[str, ...] = ()
+    samples: dict[tuple[str, ...], float] = field(default_factory=dict)
+
+
+REQUEST_LATENCY = HistogramFamily(
+    "yolo_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+STAGE_LATENCY = HistogramFamily(
+    "yolo_inference_stage_duration_seconds",
+    "Time spent per inference stage and model",
+    ("model_id", "stage"),
+)
+
+_stages = threading.local()
+
+
+@contextmanager
+def collect_stages() -> Iterator[dict[str, float]]:
+    """Collect the stage timings recorded by this thread in the block.
+
+    Collections nest: an inner block adds its timings to the outer one when
+    it ends.
+
+    Yields:
+        Stage name -> ms, filled in when the block ends
+    """
+    outer: dict[str, float] | None = getattr(_stages, "timings", None)
+    timings: dict[str, float] = {}
+    _stages.timings = timings
+    try:
+        yield timings
+    finally:
+        _stages.timings = outer
+        if outer is not None:
+            for stage, ms in timings.items():
+                outer[stage] = outer.get(stage, 0.0) + ms
+
+
+def record_stage(stage: str, ms: float) -> None:
+    """Add time spent in a stage to the current collection, if any."""
+    timings: dict[str, float] | None = getattr(_stages, "timings", None)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + ms
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Record the time spent in the block as a stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, (time.perf_counter() - start) * 1000)
+
+
+def observe_stages(model_id: str, timings: dict[str, float]) -> None:
+    """Record stage timings of a model in the stage latency histograms."""
+    for stage, ms in timings.items():
+        STAGE_LATENCY.labels(model_id, stage).observe(ms)
+
+
+def _label_value(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    """Format a label set, e.g. ``{model_id="a",le="0.1"}``."""
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_label_value(v)}"' for n, v in pairs) + "}"
+
+
+def render_prometheus(
+    families: list[tuple[HistogramFamily, dict[tuple[str, ...], Histogram]]],
+    gauges: list[Gauge],
+) -> str:
+    """Render metrics in the Prometheus text exposition format (0.0.4).
+
+    Args:
+        families: Histogram families with the histograms to export by label
+            values (usually ``family.children()``, possibly extended)
+        gauges: Gauges with their current values
+
+    Returns:
+        Exposition text; latencies are converted from ms to seconds
+    """
+    lines: list[str] = []
+    for family, children in families:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} histogram")
+        for values, histogram in sorted(children.items()):
+            counts, total = histogram.totals()
+            seen = 0
+            for bound, count in zip(histogram.buckets, counts, strict=False):
+                seen += count
+                labels = _labels(family.labelnames, values, le=f"{bound / 1000:g}")
+                lines.append(f"{family.name}_bucket{labels} {seen}")
+            seen += counts[-1]
+            labels = _labels(family.labelnames, values, le="+Inf")
+            lines.append(f"{family.name}_bucket{labels} {seen}")
+            labels = _labels(family.labelnames, values)
+            lines.append(f"{family.name}_sum{labels} {total / 1000:.6g}")
+            lines.append(f"{family.name}_count{labels} {seen}")
+    for gauge in gauges:
+        lines.append(f"# HELP {gauge.name} {gauge.documentation}")
+        lines.append(f"# TYPE {gauge.name} gauge")
+        for values, value in sorted(gauge.samples.items()):
+            labels = _labels(gauge.labelnames, values)
+            lines.append(f"{gauge.name}{labels} {value:g}")
+    return "\n".join(lines) + "\n"
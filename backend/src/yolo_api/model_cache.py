@@ -0,0 +1,289 @@
+"""Memory-budgeted LRU cache for loaded models."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+from .logging_config import logger
+
+
+def estimate_model_bytes(model: Any, model_path: Path | None = None) -> int:
+    """Estimate the resident memory of a loaded model.
+
+    Counts parameter and buffer bytes of the underlying torch module. Models
+    without one (e.g. exported formats) fall back to the weights file size.
+
+    Args:
+        model: Loaded model
+        model_path: Weights file the model was loaded from
+
+    Returns:
+        Estimated size in bytes
+    """
+    module = getattr(model, "model", None)
+    try:
+        tensors = [*module.parameters(), *module.buffers()]  # type: ignore[union-attr]
+        size = sum(t.numel() * t.element_size() for t in tensors)
+        if size > 0:
+            return int(size)
+    except (AttributeError, TypeError):
+        pass
+    if model_path is not None and model_path.exists():
+        return model_path.stat().st_size
+    return 0
+
+
+@dataclass
+class CacheEntry:
+    """A cached model with its bookkeeping."""
+
+    model: Any
+    size_bytes: int
+    load_time_ms: float = 0.0
+    loaded_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ModelCache(MutableMapping[str, Any]):
+    """LRU cache of loaded models bounded by a memory budget.
+
+    Behaves like a ``dict`` of ``model_id -> model``. Reading an entry marks it
+    as recently used. Inserting one evicts least recently used, unpinned
+    models until the total estimated size fits the budget. Models idle for
+    longer than the TTL are dropped by ``evict_idle``. Pinned models are never
+    evicted.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: int | None = None,
+        idle_ttl_s: float | None = None,
+        pinned: list[str] | None = None,
+    ) -> None:
+        """Initialize model cache.
+
+        Args:
+            memory_budget_mb: Memory budget in MB, 0 for unlimited
+            idle_ttl_s: Idle time before a model is unloaded, 0 to disable
+            pinned: Model IDs that are never evicted
+        """
+        budget_mb = (
+            memory_budget_mb
+            if memory_budget_mb is not None
+            else settings.model_cache_budget_mb
+        )
+        self.memory_budget_bytes = budget_mb * 1024 * 1024
+        self.idle_ttl_s = (
+            idle_ttl_s if idle_ttl_s is not None else settings.model_idle_ttl_s
+        )
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._pinned: set[str] = set(
+            pinned if pinned is not None else settings.pinned_models
+        )
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.load_time_ms_total = 0.0
+
+    # Mapping interface
+
+    def __getitem__(self, model_id: str) -> Any:
+        with self._lock:
+            entry = self._entries[model_id]
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(model_id)
+            return entry.model
+
+    def __setitem__(self, model_id: str, model: Any) -> None:
+        self.put(model_id, model)
+
+    def __delitem__(self, model_id: str) -> None:
+        with self._lock:
+            del self._entries[model_id]
+
+    def __contains__(self, model_id: object) -> bool:
+        # Membership checks must not count as use
+        return model_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Cache operations
+
+    def get(self, model_id: str, default: Any = None) -> Any:
+        """Look up a model, counting a hit or a miss.
+
+        Args:
+            model_id: Model identifier
+            default: Value returned on a miss
+
+        Returns:
+            The model, or default when not cached
+        """
+        with self._lock:
+            if model_id in self._entries:
+                self.hits += 1
+                return self[model_id]
+            self.misses += 1
+            return default
+
+    def peek(self, model_id: str) -> Any:
+        """Return a model without counting a lookup or refreshing its recency.
+
+        Args:
+            model_id: Model identifier
+
+        Returns:
+            The model, or None when not cached
+        """
+        entry = self._entries.get(model_id)
+        return entry.model if entry is not None else None
+
+    def put(
+        self,
+        model_id: str,
+        model: Any,
+        size_bytes: int | None = None,
+        load_time_ms: float = 0.0,
+    ) -> None:
+        """Insert a model, evicting others to stay within the budget.
+
+        Args:
+            model_id: Model identifier
+            model: Loaded model
+            size_bytes: Estimated memory size (estimated from model if None)
+            load_time_ms: Time spent loading the model
+        """
+        if size_bytes is None:
+            size_bytes = estimate_model_bytes(model)
+        with self._lock:
+            self._entries.pop(model_id, None)
+            self._make_room(size_bytes)
+            self._entries[model_id] = CacheEntry(
+                model=model, size_bytes=size_bytes, load_time_ms=load_time_ms
+            )
+            self.loads += 1
+            self.load_time_ms_total += load_time_ms
+            if self.memory_budget_bytes and self.total_bytes > self.memory_budget_bytes:
+                logger.warning(
+                    "model_cache_over_budget",
+                    model_id=model_id,
+                    total_mb=round(self.total_bytes / 1024 / 1024, 1),
+                    budget_mb=round(self.memory_budget_bytes / 1024 / 1024, 1),
+                )
+
+    def update_size(self, model_id: str, size_bytes: int) -> None:
+        """Change the estimated size of a cached model (e.g. after resizing).
+
+        Other models are evicted to stay within the budget.
+
+        Args:
+            model_id: Model identifier
+            size_bytes: New estimated memory size
+        """
+        with self._lock:
+            entry = self._entries.pop(model_id, None)
+            if entry is None:
+                return
+            self._make_room(size_bytes)
+            entry.size_bytes = size_bytes
+            self._entries[model_id] = entry
+
+    def pin(self, model_id: str) -> None:
+        """Exempt a model from eviction (it may be loaded later)."""
+        with self._lock:
+            self._pinned.add(model_id)
+
+    def unpin(self, model_id: str) -> None:
+        """Make a model evictable again."""
+        with self._lock:
+            self._pinned.discard(model_id)
+
+    def is_pinned(self, model_id: str) -> bool:
+        """Check whether a model is pinned."""
+        return model_id in self._pinned
+
+    @property
+    def total_bytes(self) -> int:
+        """Estimated memory of all cached models."""
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def evict_idle(self) -> list[str]:
+        """Unload unpinned models idle for longer than the TTL.
+
+        Returns:
+            IDs of evicted models
+        """
+        if not self.idle_ttl_s:
+            return []
+        cutoff = time.monotonic() - self.idle_ttl_s
+        with self._lock:
+            idle = [
+                model_id
+                for model_id, entry in self._entries.items()
+                if entry.last_used < cutoff and model_id not in self._pinned
+            ]
+            for model_id in idle:
+                self._evict(model_id, reason="idle")
+        return idle
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and per-model entries for sizing the budget."""
+        now = time.monotonic()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+                "memory_used_mb": round(self.total_bytes / 1024 / 1024, 1),
+                "idle_ttl_s": self.idle_ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "loads": self.loads,
+                "avg_load_time_ms": (
+                    round(self.load_time_ms_total / self.loads, 2) if self.loads else 0.0
+                ),
+                "pinned": sorted(self._pinned),
+                "models": [
+                    {
+                        "model_id": model_id,
+                        "size_mb": round(entry.size_bytes / 1024 / 1024, 2),
+                        "load_time_ms": round(entry.load_time_ms, 2),
+                        "idle_s": round(now - entry.last_used, 1),
+                        "pinned": model_id in self._pinned,
+                    }
+                    for model_id, entry in self._entries.items()
+                ],
+            }
+
+    def _make_room(self, size_bytes: int) -> None:
+        """Evict LRU unpinned models until size_bytes fits the budget."""
+        if not self.memory_budget_bytes:
+            return
+        for model_id in list(self._entries):
+            if self.total_bytes + size_bytes <= self.memory_budget_bytes:
+                break
+            if model_id not in self._pinned:
+                self._evict(model_id, reason="memory")
+
+    def _evict(self, model_id: str, reason: str) -> None:
+        """Drop a model from the cache."""
+        entry = self._entries.pop(model_id)
+        self.evictions += 1
+        logger.info(
+            "model_evicted",
+            model_id=model_id,
+            reason=reason,
+            size_mb=round(entry.size_bytes / 1024 / 1024, 2),
+        )
@@ -0,0 +1,310 @@
+"""Persistent index of the models available for inference."""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from .logging_config import logger
+from .models import ModelInfo
+from .quantization import INT8_WEIGHTS, QUANTIZATION_FILE, load_quantization_report
+
+SCHEMA_VERSION = 1
+UPLOADED_DIR = "uploaded_models"
+
+# Trained models (and their variants) are listed before uploaded ones
+_SCHEMA = """
+CREATE TABLE models (
+    model_id TEXT PRIMARY KEY,
+    base_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    section INTEGER NOT NULL,
+    sort_key REAL NOT NULL,
+    stamp TEXT NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE INDEX models_by_section ON models (section, sort_key DESC, model_id);
+CREATE INDEX models_by_kind ON models (kind, sort_key DESC);
+"""
+
+_LATEST_TRAINED = (
+    "SELECT base_id FROM models WHERE kind = 'trained' "
+    "ORDER BY sort_key DESC LIMIT 1"
+)
+
+Row = tuple[str, str, str, int, float, str, str]
+
+
+def _stamp(paths: list[Path]) -> str:
+    """Fingerprint files by modification time (missing files included)."""
+    parts = []
+    for path in paths:
+        try:
+            parts.append(str(path.stat().st_mtime_ns))
+        except OSError:
+            parts.append("-")
+    return ",".join(parts)
+
+
+class ModelRegistry:
+    """SQLite index of trained and uploaded models.
+
+    Listing models used to walk every job directory and parse its
+    ``data.yaml`` and ``training_config.json`` on each request. The registry
+    keeps the parsed metadata in a database next to the training directory,
+    so listing is a single indexed query.
+
+    Each entry stores the modification times of the files it was read from
+    and is only re-read when they change. The directories are only scanned
+    when jobs or uploads were added or removed (their modification time
+    changed); changes inside a job, such as training completing, are
+    indexed through ``update``.
+    """
+
+    def __init__(self, root: Path, db_path: Path | None = None) -> None:
+        """Initialize model registry.
+
+        Args:
+            root: Training directory holding jobs and uploaded models
+            db_path: Database file (next to the training directory if None)
+        """
+        self.root = root
+        self.db_path = db_path or root.with_name(f"{root.name}.models.sqlite3")
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._scanned_mtimes: tuple[int | None, ...] | None = None
+
+    def models(self, latest_only: bool = False) -> list[ModelInfo]:
+        """List indexed models, newest trained models first.
+
+        Args:
+            latest_only: Only include the most recent trained model (with
+                its INT8 variant) besides the uploaded models
+
+        Returns:
+            Model metadata in listing order
+        """
+        if not self.root.exists():
+            return []
+        query = "SELECT info FROM models"
+        if latest_only:
+            query += f" WHERE section = 1 OR base_id = ({_LATEST_TRAINED})"
+        query += " ORDER BY section, sort_key DESC, model_id"
+        with self._lock:
+            rows = self._connect().execute(query).fetchall()
+        return [ModelInfo.model_validate_json(info) for (info,) in rows]
+
+    def sync(self) -> None:
+        """Index jobs and uploads added or removed since the last scan."""
+        mtimes = self._dir_mtimes()
+        if mtimes == self._scanned_mtimes or mtimes[0] is None:
+            return
+        with self._lock:
+            conn = self._connect()
+            stamps = dict(
+                conn.execute("SELECT base_id, stamp FROM models WHERE kind != 'int8'")
+            )
+            seen: set[str] = set()
+            for model_dir in self._model_dirs():
+                seen.add(model_dir.name)
+                self._index(conn, model_dir, stamps.get(model_dir.name))
+            stale = {model_id for model_id in stamps if model_id not in seen}
+            conn.executemany(
+                "DELETE FROM models WHERE base_id = ?", [(m,) for m in stale]
+            )
+            conn.commit()
+        self._scanned_mtimes = mtimes
+        logger.info("model_registry_synced", models=len(seen), removed=len(stale))
+
+    def update(self, model_id: str) -> None:
+        """Re-index one model after its files were written or deleted.
+
+        Args:
+            model_id: Training job ID or uploaded model ID
+        """
+        if not self.root.exists():
+            return
+        uploaded_dir = self.root / UPLOADED_DIR / model_id
+        model_dir = uploaded_dir if uploaded_dir.is_dir() else self.root / model_id
+        with self._lock:
+            conn = self._connect()
+            self._index(conn, model_dir, stamp=None)
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _dir_mtimes(self) -> tuple[int | None, ...]:
+        """Modification times of the directories holding the models."""
+        mtimes: list[int | None] = []
+        for path in (self.root, self.root / UPLOADED_DIR):
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _model_dirs(self) -> list[Path]:
+        """Directories of trained jobs and uploaded models."""
+        dirs = [
+            path
+            for path in self.root.iterdir()
+            if path.is_dir() and path.name != UPLOADED_DIR
+        ]
+        uploaded_dir = self.root / UPLOADED_DIR
+        if uploaded_dir.is_dir():
+            dirs.extend(path for path in uploaded_dir.iterdir() if path.is_dir())
+        return dirs
+
+    def _index(
+        self, conn: sqlite3.Connection, model_dir: Path, stamp: str | None
+    ) -> None:
+        """Re-read a model directory unless its files are unchanged."""
+        uploaded = model_dir.parent == self.root / UPLOADED_DIR
+        read = self._read_uploaded if uploaded else self._read_trained
+        current = _stamp(self._sources(model_dir, uploaded))
+        if current == stamp:
+            return
+        conn.execute("DELETE FROM models WHERE base_id = ?", (model_dir.name,))
+        conn.executemany(
+            "INSERT INTO models VALUES (?, ?, ?, ?, ?, ?, ?)", read(model_dir, current)
+        )
+
+    @staticmethod
+    def _sources(model_dir: Path, uploaded: bool) -> list[Path]:
+        """Files an entry is read from."""
+        if uploaded:
+            return [
+                model_dir / "model.pt",
+                model_dir / "model.onnx",
+                model_dir / "metadata.json",
+            ]
+        weights_dir = model_dir / "training" / "weights"
+        return [
+            weights_dir / "best.pt",
+            model_dir / "dataset" / "data.yaml",
+            model_dir / "training_config.json",
+            weights_dir / INT8_WEIGHTS,
+            weights_dir / QUANTIZATION_FILE,
+        ]
+
+    @staticmethod
+    def _read_trained(model_dir: Path, stamp: str) -> list[Row]:
+        """Read a trained model and its INT8 variant."""
+        model_id = model_dir.name
+        weights_dir = model_dir / "training" / "weights"
+        model_path = weights_dir / "best.pt"
+        if not model_path.exists():
+            return []
+        mtime = model_path.stat().st_mtime
+
+        class_names: list[str] = []
+        data_yaml_path = model_dir / "dataset" / "data.yaml"
+        if data_yaml_path.exists():
+            try:
+                with open(data_yaml_path) as f:
+                    class_names = yaml.safe_load(f).get("names", [])
+            except Exception:
+                pass
+
+        # Project name, YOLO version and model size from the training config
+        config: dict[str, str] = {}
+        config_path = model_dir / "training_config.json"
+        if config_path.exists():
+            try:
+                config = json.loads(config_path.read_text())
+            except Exception:
+                pass
+
+        model_info = ModelInfo(
+            model_id=model_id,
+            name=config.get("name", f"Model {model_id}"),
+            yolo_version=config.get("yolo_version", "v8"),
+            model_size=config.get("model_size", "n"),
+            classes=class_names,
+            created_at=datetime.fromtimestamp(mtime),
+            metrics=None,
+        )
+        info = model_info.model_dump_json()
+        rows: list[Row] = [(model_id, model_id, "trained", 0, mtime, stamp, info)]
+        report = load_quantization_report(weights_dir)
+        if report is not None:
+            variant = model_info.model_copy(
+                update={
+                    "model_id": report.model_id,
+                    "name": f"{model_info.name} (INT8)",
+                    "created_at": report.created_at,
+                }
+            )
+            # Sorted right after its base model
+            info = variant.model_dump_json()
+            rows.append((report.model_id, model_id, "int8", 0, mtime, "", info))
+        return rows
+
+    @staticmethod
+    def _read_uploaded(model_dir: Path, stamp: str) -> list[Row]:
+        """Read an uploaded model."""
+        model_id = model_dir.name
+        pt_path = model_dir / "model.pt"
+        onnx_path = model_dir / "model.onnx"
+        model_path = pt_path if pt_path.exists() else onnx_path
+        if not model_path.exists():
+            return []
+        mtime = model_path.stat().st_mtime
+
+        model_name = f"Uploaded {model_id}"
+        metadata_path = model_dir / "metadata.json"
+        if metadata_path.exists():
+            try:
+                metadata = json.loads(metadata_path.read_text())
+                model_name = metadata.get("name", model_name)
+            except Exception:
+                pass
+
+        model_info = ModelInfo(
+            model_id=model_id,
+            name=f"📁 {model_name}",  # Prefix to indicate uploaded model
+            yolo_version="v8",
+            model_size="custom",
+            classes=[],  # Unknown classes for uploaded models
+            created_at=datetime.fromtimestamp(mtime),
+            metrics=None,
+        )
+        info = model_info.model_dump_json()
+        return [(model_id, model_id, "uploaded", 1, mtime, stamp, info)]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, rebuilding it when unreadable or outdated."""
+        if self._conn is None:
+            try:
+                self._conn = self._open()
+            except sqlite3.DatabaseError as e:
+                # Only an index of the training directory: safe to rebuild
+                logger.warning(
+                    "model_registry_rebuilt", path=str(self.db_path), error=str(e)
+                )
+                self.db_path.unlink(missing_ok=True)
+                self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Connect to the database, creating the schema if needed."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS models")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
@@ -1,9 +1,10 @@
 """Pydantic models for API requests and responses."""
 
+import json
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class ClassDefinition(BaseModel):
@@ -76,6 +77,51 @@ class TrainingMetrics(BaseModel):
     learning_rate: float
 
 
+# Weights formats a trained model can be served in
+ServingFormat = Literal["torch", "onnx", "torchscript"]
+
+
+class FormatBenchmark(BaseModel):
+    """Measured speed of one export format at one input configuration."""
+
+    format: ServingFormat
+    imgsz: int
+    batch_size: int
+    latency_ms: float | None = Field(None, description="Mean time per batch")
+    throughput_fps: float | None = Field(None, description="Images per second")
+    error: str | None = Field(None, description="Why the configuration failed")
+
+
+class ServingBenchmark(BaseModel):
+    """Benchmark of the export formats of a trained model on the serving host."""
+
+    created_at: datetime
+    imgsz: int = Field(..., description="Image size the model is served at")
+    cpu_count: int
+    formats: dict[str, str] = Field(..., description="Format -> weights file name")
+    results: list[FormatBenchmark]
+    fastest: str = Field(..., description="Format served by default")
+
+
+class QuantizationReport(BaseModel):
+    """Accuracy and speed of an INT8 model variant against its FP32 export."""
+
+    created_at: datetime
+    model_id: str = Field(..., description="Model ID that serves the INT8 variant")
+    weights: str = Field(..., description="Quantized weights file name")
+    imgsz: int
+    calibration_images: int = Field(..., description="Validation images calibrated on")
+    fp32_map50: float
+    int8_map50: float
+    fp32_map50_95: float
+    int8_map50_95: float
+    map50_95_delta: float = Field(..., description="INT8 minus FP32 mAP50-95")
+    fp32_latency_ms: float = Field(..., description="Mean time per image")
+    int8_latency_ms: float = Field(..., description="Mean time per image")
+    speedup: float = Field(..., description="FP32 latency / INT8 latency")
+    size_ratio: float = Field(..., description="INT8 / FP32 weights file size")
+
+
 class TrainingStatus(BaseModel):
     """Training job status."""
 
@@ -136,13 +182,101 @@ class Detection(BaseModel):
     bbox: BoundingBox = Field(..., description="Bounding box coordinates")
 
 
-class InferenceRequest(BaseModel):
-    """Request for inference."""
+class TilingParams(BaseModel):
+    """Sliced inference over overlapping tiles of a large image."""
+
+    tile_size: int = Field(640, ge=64, le=4096, description="Tile edge in source pixels")
+    overlap: float = Field(
+        0.2, ge=0, le=0.5, description="Fraction of a tile shared with its neighbor"
+    )
+    include_full_image: bool = Field(
+        False, description="Also run the whole frame to catch objects larger than a tile"
+    )
+
+
+class InferenceParams(BaseModel):
+    """Model selection and thresholds for an inference call."""
 
     model_id: str = Field(..., description="ID of trained model to use")
-    image: str = Field(..., description="Base64 encoded image")
     confidence: float = Field(0.25, ge=0.01, le=0.99, description="Confidence threshold")
     iou: float = Field(0.45, ge=0.1, le=0.9, description="IOU threshold for NMS")
+    tiling: TilingParams | None = Field(
+        None, description="Run the full-resolution image as overlapping tiles"
+    )
+    deadline_ms: float | None = Field(
+        None,
+        gt=0,
+        le=600000,
+        description="Time budget from request arrival in ms; work still queued "
+        "past it is dropped with 504 (or use the X-Deadline-Ms header)",
+    )
+
+    @field_validator("tiling", mode="before")
+    @classmethod
+    def parse_tiling(cls, value: Any) -> Any:
+        """Accept ``true`` or a JSON object from query and form fields."""
+        if not isinstance(value, str):
+            return value
+        if value.lower() in ("", "0", "false"):
+            return None
+        if value.lower() in ("1", "true"):
+            return {}
+        return json.loads(value)
+
+
+class InferenceRequest(InferenceParams):
+    """Request for inference."""
+
+    image: str | None = Field(None, description="Base64 encoded image")
+    image_id: str | None = Field(
+        None, description="ID of an image stored with POST /api/inference/images"
+    )
+
+    @model_validator(mode="after")
+    def check_image_source(self) -> "InferenceRequest":
+        """Require exactly one of image and image_id."""
+        if (self.image is None) == (self.image_id is None):
+            raise ValueError("Provide exactly one of 'image' and 'image_id'")
+        return self
+
+
+class ReplicasRequest(BaseModel):
+    """Request to change the replica count of a model."""
+
+    replicas: int = Field(..., ge=1, le=16, description="Copies of the model to keep")
+
+
+class ImageUploadRequest(BaseModel):
+    """Request to store an image for repeated inference."""
+
+    image: str = Field(..., description="Base64 encoded image")
+
+
+class StoredImageResponse(BaseModel):
+    """Image stored for repeated inference."""
+
+    image_id: str = Field(..., description="Reference for predict requests")
+    image_size: tuple[int, int] = Field(..., description="Image size (width, height)")
+    memory_bytes: int = Field(..., description="Memory held by the decoded pixels")
+    expires_at: datetime = Field(
+        ..., description="Expiry if unused; each use extends it by the TTL"
+    )
+
+
+class TilingStats(BaseModel):
+    """How a tiled inference call was run."""
+
+    tiles: int = Field(..., description="Number of tiles (plus the full frame)")
+    grid: tuple[int, int] = Field(..., description="Tile columns and rows")
+    tile_size: int
+    overlap: float
+    batch_times: list[float] = Field(
+        ..., description="Forward time of each tile batch in milliseconds"
+    )
+    per_tile_ms: float = Field(..., description="Mean forward time per tile")
+    detections_before_merge: int = Field(
+        ..., description="Detections of all tiles before cross-tile NMS"
+    )
 
 
 class InferenceResponse(BaseModel):
@@ -151,6 +285,66 @@ class InferenceResponse(BaseModel):
     detections: list[Detection] = Field(..., description="List of detected objects")
     inference_time: float = Field(..., description="Inference time in milliseconds")
     image_size: tuple[int, int] = Field(..., description="Original image size (width, height)")
+    batch_size: int = Field(1, ge=1, description="Number of images in the forward pass")
+    timings: dict[str, float] = Field(
+        default_factory=dict, description="Per-stage timings in milliseconds"
+    )
+    tiling: TilingStats | None = Field(None, description="Tiled inference details")
+    cache_hit: bool = Field(
+        False, description="Re-thresholded from cached pre-NMS outputs, no forward pass"
+    )
+
+
+class BatchPredictRequest(InferenceParams):
+    """JSON request to predict many images in one call."""
+
+    images: list[str] = Field(default_factory=list, description="Base64 encoded images")
+    image_ids: list[str] = Field(
+        default_factory=list,
+        description="IDs of images stored with POST /api/inference/images",
+    )
+
+
+class BatchPredictResult(BaseModel):
+    """Result of one image, streamed as one NDJSON line of a batch predict."""
+
+    index: int = Field(..., description="Position of the image in the request")
+    filename: str | None = Field(None, description="Name of the uploaded file")
+    image_id: str | None = Field(None, description="ID of the stored image")
+    result: InferenceResponse | None = Field(None, description="Detections")
+    error: str | None = Field(None, description="Error type if the image failed")
+    message: str | None = Field(None, description="Error message")
+
+
+class InferenceJobRequest(InferenceParams):
+    """Options of an offline inference job."""
+
+    source_dir: str | None = Field(
+        None,
+        description="Server directory of images, under YOLO_INFERENCE_JOB_SOURCE_ROOT "
+        "(instead of an uploaded archive)",
+    )
+    output_format: Literal["jsonl", "coco"] = Field(
+        "jsonl", description="One JSON line per image, or one COCO detection file"
+    )
+
+
+class InferenceJobStatus(BaseModel):
+    """Offline inference job status."""
+
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed", "stopped"]
+    model_id: str
+    output_format: Literal["jsonl", "coco"]
+    progress: float = Field(0.0, ge=0, le=100)
+    total_images: int = 0
+    processed_images: int = Field(0, description="Images done, including failed ones")
+    failed_images: int = Field(0, description="Images that could not be decoded")
+    detections: int = 0
+    images_per_second: float = Field(0.0, description="Throughput of the current run")
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    error: str | None = None
 
 
 class ModelInfo(BaseModel):
@@ -159,7 +353,9 @@ class ModelInfo(BaseModel):
     model_id: str = Field(..., description="Unique model identifier (job_id)")
     name: str = Field(..., description="Model name")
     yolo_version: Literal["v5", "v8", "v11"] = Field(..., description="YOLO version")
-    model_size: Literal["n", "s", "m", "l", "x"] = Field(..., description="Model size")
+    model_size: Literal["n", "s", "m", "l", "x", "custom"] = Field(
+        ..., description="Model size (custom for uploaded models)"
+    )
     classes: list[str] = Field(..., description="Class names the model can detect")
     created_at: datetime = Field(..., description="Model creation timestamp")
     metrics: TrainingMetrics | None = Field(None, description="Final training metrics")
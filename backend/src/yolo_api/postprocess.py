@@ -0,0 +1,364 @@
+"""Vectorized post-processing of model outputs."""
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from .models import Detection
+
+_DETECTION_LIST = TypeAdapter(list[Detection])
+
+# Offset separating boxes of different classes so one NMS pass is class-aware
+_MAX_WH = 7680.0
+# Candidates kept for NMS, highest confidence first
+_MAX_NMS_CANDIDATES = 30000
+
+
+@dataclass
+class DetectionArrays:
+    """Detections of one image as parallel NumPy arrays."""
+
+    xyxy: np.ndarray  # (N, 4) float32 box corners
+    conf: np.ndarray  # (N,) float32 confidence scores
+    cls: np.ndarray  # (N,) int64 class ids
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    @classmethod
+    def empty(cls) -> "DetectionArrays":
+        """Create an empty detection set."""
+        return cls(
+            xyxy=np.zeros((0, 4), dtype=np.float32),
+            conf=np.zeros(0, dtype=np.float32),
+            cls=np.zeros(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_boxes(cls, boxes: Any) -> "DetectionArrays":
+        """Convert ultralytics ``Boxes`` with a single device-to-host transfer.
+
+        ``Boxes.data`` holds ``[x1, y1, x2, y2, (track_id,) conf, cls]`` per
+        row, so one ``.cpu().numpy()`` call replaces the per-box indexing.
+
+        Args:
+            boxes: Ultralytics Boxes of one result (may be None)
+
+        Returns:
+            DetectionArrays for the result
+        """
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+        data = np.asarray(boxes.data.cpu().numpy(), dtype=np.float32)
+        return cls(
+            xyxy=data[:, :4],
+            conf=data[:, -2],
+            cls=data[:, -1].astype(np.int64),
+        )
+
+    def filter(self, min_confidence: float) -> "DetectionArrays":
+        """Keep detections above a confidence threshold.
+
+        Strict like ``Candidates.select`` and ultralytics, so filtering a
+        batch run at a lower threshold matches a request run on its own.
+
+        Args:
+            min_confidence: Confidence threshold
+
+        Returns:
+            Filtered DetectionArrays (self when nothing is dropped)
+        """
+        keep = self.conf > min_confidence
+        if keep.all():
+            return self
+        return DetectionArrays(self.xyxy[keep], self.conf[keep], self.cls[keep])
+
+    def scaled(self, sx: float, sy: float) -> "DetectionArrays":
+        """Scale box coordinates.
+
+        Args:
+            sx: Horizontal scale factor
+            sy: Vertical scale factor
+
+        Returns:
+            DetectionArrays with scaled boxes (self when scale is 1)
+        """
+        if sx == 1 and sy == 1:
+            return self
+        factors = np.array([sx, sy, sx, sy], dtype=np.float32)
+        return DetectionArrays(self.xyxy * factors, self.conf, self.cls)
+
+    def unletterboxed(
+        self, gain: float, pad: tuple[int, int], shape: tuple[int, int]
+    ) -> "DetectionArrays":
+        """Map boxes from a letterboxed model input back to the source image.
+
+        Args:
+            gain: Resize factor of the letterbox
+            pad: (left, top) padding of the letterbox
+            shape: Source image (height, width) to clip boxes to
+
+        Returns:
+            DetectionArrays in source image coordinates
+        """
+        offset = np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+        xyxy = (self.xyxy - offset) / gain
+        height, width = shape
+        np.clip(xyxy[:, 0::2], 0, width, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, height, out=xyxy[:, 1::2])
+        return DetectionArrays(xyxy.astype(np.float32), self.conf, self.cls)
+
+    def to_detections(self, class_names: list[str]) -> list[Detection]:
+        """Build response objects from the arrays.
+
+        The whole list is validated in one call by pydantic-core, which is
+        considerably cheaper than constructing each model from Python.
+
+        Args:
+            class_names: Class names of the model
+
+        Returns:
+            List of detections
+        """
+        num_names = len(class_names)
+        return _DETECTION_LIST.validate_python(
+            [
+                {
+                    "class_id": class_id,
+                    "class_name": (
+                        class_names[class_id]
+                        if 0 <= class_id < num_names
+                        else f"class_{class_id}"
+                    ),
+                    "confidence": confidence,
+                    "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+                }
+                for (x1, y1, x2, y2), confidence, class_id in zip(
+                    self.xyxy.tolist(), self.conf.tolist(), self.cls.tolist()
+                )
+            ]
+        )
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression.
+
+    Each iteration keeps the best remaining box and drops every box
+    overlapping it by more than the threshold in one vectorized step.
+
+    Args:
+        boxes: (N, 4) boxes as x1, y1, x2, y2
+        scores: (N,) scores
+        iou_threshold: Overlap above which a box is suppressed
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep: list[int] = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        width = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        height = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        intersection = width * height
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def class_aware_nms(
+    xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """Run NMS within each class in a single pass.
+
+    Boxes are offset by class so boxes of different classes never overlap.
+
+    Args:
+        xyxy: (N, 4) boxes as x1, y1, x2, y2
+        conf: (N,) scores
+        cls: (N,) class ids
+        iou_threshold: Overlap above which a box is suppressed
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    return nms(xyxy + (cls * _MAX_WH)[:, None], conf, iou_threshold)
+
+
+@dataclass
+class Candidates:
+    """Pre-NMS detections of one image, kept to re-threshold without a forward pass.
+
+    Holds every box scoring above a low floor, in model input coordinates,
+    along with the letterbox that maps them back to the image. ``select``
+    applies any confidence threshold at or above the floor and any IoU
+    threshold, giving the same result as decoding the raw output directly.
+    """
+
+    xyxy: np.ndarray  # (N, 4) float32 box corners in model input coordinates
+    conf: np.ndarray  # (N,) float32 best class score
+    cls: np.ndarray  # (N,) int64 best class id
+    gain: float  # Letterbox resize factor
+    pad: tuple[int, int]  # Letterbox (left, top) padding
+    shape: tuple[int, int]  # (height, width) of the image fed to the model
+    nms: bool = True  # False for NMS-free (end-to-end) heads
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays."""
+        return self.xyxy.nbytes + self.conf.nbytes + self.cls.nbytes
+
+    def select(
+        self, confidence: float, iou: float, max_det: int = 300
+    ) -> DetectionArrays:
+        """Apply thresholds and NMS, and map boxes back to the image.
+
+        Args:
+            confidence: Confidence threshold
+            iou: IOU threshold for class-aware NMS
+            max_det: Maximum detections to keep
+
+        Returns:
+            DetectionArrays in image coordinates
+        """
+        keep = self.conf > confidence
+        xyxy, conf, cls = self.xyxy[keep], self.conf[keep], self.cls[keep]
+        if self.nms and len(conf):
+            kept = class_aware_nms(xyxy, conf, cls, iou)[:max_det]
+            xyxy, conf, cls = xyxy[kept], conf[kept], cls[kept]
+        return DetectionArrays(xyxy, conf, cls).unletterboxed(
+            self.gain, self.pad, self.shape
+        )
+
+
+def yolo_candidates(
+    prediction: np.ndarray, floor: float, num_classes: int | None = None
+) -> DetectionArrays:
+    """Decode the boxes of a YOLOv8-style head scoring above a floor, before NMS.
+
+    Args:
+        prediction: (4 + num_classes, anchors) rows of center x, center y,
+            width, height followed by per-class scores
+        floor: Confidence threshold
+        num_classes: Number of class score rows (all rows after the box if
+            None); rows past them, such as mask coefficients, are ignored
+
+    Returns:
+        DetectionArrays in model input coordinates, unsorted
+    """
+    candidates = prediction.T
+    end = 4 + num_classes if num_classes else None
+    class_scores = candidates[:, 4:end]
+    cls = class_scores.argmax(axis=1)
+    conf = np.take_along_axis(class_scores, cls[:, None], axis=1)[:, 0]
+
+    keep = conf > floor
+    if not keep.any():
+        return DetectionArrays.empty()
+    boxes, conf, cls = candidates[keep, :4], conf[keep], cls[keep]
+    if len(conf) > _MAX_NMS_CANDIDATES:
+        top = conf.argsort()[::-1][:_MAX_NMS_CANDIDATES]
+        boxes, conf, cls = boxes[top], conf[top], cls[top]
+
+    half_wh = boxes[:, 2:] / 2
+    xyxy = np.concatenate([boxes[:, :2] - half_wh, boxes[:, :2] + half_wh], axis=1)
+    return DetectionArrays(
+        xyxy=xyxy.astype(np.float32),
+        conf=conf.astype(np.float32),
+        cls=cls.astype(np.int64),
+    )
+
+
+def decode_yolo_output(
+    prediction: np.ndarray,
+    confidence: float,
+    iou: float,
+    max_det: int = 300,
+    num_classes: int | None = None,
+) -> DetectionArrays:
+    """Decode the raw output of a YOLOv8-style detection head for one image.
+
+    Args:
+        prediction: (4 + num_classes, anchors) rows of center x, center y,
+            width, height followed by per-class scores
+        confidence: Confidence threshold
+        iou: IOU threshold for class-aware NMS
+        max_det: Maximum detections to keep
+        num_classes: Number of class score rows (all rows after the box if None)
+
+    Returns:
+        DetectionArrays in model input coordinates
+    """
+    candidates = yolo_candidates(prediction, confidence, num_classes)
+    if not len(candidates):
+        return candidates
+    kept = class_aware_nms(candidates.xyxy, candidates.conf, candidates.cls, iou)
+    kept = kept[:max_det]
+    return DetectionArrays(
+        candidates.xyxy[kept], candidates.conf[kept], candidates.cls[kept]
+    )
+
+
+def decode_end2end_output(
+    prediction: np.ndarray, confidence: float
+) -> DetectionArrays:
+    """Decode the output of an NMS-free head (x1, y1, x2, y2, score, class rows).
+
+    Args:
+        prediction: (max_det, 6) detections for one image
+        confidence: Confidence threshold
+
+    Returns:
+        DetectionArrays in model input coordinates
+    """
+    rows = prediction[prediction[:, 4] > confidence]
+    return DetectionArrays(
+        xyxy=rows[:, :4].astype(np.float32),
+        conf=rows[:, 4].astype(np.float32),
+        cls=rows[:, 5].astype(np.int64),
+    )
+
+
+def head_candidates(
+    prediction: np.ndarray,
+    floor: float,
+    gain: float,
+    pad: tuple[int, int],
+    shape: tuple[int, int],
+    end2end: bool = False,
+    num_classes: int | None = None,
+) -> Candidates:
+    """Decode the raw head output of one image into re-thresholdable candidates.
+
+    Args:
+        prediction: Raw output of the model for one image
+        floor: Lowest confidence threshold the candidates must support
+        gain: Letterbox resize factor
+        pad: Letterbox (left, top) padding
+        shape: (height, width) of the image fed to the model
+        end2end: Whether the head already applied NMS
+        num_classes: Number of class score rows (all rows after the box if None)
+
+    Returns:
+        Candidates of the image
+    """
+    prediction = prediction.astype(np.float32, copy=False)
+    boxes = (
+        decode_end2end_output(prediction, floor)
+        if end2end
+        else yolo_candidates(prediction, floor, num_classes)
+    )
+    return Candidates(
+        xyxy=boxes.xyxy,
+        conf=boxes.conf,
+        cls=boxes.cls,
+        gain=gain,
+        pad=pad,
+        shape=shape,
+        nms=not end2end,
+    )
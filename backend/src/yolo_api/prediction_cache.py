@@ -0,0 +1,125 @@
+"""LRU cache of pre-NMS model outputs for re-thresholding without a forward pass."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from .config import settings
+from .postprocess import Candidates
+
+# Candidates are kept down to the lowest confidence InferenceParams accepts,
+# so every valid threshold can be served from the cache
+CANDIDATE_FLOOR = 0.01
+
+# (model_id, input size, image digest)
+CacheKey = tuple[str, int, str]
+
+
+def image_digest(image_bytes: bytes) -> str:
+    """Content hash identifying an encoded image.
+
+    Args:
+        image_bytes: Encoded image file content
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """Bounded LRU of pre-NMS candidates per (model, input size, image).
+
+    Candidates are pruned to boxes above ``CANDIDATE_FLOOR`` when stored, so
+    an entry is usually a few kilobytes rather than the full head output.
+    """
+
+    def __init__(
+        self, max_entries: int | None = None, max_mb: int | None = None
+    ) -> None:
+        """Initialize prediction cache.
+
+        Args:
+            max_entries: Maximum cached images, 0 to disable caching
+            max_mb: Memory budget of the cached arrays in MB
+        """
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else settings.prediction_cache_entries
+        )
+        budget_mb = max_mb if max_mb is not None else settings.prediction_cache_mb
+        self.max_bytes = budget_mb * 1024 * 1024
+        self._entries: OrderedDict[CacheKey, Candidates] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether outputs are cached at all."""
+        return self.max_entries > 0
+
+    def get(self, key: CacheKey) -> Candidates | None:
+        """Look up candidates, counting a hit or a miss.
+
+        Args:
+            key: (model_id, input size, image digest)
+
+        Returns:
+            Cached candidates, or None on a miss
+        """
+        with self._lock:
+            candidates = self._entries.get(key)
+            if candidates is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return candidates
+
+    def put(self, key: CacheKey, candidates: Candidates) -> None:
+        """Store candidates, evicting least recently used entries to fit.
+
+        Args:
+            key: (model_id, input size, image digest)
+            candidates: Pre-NMS candidates of the image
+        """
+        if not self.enabled or candidates.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or self._bytes + candidates.nbytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+            self._entries[key] = candidates
+            self._bytes += candidates.nbytes
+
+    def drop_model(self, model_id: str) -> None:
+        """Forget all entries of a model (e.g. when its weights change)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_id]:
+                self._bytes -= self._entries.pop(key).nbytes
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit counters and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_used_mb": round(self._bytes / 1024 / 1024, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
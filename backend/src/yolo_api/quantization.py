@@ -0,0 +1,307 @@
+"""Static INT8 quantization of trained models for CPU serving."""
+
+import re
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .backends import OnnxRuntimeBackend, export_onnx
+from .config import settings
+from .export import benchmark_backend
+from .imaging import IMAGE_SUFFIXES, letterbox, to_input_tensor
+from .logging_config import logger
+from .models import QuantizationReport
+
+QUANTIZATION_FILE = "quantization.json"
+INT8_WEIGHTS = "best-int8.onnx"
+INT8_VARIANT = "int8"
+
+_MODULE_NAME = re.compile(r"^/model\.(\d+)/")
+
+
+class ValidationImageReader:
+    """Feeds letterboxed validation images to the ONNX Runtime calibrator.
+
+    Implements the ``CalibrationDataReader`` protocol (``get_next`` and
+    ``rewind``) so calibration sees the same preprocessing as serving.
+    """
+
+    def __init__(self, image_paths: list[Path], input_name: str, imgsz: int) -> None:
+        """Initialize reader.
+
+        Args:
+            image_paths: Calibration images
+            input_name: Name of the model input
+            imgsz: Square input size images are letterboxed to
+        """
+        self.image_paths = image_paths
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._iterator: Iterator[dict[str, np.ndarray]] = self._batches()
+
+    def _batches(self) -> Iterator[dict[str, np.ndarray]]:
+        for path in self.image_paths:
+            image = cv2.imread(str(path))
+            if image is None:
+                logger.warning("calibration_image_unreadable", path=str(path))
+                continue
+            tensor = to_input_tensor([letterbox(image, self.imgsz).image])
+            yield {self.input_name: tensor}
+
+    def get_next(self) -> dict[str, np.ndarray] | None:
+        """Return the next input feed, or None when exhausted."""
+        return next(self._iterator, None)
+
+    def rewind(self) -> None:
+        """Restart from the first image."""
+        self._iterator = self._batches()
+
+
+def calibration_images(dataset_dir: Path, limit: int) -> list[Path]:
+    """List validation images used to calibrate activation ranges.
+
+    Args:
+        dataset_dir: Extracted dataset of the training job
+        limit: Maximum number of images (evenly spaced over the split)
+
+    Returns:
+        Image paths from ``images/val``
+    """
+    val_dir = dataset_dir / "images" / "val"
+    if not val_dir.exists():
+        return []
+    images = sorted(
+        path
+        for path in val_dir.rglob("*")
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES
+    )
+    if limit and len(images) > limit:
+        step = len(images) / limit
+        images = [images[int(i * step)] for i in range(limit)]
+    return images
+
+
+def head_nodes_to_exclude(onnx_path: Path) -> list[str]:
+    """Find detection head nodes that must stay in floating point.
+
+    The box decoding at the end of the graph (DFL, anchor arithmetic, class
+    sigmoid and concatenation) mixes pixel coordinates with probabilities in
+    one tensor; a shared INT8 scale destroys both. Only the head's
+    convolutions are quantized.
+
+    Args:
+        onnx_path: Exported FP32 model
+
+    Returns:
+        Names of nodes to exclude from quantization
+    """
+    import onnx
+
+    graph = onnx.load(str(onnx_path), load_external_data=False).graph
+    modules = {
+        node.name: int(match.group(1))
+        for node in graph.node
+        if (match := _MODULE_NAME.match(node.name))
+    }
+    if not modules:
+        return []
+    head = max(modules.values())
+    return [
+        node.name
+        for node in graph.node
+        if modules.get(node.name) == head
+        and (node.op_type != "Conv" or "/dfl/" in node.name)
+    ]
+
+
+def quantize_onnx(
+    onnx_path: Path,
+    output_path: Path,
+    image_paths: list[Path],
+    imgsz: int,
+) -> Path:
+    """Quantize an FP32 ONNX model to INT8 with static calibration.
+
+    Weights are quantized per channel to signed INT8, activations to unsigned
+    INT8 with ranges calibrated on the given images, using QDQ nodes that
+    ONNX Runtime fuses into integer kernels.
+
+    Args:
+        onnx_path: Exported FP32 model
+        output_path: Where to write the quantized model
+        image_paths: Calibration images
+        imgsz: Input size to calibrate at
+
+    Returns:
+        Path of the quantized model
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if not image_paths:
+        raise ValueError("No calibration images found in dataset/images/val")
+
+    # Shape inference and graph cleanup make more operators quantizable
+    prepared_path = output_path.with_name(f"{output_path.stem}-prep.onnx")
+    try:
+        quant_pre_process(str(onnx_path), str(prepared_path), skip_symbolic_shape=True)
+        model_input = prepared_path
+    except Exception as e:
+        logger.warning("quantization_preprocess_failed", error=str(e))
+        model_input = onnx_path
+
+    try:
+        session = ort.InferenceSession(
+            str(model_input), providers=["CPUExecutionProvider"]
+        )
+        input_name = session.get_inputs()[0].name
+        del session
+
+        quantize_static(
+            str(model_input),
+            str(output_path),
+            ValidationImageReader(image_paths, input_name, imgsz),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            nodes_to_exclude=head_nodes_to_exclude(onnx_path),
+        )
+    finally:
+        prepared_path.unlink(missing_ok=True)
+    return output_path
+
+
+def evaluate_map(
+    weights_path: Path, data_yaml: Path, imgsz: int, output_dir: Path
+) -> tuple[float, float]:
+    """Run validation on the job's val split.
+
+    Args:
+        weights_path: Model weights (any format ultralytics can run)
+        data_yaml: Dataset configuration of the training job
+        imgsz: Validation image size
+        output_dir: Directory for the validation run outputs
+
+    Returns:
+        Tuple of (mAP50, mAP50-95)
+    """
+    from ultralytics import YOLO  # type: ignore[attr-defined]
+
+    metrics = YOLO(str(weights_path), task="detect").val(
+        data=str(data_yaml),
+        imgsz=imgsz,
+        batch=1,
+        device="cpu",
+        plots=False,
+        verbose=False,
+        project=str(output_dir),
+        name=weights_path.stem,
+        exist_ok=True,
+    )
+    return float(metrics.box.map50), float(metrics.box.map)
+
+
+def quantize_model(job_dir: Path, job_id: str, imgsz: int) -> QuantizationReport:
+    """Quantize a trained model and measure what INT8 costs and gains.
+
+    Exports ``best.onnx`` if needed, calibrates on the job's validation
+    images, re-runs mAP for the FP32 and INT8 models and times both on this
+    host. The report is written to ``quantization.json`` next to the weights;
+    the INT8 model is then served as model ID ``<job_id>:int8``.
+
+    Args:
+        job_dir: Training job directory
+        job_id: Training job ID
+        imgsz: Image size the model was trained at
+
+    Returns:
+        The quantization report
+    """
+    weights_dir = job_dir / "training" / "weights"
+    data_yaml = job_dir / "dataset" / "data.yaml"
+    onnx_path = weights_dir / "best.onnx"
+    if not onnx_path.exists():
+        onnx_path = export_onnx(weights_dir / "best.pt")
+
+    start_time = time.perf_counter()
+    images = calibration_images(
+        job_dir / "dataset", settings.quantization_calibration_images
+    )
+    int8_path = quantize_onnx(onnx_path, weights_dir / INT8_WEIGHTS, images, imgsz)
+    quantize_time_ms = (time.perf_counter() - start_time) * 1000
+
+    output_dir = job_dir / "quantization"
+    fp32_map50, fp32_map = evaluate_map(onnx_path, data_yaml, imgsz, output_dir)
+    int8_map50, int8_map = evaluate_map(int8_path, data_yaml, imgsz, output_dir)
+
+    latencies: dict[str, float] = {}
+    for name, path in (("fp32", onnx_path), ("int8", int8_path)):
+        backend = OnnxRuntimeBackend(path, imgsz=imgsz)
+        latencies[name], _ = benchmark_backend(
+            backend, 1, settings.export_benchmark_runs
+        )
+
+    report = QuantizationReport(
+        created_at=datetime.now(),
+        model_id=f"{job_id}:{INT8_VARIANT}",
+        weights=int8_path.name,
+        imgsz=imgsz,
+        calibration_images=len(images),
+        fp32_map50=round(fp32_map50, 4),
+        int8_map50=round(int8_map50, 4),
+        fp32_map50_95=round(fp32_map, 4),
+        int8_map50_95=round(int8_map, 4),
+        map50_95_delta=round(int8_map - fp32_map, 4),
+        fp32_latency_ms=round(latencies["fp32"], 2),
+        int8_latency_ms=round(latencies["int8"], 2),
+        speedup=round(latencies["fp32"] / latencies["int8"], 3),
+        size_ratio=round(int8_path.stat().st_size / onnx_path.stat().st_size, 3),
+    )
+    (weights_dir / QUANTIZATION_FILE).write_text(report.model_dump_json(indent=2))
+    logger.info(
+        "model_quantized",
+        job_id=job_id,
+        calibration_images=len(images),
+        map50_95_delta=report.map50_95_delta,
+        speedup=report.speedup,
+        quantize_time_ms=round(quantize_time_ms, 2),
+    )
+    return report
+
+
+def load_quantization_report(weights_dir: Path) -> QuantizationReport | None:
+    """Read the quantization report stored next to trained weights.
+
+    Args:
+        weights_dir: Directory containing best.pt
+
+    Returns:
+        The report, or None if missing, unreadable or the INT8 model is gone
+    """
+    path = weights_dir / QUANTIZATION_FILE
+    if not path.exists() or not (weights_dir / INT8_WEIGHTS).exists():
+        return None
+    try:
+        return QuantizationReport.model_validate_json(path.read_text())
+    except ValueError as e:
+        logger.warning("quantization_report_invalid", path=str(path), error=str(e))
+        return None
+
+
+def split_variant(model_id: str) -> tuple[str, str]:
+    """Split ``<model_id>:<variant>`` into the base model ID and variant.
+
+    Args:
+        model_id: Model ID, optionally with a variant suffix
+
+    Returns:
+        Tuple of (base model ID, variant or "")
+    """
+    base_id, _, variant = model_id.partition(":")
+    return base_id, variant
@@ -0,0 +1,165 @@
+"""Pools of interchangeable model replicas for concurrent forward passes."""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .backends import InferenceBackend
+from .postprocess import Candidates, DetectionArrays
+
+
+class ReplicaPool(InferenceBackend):
+    """Copies of one model, each used by at most one caller at a time.
+
+    Runtimes such as ultralytics keep per-call state in the model object, so
+    a single instance cannot safely run two forward passes at once. The pool
+    hands out an idle replica per call and blocks when all are busy; with
+    several replicas, batches of one hot model run in parallel on different
+    cores. Replicas can be added or removed while the pool is in use.
+    """
+
+    name = "replicas"
+
+    def __init__(
+        self,
+        factory: Callable[[], InferenceBackend],
+        replicas: int = 1,
+        primary: InferenceBackend | None = None,
+    ) -> None:
+        """Initialize replica pool.
+
+        Args:
+            factory: Loads one more replica of the model
+            replicas: Number of replicas to keep
+            primary: Already loaded replica (loaded with the factory if None)
+        """
+        self._factory = factory
+        self.primary = primary if primary is not None else factory()
+        self._replicas: list[InferenceBackend] = [self.primary]
+        self._idle: list[InferenceBackend] = [self.primary]
+        self._retired: set[int] = set()  # ids of replicas dropped on check-in
+        self._condition = threading.Condition()
+        self._resize_lock = threading.Lock()
+        self._replica_bytes = 0
+        self._waiting = 0
+        self.checkouts = 0
+        self.wait_ms_total = 0.0
+        self.resize(replicas)
+
+    @property
+    def size(self) -> int:
+        """Number of replicas."""
+        return len(self._replicas)
+
+    @contextmanager
+    def checkout(self) -> Iterator[InferenceBackend]:
+        """Borrow an idle replica, waiting for one if all are busy.
+
+        Yields:
+            Replica reserved for the caller until the block exits
+        """
+        start_time = time.perf_counter()
+        with self._condition:
+            self._waiting += 1
+            while not self._idle:
+                self._condition.wait()
+            self._waiting -= 1
+            replica = self._idle.pop()
+            self.checkouts += 1
+            self.wait_ms_total += (time.perf_counter() - start_time) * 1000
+        try:
+            yield replica
+        finally:
+            with self._condition:
+                if id(replica) in self._retired:
+                    self._retired.discard(id(replica))
+                else:
+                    self._idle.append(replica)
+                    self._condition.notify()
+
+    def resize(self, replicas: int) -> None:
+        """Load or drop replicas until the pool has the requested number.
+
+        New replicas are loaded outside the pool lock, so callers keep using
+        the existing ones meanwhile. Busy replicas that are dropped finish
+        their current call first.
+
+        Args:
+            replicas: Number of replicas to keep (at least 1)
+        """
+        replicas = max(1, replicas)
+        with self._resize_lock:
+            added = [self._factory() for _ in range(replicas - self.size)]
+            with self._condition:
+                for replica in added:
+                    self._replicas.append(replica)
+                    self._idle.append(replica)
+                    self._condition.notify()
+                while self.size > replicas:
+                    # The primary stays: it answers the model metadata
+                    replica = self._replicas.pop()
+                    if replica in self._idle:
+                        self._idle.remove(replica)
+                    else:
+                        self._retired.add(id(replica))
+
+    def stats(self) -> dict[str, Any]:
+        """Return replica usage for sizing the pool."""
+        with self._condition:
+            return {
+                "replicas": self.size,
+                "busy": self.size - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": (
+                    round(self.wait_ms_total / self.checkouts, 2)
+                    if self.checkouts
+                    else 0.0
+                ),
+            }
+
+    # InferenceBackend interface, served by whichever replica is idle
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        """Run one forward pass on an idle replica."""
+        with self.checkout() as replica:
+            return replica.predict(images, confidence, iou)
+
+    @property
+    def supports_candidates(self) -> bool:
+        """Whether the replicas expose pre-NMS candidates."""
+        return self.primary.supports_candidates
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        """Run one forward pass on an idle replica, keeping the candidates."""
+        with self.checkout() as replica:
+            return replica.forward_candidates(images, floor)
+
+    @property
+    def input_size(self) -> int | None:
+        """Input size of the model."""
+        return self.primary.input_size
+
+    @property
+    def class_names(self) -> list[str]:
+        """Class names of the model."""
+        return self.primary.class_names
+
+    def size_bytes(self, model_path: Path | None = None) -> int:
+        """Estimated memory of all replicas.
+
+        The size of one replica is measured on the first call (with the
+        weights path) and reused when the pool is resized.
+        """
+        if model_path is not None or not self._replica_bytes:
+            self._replica_bytes = self.primary.size_bytes(model_path)
+        return self._replica_bytes * self.size
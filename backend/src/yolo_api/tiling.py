@@ -0,0 +1,185 @@
+"""Sliced inference over overlapping tiles of large images."""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from .config import settings
+from .exceptions import DeadlineExceededError, ResourceLimitError
+from .models import TilingParams, TilingStats
+from .postprocess import DetectionArrays, class_aware_nms
+
+# (images, confidence, iou) -> detections per image
+TilePredictor = Callable[[list[np.ndarray], float, float], list[DetectionArrays]]
+
+
+@dataclass
+class TileGrid:
+    """Overlapping tiles of one image."""
+
+    tiles: list[np.ndarray]  # Views into the source image, row by row
+    offsets: np.ndarray  # (N, 2) float32 top-left corner (x, y) of each tile
+    grid: tuple[int, int]  # (columns, rows)
+
+
+def tile_origins(length: int, tile_size: int, step: int) -> list[int]:
+    """Start positions of tiles covering ``[0, length)`` along one axis.
+
+    The last tile is aligned to the end of the axis, so every tile has the
+    full size unless the image is smaller than a tile.
+
+    Args:
+        length: Image width or height
+        tile_size: Tile edge
+        step: Distance between tile starts
+
+    Returns:
+        Start positions in ascending order
+    """
+    if length <= tile_size:
+        return [0]
+    origins = list(range(0, length - tile_size, step))
+    origins.append(length - tile_size)
+    return origins
+
+
+def slice_image(image: np.ndarray, tile_size: int, overlap: float) -> TileGrid:
+    """Cut an image into overlapping tiles without copying pixels.
+
+    Args:
+        image: BGR image
+        tile_size: Tile edge in pixels
+        overlap: Fraction of a tile shared with its neighbor
+
+    Returns:
+        TileGrid with the tiles and their offsets
+    """
+    height, width = image.shape[:2]
+    step = _tile_step(tile_size, overlap)
+    xs = tile_origins(width, tile_size, step)
+    ys = tile_origins(height, tile_size, step)
+    return TileGrid(
+        tiles=[image[y : y + tile_size, x : x + tile_size] for y in ys for x in xs],
+        offsets=np.array([(x, y) for y in ys for x in xs], dtype=np.float32),
+        grid=(len(xs), len(ys)),
+    )
+
+
+def count_tiles(height: int, width: int, tiling: TilingParams) -> int:
+    """Number of images ``predict_tiled`` runs for an image of this size.
+
+    Args:
+        height: Image height
+        width: Image width
+        tiling: Tile size and overlap
+
+    Returns:
+        Tiles, plus the full image if requested
+    """
+    step = _tile_step(tiling.tile_size, tiling.overlap)
+    tiles = len(tile_origins(width, tiling.tile_size, step)) * len(
+        tile_origins(height, tiling.tile_size, step)
+    )
+    return tiles + 1 if tiling.include_full_image and tiles > 1 else tiles
+
+
+def _tile_step(tile_size: int, overlap: float) -> int:
+    """Distance between tile starts for a tile size and overlap."""
+    return max(1, round(tile_size * (1 - overlap)))
+
+
+def merge_tile_detections(
+    results: list[DetectionArrays],
+    offsets: np.ndarray,
+    iou: float,
+    max_det: int = 300,
+) -> DetectionArrays:
+    """Shift tile detections to image coordinates and merge duplicates.
+
+    Objects in the overlap of two tiles are detected twice; one class-aware
+    NMS pass over all tiles keeps the best box of each.
+
+    Args:
+        results: Detections of each tile in tile coordinates
+        offsets: (N, 2) top-left corner (x, y) of each tile
+        iou: IOU threshold for NMS
+        max_det: Maximum detections to keep
+
+    Returns:
+        Merged detections in image coordinates
+    """
+    counts = [len(result) for result in results]
+    if not sum(counts):
+        return DetectionArrays.empty()
+    shift = np.repeat(np.tile(offsets, 2), counts, axis=0)
+    xyxy = np.concatenate([result.xyxy for result in results]) + shift
+    conf = np.concatenate([result.conf for result in results])
+    cls = np.concatenate([result.cls for result in results])
+    kept = class_aware_nms(xyxy, conf, cls, iou)[:max_det]
+    return DetectionArrays(
+        xyxy=xyxy[kept].astype(np.float32), conf=conf[kept], cls=cls[kept]
+    )
+
+
+def predict_tiled(
+    predict: TilePredictor,
+    image: np.ndarray,
+    tiling: TilingParams,
+    confidence: float,
+    iou: float,
+    max_det: int = 300,
+    deadline: float | None = None,
+) -> tuple[DetectionArrays, TilingStats]:
+    """Run a full-resolution image through the model as batches of tiles.
+
+    Args:
+        predict: Runs one forward pass over a batch of images
+        image: Full-resolution BGR image
+        tiling: Tile size and overlap
+        confidence: Confidence threshold
+        iou: IOU threshold for per-tile and cross-tile NMS
+        max_det: Maximum detections to keep after merging
+        deadline: ``time.perf_counter()`` after which no more batches run
+
+    Returns:
+        Tuple of (detections in image coordinates, tiling stats)
+
+    Raises:
+        ResourceLimitError: If the image needs more tiles than allowed
+        DeadlineExceededError: If the deadline passed between tile batches
+    """
+    grid = slice_image(image, tiling.tile_size, tiling.overlap)
+    images, offsets = grid.tiles, grid.offsets
+    if tiling.include_full_image and len(images) > 1:
+        images = [*images, image]
+        offsets = np.concatenate([offsets, np.zeros((1, 2), dtype=np.float32)])
+    if len(images) > settings.tiling_max_tiles:
+        raise ResourceLimitError(
+            f"{len(images)} tiles exceed the limit of {settings.tiling_max_tiles}; "
+            "use a larger tile_size or less overlap"
+        )
+
+    results: list[DetectionArrays] = []
+    batch_times: list[float] = []
+    for start in range(0, len(images), settings.tiling_batch_size):
+        start_time = time.perf_counter()
+        if deadline is not None and start_time > deadline:
+            raise DeadlineExceededError("between tile batches")
+        results.extend(
+            predict(images[start : start + settings.tiling_batch_size], confidence, iou)
+        )
+        batch_times.append(round((time.perf_counter() - start_time) * 1000, 2))
+
+    detections = merge_tile_detections(results, offsets, iou, max_det)
+    stats = TilingStats(
+        tiles=len(images),
+        grid=grid.grid,
+        tile_size=tiling.tile_size,
+        overlap=tiling.overlap,
+        batch_times=batch_times,
+        per_tile_ms=round(sum(batch_times) / len(images), 2),
+        detections_before_merge=sum(len(result) for result in results),
+    )
+    return detections, stats
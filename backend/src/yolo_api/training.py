@@ -11,7 +11,6 @@ from pathlib import Path
 from typing import Any
 
 import yaml
-from ultralytics import YOLO  # type: ignore[attr-defined]
 
 from .config import settings
 from .models import TrainingConfig, TrainingMetrics, TrainingStatus
@@ -26,10 +25,12 @@ class TrainingManager:
         max_workers: int | None = None,
     ) -> None:
         self.work_dir = work_dir or settings.training_dir
-        self.work_dir.mkdir(parents=True, exist_ok=True)
         self.jobs: dict[str, TrainingStatus] = {}
         self.callbacks: dict[str, list[Callable[[dict[str, Any]], Awaitable[None]]]] = {}
         self._pending_messages: dict[str, list[dict[str, Any]]] = {}
+        # job_id -> "running" / "completed" / "failed" (error in quantization_errors)
+        self.quantizations: dict[str, str] = {}
+        self.quantization_errors: dict[str, str] = {}
         self.executor = ThreadPoolExecutor(
             max_workers=max_workers or settings.max_concurrent_trainings
         )
@@ -278,6 +279,9 @@ class TrainingManager:
         job_dir: Path,
     ) -> None:
         """Synchronous training function (runs in thread pool)."""
+        # Imports torch: only pay for it once a job actually trains
+        from ultralytics import YOLO  # type: ignore[attr-defined]
+
         try:
             # Extract dataset
             dataset_dir = self._extract_dataset(dataset_zip_b64, job_dir)
@@ -354,16 +358,104 @@ class TrainingManager:
                 verbose=True,
             )
 
+            # Prepare the fastest serving format before the job is reported
+            # completed: a model loaded earlier would miss benchmark.json and
+            # stay on the slower format until reloaded
+            if settings.export_after_training:
+                self._export_for_serving(job_id, job_dir, config.image_size)
+
             # Training completed
             self.jobs[job_id].status = "completed"
             self.jobs[job_id].progress = 100.0
             self.jobs[job_id].completed_at = datetime.now()
+            self._update_registry(job_id)
+
+            # Load and warm up the model in the background so the first
+            # prediction against the new model is fast
+            if settings.warmup_trained_models:
+                from .executor import inference_executor
+
+                inference_executor.executor.submit(self._warm_up_model, job_id)
 
         except Exception as e:
             self.jobs[job_id].status = "failed"
             self.jobs[job_id].error = str(e)
             raise
 
+    def _export_for_serving(self, job_id: str, job_dir: Path, imgsz: int) -> None:
+        """Export best.pt and benchmark the formats (failures are only logged)."""
+        from .export import export_and_benchmark
+        from .logging_config import logger
+
+        weights_path = job_dir / "training" / "weights" / "best.pt"
+        try:
+            export_and_benchmark(weights_path, imgsz)
+        except Exception as e:
+            logger.warning("serving_export_failed", job_id=job_id, error=str(e))
+
+    def _update_registry(self, job_id: str) -> None:
+        """Re-index a job's models for listing (failures are only logged)."""
+        from .inference import inference_manager
+        from .logging_config import logger
+
+        registry = inference_manager.registry
+        if registry.root != self.work_dir:
+            return
+        try:
+            registry.update(job_id)
+        except Exception as e:
+            logger.warning("model_registry_update_failed", job_id=job_id, error=str(e))
+
+    def _warm_up_model(self, job_id: str) -> None:
+        """Preload a freshly trained model for inference (runs in background)."""
+        from .logging_config import logger
+        from .workers import model_host
+
+        try:
+            model_host.preload(job_id)
+        except Exception as e:
+            logger.warning("trained_model_warmup_failed", job_id=job_id, error=str(e))
+
+    def start_quantization(self, job_id: str) -> bool:
+        """Quantize the model of a completed job to INT8 in the background.
+
+        Returns:
+            False if a quantization of the job is already running
+        """
+        if self.quantizations.get(job_id) == "running":
+            return False
+        self.quantizations[job_id] = "running"
+        self.quantization_errors.pop(job_id, None)
+        self.executor.submit(self._quantize_sync, job_id)
+        return True
+
+    def _quantize_sync(self, job_id: str) -> None:
+        """Run INT8 quantization of a job's model (in thread pool)."""
+        import json
+
+        from .logging_config import logger
+        from .quantization import INT8_VARIANT, quantize_model
+        from .workers import model_host
+
+        job_dir = self.work_dir / job_id
+        imgsz = settings.default_image_size
+        config_file = job_dir / "training_config.json"
+        if config_file.exists():
+            imgsz = json.loads(config_file.read_text()).get("image_size", imgsz)
+
+        try:
+            quantize_model(job_dir, job_id, imgsz)
+            # A variant loaded from an earlier run serves stale weights
+            model_host.unload_model(f"{job_id}:{INT8_VARIANT}")
+            self._update_registry(job_id)
+            self.quantizations[job_id] = "completed"
+        except Exception as e:
+            logger.error(
+                "model_quantization_failed", job_id=job_id, error=str(e), exc_info=True
+            )
+            self.quantizations[job_id] = "failed"
+            self.quantization_errors[job_id] = str(e)
+
     async def _process_pending_messages(self, job_id: str) -> None:
         """Process pending messages from training thread."""
         while True:
@@ -457,6 +549,9 @@ class TrainingManager:
             del self.jobs[job_id]
         if job_id in self.callbacks:
             del self.callbacks[job_id]
+        self.quantizations.pop(job_id, None)
+        self.quantization_errors.pop(job_id, None)
+        self._update_registry(job_id)
 
 
 # Global training manager instance
@@ -0,0 +1,489 @@
+"""Process-pool inference workers with shared-memory image transport."""
+
+import multiprocessing as mp
+import os
+import threading
+import zlib
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+from . import exceptions
+from .config import settings
+from .exceptions import InferenceError, YOLOAPIException
+from .inference import InferenceManager, inference_manager
+from .logging_config import logger
+from .metrics import collect_stages, observe_stages
+from .models import ModelInfo
+from .postprocess import DetectionArrays
+
+# (offset, shape) of each image packed into a shared memory buffer
+ImageLayout = list[tuple[int, tuple[int, ...]]]
+
+_POLL_INTERVAL_S = 0.5
+
+
+def pack_images(images: list[np.ndarray], buffer: memoryview) -> ImageLayout:
+    """Copy uint8 images back to back into a shared memory buffer.
+
+    Args:
+        images: Decoded BGR image arrays
+        buffer: Destination buffer, at least ``packed_size(images)`` bytes
+
+    Returns:
+        Offset and shape of each image
+    """
+    layout: ImageLayout = []
+    offset = 0
+    for image in images:
+        target = np.ndarray(image.shape, dtype=np.uint8, buffer=buffer, offset=offset)
+        target[...] = image
+        layout.append((offset, image.shape))
+        offset += image.nbytes
+    return layout
+
+
+def unpack_images(buffer: memoryview, layout: ImageLayout) -> list[np.ndarray]:
+    """View the images packed by ``pack_images`` without copying them.
+
+    Args:
+        buffer: Shared memory buffer
+        layout: Offset and shape of each image
+
+    Returns:
+        Arrays backed by the buffer
+    """
+    return [
+        np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=offset)
+        for offset, shape in layout
+    ]
+
+
+def packed_size(images: list[np.ndarray]) -> int:
+    """Bytes needed to pack a batch of images."""
+    return sum(image.nbytes for image in images)
+
+
+def _shm_buffer(shm: SharedMemory) -> memoryview:
+    """Mapped buffer of an open shared memory block."""
+    buffer = shm.buf
+    assert buffer is not None, f"Shared memory {shm.name} is closed"
+    return buffer
+
+
+def _rebuild_error(name: str, message: str, status_code: int) -> YOLOAPIException:
+    """Recreate an API exception raised inside a worker process.
+
+    Custom exceptions take their own constructor arguments, so they are sent
+    as (class name, message, status code) and rebuilt without calling
+    ``__init__`` of the subclass.
+    """
+    cls = getattr(exceptions, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, YOLOAPIException)):
+        return InferenceError(message)
+    error = cls.__new__(cls)
+    YOLOAPIException.__init__(error, message, status_code)
+    return error
+
+
+def _worker_main(conn: Connection, worker_index: int, num_threads: int) -> None:
+    """Entry point of a worker process.
+
+    Serves commands from the API process until the pipe closes. Each worker
+    holds its own InferenceManager, so models are loaded once per worker.
+    """
+    try:
+        import torch
+
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    manager = InferenceManager()
+    attached: SharedMemory | None = None
+
+    def predict(
+        model_id: str,
+        shm_name: str,
+        layout: ImageLayout,
+        confidence: float,
+        iou: float,
+        cache_keys: list[str | None] | None,
+    ) -> tuple[list[tuple[np.ndarray, np.ndarray, np.ndarray]], dict[str, float]]:
+        nonlocal attached
+        if attached is None or attached.name != shm_name:
+            # The API process replaced the buffer with a larger one
+            if attached is not None:
+                try:
+                    attached.close()
+                except BufferError:
+                    pass  # Still referenced; unmapped once garbage collected
+            attached = SharedMemory(name=shm_name)
+        if model_id not in manager.models:
+            manager.load_model(model_id)
+        images = unpack_images(_shm_buffer(attached), layout)
+        try:
+            # Stage timings are reported to the API process with the results
+            with collect_stages() as stages:
+                results = manager.predict_batch(
+                    model_id, images, confidence, iou, cache_keys
+                )
+        finally:
+            # Release buffer views before the buffer can be closed
+            del images
+        return [(r.xyxy, r.conf, r.cls) for r in results], stages
+
+    def cached(
+        model_id: str, cache_key: str, confidence: float, iou: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, tuple[int, int]] | None:
+        result = manager.predict_cached(model_id, cache_key, confidence, iou)
+        if result is None:
+            return None
+        detections, shape = result
+        return detections.xyxy, detections.conf, detections.cls, shape
+
+    def stats() -> dict[str, Any]:
+        return {
+            **manager.models.stats(),
+            "prediction_cache": manager.prediction_cache.stats(),
+        }
+
+    def load(model_id: str) -> tuple[ModelInfo, int]:
+        manager.load_model(model_id)
+        return manager.model_info[model_id], manager.model_input_size(model_id)
+
+    handlers: dict[str, Any] = {
+        "predict": predict,
+        "cached": cached,
+        "load": load,
+        "preload": manager.preload,
+        "unload": manager.unload_model,
+        "pin": manager.models.pin,
+        "unpin": manager.models.unpin,
+        "stats": stats,
+    }
+
+    logger.info("inference_worker_started", worker=worker_index, pid=os.getpid())
+    while True:
+        try:
+            if not conn.poll(_POLL_INTERVAL_S * 10):
+                manager.models.evict_idle()
+                continue
+            command, args = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            break
+        try:
+            reply: tuple[Any, ...] = ("ok", handlers[command](*args))
+        except YOLOAPIException as e:
+            reply = ("error", type(e).__name__, e.message, e.status_code)
+        except Exception as e:
+            reply = ("error", "InferenceError", str(e), 500)
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            break
+
+    if attached is not None:
+        attached.close()
+
+
+@dataclass
+class _Worker:
+    """API-side handle of a worker process."""
+
+    index: int
+    process: BaseProcess | None = None
+    conn: Connection | None = None
+    shm: SharedMemory | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    requests: int = 0
+    restarts: int = 0
+
+
+class ProcessWorkerPool:
+    """Runs models in separate worker processes to sidestep the GIL.
+
+    Every model is routed to one worker by a stable hash of its ID, so it is
+    loaded in exactly one process and keeps its affinity across requests.
+    Decoded images are copied into a per-worker ``SharedMemory`` buffer and
+    only their layout is pickled; detections come back through the pipe.
+    A worker that dies is restarted and the request it was serving fails
+    with ``InferenceError``; the API process and the other workers keep
+    running.
+
+    The pool mirrors the model-hosting interface of ``InferenceManager``
+    (``load_model``, ``predict_batch``, ``model_info``, ...), so either can
+    serve as the model host of the API.
+    """
+
+    def __init__(self, num_workers: int | None = None) -> None:
+        """Initialize worker pool.
+
+        Args:
+            num_workers: Number of worker processes (default: settings.process_workers)
+        """
+        self.num_workers = num_workers or settings.process_workers
+        self.model_info: dict[str, ModelInfo] = {}  # model_id -> model metadata
+        self._input_sizes: dict[str, int] = {}
+        self._workers = [_Worker(index=i) for i in range(self.num_workers)]
+        self._context = mp.get_context("spawn")
+        # Split the cores between workers instead of oversubscribing them
+        self._threads_per_worker = max(1, (os.cpu_count() or 1) // self.num_workers)
+
+    def start(self) -> None:
+        """Start all worker processes that are not running."""
+        for worker in self._workers:
+            with worker.lock:
+                if not self._is_alive(worker):
+                    self._spawn(worker)
+
+    def close(self) -> None:
+        """Stop all worker processes and release their buffers."""
+        for worker in self._workers:
+            with worker.lock:
+                self._stop(worker)
+                if worker.shm is not None:
+                    worker.shm.close()
+                    worker.shm.unlink()
+                    worker.shm = None
+
+    def worker_for(self, model_id: str) -> int:
+        """Index of the worker hosting a model."""
+        return zlib.crc32(model_id.encode()) % self.num_workers
+
+    # Model host interface
+
+    def is_loaded(self, model_id: str) -> bool:
+        """Check whether a model has been loaded by its worker."""
+        return model_id in self.model_info
+
+    def load_model(self, model_id: str) -> None:
+        """Load a model in its worker process.
+
+        Args:
+            model_id: Model identifier
+
+        Raises:
+            ModelNotFoundError: If model directory doesn't exist
+            ModelFileNotFoundError: If model file not found
+            InferenceError: If the worker crashed
+        """
+        info, input_size = self._call(model_id, "load", model_id)
+        self.model_info[model_id] = info
+        self._input_sizes[model_id] = input_size
+
+    def preload(self, model_id: str) -> None:
+        """Load a model in its worker process and warm it up."""
+        self.load_model(model_id)
+        self._call(model_id, "preload", model_id)
+
+    def unload_model(self, model_id: str) -> None:
+        """Unload a model from its worker process."""
+        self.model_info.pop(model_id, None)
+        self._input_sizes.pop(model_id, None)
+        self._call(model_id, "unload", model_id)
+
+    def pin(self, model_id: str) -> None:
+        """Exempt a model from eviction in its worker."""
+        self._call(model_id, "pin", model_id)
+
+    def unpin(self, model_id: str) -> None:
+        """Make a model evictable again in its worker."""
+        self._call(model_id, "unpin", model_id)
+
+    def replica_count(self, model_id: str) -> int:
+        """Batches of a model run one at a time through its worker's pipe."""
+        return 1
+
+    def decode_target_size(self, model_id: str) -> int | None:
+        """Target size for reduced JPEG decoding of images for a model."""
+        if not settings.reduced_jpeg_decode:
+            return None
+        return self._input_sizes.get(model_id, settings.default_image_size)
+
+    def predict_batch(
+        self,
+        model_id: str,
+        images: list[np.ndarray],
+        confidence: float = 0.25,
+        iou: float = 0.45,
+        cache_keys: list[str | None] | None = None,
+    ) -> list[DetectionArrays]:
+        """Run one forward pass over a batch of images in the model's worker.
+
+        Args:
+            model_id: Model identifier
+            images: Decoded BGR image arrays
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+            cache_keys: Image digests whose pre-NMS outputs the worker caches
+
+        Returns:
+            Detection arrays for each image, in input order
+
+        Raises:
+            ModelNotFoundError: If model not found
+            InferenceError: If inference fails or the worker crashed
+        """
+        images = [np.ascontiguousarray(image, dtype=np.uint8) for image in images]
+        worker = self._workers[self.worker_for(model_id)]
+        with worker.lock:
+            buffer = self._buffer(worker, packed_size(images))
+            layout = pack_images(images, _shm_buffer(buffer))
+            results, stages = self._request(
+                worker,
+                "predict",
+                (model_id, buffer.name, layout, confidence, iou, cache_keys),
+            )
+        observe_stages(model_id, stages)
+        return [DetectionArrays(xyxy, conf, cls) for xyxy, conf, cls in results]
+
+    def predict_cached(
+        self, model_id: str, cache_key: str, confidence: float, iou: float
+    ) -> tuple[DetectionArrays, tuple[int, int]] | None:
+        """Re-threshold the pre-NMS outputs cached in the model's worker.
+
+        Args:
+            model_id: Model identifier
+            cache_key: Digest of the encoded image
+            confidence: Confidence threshold
+            iou: IOU threshold for NMS
+
+        Returns:
+            Tuple of (detections, (height, width) of the image the model saw),
+            or None if the image is not cached for this model
+        """
+        result = self._call(model_id, "cached", model_id, cache_key, confidence, iou)
+        if result is None:
+            return None
+        xyxy, conf, cls, shape = result
+        return DetectionArrays(xyxy, conf, cls), shape
+
+    def stats(self) -> dict[str, Any]:
+        """Return per-worker process state and model cache statistics."""
+        workers = []
+        for worker in self._workers:
+            entry: dict[str, Any] = {
+                "worker": worker.index,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": self._is_alive(worker),
+                "requests": worker.requests,
+                "restarts": worker.restarts,
+            }
+            if entry["alive"]:
+                try:
+                    with worker.lock:
+                        entry["cache"] = self._request(worker, "stats", ())
+                except InferenceError:
+                    entry["alive"] = False
+            workers.append(entry)
+        return {"num_workers": self.num_workers, "workers": workers}
+
+    # Internals
+
+    def _call(self, model_id: str, command: str, *args: Any) -> Any:
+        """Send a command to the worker hosting a model."""
+        worker = self._workers[self.worker_for(model_id)]
+        with worker.lock:
+            return self._request(worker, command, args)
+
+    def _request(self, worker: _Worker, command: str, args: tuple[Any, ...]) -> Any:
+        """Send a command and wait for its reply (caller holds worker.lock)."""
+        if not self._is_alive(worker):
+            if worker.process is not None:
+                # Died while idle
+                logger.warning(
+                    "inference_worker_restarting",
+                    worker=worker.index,
+                    exitcode=worker.process.exitcode,
+                )
+                self._stop(worker)
+                worker.restarts += 1
+            self._spawn(worker)
+        assert worker.conn is not None and worker.process is not None
+        worker.requests += 1
+
+        try:
+            worker.conn.send((command, args))
+            # Poll so a worker dying mid-request is noticed instead of
+            # blocking on a pipe that will never answer
+            while not worker.conn.poll(_POLL_INTERVAL_S):
+                if not worker.process.is_alive():
+                    raise EOFError("worker process exited")
+            reply = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            exitcode = worker.process.exitcode
+            logger.error(
+                "inference_worker_crashed",
+                worker=worker.index,
+                command=command,
+                exitcode=exitcode,
+                error=str(e),
+            )
+            self._stop(worker)
+            worker.restarts += 1
+            self._spawn(worker)
+            raise InferenceError(
+                f"Inference worker {worker.index} crashed (exit code {exitcode})"
+            ) from e
+
+        if reply[0] == "error":
+            _, name, message, status_code = reply
+            raise _rebuild_error(name, message, status_code)
+        return reply[1]
+
+    def _buffer(self, worker: _Worker, size: int) -> SharedMemory:
+        """Get the shared memory buffer of a worker, growing it when too small."""
+        if worker.shm is None or worker.shm.size < size:
+            if worker.shm is not None:
+                worker.shm.close()
+                worker.shm.unlink()
+            # Leave headroom so slightly larger batches reuse the buffer
+            worker.shm = SharedMemory(create=True, size=max(1, int(size * 1.5)))
+        return worker.shm
+
+    def _spawn(self, worker: _Worker) -> None:
+        """Start the process of a worker."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, worker.index, self._threads_per_worker),
+            name=f"yolo-inference-worker-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = parent_conn
+        logger.info("inference_worker_spawned", worker=worker.index, pid=process.pid)
+
+    def _stop(self, worker: _Worker) -> None:
+        """Terminate the process of a worker."""
+        if worker.conn is not None:
+            worker.conn.close()
+            worker.conn = None
+        if worker.process is not None:
+            # Closing the pipe ends the worker loop; terminate if it hangs
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(timeout=2)
+            worker.process = None
+
+    @staticmethod
+    def _is_alive(worker: _Worker) -> bool:
+        """Check whether the process of a worker is running."""
+        return worker.process is not None and worker.process.is_alive()
+
+
+# Global worker pool instance (workers start on first use)
+worker_pool = ProcessWorkerPool()
+
+# Where models are loaded and run for the configured inference mode
+model_host: InferenceManager | ProcessWorkerPool = (
+    worker_pool if settings.inference_mode == "process" else inference_manager
+)
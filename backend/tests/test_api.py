@@ -31,6 +31,30 @@ class TestAPIEndpoints:
         data = response.json()
         assert data["status"] == "healthy"
 
+    @pytest.mark.asyncio
+    async def test_ready_endpoint(self, async_client: AsyncClient) -> None:
+        """Test readiness endpoint when no models are warming up."""
+        response = await async_client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    @pytest.mark.asyncio
+    async def test_ready_endpoint_warming_up(self, async_client: AsyncClient) -> None:
+        """Test readiness endpoint reports 503 while models are preloading."""
+        from yolo_api.main import app
+
+        app.state.warming_up = {"model_b", "model_a"}
+        try:
+            response = await async_client.get("/ready")
+        finally:
+            app.state.warming_up = set()
+
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "warming_up"
+        assert data["pending_models"] == ["model_a", "model_b"]
+
     @pytest.mark.asyncio
     async def test_list_training_jobs_empty(self, async_client: AsyncClient) -> None:
         """Test listing training jobs when empty."""
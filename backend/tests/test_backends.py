@@ -0,0 +1,208 @@
+"""Tests for model execution backends."""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from yolo_api.backends import (
+    OnnxRuntimeBackend,
+    UltralyticsBackend,
+    as_backend,
+    load_backend,
+    select_weights,
+)
+from yolo_api.exceptions import UnsupportedModelTaskError
+
+
+def make_onnx_model(
+    path: Path, size: int = 64, extra_rows: int = 0, task: str | None = None
+) -> None:
+    """Write an ONNX model emitting a fixed YOLOv8-style prediction.
+
+    The graph ignores pixel values and returns two anchors for two classes:
+    a 20x20 box of class 1 centered in the input and a low-score box.
+    ``extra_rows`` rows of large values follow the class scores, like the
+    mask coefficients of a segmentation head.
+    """
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    prediction = np.array(
+        [
+            [[size / 2, 5], [size / 2, 5], [20, 4], [20, 4], [0.1, 0.01], [0.9, 0.02]]
+        ],
+        dtype=np.float32,
+    )
+    extra = np.full((1, extra_rows, 2), 50.0, dtype=np.float32)
+    prediction = np.concatenate([prediction, extra], axis=1)
+    nodes = [
+        # Zero-valued (N, 1, 1) tensor derived from the input keeps the batch axis
+        helper.make_node("ReduceMean", ["images", "axes"], ["mean"], keepdims=1),
+        helper.make_node("Reshape", ["mean", "shape"], ["mean3d"]),
+        helper.make_node("Mul", ["mean3d", "zero"], ["zeros"]),
+        helper.make_node("Add", ["zeros", "prediction"], ["output0"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "fixed_yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, size, size])],
+        [
+            helper.make_tensor_value_info(
+                "output0", TensorProto.FLOAT, ["batch", 6 + extra_rows, 2]
+            )
+        ],
+        initializer=[
+            numpy_helper.from_array(np.array([1, 2, 3], dtype=np.int64), "axes"),
+            numpy_helper.from_array(np.array([-1, 1, 1], dtype=np.int64), "shape"),
+            numpy_helper.from_array(np.zeros(1, dtype=np.float32), "zero"),
+            numpy_helper.from_array(prediction, "prediction"),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 18)])
+    model.ir_version = 8
+    metadata = {"names": "{0: 'person', 1: 'car'}", "stride": "32"}
+    if task is not None:
+        metadata["task"] = task
+    helper.set_model_props(model, metadata)
+    onnx.save(model, str(path))
+
+
+class TestUltralyticsBackend:
+    """Test UltralyticsBackend class."""
+
+    def test_as_backend_wraps_bare_models(self) -> None:
+        """Test bare models are wrapped and backends pass through."""
+        model = Mock()
+        backend = as_backend(model)
+
+        assert isinstance(backend, UltralyticsBackend)
+        assert backend.model is model
+        assert as_backend(backend) is backend
+
+    def test_metadata(self) -> None:
+        """Test input size and class names are read from the model."""
+        model = Mock()
+        model.overrides = {"imgsz": [320, 256]}
+        model.names = {1: "car", 0: "person"}
+        backend = UltralyticsBackend(model)
+
+        assert backend.input_size == 320
+        assert backend.class_names == ["person", "car"]
+
+    @pytest.mark.parametrize("config", ["yolov8n.yaml", "yolov8n-seg.yaml"])
+    def test_candidates_only_for_detection(self, config: str) -> None:
+        """Test segmentation heads are not decoded as detection heads."""
+        from ultralytics import YOLO  # type: ignore[attr-defined]
+
+        backend = UltralyticsBackend(YOLO(config), imgsz=64)
+        image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        if config == "yolov8n.yaml":
+            assert backend.supports_candidates
+            assert len(backend.forward_candidates([image], 0.001)) == 1
+        else:
+            assert not backend.supports_candidates
+            with pytest.raises(UnsupportedModelTaskError):
+                backend.forward_candidates([image], 0.001)
+
+
+class TestOnnxRuntimeBackend:
+    """Test OnnxRuntimeBackend class."""
+
+    @pytest.fixture
+    def onnx_path(self, tmp_path: Path) -> Path:
+        """Create a fixed-output ONNX model."""
+        pytest.importorskip("onnxruntime")
+        path = tmp_path / "model.onnx"
+        make_onnx_model(path)
+        return path
+
+    def test_metadata(self, onnx_path: Path) -> None:
+        """Test input size and class names come from the graph and metadata."""
+        backend = OnnxRuntimeBackend(onnx_path, intra_op_threads=1)
+
+        assert backend.input_size == 64
+        assert backend.class_names == ["person", "car"]
+
+    def test_predict_maps_to_source_coordinates(self, onnx_path: Path) -> None:
+        """Test detections are decoded and mapped back through the letterbox."""
+        backend = OnnxRuntimeBackend(onnx_path, intra_op_threads=1)
+        wide = np.zeros((32, 64, 3), dtype=np.uint8)  # Padded 16px top and bottom
+        large = np.zeros((128, 128, 3), dtype=np.uint8)  # Scaled by 0.5
+
+        results = backend.predict([wide, large], confidence=0.25, iou=0.45)
+
+        assert [len(r) for r in results] == [1, 1]
+        assert results[0].cls.tolist() == [1]
+        assert results[0].conf.tolist() == pytest.approx([0.9])
+        np.testing.assert_allclose(results[0].xyxy[0], [22, 6, 42, 26])
+        np.testing.assert_allclose(results[1].xyxy[0], [44, 44, 84, 84])
+
+    def test_load_backend_uses_onnxruntime(self, onnx_path: Path) -> None:
+        """Test .onnx weights load on ONNX Runtime by default."""
+        assert isinstance(load_backend(onnx_path), OnnxRuntimeBackend)
+
+    def test_rows_after_class_scores_ignored(self, tmp_path: Path) -> None:
+        """Test only as many score rows as class names are decoded."""
+        pytest.importorskip("onnxruntime")
+        path = tmp_path / "model.onnx"
+        make_onnx_model(path, extra_rows=3, task="detect")
+        backend = OnnxRuntimeBackend(path, intra_op_threads=1)
+        image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        (result,) = backend.predict([image], confidence=0.25, iou=0.45)
+
+        assert result.cls.tolist() == [1]
+        assert result.conf.tolist() == pytest.approx([0.9])
+
+    def test_other_tasks_fall_back_to_ultralytics(self, tmp_path: Path) -> None:
+        """Test segmentation exports are not decoded as detection heads."""
+        pytest.importorskip("onnxruntime")
+        path = tmp_path / "model.onnx"
+        make_onnx_model(path, extra_rows=32, task="segment")
+
+        with pytest.raises(UnsupportedModelTaskError):
+            OnnxRuntimeBackend(path, intra_op_threads=1)
+        with patch.object(UltralyticsBackend, "load") as load:
+            backend = load_backend(path)
+
+        load.assert_called_once_with(path)
+        assert backend is load.return_value
+
+
+class TestSelectWeights:
+    """Test select_weights function."""
+
+    def test_prefers_exported_onnx(self, tmp_path: Path) -> None:
+        """Test an exported .onnx next to the weights is served in auto mode."""
+        pt_path = tmp_path / "best.pt"
+        pt_path.touch()
+        (tmp_path / "best.onnx").touch()
+
+        with patch("yolo_api.backends.onnxruntime_available", return_value=True):
+            assert select_weights(pt_path) == tmp_path / "best.onnx"
+
+    def test_torch_backend_keeps_weights(self, tmp_path: Path) -> None:
+        """Test the torch backend always serves the PyTorch weights."""
+        pt_path = tmp_path / "best.pt"
+        (tmp_path / "best.onnx").touch()
+
+        with patch("yolo_api.backends.settings") as mock_settings:
+            mock_settings.inference_backend = "torch"
+            assert select_weights(pt_path) == pt_path
+
+    def test_onnxruntime_backend_exports(self, tmp_path: Path) -> None:
+        """Test the onnxruntime backend exports weights without an .onnx."""
+        pt_path = tmp_path / "best.pt"
+
+        with (
+            patch("yolo_api.backends.settings") as mock_settings,
+            patch("yolo_api.backends.export_onnx") as mock_export,
+        ):
+            mock_settings.inference_backend = "onnxruntime"
+            mock_export.return_value = tmp_path / "best.onnx"
+            assert select_weights(pt_path) == tmp_path / "best.onnx"
+
+        mock_export.assert_called_once_with(pt_path)
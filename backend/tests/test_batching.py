@@ -0,0 +1,405 @@
+"""Tests for inference micro-batching."""
+
+import asyncio
+import base64
+import time
+from io import BytesIO
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from yolo_api.batching import BatchScheduler
+from yolo_api.exceptions import (
+    ClientDisconnectedError,
+    DeadlineExceededError,
+    ServiceOverloadedError,
+)
+from yolo_api.models import ModelInfo
+from yolo_api.postprocess import DetectionArrays
+
+
+def make_detections() -> DetectionArrays:
+    """Create two detections with confidence 0.3 and 0.9."""
+    return DetectionArrays(
+        xyxy=np.array([[0, 0, 10, 10], [5, 5, 20, 20]], dtype=np.float32),
+        conf=np.array([0.3, 0.9], dtype=np.float32),
+        cls=np.array([0, 1]),
+    )
+
+
+class RecordingRunner:
+    """Batch runner that records every call it receives."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls: list[tuple[str, int, float, float]] = []
+        self.delay = delay
+
+    def __call__(
+        self,
+        model_id: str,
+        images: list[np.ndarray],
+        confidence: float,
+        iou: float,
+    ) -> list[DetectionArrays]:
+        self.calls.append((model_id, len(images), confidence, iou))
+        time.sleep(self.delay)
+        return [make_detections() for _ in images]
+
+
+@pytest.fixture
+def image() -> np.ndarray:
+    """Create a blank BGR image."""
+    return np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+class TestBatchScheduler:
+    """Test BatchScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_batch(self, image: np.ndarray) -> None:
+        """Test requests arriving within the window run as one batch."""
+        runner = RecordingRunner()
+        scheduler = BatchScheduler(runner, max_batch_size=8, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            *(scheduler.submit("model", image) for _ in range(4))
+        )
+
+        assert runner.calls == [("model", 4, 0.25, 0.45)]
+        assert all(r.batch_size == 4 for r in results)
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_batch_size_limit(self, image: np.ndarray) -> None:
+        """Test batches never exceed the maximum batch size."""
+        runner = RecordingRunner()
+        scheduler = BatchScheduler(runner, max_batch_size=2, max_wait_ms=50)
+
+        await asyncio.gather(*(scheduler.submit("model", image) for _ in range(5)))
+
+        assert [size for _, size, _, _ in runner.calls] == [2, 2, 1]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_models_batched_separately(self, image: np.ndarray) -> None:
+        """Test requests for different models never share a batch."""
+        runner = RecordingRunner()
+        scheduler = BatchScheduler(runner, max_batch_size=8, max_wait_ms=20)
+
+        await asyncio.gather(
+            scheduler.submit("a", image),
+            scheduler.submit("b", image),
+            scheduler.submit("a", image),
+        )
+
+        assert sorted((m, n) for m, n, _, _ in runner.calls) == [("a", 2), ("b", 1)]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_confidence_filtered_per_request(self, image: np.ndarray) -> None:
+        """Test the batch runs at the lowest confidence and filters per request."""
+        runner = RecordingRunner()
+        scheduler = BatchScheduler(runner, max_batch_size=8, max_wait_ms=50)
+
+        low, high = await asyncio.gather(
+            scheduler.submit("model", image, confidence=0.2),
+            scheduler.submit("model", image, confidence=0.5),
+        )
+
+        assert runner.calls == [("model", 2, 0.2, 0.45)]
+        assert len(low.detections) == 2
+        assert high.detections.conf.tolist() == pytest.approx([0.9])
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_different_iou_separate_passes(self, image: np.ndarray) -> None:
+        """Test requests with a different IoU run separate forward passes."""
+        runner = RecordingRunner()
+        scheduler = BatchScheduler(runner, max_batch_size=8, max_wait_ms=50)
+
+        await asyncio.gather(
+            scheduler.submit("model", image, iou=0.45),
+            scheduler.submit("model", image, iou=0.7),
+        )
+
+        assert sorted(iou for _, _, _, iou in runner.calls) == [0.45, 0.7]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_runner_error_propagates(self, image: np.ndarray) -> None:
+        """Test a failing batch fails every request in it."""
+
+        def failing_runner(*args: object) -> list[DetectionArrays]:
+            raise RuntimeError("forward failed")
+
+        scheduler = BatchScheduler(failing_runner, max_batch_size=8, max_wait_ms=20)
+
+        results = await asyncio.gather(
+            scheduler.submit("model", image),
+            scheduler.submit("model", image),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await scheduler.close()
+
+    def test_effective_batch_size_respects_latency_budget(self) -> None:
+        """Test slow models get smaller batches to stay within the budget."""
+        scheduler = BatchScheduler(
+            RecordingRunner(),
+            max_batch_size=16,
+            max_wait_ms=10,
+            latency_budget_ms=210,
+        )
+
+        assert scheduler.effective_batch_size("model") == 16
+
+        scheduler._record_cost("model", 50.0)
+        assert scheduler.effective_batch_size("model") == 4
+
+        scheduler._record_cost("slow", 1000.0)
+        assert scheduler.effective_batch_size("slow") == 1
+
+
+class TestAdmissionControl:
+    """Test bounded model queues."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self, image: np.ndarray) -> None:
+        """Test requests beyond the queue depth fail fast."""
+        runner = RecordingRunner(delay=0.05)
+        scheduler = BatchScheduler(
+            runner, max_batch_size=1, max_wait_ms=0, max_queue_depth=2
+        )
+
+        results = await asyncio.gather(
+            *(scheduler.submit("model", image) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[2], ServiceOverloadedError)
+        assert results[2].status_code == 503
+        assert results[2].retry_after >= 1
+        assert len(runner.calls) == 2
+        stats = scheduler.stats()["model"]
+        assert stats["rejected"]["queue_full"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["queue_wait_ms"]["count"] == 2
+        await scheduler.close()
+
+    def test_rejects_when_expected_wait_too_long(self) -> None:
+        """Test the measured forward cost bounds the admitted backlog."""
+        scheduler = BatchScheduler(
+            RecordingRunner(), max_batch_size=2, max_wait_ms=10, max_queue_ms=2500
+        )
+        scheduler._record_cost("model", 1000.0)
+        scheduler._depth["model"] = 2
+
+        assert scheduler.estimated_wait_ms("model", 3) == 2010
+        scheduler._admit("model")
+
+        scheduler._depth["model"] = 4
+        with pytest.raises(ServiceOverloadedError) as exc_info:
+            scheduler._admit("model")
+        assert exc_info.value.retry_after == 4
+        assert scheduler.stats() == {}  # No queue was ever used
+
+    @pytest.mark.asyncio
+    async def test_sheds_requests_that_waited_too_long(
+        self, image: np.ndarray
+    ) -> None:
+        """Test requests past the max queue time are failed, not run."""
+        runner = RecordingRunner(delay=0.2)
+        scheduler = BatchScheduler(
+            runner, max_batch_size=1, max_wait_ms=0, max_queue_ms=50
+        )
+
+        results = await asyncio.gather(
+            scheduler.submit("model", image),
+            scheduler.submit("model", image),
+            return_exceptions=True,
+        )
+
+        assert not isinstance(results[0], Exception)
+        assert isinstance(results[1], ServiceOverloadedError)
+        assert len(runner.calls) == 1
+        assert scheduler.stats()["model"]["rejected"]["expired"] == 1
+        await scheduler.close()
+
+    def test_reserve_counts_images(self) -> None:
+        """Test work run outside the queue is admitted and counted per image."""
+        scheduler = BatchScheduler(RecordingRunner(), max_queue_depth=4)
+
+        with scheduler.reserve("model", 4):
+            assert scheduler.queue_depths() == {"model": 4}
+            with pytest.raises(ServiceOverloadedError):
+                with scheduler.reserve("model", 1):
+                    pass
+
+        assert scheduler.queue_depths() == {"model": 0}
+
+    @pytest.mark.asyncio
+    async def test_unlimited(self, image: np.ndarray) -> None:
+        """Test zero limits admit every request."""
+        runner = RecordingRunner(delay=0.01)
+        scheduler = BatchScheduler(
+            runner, max_batch_size=1, max_wait_ms=0, max_queue_depth=0, max_queue_ms=0
+        )
+
+        results = await asyncio.gather(
+            *(scheduler.submit("model", image) for _ in range(5))
+        )
+
+        assert len(results) == 5
+        await scheduler.close()
+
+
+class TestAdmissionAPI:
+    """Test overload responses of the inference endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_overload_returns_503_with_retry_after(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Test rejected requests get 503 and a Retry-After header."""
+        from yolo_api.inference import inference_manager
+
+        inference_manager.models["busy_model"] = Mock()
+        inference_manager.model_info["busy_model"] = ModelInfo(
+            model_id="busy_model",
+            name="Busy Model",
+            yolo_version="v8",
+            model_size="n",
+            classes=["person"],
+            created_at="2024-01-01T00:00:00",  # type: ignore
+        )
+        overloaded = ServiceOverloadedError("busy_model", "queue full", 3)
+        buffer = BytesIO()
+        Image.new("RGB", (64, 64)).save(buffer, format="PNG")
+        try:
+            with patch(
+                "yolo_api.main.batch_scheduler.submit",
+                AsyncMock(side_effect=overloaded),
+            ):
+                response = await async_client.post(
+                    "/api/inference/predict",
+                    json={
+                        "model_id": "busy_model",
+                        "image": base64.b64encode(buffer.getvalue()).decode(),
+                    },
+                )
+        finally:
+            inference_manager.unload_model("busy_model")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert response.json()["error"] == "ServiceOverloadedError"
+
+
+class TestDeadlinesAndCancellation:
+    """Test dropping work nobody waits for."""
+
+    @pytest.mark.asyncio
+    async def test_deadline_passes_while_queued(self, image: np.ndarray) -> None:
+        """Test a request past its deadline fails fast and never runs."""
+        runner = RecordingRunner(delay=0.2)
+        scheduler = BatchScheduler(runner, max_batch_size=1, max_wait_ms=0)
+        start = time.perf_counter()
+
+        results = await asyncio.gather(
+            scheduler.submit("model", image),
+            scheduler.submit("model", image, deadline=start + 0.05),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], DeadlineExceededError)
+        assert results[1].status_code == 504
+        await asyncio.sleep(0.3)
+        assert len(runner.calls) == 1
+        compute = scheduler.stats()["model"]["compute"]
+        assert compute["saved_deadline"] == 1
+        assert compute["wasted_deadline"] == 0
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_queued(self, image: np.ndarray) -> None:
+        """Test a cancelled caller's image is dropped from the queue."""
+        runner = RecordingRunner(delay=0.2)
+        scheduler = BatchScheduler(runner, max_batch_size=1, max_wait_ms=0)
+
+        first = asyncio.create_task(scheduler.submit("model", image))
+        second = asyncio.create_task(scheduler.submit("model", image))
+        await asyncio.sleep(0.05)
+        second.cancel()
+        await first
+        await asyncio.sleep(0.05)  # The consumer drops it on its next collect
+
+        assert len(runner.calls) == 1
+        compute = scheduler.stats()["model"]["compute"]
+        assert compute["saved_cancelled"] == 1
+        assert scheduler.stats()["model"]["queue_depth"] == 0
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_during_forward_is_wasted(
+        self, image: np.ndarray
+    ) -> None:
+        """Test a result finished after its caller left counts as wasted."""
+        runner = RecordingRunner(delay=0.1)
+        scheduler = BatchScheduler(runner, max_batch_size=1, max_wait_ms=0)
+
+        task = asyncio.create_task(scheduler.submit("model", image))
+        await asyncio.sleep(0.03)
+        task.cancel()
+        await asyncio.sleep(0.15)
+
+        compute = scheduler.stats()["model"]["compute"]
+        assert compute["wasted_cancelled"] == 1
+        assert compute["wasted_forward_ms"] >= 100
+        await scheduler.close()
+
+
+class TestRequestDeadlineAPI:
+    """Test deadlines and disconnects at the endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_disconnect(self) -> None:
+        """Test work is cancelled when the client goes away."""
+        from yolo_api.main import _cancel_on_disconnect
+
+        async def receive() -> dict[str, str]:
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        request = Mock(receive=receive)
+        work = asyncio.Event()
+
+        with pytest.raises(ClientDisconnectedError):
+            await _cancel_on_disconnect(request, work.wait())
+        assert await _cancel_on_disconnect(request, asyncio.sleep(0, "done")) == (
+            "done"
+        )
+
+    @pytest.mark.asyncio
+    async def test_invalid_deadline_header(self, async_client: AsyncClient) -> None:
+        """Test the deadline header must be a positive number."""
+        response = await async_client.post(
+            "/api/inference/predict",
+            json={"model_id": "m", "image_id": "x"},
+            headers={"X-Deadline-Ms": "soon"},
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_deadline_field_validated(self, async_client: AsyncClient) -> None:
+        """Test deadline_ms must be positive."""
+        response = await async_client.post(
+            "/api/inference/predict",
+            json={"model_id": "m", "image_id": "x", "deadline_ms": 0},
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,75 @@
+"""Tests for the inference executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from yolo_api.executor import InferenceExecutor
+
+
+class TestInferenceExecutor:
+    """Test InferenceExecutor class."""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self) -> None:
+        """Test run awaits the function result in a worker thread."""
+        executor = InferenceExecutor(max_workers=2)
+
+        result = await executor.run(
+            lambda a, b: (a + b, threading.current_thread().name), 1, b=2
+        )
+
+        assert result[0] == 3
+        assert result[1].startswith("yolo-inference")
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_propagates_exceptions(self) -> None:
+        """Test exceptions raised in the worker reach the caller."""
+        executor = InferenceExecutor(max_workers=1)
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(fail)
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self) -> None:
+        """Test blocking work does not stall other coroutines."""
+        executor = InferenceExecutor(max_workers=1)
+
+        blocking = asyncio.create_task(executor.run(time.sleep, 0.3))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.1
+        await blocking
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_stats_bounded_pool(self) -> None:
+        """Test extra work queues up behind the bounded pool."""
+        executor = InferenceExecutor(max_workers=1)
+        started = threading.Event()
+
+        def work() -> None:
+            started.set()
+            time.sleep(0.1)
+
+        tasks = [asyncio.create_task(executor.run(work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+
+        stats = executor.stats()
+        assert stats["max_workers"] == 1
+        assert stats["running"] == 1
+        assert stats["queued"] == 2
+
+        await asyncio.gather(*tasks)
+        assert executor.stats()["queued"] == 0
+        executor.shutdown()
@@ -0,0 +1,144 @@
+"""Tests for post-training export and serving benchmark."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from yolo_api.backends import InferenceBackend, select_weights
+from yolo_api.export import (
+    BENCHMARK_FILE,
+    export_and_benchmark,
+    fastest_format,
+    load_benchmark,
+)
+from yolo_api.models import FormatBenchmark
+from yolo_api.postprocess import Candidates, DetectionArrays, head_candidates
+
+
+class FakeBackend(InferenceBackend):
+    """Backend returning no detections."""
+
+    name = "fake"
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        return [DetectionArrays.empty() for _ in images]
+
+    @property
+    def supports_candidates(self) -> bool:
+        return True
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        empty = np.zeros((6, 0), dtype=np.float32)
+        return [
+            head_candidates(empty, floor, 1.0, (0, 0), image.shape[:2])
+            for image in images
+        ]
+
+
+def result(fmt: str, batch_size: int, latency_ms: float | None) -> FormatBenchmark:
+    """Create a benchmark result at imgsz 640."""
+    return FormatBenchmark(
+        format=fmt,  # type: ignore[arg-type]
+        imgsz=640,
+        batch_size=batch_size,
+        latency_ms=latency_ms,
+        error=None if latency_ms is not None else "failed",
+    )
+
+
+class TestFastestFormat:
+    """Test fastest_format function."""
+
+    def test_lowest_per_image_latency_wins(self) -> None:
+        """Test the format with the lowest mean per-image latency is picked."""
+        results = [
+            result("torch", 1, 100.0),
+            result("torch", 4, 360.0),
+            result("onnx", 1, 80.0),
+            result("onnx", 4, 340.0),
+        ]
+
+        assert fastest_format(results, 640) == "onnx"
+
+    def test_partially_failed_format_ignored(self) -> None:
+        """Test a format failing at any batch size is never picked."""
+        results = [
+            result("torch", 1, 100.0),
+            result("onnx", 1, 10.0),
+            result("onnx", 4, None),
+        ]
+
+        assert fastest_format(results, 640) == "torch"
+
+    def test_other_sizes_ignored(self) -> None:
+        """Test only results at the serving size count."""
+        results = [result("torch", 1, 100.0)]
+
+        assert fastest_format(results, 320) == "torch"
+
+
+class TestExportAndBenchmark:
+    """Test export_and_benchmark function."""
+
+    def test_writes_table_and_selects_fastest(self, tmp_path: Path) -> None:
+        """Test the table is stored next to the weights and used for loading."""
+        weights = tmp_path / "best.pt"
+        weights.touch()
+        onnx_path = tmp_path / "best.onnx"
+        onnx_path.touch()
+        latencies = {"torch": 0.02, "onnx": 0.01}
+
+        def fake_benchmark(
+            backend: InferenceBackend, batch_size: int, runs: int
+        ) -> tuple[float, float]:
+            latency_ms = latencies[backend.fmt] * 1000 * batch_size  # type: ignore[attr-defined]
+            return latency_ms, batch_size * 1000 / latency_ms
+
+        def fake_load(fmt: str, path: Path, imgsz: int | None = None) -> FakeBackend:
+            backend = FakeBackend()
+            backend.fmt = fmt  # type: ignore[attr-defined]
+            return backend
+
+        with (
+            patch(
+                "yolo_api.export.export_formats",
+                return_value={"torch": weights, "onnx": onnx_path},
+            ),
+            patch("yolo_api.export.load_format", side_effect=fake_load),
+            patch("yolo_api.export.benchmark_backend", side_effect=fake_benchmark),
+            patch("yolo_api.backends.onnxruntime_available", return_value=True),
+        ):
+            benchmark = export_and_benchmark(weights, imgsz=640)
+            selected = select_weights(weights)
+
+        assert benchmark.fastest == "onnx"
+        assert benchmark.formats == {"torch": "best.pt", "onnx": "best.onnx"}
+        assert len(benchmark.results) == 4  # 2 formats x default batch sizes [1, 4]
+        assert (tmp_path / BENCHMARK_FILE).exists()
+        assert load_benchmark(tmp_path) == benchmark
+        assert selected == onnx_path
+
+    def test_failed_load_recorded(self, tmp_path: Path) -> None:
+        """Test a format that fails to load is recorded with its error."""
+        weights = tmp_path / "best.pt"
+
+        with (
+            patch("yolo_api.export.export_formats", return_value={"torch": weights}),
+            patch("yolo_api.export.load_format", side_effect=RuntimeError("boom")),
+        ):
+            benchmark = export_and_benchmark(weights, imgsz=640)
+
+        assert benchmark.fastest == "torch"
+        assert all(r.error == "boom" for r in benchmark.results)
+
+    def test_load_benchmark_missing_or_invalid(self, tmp_path: Path) -> None:
+        """Test a missing or corrupt table reads as None."""
+        assert load_benchmark(tmp_path) is None
+
+        (tmp_path / BENCHMARK_FILE).write_text("{not json")
+        assert load_benchmark(tmp_path) is None
@@ -0,0 +1,208 @@
+"""Tests for the image session store."""
+
+import base64
+from collections.abc import Iterator
+from io import BytesIO
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from pydantic import ValidationError
+
+from yolo_api.exceptions import ImageNotFoundError, ResourceLimitError
+from yolo_api.image_store import ImageStore
+from yolo_api.models import InferenceRequest, ModelInfo
+
+
+def png(width: int = 64, height: int = 48) -> bytes:
+    """Create a PNG image."""
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color="red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestImageStore:
+    """Test storing decoded images."""
+
+    def test_put_and_get(self) -> None:
+        """Test an image is decoded once and shared read-only."""
+        store = ImageStore(max_mb=1, ttl_seconds=60)
+
+        image = store.put(png())
+
+        assert store.get(image.image_id) is image
+        assert image.decoded.original_size == (64, 48)
+        assert image.nbytes == 64 * 48 * 3
+        assert not image.decoded.array.flags.writeable
+        decoded = image.decode(640)
+        assert np.shares_memory(decoded.array, image.decoded.array)
+        assert decoded.timings == {}
+
+    def test_same_content_same_digest(self) -> None:
+        """Test uploads of the same bytes share the prediction cache key."""
+        store = ImageStore(max_mb=1, ttl_seconds=60)
+
+        first, second = store.put(png()), store.put(png())
+
+        assert first.image_id != second.image_id
+        assert first.digest == second.digest
+
+    def test_expires_after_ttl(self) -> None:
+        """Test unused images expire and each use extends the TTL."""
+        store = ImageStore(max_mb=1, ttl_seconds=10)
+        with patch("yolo_api.image_store.time.monotonic") as monotonic:
+            monotonic.return_value = 100.0
+            image = store.put(png())
+
+            monotonic.return_value = 108.0
+            store.get(image.image_id)
+            monotonic.return_value = 116.0
+            assert store.get(image.image_id) is image
+
+            monotonic.return_value = 127.0
+            with pytest.raises(ImageNotFoundError):
+                store.get(image.image_id)
+            assert store.stats()["expirations"] == 1
+
+    def test_memory_budget_evicts_least_recently_used(self) -> None:
+        """Test the memory budget evicts the least recently used image."""
+        store = ImageStore(max_mb=1, ttl_seconds=60)
+        first = store.put(png(400, 300))  # 360 KB each
+        second = store.put(png(400, 300))
+        store.get(first.image_id)
+
+        store.put(png(400, 300))
+
+        assert store.get(first.image_id) is first
+        with pytest.raises(ImageNotFoundError):
+            store.get(second.image_id)
+        assert store.stats()["images"] == 2
+        assert store.stats()["evictions"] == 1
+
+    def test_image_over_budget(self) -> None:
+        """Test an image larger than the whole budget is rejected."""
+        store = ImageStore(max_mb=1, ttl_seconds=60)
+
+        with pytest.raises(ResourceLimitError):
+            store.put(png(800, 600))
+
+    def test_delete(self) -> None:
+        """Test deleted images are gone and free their memory."""
+        store = ImageStore(max_mb=1, ttl_seconds=60)
+        image = store.put(png())
+
+        store.delete(image.image_id)
+
+        assert store.stats()["memory_used_mb"] == 0
+        with pytest.raises(ImageNotFoundError):
+            store.delete(image.image_id)
+
+
+class TestInferenceRequestImageSource:
+    """Test predict requests carry an image or reference one."""
+
+    def test_requires_exactly_one_source(self) -> None:
+        """Test image and image_id are mutually exclusive."""
+        assert InferenceRequest(model_id="m", image_id="abc").image is None
+        with pytest.raises(ValidationError):
+            InferenceRequest(model_id="m")
+        with pytest.raises(ValidationError):
+            InferenceRequest(model_id="m", image="aGk=", image_id="abc")
+
+
+@pytest.fixture
+def store_model() -> Iterator[str]:
+    """Register a mock model with the global inference manager."""
+    from yolo_api.inference import inference_manager
+
+    mock_result = Mock()
+    mock_result.boxes = None
+    mock_model = Mock()
+    mock_model.predict.side_effect = lambda source, **kwargs: [mock_result] * len(
+        source
+    )
+    inference_manager.models["store_model"] = mock_model
+    inference_manager.model_info["store_model"] = ModelInfo(
+        model_id="store_model",
+        name="Store Model",
+        yolo_version="v8",
+        model_size="n",
+        classes=["person"],
+        created_at="2024-01-01T00:00:00",  # type: ignore
+    )
+    yield "store_model"
+    inference_manager.unload_model("store_model")
+
+
+class TestImageStoreAPI:
+    """Test image store endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_store_and_predict(
+        self, async_client: AsyncClient, store_model: str
+    ) -> None:
+        """Test predicting by image_id without re-sending the image."""
+        response = await async_client.post(
+            "/api/inference/images", json={"image": base64.b64encode(png()).decode()}
+        )
+        assert response.status_code == 201
+        stored = response.json()
+        assert stored["image_size"] == [64, 48]
+
+        for confidence in (0.25, 0.5):
+            predict = await async_client.post(
+                "/api/inference/predict",
+                json={
+                    "model_id": store_model,
+                    "image_id": stored["image_id"],
+                    "confidence": confidence,
+                },
+            )
+            assert predict.status_code == 200
+            assert predict.json()["image_size"] == [64, 48]
+            assert "decode" not in predict.json()["timings"]
+
+        image_id = stored["image_id"]
+        delete = await async_client.delete(f"/api/inference/images/{image_id}")
+        assert delete.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_store_binary_upload(self, async_client: AsyncClient) -> None:
+        """Test images can be stored from a raw body."""
+        response = await async_client.post(
+            "/api/inference/images",
+            content=png(),
+            headers={"content-type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 201
+        from yolo_api.image_store import image_store
+
+        image_store.delete(response.json()["image_id"])
+
+    @pytest.mark.asyncio
+    async def test_store_invalid_image(self, async_client: AsyncClient) -> None:
+        """Test invalid images are rejected at upload."""
+        response = await async_client.post(
+            "/api/inference/images",
+            content=b"not an image",
+            headers={"content-type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "InvalidImageError"
+
+    @pytest.mark.asyncio
+    async def test_predict_unknown_image(
+        self, async_client: AsyncClient, store_model: str
+    ) -> None:
+        """Test predicting with an unknown image_id."""
+        response = await async_client.post(
+            "/api/inference/predict",
+            json={"model_id": store_model, "image_id": "missing"},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["error"] == "ImageNotFoundError"
@@ -0,0 +1,159 @@
+"""Tests for image decoding."""
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from yolo_api.exceptions import InvalidImageError
+from yolo_api.imaging import (
+    decode_image,
+    jpeg_reduction,
+    letterbox,
+    read_image_header,
+    to_input_tensor,
+)
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    """Encode a PIL image to bytes."""
+    buffer = BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+class TestDecodeImage:
+    """Test decode_image function."""
+
+    def test_decode_png_to_bgr(self) -> None:
+        """Test PNG decodes to a BGR uint8 array."""
+        data = encode(Image.new("RGB", (80, 40), color=(255, 0, 0)), "PNG")
+
+        decoded = decode_image(data)
+
+        assert decoded.original_size == (80, 40)
+        assert decoded.array.shape == (40, 80, 3)
+        assert decoded.array.dtype == np.uint8
+        assert decoded.array[0, 0].tolist() == [0, 0, 255]
+        assert set(decoded.timings) == {"header", "decode"}
+
+    @pytest.mark.parametrize("mode", ["L", "RGBA", "P"])
+    def test_decode_normalizes_channels(self, mode: str) -> None:
+        """Test grayscale, alpha and palette images become 3-channel BGR."""
+        data = encode(Image.new(mode, (48, 48)), "PNG")
+
+        decoded = decode_image(data)
+
+        assert decoded.array.shape == (48, 48, 3)
+
+    def test_decode_gif_fallback(self) -> None:
+        """Test formats OpenCV cannot read still decode through PIL."""
+        data = encode(Image.new("RGB", (40, 40), color=(0, 0, 255)), "GIF")
+
+        decoded = decode_image(data)
+
+        assert decoded.array.shape == (40, 40, 3)
+        assert decoded.array[0, 0].tolist() == [255, 0, 0]
+
+    def test_oversized_dimensions_rejected_from_header(self) -> None:
+        """Test dimension limits are enforced before pixel decoding."""
+        data = encode(Image.new("L", (5000, 40)), "PNG")
+
+        assert read_image_header(data) == ("PNG", (5000, 40))
+        with pytest.raises(InvalidImageError, match="5000x40"):
+            decode_image(data)
+
+    def test_too_small_rejected(self) -> None:
+        """Test images below the minimum dimension are rejected."""
+        data = encode(Image.new("RGB", (16, 16)), "PNG")
+
+        with pytest.raises(InvalidImageError, match="Image too small"):
+            decode_image(data)
+
+    def test_invalid_bytes_rejected(self) -> None:
+        """Test non-image bytes are rejected."""
+        with pytest.raises(InvalidImageError, match="Invalid or unsupported"):
+            decode_image(b"not an image file")
+
+    def test_file_size_limit(self) -> None:
+        """Test payloads over the size limit are rejected before parsing."""
+        with pytest.raises(InvalidImageError, match="max 10MB"):
+            decode_image(b"\0" * (10 * 1024 * 1024 + 1))
+
+
+class TestReducedJpegDecode:
+    """Test reduced-resolution JPEG decoding."""
+
+    @pytest.mark.parametrize(
+        ("size", "target", "expected"),
+        [
+            ((4096, 2160), 640, 4),
+            ((4096, 2160), 512, 8),
+            ((1280, 720), 640, 2),
+            ((1000, 800), 640, 1),
+            ((4096, 2160), None, 1),
+        ],
+    )
+    def test_jpeg_reduction(
+        self, size: tuple[int, int], target: int | None, expected: int
+    ) -> None:
+        """Test the largest factor keeping the long side >= target is chosen."""
+        assert jpeg_reduction(size, target) == expected
+
+    def test_large_jpeg_decoded_reduced(self) -> None:
+        """Test a large JPEG is decoded at reduced size but reports its full size."""
+        data = encode(Image.new("RGB", (2600, 1400), color="green"), "JPEG")
+
+        decoded = decode_image(data, target_size=640)
+
+        assert decoded.reduction == 4
+        assert decoded.array.shape == (350, 650, 3)
+        assert decoded.original_size == (2600, 1400)
+        assert decoded.scale == (4.0, 4.0)
+
+    def test_png_never_reduced(self) -> None:
+        """Test non-JPEG formats are always decoded at full size."""
+        data = encode(Image.new("RGB", (2600, 1400)), "PNG")
+
+        decoded = decode_image(data, target_size=640)
+
+        assert decoded.reduction == 1
+        assert decoded.array.shape == (1400, 2600, 3)
+
+
+class TestLetterbox:
+    """Test letterbox preprocessing."""
+
+    def test_wide_image_padded_vertically(self) -> None:
+        """Test a wide image is scaled to the input width and centered."""
+        image = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+        box = letterbox(image, 64)
+
+        assert box.image.shape == (64, 64, 3)
+        assert box.gain == pytest.approx(0.32)
+        assert box.pad == (0, 16)
+        assert (box.image[:16] == 114).all()
+        assert (box.image[16:48] == 255).all()
+
+    def test_stride_pads_to_rectangle(self) -> None:
+        """Test a stride only pads the short side to a stride multiple."""
+        image = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        box = letterbox(image, 64, stride=32)
+
+        assert box.image.shape == (32, 64, 3)
+        assert box.pad == (0, 0)
+
+    def test_to_input_tensor(self) -> None:
+        """Test images become a normalized NCHW RGB batch."""
+        bgr = np.zeros((8, 8, 3), dtype=np.uint8)
+        bgr[..., 0] = 255  # Blue
+
+        batch = to_input_tensor([bgr, bgr])
+
+        assert batch.shape == (2, 3, 8, 8)
+        assert batch.dtype == np.float32
+        assert batch[:, 2].max() == pytest.approx(1.0)  # Blue is the last RGB plane
+        assert batch[:, 0].max() == 0
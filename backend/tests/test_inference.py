@@ -1,9 +1,11 @@
 """Tests for inference functionality."""
 
 import base64
+import json
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
+import numpy as np
 import pytest
 from httpx import AsyncClient
 
@@ -104,6 +106,36 @@ class TestInferenceManager:
         assert "test_model" not in manager.models
         assert "test_model" not in manager.model_info
 
+    def test_warmup_runs_forward_passes(self) -> None:
+        """Test warm-up runs dummy predictions at the model input size."""
+        manager = InferenceManager()
+        mock_model = Mock()
+        mock_model.overrides = {"imgsz": 320}
+        mock_result = Mock()
+        mock_result.boxes = None
+        mock_model.predict.return_value = [mock_result]
+        manager.models["test_model"] = mock_model
+
+        warmup_time = manager.warmup("test_model", runs=3)
+
+        assert warmup_time >= 0
+        assert mock_model.predict.call_count == 3
+        source = mock_model.predict.call_args.args[0]
+        assert source.shape == (320, 320, 3)
+
+    def test_preload_loads_and_warms_up(self) -> None:
+        """Test preload loads the model before warming it up."""
+        manager = InferenceManager()
+
+        with (
+            patch.object(manager, "load_model") as mock_load,
+            patch.object(manager, "warmup") as mock_warmup,
+        ):
+            manager.preload("test_model")
+
+        mock_load.assert_called_once_with("test_model")
+        mock_warmup.assert_called_once_with("test_model")
+
     def test_infer_model_not_loaded(self) -> None:
         """Test inference with model not loaded."""
         manager = InferenceManager()
@@ -120,14 +152,13 @@ class TestInferenceManager:
         mock_model = Mock()
         mock_result = Mock()
 
-        # Mock detection box
-        mock_box = Mock()
-        mock_box.cls = [0]  # class_id
-        mock_box.conf = [0.95]  # confidence
-        mock_box.xyxy = [Mock()]
-        mock_box.xyxy[0].cpu.return_value.numpy.return_value = [10, 20, 100, 200]
+        # Mock detection boxes: rows of [x1, y1, x2, y2, conf, cls]
+        mock_result.boxes = MagicMock()
+        mock_result.boxes.__len__.return_value = 1
+        mock_result.boxes.data.cpu.return_value.numpy.return_value = np.array(
+            [[10, 20, 100, 200, 0.95, 0]]
+        )
 
-        mock_result.boxes = [mock_box]
         mock_model.predict.return_value = [mock_result]
 
         manager.models["test_model"] = mock_model
@@ -156,7 +187,8 @@ class TestInferenceManager:
         assert len(result.detections) == 1
         assert result.detections[0].class_id == 0
         assert result.detections[0].class_name == "person"
-        assert result.detections[0].confidence == 0.95
+        assert result.detections[0].confidence == pytest.approx(0.95)
+        assert result.detections[0].bbox == BoundingBox(x1=10, y1=20, x2=100, y2=200)
         assert result.inference_time > 0
         assert result.image_size == (64, 64)
 
@@ -267,6 +299,43 @@ class TestInferenceManager:
         assert "Invalid or unsupported image format" in str(exc_info.value)
 
 
+@pytest.fixture
+def png_bytes() -> bytes:
+    """Create a 64x48 PNG image."""
+    from io import BytesIO
+
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), color="red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def api_model() -> str:
+    """Register a mock model with the global inference manager."""
+    from yolo_api.inference import inference_manager
+
+    mock_result = Mock()
+    mock_result.boxes = None
+    mock_model = Mock()
+    mock_model.predict.side_effect = lambda source, **kwargs: [mock_result] * (
+        len(source) if isinstance(source, list) else 1
+    )
+
+    inference_manager.models["api_model"] = mock_model
+    inference_manager.model_info["api_model"] = ModelInfo(
+        model_id="api_model",
+        name="API Model",
+        yolo_version="v8",
+        model_size="n",
+        classes=["person"],
+        created_at="2024-01-01T00:00:00",  # type: ignore
+    )
+    yield "api_model"
+    inference_manager.unload_model("api_model")
+
+
 class TestInferenceAPI:
     """Test inference API endpoints."""
 
@@ -334,3 +403,231 @@ class TestInferenceAPI:
         assert response.status_code == 422
         data = response.json()
         assert data["error"] == "ValidationError"
+
+    @pytest.mark.asyncio
+    async def test_predict_endpoint_success(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test POST /api/inference/predict with a loaded model."""
+        request_data = {
+            "model_id": api_model,
+            "image": base64.b64encode(png_bytes).decode(),
+        }
+
+        response = await async_client.post("/api/inference/predict", json=request_data)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["detections"] == []
+        assert data["image_size"] == [64, 48]
+        assert data["batch_size"] == 1
+        assert {"base64", "header", "decode", "queue", "forward"} <= set(
+            data["timings"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_predict_endpoint_tiled(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test tiled prediction reports the tile grid and batch timings."""
+        request_data = {
+            "model_id": api_model,
+            "image": base64.b64encode(png_bytes).decode(),
+            "tiling": {"tile_size": 64, "overlap": 0.5},
+        }
+
+        response = await async_client.post("/api/inference/predict", json=request_data)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["image_size"] == [64, 48]
+        assert data["batch_size"] == 1
+        assert data["tiling"]["grid"] == [1, 1]
+        assert len(data["tiling"]["batch_times"]) == 1
+        assert {"forward", "merge"} <= set(data["timings"])
+
+    @pytest.mark.asyncio
+    async def test_predict_binary_tiled(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test tiling can be requested as a query parameter."""
+        response = await async_client.post(
+            "/api/inference/predict/binary",
+            params={"model_id": api_model, "tiling": '{"tile_size": 64}'},
+            content=png_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["tiling"]["tile_size"] == 64
+
+    @pytest.mark.asyncio
+    async def test_predict_tiled_admission(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test tiled requests are rejected when the model queue is full."""
+        from yolo_api.main import batch_scheduler
+
+        with (
+            patch.object(batch_scheduler, "max_queue_depth", 1),
+            patch.dict(batch_scheduler._depth, {api_model: 1}),
+        ):
+            response = await async_client.post(
+                "/api/inference/predict",
+                json={
+                    "model_id": api_model,
+                    "image": base64.b64encode(png_bytes).decode(),
+                    "tiling": {"tile_size": 64},
+                },
+            )
+
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+
+    @pytest.mark.asyncio
+    async def test_predict_binary_raw_body(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test POST /api/inference/predict/binary with an octet-stream body."""
+        response = await async_client.post(
+            "/api/inference/predict/binary",
+            params={"model_id": api_model, "confidence": 0.5},
+            content=png_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["image_size"] == [64, 48]
+
+    @pytest.mark.asyncio
+    async def test_predict_binary_multipart(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test POST /api/inference/predict/binary with multipart form data."""
+        response = await async_client.post(
+            "/api/inference/predict/binary",
+            files={"image": ("frame.png", png_bytes, "image/png")},
+            data={"model_id": api_model, "confidence": "0.3", "iou": "0.5"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["image_size"] == [64, 48]
+
+    @pytest.mark.asyncio
+    async def test_predict_binary_invalid_threshold(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test invalid thresholds are rejected with a validation error."""
+        response = await async_client.post(
+            "/api/inference/predict/binary",
+            params={"model_id": api_model, "confidence": 1.5},
+            content=png_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["error"] == "ValidationError"
+
+    @pytest.mark.asyncio
+    async def test_predict_binary_empty_body(self, async_client: AsyncClient) -> None:
+        """Test an empty body is rejected as an invalid image."""
+        response = await async_client.post(
+            "/api/inference/predict/binary",
+            params={"model_id": "anything"},
+            content=b"",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "InvalidImageError"
+
+
+class TestBatchPredictAPI:
+    """Test the NDJSON batch predict endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_multipart_streams_one_line_per_image(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test every uploaded image gets its own result line."""
+        response = await async_client.post(
+            "/api/inference/predict/batch",
+            files=[
+                ("images", (f"frame{i}.png", png_bytes, "image/png")) for i in range(3)
+            ]
+            + [("images", ("broken.png", b"not an image", "image/png"))],
+            data={"model_id": api_model, "confidence": "0.3"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+        by_index = {line["index"]: line for line in lines}
+        assert by_index[0]["filename"] == "frame0.png"
+        assert by_index[0]["result"]["image_size"] == [64, 48]
+        assert by_index[3]["result"] is None
+        assert by_index[3]["error"] == "InvalidImageError"
+
+    @pytest.mark.asyncio
+    async def test_json_base64_and_stored_images(
+        self, async_client: AsyncClient, api_model: str, png_bytes: bytes
+    ) -> None:
+        """Test base64 images and image store references in one batch."""
+        image = base64.b64encode(png_bytes).decode()
+        stored = await async_client.post("/api/inference/images", json={"image": image})
+        image_id = stored.json()["image_id"]
+
+        response = await async_client.post(
+            "/api/inference/predict/batch",
+            json={
+                "model_id": api_model,
+                "images": [image],
+                "image_ids": [image_id, "missing"],
+            },
+        )
+        await async_client.delete(f"/api/inference/images/{image_id}")
+
+        assert response.status_code == 200
+        lines = {
+            line["index"]: line
+            for line in map(json.loads, response.text.splitlines())
+        }
+        assert lines[0]["result"]["image_size"] == [64, 48]
+        assert lines[1]["image_id"] == image_id
+        assert lines[1]["result"] is not None
+        assert lines[2]["error"] == "ImageNotFoundError"
+
+    @pytest.mark.asyncio
+    async def test_unknown_model(
+        self, async_client: AsyncClient, png_bytes: bytes
+    ) -> None:
+        """Test an unknown model fails the request before streaming."""
+        response = await async_client.post(
+            "/api/inference/predict/batch",
+            json={
+                "model_id": "nonexistent",
+                "images": [base64.b64encode(png_bytes).decode()],
+            },
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_batch_limits(
+        self, async_client: AsyncClient, api_model: str
+    ) -> None:
+        """Test empty and oversized batches are rejected."""
+        empty = await async_client.post(
+            "/api/inference/predict/batch", json={"model_id": api_model}
+        )
+        with patch("yolo_api.main.settings") as mock_settings:
+            mock_settings.batch_predict_max_images = 2
+            too_many = await async_client.post(
+                "/api/inference/predict/batch",
+                json={"model_id": api_model, "image_ids": ["a", "b", "c"]},
+            )
+
+        assert empty.status_code == 400
+        assert too_many.status_code == 429
+        assert too_many.json()["error"] == "ResourceLimitError"
@@ -0,0 +1,346 @@
+"""Tests for offline inference jobs."""
+
+import io
+import json
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from yolo_api.exceptions import DatasetValidationError, InferenceJobError
+from yolo_api.imaging import DecodedImage
+from yolo_api.inference_jobs import (
+    CHECKPOINT_FILE,
+    RESULTS_COCO,
+    RESULTS_JSONL,
+    InferenceJobManager,
+    decode_ahead,
+    extract_archive,
+    list_images,
+    write_coco,
+)
+from yolo_api.models import InferenceJobRequest, InferenceJobStatus, ModelInfo
+from yolo_api.postprocess import DetectionArrays
+
+
+def make_images(directory: Path, count: int) -> list[Path]:
+    """Write small PNG images."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = directory / f"{i:03d}.png"
+        cv2.imwrite(str(path), np.full((40, 64, 3), i, dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def fake_model_host(calls: list[int]) -> MagicMock:
+    """Create a model host returning one box per image."""
+    host = MagicMock()
+    host.is_loaded.return_value = True
+    host.decode_target_size.return_value = None
+    host.model_info = {
+        "m": ModelInfo(
+            model_id="m",
+            name="M",
+            yolo_version="v8",
+            model_size="n",
+            classes=["person", "car"],
+            created_at="2024-01-01T00:00:00",  # type: ignore
+        )
+    }
+
+    def predict_batch(
+        model_id: str, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        calls.append(len(images))
+        return [
+            DetectionArrays(
+                xyxy=np.array([[1, 2, 11, 22]], dtype=np.float32),
+                conf=np.array([0.9], dtype=np.float32),
+                cls=np.array([1], dtype=np.int64),
+            )
+            for _ in images
+        ]
+
+    host.predict_batch.side_effect = predict_batch
+    return host
+
+
+@pytest.fixture
+def job_env(tmp_path: Path) -> Iterator[tuple[InferenceJobManager, Path, list[int]]]:
+    """Manager over a source root of 5 images with a fake model host."""
+    source_root = tmp_path / "source"
+    make_images(source_root / "batch", 5)
+    calls: list[int] = []
+    with (
+        patch("yolo_api.inference_jobs.settings") as mock_settings,
+        patch("yolo_api.workers.model_host", fake_model_host(calls)),
+    ):
+        mock_settings.inference_job_source_root = source_root
+        mock_settings.inference_job_batch_size = 2
+        mock_settings.inference_job_decode_workers = 2
+        mock_settings.inference_job_max_images = 100
+        manager = InferenceJobManager(work_dir=tmp_path / "jobs", max_workers=1)
+        yield manager, tmp_path / "jobs", calls
+
+
+def add_job(manager: InferenceJobManager, job_id: str, **options: str) -> None:
+    """Register a job reading the source directory, as start_job does."""
+    request = InferenceJobRequest.model_validate(
+        {"model_id": "m", "source_dir": "batch", **options}
+    )
+    (manager.work_dir / job_id).mkdir(parents=True)
+    (manager.work_dir / job_id / "job.json").write_text(request.model_dump_json())
+    manager.requests[job_id] = request
+    manager.jobs[job_id] = InferenceJobStatus(
+        job_id=job_id,
+        status="running",
+        model_id="m",
+        output_format=request.output_format,
+    )
+
+
+class TestArchives:
+    """Test reading image archives."""
+
+    def test_extracts_zip_and_tar(self, tmp_path: Path) -> None:
+        """Test both archive types extract to the same images."""
+        zip_path = tmp_path / "images.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("a/1.jpg", b"x")
+            zf.writestr("2.png", b"x")
+        tar_path = tmp_path / "images.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as tf:
+            for name in ("a/1.jpg", "2.png"):
+                info = tarfile.TarInfo(name)
+                info.size = 1
+                tf.addfile(info, io.BytesIO(b"x"))
+
+        extract_archive(zip_path, tmp_path / "from_zip")
+        extract_archive(tar_path, tmp_path / "from_tar")
+
+        assert list_images(tmp_path / "from_zip") == ["2.png", "a/1.jpg"]
+        assert list_images(tmp_path / "from_tar") == ["2.png", "a/1.jpg"]
+
+    def test_rejects_path_traversal(self, tmp_path: Path) -> None:
+        """Test members escaping the target directory are rejected."""
+        zip_path = tmp_path / "evil.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("../evil.jpg", b"x")
+
+        with pytest.raises(DatasetValidationError):
+            extract_archive(zip_path, tmp_path / "out")
+
+    def test_skips_tar_links(self, tmp_path: Path) -> None:
+        """Test symlinks in tar archives are not extracted."""
+        tar_path = tmp_path / "links.tar"
+        with tarfile.open(tar_path, "w") as tf:
+            link = tarfile.TarInfo("passwd.jpg")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "/etc/passwd"
+            tf.addfile(link)
+
+        extract_archive(tar_path, tmp_path / "out")
+
+        assert not (tmp_path / "out" / "passwd.jpg").exists()
+
+    def test_list_images_filters_files(self, tmp_path: Path) -> None:
+        """Test only image files are listed, sorted."""
+        make_images(tmp_path, 2)
+        (tmp_path / "labels.txt").write_text("x")
+        (tmp_path / ".hidden.png").write_bytes(b"x")
+
+        assert list_images(tmp_path) == ["000.png", "001.png"]
+
+
+class TestDecodeAhead:
+    """Test decoding on a worker pool."""
+
+    def test_batches_in_order_with_errors(self, tmp_path: Path) -> None:
+        """Test batches keep file order and carry decode errors."""
+        make_images(tmp_path, 4)
+        (tmp_path / "broken.png").write_bytes(b"not an image")
+        files = ["000.png", "001.png", "broken.png", "002.png", "003.png"]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            batches = list(decode_ahead(pool, tmp_path, files, None, 2))
+
+        assert [[name for name, _ in batch] for batch in batches] == [
+            ["000.png", "001.png"],
+            ["broken.png", "002.png"],
+            ["003.png"],
+        ]
+        assert isinstance(batches[1][0][1], Exception)
+        assert isinstance(batches[1][1][1], DecodedImage)
+        assert batches[1][1][1].original_size == (64, 40)
+
+
+class TestWriteCoco:
+    """Test COCO output."""
+
+    def test_converts_lines(self, tmp_path: Path) -> None:
+        """Test images, boxes in xywh and categories are written."""
+        detection = {
+            "class_id": 1,
+            "class_name": "car",
+            "confidence": 0.9,
+            "bbox": {"x1": 1.0, "y1": 2.0, "x2": 11.0, "y2": 22.0},
+        }
+        lines = [
+            {"file": "a.png", "image_size": [64, 40], "detections": [detection]},
+            {"file": "b.png", "error": "Invalid image"},
+        ]
+        results = tmp_path / RESULTS_JSONL
+        results.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+        write_coco(results, tmp_path / RESULTS_COCO, ["person", "car"])
+
+        coco = json.loads((tmp_path / RESULTS_COCO).read_text())
+        assert coco["images"] == [
+            {"id": 1, "file_name": "a.png", "width": 64, "height": 40}
+        ]
+        assert coco["annotations"][0]["bbox"] == [1.0, 2.0, 10.0, 20.0]
+        assert coco["annotations"][0]["area"] == 200.0
+        assert coco["categories"][1] == {"id": 1, "name": "car"}
+
+
+class TestInferenceJobManager:
+    """Test running, stopping and resuming jobs."""
+
+    def test_runs_to_completion(
+        self, job_env: tuple[InferenceJobManager, Path, list[int]]
+    ) -> None:
+        """Test every image gets a result line and the job completes."""
+        manager, jobs_dir, calls = job_env
+        add_job(manager, "job1", output_format="coco")
+
+        manager._run_sync("job1")
+
+        status = manager.jobs["job1"]
+        assert status.status == "completed"
+        assert (status.processed_images, status.detections) == (5, 5)
+        assert calls == [2, 2, 1]
+        lines = (jobs_dir / "job1" / RESULTS_JSONL).read_text().splitlines()
+        assert [json.loads(line)["file"] for line in lines] == [
+            f"{i:03d}.png" for i in range(5)
+        ]
+        coco = json.loads((jobs_dir / "job1" / RESULTS_COCO).read_text())
+        assert len(coco["annotations"]) == 5
+        assert manager.results_path("job1").name == RESULTS_COCO
+
+    def test_stop_and_resume_from_checkpoint(
+        self, job_env: tuple[InferenceJobManager, Path, list[int]]
+    ) -> None:
+        """Test a stopped job continues after its last checkpoint."""
+        manager, jobs_dir, calls = job_env
+        add_job(manager, "job1")
+        host = fake_model_host(calls)
+        predict = host.predict_batch.side_effect
+
+        def stop_after_first_batch(*args: object) -> list[DetectionArrays]:
+            manager.stop_job("job1")
+            return predict(*args)
+
+        host.predict_batch.side_effect = stop_after_first_batch
+        with patch("yolo_api.workers.model_host", host):
+            manager._run_sync("job1")
+
+        status = manager.jobs["job1"]
+        assert status.status == "stopped"
+        assert status.processed_images == 2
+        # A crash after writing lines but before the checkpoint
+        results = jobs_dir / "job1" / RESULTS_JSONL
+        with results.open("a") as f:
+            f.write('{"file": "partial"}\n')
+
+        manager._stop_requested.clear()
+        calls.clear()
+        status.status = "running"
+        manager._run_sync("job1")
+
+        assert status.status == "completed"
+        assert calls == [2, 1]
+        files = [json.loads(line)["file"] for line in results.read_text().splitlines()]
+        assert files == [f"{i:03d}.png" for i in range(5)]
+
+    def test_restore_interrupted_job(
+        self, job_env: tuple[InferenceJobManager, Path, list[int]]
+    ) -> None:
+        """Test jobs running at shutdown come back as resumable."""
+        manager, jobs_dir, _ = job_env
+        add_job(manager, "job1")
+        manager._save_checkpoint("job1", 0)
+
+        restored = InferenceJobManager(work_dir=jobs_dir, max_workers=1)
+        restored.restore_jobs()
+
+        assert restored.jobs["job1"].status == "stopped"
+        assert restored.requests["job1"].source_dir == "batch"
+        assert (jobs_dir / "job1" / CHECKPOINT_FILE).exists()
+
+    def test_source_dir_must_be_under_root(
+        self, job_env: tuple[InferenceJobManager, Path, list[int]]
+    ) -> None:
+        """Test server directories outside the source root are refused."""
+        manager, _, _ = job_env
+
+        with pytest.raises(InferenceJobError):
+            manager.resolve_source_dir("../jobs")
+        assert manager.resolve_source_dir("batch").name == "batch"
+
+    def test_source_dirs_disabled(self, tmp_path: Path) -> None:
+        """Test server directories are refused without a source root."""
+        with patch("yolo_api.inference_jobs.settings") as mock_settings:
+            mock_settings.inference_job_source_root = None
+            with pytest.raises(InferenceJobError, match="disabled"):
+                manager = InferenceJobManager(work_dir=tmp_path, max_workers=1)
+                manager.resolve_source_dir("x")
+
+
+class TestInferenceJobAPI:
+    """Test inference job endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_requires_a_source(self, async_client: AsyncClient) -> None:
+        """Test a job needs an archive or a source directory."""
+        from yolo_api.inference import inference_manager
+
+        inference_manager.models["job_model"] = MagicMock()
+        try:
+            response = await async_client.post(
+                "/api/inference/jobs", json={"model_id": "job_model"}
+            )
+        finally:
+            inference_manager.unload_model("job_model")
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "InferenceJobError"
+
+    @pytest.mark.asyncio
+    async def test_unknown_model(self, async_client: AsyncClient) -> None:
+        """Test jobs for unknown models are refused before starting."""
+        response = await async_client.post(
+            "/api/inference/jobs",
+            files={"archive": ("images.zip", b"PK", "application/zip")},
+            data={"model_id": "nonexistent"},
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, async_client: AsyncClient) -> None:
+        """Test status and results of unknown jobs."""
+        status = await async_client.get("/api/inference/jobs/missing")
+        results = await async_client.get("/api/inference/jobs/missing/results")
+
+        assert status.status_code == 404
+        assert status.json()["error"] == "InferenceJobNotFoundError"
+        assert results.status_code == 404
@@ -0,0 +1,233 @@
+"""Tests for in-process metrics."""
+
+import base64
+import threading
+from collections.abc import Iterator
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from yolo_api.metrics import (
+    Gauge,
+    Histogram,
+    HistogramFamily,
+    collect_stages,
+    record_stage,
+    render_prometheus,
+    timed_stage,
+)
+from yolo_api.models import ModelInfo
+
+
+class TestHistogram:
+    """Test fixed-bucket histograms."""
+
+    def test_cumulative_buckets(self) -> None:
+        """Test observations are counted in cumulative buckets."""
+        histogram = Histogram(buckets=(10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        assert snapshot["buckets"] == {"10": 2, "100": 3, "+Inf": 4}
+        assert (snapshot["count"], snapshot["sum"]) == (4, 565)
+
+    def test_quantiles(self) -> None:
+        """Test quantiles are estimated as bucket upper bounds."""
+        histogram = Histogram(buckets=(10, 100))
+        assert histogram.quantile(0.5) is None
+
+        for value in [1] * 90 + [50] * 9 + [1000]:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 10
+        assert histogram.quantile(0.95) == 100
+        assert histogram.snapshot()["p99"] == 100
+        histogram.observe(1000)
+        assert histogram.snapshot()["p99"] == "+Inf"
+
+    def test_concurrent_threads(self) -> None:
+        """Test observations from many threads are all counted."""
+        histogram = Histogram(buckets=(10, 100))
+
+        def observe() -> None:
+            for _ in range(1000):
+                histogram.observe(5)
+
+        threads = [threading.Thread(target=observe) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.count == 8000
+        assert histogram.totals() == ([8000, 0, 0], 40000)
+
+
+class TestStages:
+    """Test collecting per-stage timings."""
+
+    def test_collect(self) -> None:
+        """Test stages recorded in the block are summed per stage."""
+        with collect_stages() as stages:
+            record_stage("forward", 2.0)
+            record_stage("forward", 3.0)
+            with timed_stage("nms"):
+                pass
+
+        assert stages["forward"] == 5.0
+        assert stages["nms"] >= 0
+
+    def test_nested(self) -> None:
+        """Test an inner collection adds up into the outer one."""
+        with collect_stages() as outer:
+            record_stage("preprocess", 1.0)
+            with collect_stages() as inner:
+                record_stage("forward", 4.0)
+
+        assert inner == {"forward": 4.0}
+        assert outer == {"preprocess": 1.0, "forward": 4.0}
+
+    def test_outside_collection(self) -> None:
+        """Test recording without a collection is a no-op."""
+        record_stage("forward", 1.0)
+
+        with collect_stages() as stages:
+            pass
+
+        assert stages == {}
+
+
+class TestRenderPrometheus:
+    """Test the text exposition format."""
+
+    def test_histograms_and_gauges(self) -> None:
+        """Test histograms are exported in seconds and gauges as values."""
+        family = HistogramFamily("test_seconds", "Test", ("route",), (10, 100))
+        family.labels("/a").observe(5)
+        family.labels("/a").observe(50)
+        gauge = Gauge("test_gauge", "Gauge", ("name",), {('say "hi"',): 2})
+
+        text = render_prometheus([(family, family.children())], [gauge])
+
+        assert text.splitlines() == [
+            "# HELP test_seconds Test",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{route="/a",le="0.01"} 1',
+            'test_seconds_bucket{route="/a",le="0.1"} 2',
+            'test_seconds_bucket{route="/a",le="+Inf"} 2',
+            'test_seconds_sum{route="/a"} 0.055',
+            'test_seconds_count{route="/a"} 2',
+            "# HELP test_gauge Gauge",
+            "# TYPE test_gauge gauge",
+            'test_gauge{name="say \\"hi\\""} 2',
+        ]
+
+    def test_labels_reuse_histogram(self) -> None:
+        """Test the same label values return the same histogram."""
+        family = HistogramFamily("test_seconds", "Test", ("route",))
+
+        assert family.labels("/a") is family.labels("/a")
+        assert family.labels("/a") is not family.labels("/b")
+
+
+@pytest.fixture
+def metrics_model() -> Iterator[str]:
+    """Register a mock model reporting ultralytics stage speeds."""
+    from yolo_api.inference import inference_manager
+
+    mock_result = Mock()
+    mock_result.boxes = None
+    mock_result.speed = {"preprocess": 1.0, "inference": 20.0, "postprocess": 3.0}
+    mock_model = Mock()
+    mock_model.predict.side_effect = lambda source, **kwargs: [mock_result] * (
+        len(source) if isinstance(source, list) else 1
+    )
+    inference_manager.models["metrics_model"] = mock_model
+    inference_manager.model_info["metrics_model"] = ModelInfo(
+        model_id="metrics_model",
+        name="Metrics Model",
+        yolo_version="v8",
+        model_size="n",
+        classes=["person"],
+        created_at="2024-01-01T00:00:00",  # type: ignore
+    )
+    yield "metrics_model"
+    inference_manager.unload_model("metrics_model")
+
+
+class TestMetricsAPI:
+    """Test the /metrics endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_request_latency_by_route(self, async_client: AsyncClient) -> None:
+        """Test requests are counted per route template and status."""
+        await async_client.get("/health")
+        await async_client.get("/api/inference/jobs/missing")
+
+        response = await async_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'yolo_http_request_duration_seconds_count{method="GET",'
+            'route="/health",status="200"}'
+        ) in text
+        assert 'route="/api/inference/jobs/{job_id}",status="404"' in text
+        assert "/jobs/missing" not in text
+
+    @pytest.mark.asyncio
+    async def test_gauges(self, async_client: AsyncClient) -> None:
+        """Test gauges are exported with their current values."""
+        response = await async_client.get("/metrics")
+
+        lines = response.text.splitlines()
+        assert "# TYPE yolo_models_loaded gauge" in lines
+        assert "yolo_training_jobs_running 0" in lines
+        assert "yolo_inference_jobs_running 0" in lines
+        assert 'yolo_websocket_subscribers{channel="training"} 0' in lines
+        assert 'yolo_websocket_subscribers{channel="inference_job"} 0' in lines
+
+    @pytest.mark.asyncio
+    async def test_inference_stages(
+        self, async_client: AsyncClient, metrics_model: str
+    ) -> None:
+        """Test a prediction records every stage of its model."""
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), color="red").save(buffer, format="PNG")
+        predict = await async_client.post(
+            "/api/inference/predict",
+            json={
+                "model_id": metrics_model,
+                "image": base64.b64encode(buffer.getvalue()).decode(),
+            },
+        )
+        assert predict.status_code == 200
+
+        response = await async_client.get("/metrics")
+
+        stages = {
+            line.split('stage="')[1].split('"')[0]
+            for line in response.text.splitlines()
+            if line.startswith("yolo_inference_stage_duration_seconds_count")
+            and f'model_id="{metrics_model}"' in line
+        }
+        assert set(stages) == {
+            "base64",
+            "decode",
+            "queue",
+            "preprocess",
+            "forward",
+            "nms",
+            "serialize",
+        }
+        assert (
+            "yolo_inference_stage_duration_seconds_sum"
+            f'{{model_id="{metrics_model}",stage="forward"}} 0.02'
+        ) in response.text
+        assert 'yolo_batch_queue_depth{model_id="metrics_model"} 0' in response.text
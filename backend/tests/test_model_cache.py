@@ -0,0 +1,129 @@
+"""Tests for the model cache."""
+
+import time
+from pathlib import Path
+
+import pytest
+import torch
+from httpx import AsyncClient
+
+from yolo_api.model_cache import ModelCache, estimate_model_bytes
+
+MB = 1024 * 1024
+
+
+class TestModelCache:
+    """Test ModelCache class."""
+
+    def test_dict_interface(self) -> None:
+        """Test the cache behaves like a dict of models."""
+        cache = ModelCache(memory_budget_mb=0, idle_ttl_s=0, pinned=[])
+
+        cache.put("a", "model_a", size_bytes=MB)
+
+        assert cache == {"a": "model_a"}
+        assert "a" in cache
+        assert cache["a"] == "model_a"
+        del cache["a"]
+        assert len(cache) == 0
+
+    def test_lru_eviction_within_budget(self) -> None:
+        """Test the least recently used model is evicted first."""
+        cache = ModelCache(memory_budget_mb=3, idle_ttl_s=0, pinned=[])
+        cache.put("a", "model_a", size_bytes=MB)
+        cache.put("b", "model_b", size_bytes=MB)
+        cache.put("c", "model_c", size_bytes=MB)
+
+        cache["a"]  # Touch a so b becomes least recently used
+        cache.put("d", "model_d", size_bytes=MB)
+
+        assert set(cache) == {"a", "c", "d"}
+        assert cache.evictions == 1
+
+    def test_pinned_models_not_evicted(self) -> None:
+        """Test pinned models survive memory and idle eviction."""
+        cache = ModelCache(memory_budget_mb=2, idle_ttl_s=0.01, pinned=["a"])
+        cache.put("a", "model_a", size_bytes=MB)
+        cache.put("b", "model_b", size_bytes=MB)
+        cache.put("c", "model_c", size_bytes=MB)
+
+        assert set(cache) == {"a", "c"}
+
+        time.sleep(0.02)
+        assert cache.evict_idle() == ["c"]
+        assert set(cache) == {"a"}
+
+        cache.unpin("a")
+        assert not cache.is_pinned("a")
+
+    def test_idle_eviction(self) -> None:
+        """Test only models idle past the TTL are unloaded."""
+        cache = ModelCache(memory_budget_mb=0, idle_ttl_s=0.05, pinned=[])
+        cache.put("old", "model_old", size_bytes=MB)
+        time.sleep(0.06)
+        cache.put("new", "model_new", size_bytes=MB)
+
+        assert cache.evict_idle() == ["old"]
+        assert set(cache) == {"new"}
+
+    def test_hit_miss_counters(self) -> None:
+        """Test get counts hits and misses while membership checks do not."""
+        cache = ModelCache(memory_budget_mb=0, idle_ttl_s=0, pinned=[])
+        cache.put("a", "model_a", size_bytes=MB, load_time_ms=120.0)
+
+        assert cache.get("a") == "model_a"
+        assert cache.get("missing") is None
+        assert "a" in cache
+        assert cache.peek("a") == "model_a"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["loads"] == 1
+        assert stats["avg_load_time_ms"] == 120.0
+        assert stats["memory_used_mb"] == 1.0
+        assert stats["models"][0]["model_id"] == "a"
+
+
+class TestEstimateModelBytes:
+    """Test estimate_model_bytes function."""
+
+    def test_counts_torch_parameters(self) -> None:
+        """Test parameter and buffer bytes of the torch module are counted."""
+
+        class Wrapper:
+            model = torch.nn.BatchNorm1d(10)  # 20 params + 21 buffer values
+
+        size = estimate_model_bytes(Wrapper())
+
+        assert size == 20 * 4 + 20 * 4 + 8
+
+    def test_falls_back_to_file_size(self, tmp_path: Path) -> None:
+        """Test models without a torch module use the weights file size."""
+        weights = tmp_path / "model.onnx"
+        weights.write_bytes(b"\0" * 1234)
+
+        assert estimate_model_bytes(object(), weights) == 1234
+        assert estimate_model_bytes(object()) == 0
+
+
+class TestModelCacheAPI:
+    """Test model cache API endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_stats_endpoint(self, async_client: AsyncClient) -> None:
+        """Test GET /api/inference/stats reports cache, batching and executor."""
+        response = await async_client.get("/api/inference/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert {"cache", "batching", "executor"} <= set(data)
+        assert "hits" in data["cache"]
+
+    @pytest.mark.asyncio
+    async def test_pin_unknown_model(self, async_client: AsyncClient) -> None:
+        """Test pinning a model that does not exist returns 404."""
+        response = await async_client.post("/api/inference/pin/nonexistent")
+
+        assert response.status_code == 404
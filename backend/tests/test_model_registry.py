@@ -0,0 +1,237 @@
+"""Tests for the persistent model registry."""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from yolo_api.config import settings
+from yolo_api.model_registry import UPLOADED_DIR, ModelRegistry
+from yolo_api.models import QuantizationReport
+from yolo_api.quantization import INT8_WEIGHTS, QUANTIZATION_FILE
+
+
+def make_trained(root: Path, job_id: str, name: str, mtime: float) -> Path:
+    """Create a trained job directory with best.pt modified at mtime."""
+    job_dir = root / job_id
+    weights_dir = job_dir / "training" / "weights"
+    weights_dir.mkdir(parents=True)
+    (job_dir / "dataset").mkdir()
+    (job_dir / "dataset" / "data.yaml").write_text("names: ['cat', 'dog']")
+    (job_dir / "training_config.json").write_text(
+        json.dumps({"name": name, "yolo_version": "v11", "model_size": "s"})
+    )
+    best = weights_dir / "best.pt"
+    best.touch()
+    os.utime(best, (mtime, mtime))
+    return job_dir
+
+
+def make_uploaded(root: Path, model_id: str, name: str) -> None:
+    """Create an uploaded model directory."""
+    model_dir = root / UPLOADED_DIR / model_id
+    model_dir.mkdir(parents=True)
+    (model_dir / "model.onnx").touch()
+    (model_dir / "metadata.json").write_text(json.dumps({"name": name}))
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    """Training directory with two trained jobs and an uploaded model."""
+    root = tmp_path / "training"
+    make_trained(root, "old", "Old project", 1_000_000)
+    make_trained(root, "new", "New project", 2_000_000)
+    make_uploaded(root, "uploaded_1", "Mine")
+    return root
+
+
+def synced(root: Path) -> ModelRegistry:
+    """Create a registry of root and index it."""
+    registry = ModelRegistry(root)
+    registry.sync()
+    return registry
+
+
+class TestModelRegistry:
+    """Test indexing and listing models."""
+
+    def test_list_all(self, root: Path) -> None:
+        """Test every model is listed, newest trained models first."""
+        models = synced(root).models()
+
+        assert [m.model_id for m in models] == ["new", "old", "uploaded_1"]
+        assert models[0].name == "New project"
+        assert models[0].yolo_version == "v11"
+        assert models[0].classes == ["cat", "dog"]
+        assert models[2].name == "📁 Mine"
+        assert models[2].model_size == "custom"
+
+    def test_list_latest_only(self, root: Path) -> None:
+        """Test only the latest trained model is listed with the uploads."""
+        models = synced(root).models(latest_only=True)
+
+        assert [m.model_id for m in models] == ["new", "uploaded_1"]
+
+    def test_int8_variant_follows_base(self, root: Path) -> None:
+        """Test a quantized model is listed right after its base model."""
+        weights_dir = root / "old" / "training" / "weights"
+        (weights_dir / INT8_WEIGHTS).touch()
+        report = QuantizationReport(
+            created_at=datetime(2024, 1, 1),
+            model_id="old:int8",
+            weights=INT8_WEIGHTS,
+            imgsz=640,
+            calibration_images=100,
+            fp32_map50=0.9,
+            int8_map50=0.89,
+            fp32_map50_95=0.65,
+            int8_map50_95=0.64,
+            map50_95_delta=-0.01,
+            fp32_latency_ms=100.0,
+            int8_latency_ms=50.0,
+            speedup=2.0,
+            size_ratio=0.27,
+        )
+        (weights_dir / QUANTIZATION_FILE).write_text(report.model_dump_json())
+
+        models = synced(root).models()
+
+        model_ids = [m.model_id for m in models]
+        assert model_ids == ["new", "old", "old:int8", "uploaded_1"]
+        assert models[2].name == "Old project (INT8)"
+
+    def test_persists_across_instances(self, root: Path) -> None:
+        """Test a new registry reuses the index without re-reading files."""
+        synced(root).close()
+
+        with patch("yolo_api.model_registry.yaml.safe_load") as safe_load:
+            models = synced(root).models()
+
+        safe_load.assert_not_called()
+        assert len(models) == 3
+        assert (root.parent / "training.models.sqlite3").exists()
+
+    def test_listing_does_not_rescan(self, root: Path) -> None:
+        """Test unchanged directories are not scanned again."""
+        registry = synced(root)
+
+        with patch.object(registry, "_model_dirs") as model_dirs:
+            registry.sync()
+
+        model_dirs.assert_not_called()
+
+    def test_update_rereads_changed_job(self, root: Path) -> None:
+        """Test changes inside a job are picked up by update."""
+        registry = synced(root)
+        (root / "old" / "training_config.json").write_text(
+            json.dumps({"name": "Renamed"})
+        )
+
+        registry.update("old")
+
+        assert registry.models()[1].name == "Renamed"
+
+    def test_added_and_deleted_jobs(self, root: Path) -> None:
+        """Test jobs added or removed are reconciled on the next sync."""
+        registry = synced(root)
+        make_trained(root, "newest", "Newest", 3_000_000)
+        for path in sorted((root / "old").rglob("*"), reverse=True):
+            path.unlink() if path.is_file() else path.rmdir()
+        (root / "old").rmdir()
+
+        registry.sync()
+
+        assert [m.model_id for m in registry.models()] == [
+            "newest",
+            "new",
+            "uploaded_1",
+        ]
+
+    def test_update_deleted_upload(self, root: Path) -> None:
+        """Test update drops a model whose files are gone."""
+        registry = synced(root)
+        model_dir = root / UPLOADED_DIR / "uploaded_1"
+        for path in model_dir.iterdir():
+            path.unlink()
+        model_dir.rmdir()
+
+        registry.update("uploaded_1")
+
+        assert [m.model_id for m in registry.models()] == ["new", "old"]
+
+    def test_job_without_weights(self, root: Path) -> None:
+        """Test jobs still training are not listed."""
+        (root / "running").mkdir()
+
+        assert len(synced(root).models()) == 3
+
+    def test_missing_root(self, tmp_path: Path) -> None:
+        """Test a missing training directory lists nothing."""
+        registry = synced(tmp_path / "missing")
+
+        assert registry.models() == []
+        assert not (tmp_path / "missing.models.sqlite3").exists()
+
+    def test_corrupt_database_rebuilt(self, root: Path) -> None:
+        """Test an unreadable database file is replaced."""
+        db_path = root.parent / "training.models.sqlite3"
+        db_path.write_text("not a database" * 100)
+
+        assert len(synced(root).models()) == 3
+
+    def test_outdated_schema_rebuilt(self, root: Path) -> None:
+        """Test a database with another schema version is recreated."""
+        conn = sqlite3.connect(root.parent / "training.models.sqlite3")
+        conn.execute("CREATE TABLE models (model_id TEXT)")
+        conn.commit()
+        conn.close()
+
+        assert len(synced(root).models()) == 3
+
+
+class TestModelsAPI:
+    """Test listing models through the API."""
+
+    @pytest.mark.asyncio
+    async def test_list_all_models(
+        self, async_client: AsyncClient, root: Path
+    ) -> None:
+        """Test every trained model is listed with latest_only=false."""
+        with patch("yolo_api.inference.settings") as mock_settings:
+            mock_settings.training_dir = root
+            latest = await async_client.get("/api/inference/models")
+            every = await async_client.get(
+                "/api/inference/models", params={"latest_only": "false"}
+            )
+
+        assert latest.json()["total"] == 2
+        assert [m["model_id"] for m in every.json()["models"]] == [
+            "new",
+            "old",
+            "uploaded_1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_uploaded_model_listed(
+        self, async_client: AsyncClient, root: Path
+    ) -> None:
+        """Test an uploaded model is indexed right away."""
+        with patch.object(settings, "training_dir", root):
+            upload = await async_client.post(
+                "/api/inference/upload-model",
+                files={"file": ("mine.onnx", b"onnx", "application/octet-stream")},
+                data={"model_name": "Fresh"},
+            )
+            # Indexed by the upload itself, without a directory scan
+            with patch.object(ModelRegistry, "sync"):
+                response = await async_client.get("/api/inference/models")
+
+        assert upload.status_code == 200
+        model_id = upload.json()["model_id"]
+        names = {m["model_id"]: m["name"] for m in response.json()["models"]}
+        assert names[model_id] == "📁 Fresh"
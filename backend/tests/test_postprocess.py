@@ -0,0 +1,122 @@
+"""Tests for vectorized post-processing."""
+
+import numpy as np
+import pytest
+import torch
+from ultralytics.engine.results import Boxes
+
+from yolo_api.models import BoundingBox
+from yolo_api.postprocess import DetectionArrays, decode_yolo_output, nms
+
+
+@pytest.fixture
+def boxes() -> Boxes:
+    """Create ultralytics Boxes with three detections."""
+    data = torch.tensor(
+        [
+            [10.0, 20.0, 100.0, 200.0, 0.95, 0.0],
+            [30.0, 40.0, 50.0, 60.0, 0.40, 1.0],
+            [0.0, 0.0, 5.0, 5.0, 0.10, 7.0],
+        ]
+    )
+    return Boxes(data, orig_shape=(480, 640))
+
+
+class TestDetectionArrays:
+    """Test DetectionArrays class."""
+
+    def test_from_boxes(self, boxes: Boxes) -> None:
+        """Test conversion matches the per-box ultralytics accessors."""
+        arrays = DetectionArrays.from_boxes(boxes)
+
+        assert len(arrays) == 3
+        np.testing.assert_allclose(arrays.xyxy, boxes.xyxy.numpy())
+        np.testing.assert_allclose(arrays.conf, boxes.conf.numpy())
+        assert arrays.cls.tolist() == [0, 1, 7]
+
+    def test_from_boxes_empty(self) -> None:
+        """Test missing or empty boxes produce an empty set."""
+        assert len(DetectionArrays.from_boxes(None)) == 0
+        empty = Boxes(torch.zeros((0, 6)), orig_shape=(480, 640))
+        assert len(DetectionArrays.from_boxes(empty)) == 0
+
+    def test_filter(self, boxes: Boxes) -> None:
+        """Test filtering by confidence."""
+        arrays = DetectionArrays.from_boxes(boxes)
+
+        assert arrays.filter(0.05) is arrays
+        assert arrays.filter(0.3).cls.tolist() == [0, 1]
+        # A box exactly at the threshold is dropped, as by Candidates.select
+        threshold = float(arrays.conf[1])
+        assert arrays.filter(threshold).cls.tolist() == [0]
+
+    def test_scaled(self, boxes: Boxes) -> None:
+        """Test box coordinates are scaled per axis."""
+        arrays = DetectionArrays.from_boxes(boxes)
+
+        assert arrays.scaled(1, 1) is arrays
+        np.testing.assert_allclose(arrays.scaled(2, 4).xyxy[0], [20, 80, 200, 800])
+
+    def test_to_detections(self, boxes: Boxes) -> None:
+        """Test response objects carry class names with a fallback."""
+        detections = DetectionArrays.from_boxes(boxes).to_detections(["person", "car"])
+
+        assert [d.class_name for d in detections] == ["person", "car", "class_7"]
+        assert detections[0].class_id == 0
+        assert detections[0].confidence == pytest.approx(0.95)
+        assert detections[0].bbox == BoundingBox(x1=10, y1=20, x2=100, y2=200)
+        assert detections[0].model_dump()["bbox"]["x2"] == 100
+
+    def test_unletterboxed(self) -> None:
+        """Test boxes are mapped back through the letterbox and clipped."""
+        arrays = DetectionArrays(
+            xyxy=np.array([[10, 26, 30, 40], [0, 0, 64, 64]], dtype=np.float32),
+            conf=np.array([0.9, 0.8], dtype=np.float32),
+            cls=np.array([0, 1]),
+        )
+
+        mapped = arrays.unletterboxed(gain=0.5, pad=(0, 16), shape=(64, 128))
+
+        np.testing.assert_allclose(mapped.xyxy, [[20, 20, 60, 48], [0, 0, 128, 64]])
+
+
+class TestNMS:
+    """Test NumPy non-maximum suppression."""
+
+    def test_nms_suppresses_overlaps(self) -> None:
+        """Test overlapping boxes are suppressed in score order."""
+        boxes = np.array(
+            [[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]], dtype=np.float32
+        )
+        scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+
+        assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+        assert nms(boxes, scores, 0.9).tolist() == [1, 0, 2]
+
+    def test_decode_yolo_output(self) -> None:
+        """Test raw head output is thresholded and NMS is class-aware."""
+        # Columns are anchors: (cx, cy, w, h, score_class0, score_class1)
+        prediction = np.array(
+            [
+                [50, 51, 50, 200],
+                [50, 51, 50, 200],
+                [20, 20, 20, 20],
+                [20, 20, 20, 20],
+                [0.9, 0.8, 0.1, 0.05],
+                [0.1, 0.1, 0.85, 0.1],
+            ],
+            dtype=np.float32,
+        )
+
+        arrays = decode_yolo_output(prediction, confidence=0.25, iou=0.45)
+
+        # Anchor 1 overlaps anchor 0 of the same class; anchor 2 is class 1
+        assert arrays.conf.tolist() == pytest.approx([0.9, 0.85])
+        assert arrays.cls.tolist() == [0, 1]
+        np.testing.assert_allclose(arrays.xyxy[0], [40, 40, 60, 60])
+
+    def test_decode_yolo_output_empty(self) -> None:
+        """Test no candidates above the threshold gives empty arrays."""
+        prediction = np.zeros((6, 10), dtype=np.float32)
+
+        assert len(decode_yolo_output(prediction, 0.25, 0.45)) == 0
@@ -0,0 +1,302 @@
+"""Tests for the threshold-independent prediction cache."""
+
+import base64
+import threading
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from yolo_api.backends import InferenceBackend, UltralyticsBackend
+from yolo_api.inference import InferenceManager
+from yolo_api.models import ModelInfo
+from yolo_api.postprocess import (
+    Candidates,
+    DetectionArrays,
+    decode_yolo_output,
+    head_candidates,
+)
+from yolo_api.prediction_cache import CANDIDATE_FLOOR, PredictionCache, image_digest
+
+
+def make_prediction(anchors: int = 200, classes: int = 3) -> np.ndarray:
+    """Create a random YOLOv8-style head output for one image."""
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(20, 100, size=(2, anchors))
+    sizes = rng.uniform(5, 40, size=(2, anchors))
+    scores = rng.uniform(0, 1, size=(classes, anchors)) ** 3
+    return np.concatenate([centers, sizes, scores]).astype(np.float32)
+
+
+def make_candidates(count: int = 10) -> Candidates:
+    """Create candidates with a known memory footprint."""
+    return Candidates(
+        xyxy=np.zeros((count, 4), dtype=np.float32),
+        conf=np.full(count, 0.5, dtype=np.float32),
+        cls=np.zeros(count, dtype=np.int64),
+        gain=1.0,
+        pad=(0, 0),
+        shape=(128, 128),
+    )
+
+
+class FakeBackend(InferenceBackend):
+    """Backend returning the same head output for every image."""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.prediction = make_prediction()
+        self.forward_calls = 0
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        candidates = self.forward_candidates(images, confidence)
+        return [c.select(confidence, iou) for c in candidates]
+
+    @property
+    def supports_candidates(self) -> bool:
+        return True
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        self.forward_calls += 1
+        return [
+            head_candidates(self.prediction, floor, 1.0, (0, 0), image.shape[:2])
+            for image in images
+        ]
+
+    @property
+    def input_size(self) -> int | None:
+        return 128
+
+
+class TestCandidates:
+    """Test re-thresholding pre-NMS candidates."""
+
+    @pytest.mark.parametrize(
+        ("confidence", "iou"), [(0.01, 0.45), (0.25, 0.7), (0.6, 0.3)]
+    )
+    def test_select_matches_direct_decode(self, confidence: float, iou: float) -> None:
+        """Test candidates kept at the floor give the same detections as decoding."""
+        prediction = make_prediction()
+        candidates = head_candidates(
+            prediction, CANDIDATE_FLOOR, 1.0, (0, 0), (128, 128)
+        )
+
+        selected = candidates.select(confidence, iou)
+        direct = decode_yolo_output(prediction, confidence, iou)
+
+        np.testing.assert_allclose(selected.xyxy, direct.xyxy.clip(0, 128))
+        np.testing.assert_array_equal(selected.conf, direct.conf)
+        np.testing.assert_array_equal(selected.cls, direct.cls)
+
+    def test_floor_prunes_candidates(self) -> None:
+        """Test only boxes above the floor are stored."""
+        candidates = head_candidates(make_prediction(), 0.5, 1.0, (0, 0), (128, 128))
+
+        assert len(candidates.conf) < 200
+        assert (candidates.conf > 0.5).all()
+
+
+class TestPredictionCache:
+    """Test the LRU of pre-NMS candidates."""
+
+    def test_get_and_put(self) -> None:
+        """Test stored candidates are returned and lookups are counted."""
+        cache = PredictionCache(max_entries=4, max_mb=1)
+        candidates = make_candidates()
+
+        assert cache.get(("m", 640, "a")) is None
+        cache.put(("m", 640, "a"), candidates)
+
+        assert cache.get(("m", 640, "a")) is candidates
+        assert cache.get(("m", 320, "a")) is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test the entry limit evicts the least recently used image."""
+        cache = PredictionCache(max_entries=2, max_mb=1)
+        cache.put(("m", 640, "a"), make_candidates())
+        cache.put(("m", 640, "b"), make_candidates())
+        cache.get(("m", 640, "a"))
+
+        cache.put(("m", 640, "c"), make_candidates())
+
+        assert cache.get(("m", 640, "b")) is None
+        assert cache.get(("m", 640, "a")) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_memory_budget(self) -> None:
+        """Test entries are evicted to stay within the byte budget."""
+        cache = PredictionCache(max_entries=100, max_mb=1)
+        entry_bytes = make_candidates(15_000).nbytes  # 420 KB
+
+        for key in "abc":
+            cache.put(("m", 640, key), make_candidates(15_000))
+
+        assert cache.stats()["entries"] == 2
+        assert cache._bytes == 2 * entry_bytes
+
+    def test_drop_model(self) -> None:
+        """Test unloading a model forgets its entries only."""
+        cache = PredictionCache(max_entries=4, max_mb=1)
+        cache.put(("m", 640, "a"), make_candidates())
+        cache.put(("other", 640, "a"), make_candidates())
+
+        cache.drop_model("m")
+
+        assert cache.get(("m", 640, "a")) is None
+        assert cache.get(("other", 640, "a")) is not None
+
+    def test_disabled(self) -> None:
+        """Test a zero entry limit disables caching."""
+        cache = PredictionCache(max_entries=0, max_mb=1)
+        cache.put(("m", 640, "a"), make_candidates())
+
+        assert not cache.enabled
+        assert cache.stats()["entries"] == 0
+
+
+class TestManagerPredictionCache:
+    """Test caching through the inference manager."""
+
+    def test_rethresholds_without_forward_pass(self) -> None:
+        """Test a cached image is served at new thresholds without the model."""
+        manager = InferenceManager()
+        manager.prediction_cache = PredictionCache(max_entries=4, max_mb=1)
+        backend = FakeBackend()
+        manager.models["fake"] = backend
+        image = np.zeros((128, 128, 3), dtype=np.uint8)
+
+        [first] = manager.predict_batch("fake", [image], 0.25, 0.45, cache_keys=["img"])
+        cached = manager.predict_cached("fake", "img", 0.5, 0.3)
+
+        assert backend.forward_calls == 1
+        assert cached is not None
+        detections, shape = cached
+        assert shape == (128, 128)
+        expected = backend.predict([image], 0.5, 0.3)[0]
+        np.testing.assert_array_equal(detections.conf, expected.conf)
+        assert len(detections) < len(first)
+
+    def test_unload_drops_entries(self) -> None:
+        """Test unloading a model invalidates its cached outputs."""
+        manager = InferenceManager()
+        manager.prediction_cache = PredictionCache(max_entries=4, max_mb=1)
+        manager.models["fake"] = FakeBackend()
+        image = np.zeros((128, 128, 3), dtype=np.uint8)
+        manager.predict_batch("fake", [image], 0.25, 0.45, cache_keys=["img"])
+
+        manager.unload_model("fake")
+
+        assert manager.prediction_cache.stats()["entries"] == 0
+
+    def test_pose_model_bypasses_cache(self) -> None:
+        """Test models without a detection head predict without caching."""
+        from ultralytics import YOLO  # type: ignore[attr-defined]
+
+        manager = InferenceManager()
+        manager.prediction_cache = PredictionCache(max_entries=4, max_mb=1)
+        model = YOLO("yolov8n-pose.yaml")
+        manager.models["pose"] = UltralyticsBackend(model, imgsz=64)
+        image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        [result] = manager.predict_batch("pose", [image], cache_keys=["img"])
+
+        assert isinstance(result, DetectionArrays)
+        assert manager.prediction_cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def png_bytes() -> bytes:
+    """Create a 128x128 PNG image."""
+    from io import BytesIO
+
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", (128, 128), color="red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def cached_model() -> Iterator[str]:
+    """Register a backend that exposes candidates with the global manager."""
+    from yolo_api.inference import inference_manager
+
+    inference_manager.models["cached_model"] = FakeBackend()
+    inference_manager.model_info["cached_model"] = ModelInfo(
+        model_id="cached_model",
+        name="Cached Model",
+        yolo_version="v8",
+        model_size="n",
+        classes=["a", "b", "c"],
+        created_at="2024-01-01T00:00:00",  # type: ignore
+    )
+    yield "cached_model"
+    inference_manager.unload_model("cached_model")
+
+
+class TestPredictionCacheAPI:
+    """Test re-thresholding through the inference endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_hits_cache(
+        self, async_client: AsyncClient, cached_model: str, png_bytes: bytes
+    ) -> None:
+        """Test repeating an image with new thresholds skips the forward pass."""
+        image = base64.b64encode(png_bytes).decode()
+
+        first = await async_client.post(
+            "/api/inference/predict",
+            json={"model_id": cached_model, "image": image, "confidence": 0.25},
+        )
+        second = await async_client.post(
+            "/api/inference/predict",
+            json={"model_id": cached_model, "image": image, "confidence": 0.6},
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json()["cache_hit"] is False
+        data = second.json()
+        assert data["cache_hit"] is True
+        assert data["image_size"] == first.json()["image_size"]
+        assert "cache" in data["timings"]
+        assert len(data["detections"]) < len(first.json()["detections"])
+        assert all(d["confidence"] > 0.6 for d in data["detections"])
+
+    @pytest.mark.asyncio
+    async def test_hashes_off_event_loop(
+        self, async_client: AsyncClient, cached_model: str, png_bytes: bytes
+    ) -> None:
+        """Test uploads are hashed on the executor, not the event loop."""
+        threads: list[threading.Thread] = []
+
+        def digest(image: bytes) -> str:
+            threads.append(threading.current_thread())
+            return image_digest(image)
+
+        with patch("yolo_api.main.image_digest", side_effect=digest):
+            response = await async_client.post(
+                "/api/inference/predict",
+                json={
+                    "model_id": cached_model,
+                    "image": base64.b64encode(png_bytes).decode(),
+                },
+            )
+
+        assert response.status_code == 200
+        assert threads
+        assert threading.main_thread() not in threads
+
+    def test_image_digest(self) -> None:
+        """Test images are keyed by content."""
+        assert image_digest(b"abc") == image_digest(b"abc")
+        assert image_digest(b"abc") != image_digest(b"abd")
@@ -0,0 +1,244 @@
+"""Tests for INT8 quantization of trained models."""
+
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from yolo_api.exceptions import ModelNotFoundError
+from yolo_api.inference import InferenceManager
+from yolo_api.models import QuantizationReport, TrainingStatus
+from yolo_api.quantization import (
+    INT8_WEIGHTS,
+    QUANTIZATION_FILE,
+    ValidationImageReader,
+    calibration_images,
+    head_nodes_to_exclude,
+    load_quantization_report,
+    quantize_onnx,
+    split_variant,
+)
+
+
+def make_conv_model(path: Path, size: int = 32) -> None:
+    """Write a YOLO-like ONNX graph: a backbone conv and a head module."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    nodes = [
+        helper.make_node(
+            "Conv", ["images", "w0"], ["x0"], name="/model.0/conv/Conv", pads=[1] * 4
+        ),
+        helper.make_node("Relu", ["x0"], ["x1"], name="/model.0/act/Relu"),
+        helper.make_node("Conv", ["x1", "w1"], ["x2"], name="/model.1/cv2/Conv"),
+        helper.make_node("Sigmoid", ["x2"], ["output0"], name="/model.1/Sigmoid"),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "tiny_yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, size, size])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [1, 2, size, size])],
+        initializer=[
+            numpy_helper.from_array(
+                rng.normal(size=(4, 3, 3, 3)).astype(np.float32), "w0"
+            ),
+            numpy_helper.from_array(
+                rng.normal(size=(2, 4, 1, 1)).astype(np.float32), "w1"
+            ),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+def make_images(directory: Path, count: int) -> list[Path]:
+    """Write random JPEG images."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = directory / f"{i:03d}.jpg"
+        cv2.imwrite(str(path), rng.integers(0, 255, (24, 40, 3), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def make_report(model_id: str = "job1:int8") -> QuantizationReport:
+    """Create a quantization report."""
+    return QuantizationReport(
+        created_at=datetime(2024, 1, 1),
+        model_id=model_id,
+        weights=INT8_WEIGHTS,
+        imgsz=640,
+        calibration_images=100,
+        fp32_map50=0.9,
+        int8_map50=0.89,
+        fp32_map50_95=0.65,
+        int8_map50_95=0.64,
+        map50_95_delta=-0.01,
+        fp32_latency_ms=100.0,
+        int8_latency_ms=50.0,
+        speedup=2.0,
+        size_ratio=0.27,
+    )
+
+
+class TestCalibrationImages:
+    """Test calibration image selection."""
+
+    def test_lists_validation_images(self, tmp_path: Path) -> None:
+        """Test only images from images/val are used."""
+        val_images = make_images(tmp_path / "images" / "val", 3)
+        make_images(tmp_path / "images" / "train", 2)
+        (tmp_path / "images" / "val" / "classes.txt").write_text("person")
+
+        assert calibration_images(tmp_path, limit=10) == val_images
+
+    def test_limit_spreads_over_split(self, tmp_path: Path) -> None:
+        """Test the limit samples evenly instead of taking the first images."""
+        val_images = make_images(tmp_path / "images" / "val", 10)
+
+        assert calibration_images(tmp_path, limit=5) == val_images[::2]
+
+    def test_missing_split(self, tmp_path: Path) -> None:
+        """Test a dataset without a val split yields no images."""
+        assert calibration_images(tmp_path, limit=10) == []
+
+    def test_reader_letterboxes_and_rewinds(self, tmp_path: Path) -> None:
+        """Test the reader feeds one letterboxed NCHW tensor per image."""
+        paths = make_images(tmp_path, 2)
+        (tmp_path / "broken.jpg").write_bytes(b"not an image")
+        reader = ValidationImageReader([*paths, tmp_path / "broken.jpg"], "images", 32)
+
+        feeds = [reader.get_next(), reader.get_next()]
+        assert reader.get_next() is None
+        assert all(feed["images"].shape == (1, 3, 32, 32) for feed in feeds)  # type: ignore[index]
+
+        reader.rewind()
+        assert reader.get_next() is not None
+
+
+class TestQuantizeOnnx:
+    """Test static quantization of ONNX models."""
+
+    def test_excludes_head_decoding(self, tmp_path: Path) -> None:
+        """Test only convolutions of the last module are quantized."""
+        path = tmp_path / "model.onnx"
+        make_conv_model(path)
+
+        assert head_nodes_to_exclude(path) == ["/model.1/Sigmoid"]
+
+    def test_quantizes_with_calibration(self, tmp_path: Path) -> None:
+        """Test the quantized model has INT8 weights and still runs."""
+        pytest.importorskip("onnxruntime")
+        import onnx
+        import onnxruntime as ort
+
+        path = tmp_path / "model.onnx"
+        make_conv_model(path)
+        images = make_images(tmp_path / "val", 4)
+
+        output = quantize_onnx(path, tmp_path / INT8_WEIGHTS, images, imgsz=32)
+
+        model = onnx.load(str(output))
+        op_types = {node.op_type for node in model.graph.node}
+        assert {"QuantizeLinear", "DequantizeLinear"} <= op_types
+        assert not (tmp_path / "best-int8-prep.onnx").exists()
+
+        session = ort.InferenceSession(str(output), providers=["CPUExecutionProvider"])
+        result = session.run(None, {"images": np.zeros((1, 3, 32, 32), np.float32)})
+        assert result[0].shape == (1, 2, 32, 32)
+
+    def test_requires_calibration_images(self, tmp_path: Path) -> None:
+        """Test quantization fails without calibration images."""
+        pytest.importorskip("onnxruntime")
+        path = tmp_path / "model.onnx"
+        make_conv_model(path)
+
+        with pytest.raises(ValueError, match="calibration images"):
+            quantize_onnx(path, tmp_path / INT8_WEIGHTS, [], imgsz=32)
+
+
+class TestQuantizedVariant:
+    """Test serving the INT8 variant of a trained model."""
+
+    def test_split_variant(self) -> None:
+        """Test model IDs split into base ID and variant."""
+        assert split_variant("job1:int8") == ("job1", "int8")
+        assert split_variant("job1") == ("job1", "")
+
+    def test_load_report(self, tmp_path: Path) -> None:
+        """Test the report is only returned while the INT8 model exists."""
+        (tmp_path / QUANTIZATION_FILE).write_text(make_report().model_dump_json())
+        assert load_quantization_report(tmp_path) is None
+
+        (tmp_path / INT8_WEIGHTS).touch()
+        report = load_quantization_report(tmp_path)
+        assert report is not None
+        assert report.speedup == 2.0
+
+    def test_list_models_includes_variant(self, tmp_path: Path) -> None:
+        """Test a quantized trained model is listed with its INT8 variant."""
+        weights_dir = tmp_path / "job1" / "training" / "weights"
+        weights_dir.mkdir(parents=True)
+        (weights_dir / "best.pt").touch()
+        (weights_dir / INT8_WEIGHTS).touch()
+        (weights_dir / QUANTIZATION_FILE).write_text(make_report().model_dump_json())
+
+        with patch("yolo_api.inference.settings") as mock_settings:
+            mock_settings.training_dir = tmp_path
+            models = InferenceManager().list_models()
+
+        assert [m.model_id for m in models] == ["job1", "job1:int8"]
+        assert models[1].name.endswith("(INT8)")
+
+    def test_load_unknown_variant(self, tmp_path: Path) -> None:
+        """Test variants other than int8 are not found."""
+        (tmp_path / "job1").mkdir()
+
+        with patch("yolo_api.inference.settings") as mock_settings:
+            mock_settings.training_dir = tmp_path
+            with pytest.raises(ModelNotFoundError):
+                InferenceManager().load_model("job1:fp8")
+
+
+class TestQuantizationAPI:
+    """Test quantization endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_quantize_nonexistent_job(self, async_client: AsyncClient) -> None:
+        """Test quantizing a non-existent job."""
+        response = await async_client.post("/api/training/nonexistent_job/quantize")
+
+        assert response.status_code == 404
+        assert response.json()["error"] == "TrainingNotFoundError"
+
+    @pytest.mark.asyncio
+    async def test_quantize_requires_completed_job(
+        self, async_client: AsyncClient
+    ) -> None:
+        """Test only completed trainings can be quantized."""
+        from yolo_api.training import training_manager
+
+        training_manager.jobs["pending_job"] = TrainingStatus(
+            job_id="pending_job", status="running", total_epochs=3
+        )
+        try:
+            response = await async_client.post("/api/training/pending_job/quantize")
+            status_response = await async_client.get(
+                "/api/training/pending_job/quantization"
+            )
+        finally:
+            del training_manager.jobs["pending_job"]
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "ModelNotReadyError"
+        assert status_response.status_code == 200
+        assert status_response.json()["status"] == "not_started"
+        assert status_response.json()["report"] is None
@@ -0,0 +1,204 @@
+"""Tests for per-model replica pools."""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from yolo_api.backends import InferenceBackend
+from yolo_api.batching import BatchScheduler
+from yolo_api.inference import InferenceManager
+from yolo_api.postprocess import Candidates, DetectionArrays, head_candidates
+from yolo_api.replicas import ReplicaPool
+
+
+class SlowBackend(InferenceBackend):
+    """Backend that fails if two callers use it at the same time."""
+
+    name = "slow"
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def predict(
+        self, images: list[np.ndarray], confidence: float, iou: float
+    ) -> list[DetectionArrays]:
+        if not self.lock.acquire(blocking=False):
+            raise RuntimeError("Concurrent call on one replica")
+        try:
+            self.calls += 1
+            time.sleep(self.delay)
+            return [DetectionArrays.empty() for _ in images]
+        finally:
+            self.lock.release()
+
+    @property
+    def supports_candidates(self) -> bool:
+        return True
+
+    def forward_candidates(
+        self, images: list[np.ndarray], floor: float
+    ) -> list[Candidates]:
+        self.predict(images, floor, 0.45)
+        empty = np.zeros((6, 0), dtype=np.float32)
+        return [
+            head_candidates(empty, floor, 1.0, (0, 0), image.shape[:2])
+            for image in images
+        ]
+
+    def size_bytes(self, model_path: Path | None = None) -> int:
+        return 1024 * 1024
+
+
+def run_concurrently(pool: ReplicaPool, callers: int) -> float:
+    """Predict from several threads at once and return the elapsed seconds."""
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    threads = [
+        threading.Thread(target=pool.predict, args=([image], 0.25, 0.45))
+        for _ in range(callers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+class TestReplicaPool:
+    """Test checking replicas in and out."""
+
+    def test_one_caller_per_replica(self) -> None:
+        """Test concurrent calls never share a replica and run in parallel."""
+        replicas: list[SlowBackend] = []
+
+        def factory() -> SlowBackend:
+            replicas.append(SlowBackend(delay=0.1))
+            return replicas[-1]
+
+        pool = ReplicaPool(factory, replicas=4)
+
+        elapsed = run_concurrently(pool, 4)
+
+        assert elapsed < 0.3
+        assert sum(replica.calls for replica in replicas) == 4
+        assert pool.stats()["checkouts"] == 4
+        assert pool.stats()["busy"] == 0
+
+    def test_waits_for_a_free_replica(self) -> None:
+        """Test callers beyond the replica count wait instead of sharing."""
+        pool = ReplicaPool(lambda: SlowBackend(delay=0.05), replicas=1)
+
+        elapsed = run_concurrently(pool, 3)
+
+        assert elapsed >= 0.15
+        assert pool.primary.calls == 3  # type: ignore[attr-defined]
+
+    def test_resize(self) -> None:
+        """Test replicas are added and removed, keeping the primary."""
+        primary = SlowBackend()
+        pool = ReplicaPool(SlowBackend, replicas=3, primary=primary)
+        assert pool.size == 3
+        assert pool.size_bytes() == 3 * 1024 * 1024
+
+        pool.resize(1)
+
+        assert pool.size == 1
+        assert pool.primary is primary
+        assert pool.stats()["replicas"] == 1
+
+    def test_shrink_while_busy(self) -> None:
+        """Test a busy replica that is removed finishes its call first."""
+        pool = ReplicaPool(SlowBackend, replicas=2)
+
+        with pool.checkout() as first, pool.checkout() as second:
+            pool.resize(1)
+            assert pool.stats()["busy"] == 1
+
+        assert pool.stats()["replicas"] == 1
+        assert pool.stats()["busy"] == 0
+        with pool.checkout() as replica:
+            assert replica is pool.primary
+        assert first is not second
+
+
+class TestManagerReplicas:
+    """Test replica counts through the inference manager."""
+
+    def test_set_replicas(self) -> None:
+        """Test resizing a loaded model updates its cache entry."""
+        manager = InferenceManager()
+        pool = ReplicaPool(SlowBackend)
+        manager.models.put("m", pool, size_bytes=pool.size_bytes())
+
+        manager.set_replicas("m", 3)
+
+        assert manager.replica_count("m") == 3
+        assert manager.models.stats()["models"][0]["size_mb"] == 3.0
+        assert manager.replica_stats()["m"]["replicas"] == 3
+
+    def test_count_kept_for_later_loads(self) -> None:
+        """Test counts set before a model is loaded are remembered."""
+        manager = InferenceManager()
+
+        manager.set_replicas("m", 2)
+
+        assert manager._replica_counts["m"] == 2
+        assert manager.replica_count("m") == 1
+
+
+class TestConcurrentBatches:
+    """Test the scheduler runs one batch per replica."""
+
+    @pytest.mark.asyncio
+    async def test_batches_run_in_parallel(self) -> None:
+        """Test batches of one model overlap when it has two replicas."""
+        pool = ReplicaPool(lambda: SlowBackend(delay=0.1), replicas=2)
+
+        def runner(
+            model_id: str, images: list[np.ndarray], confidence: float, iou: float
+        ) -> list[DetectionArrays]:
+            return pool.predict(images, confidence, iou)
+
+        scheduler = BatchScheduler(
+            runner,
+            max_batch_size=1,
+            max_wait_ms=0,
+            concurrency=lambda model_id: pool.size,
+        )
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        start = time.perf_counter()
+
+        await asyncio.gather(*(scheduler.submit("m", image) for _ in range(4)))
+
+        assert time.perf_counter() - start < 0.35
+        assert pool.stats()["checkouts"] == 4
+        await scheduler.close()
+
+
+class TestReplicasAPI:
+    """Test the replica endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_model(self, async_client: AsyncClient) -> None:
+        """Test replicas of an unknown model."""
+        response = await async_client.post(
+            "/api/inference/replicas/nonexistent", json={"replicas": 2}
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_invalid_count(self, async_client: AsyncClient) -> None:
+        """Test the replica count is validated."""
+        response = await async_client.post(
+            "/api/inference/replicas/m", json={"replicas": 0}
+        )
+
+        assert response.status_code == 422
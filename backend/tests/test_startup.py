@@ -0,0 +1,46 @@
+"""Tests for a fast, side-effect free API import."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def run_python(code: str, **env: str) -> str:
+    """Run code in a fresh interpreter importing from src/ and return stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR), **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+class TestStartup:
+    """Test what importing the app costs."""
+
+    def test_no_ml_runtime_imported(self) -> None:
+        """Test the app imports without torch, ultralytics or onnxruntime."""
+        output = run_python(
+            "import sys\n"
+            "import yolo_api.main\n"
+            "heavy = ('torch', 'ultralytics', 'onnxruntime')\n"
+            "print([m for m in heavy if m in sys.modules])"
+        )
+
+        assert output == "[]"
+
+    def test_no_directories_created(self, tmp_path: Path) -> None:
+        """Test importing the app does not create the data directories."""
+        run_python(
+            "import yolo_api.main",
+            YOLO_TRAINING_DIR=str(tmp_path / "training"),
+            YOLO_INFERENCE_JOBS_DIR=str(tmp_path / "jobs"),
+            YOLO_MODEL_CACHE_DIR=str(tmp_path / "models"),
+        )
+
+        assert list(tmp_path.iterdir()) == []
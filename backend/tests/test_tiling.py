@@ -0,0 +1,205 @@
+"""Tests for tiled inference."""
+
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from yolo_api.exceptions import DeadlineExceededError, ResourceLimitError
+from yolo_api.models import InferenceParams, TilingParams
+from yolo_api.postprocess import DetectionArrays
+from yolo_api.tiling import (
+    count_tiles,
+    merge_tile_detections,
+    predict_tiled,
+    slice_image,
+    tile_origins,
+)
+
+
+def arrays(boxes: list[list[float]], conf: list[float], cls: list[int]) -> DetectionArrays:
+    """Create detection arrays."""
+    return DetectionArrays(
+        xyxy=np.array(boxes, dtype=np.float32).reshape(-1, 4),
+        conf=np.array(conf, dtype=np.float32),
+        cls=np.array(cls, dtype=np.int64),
+    )
+
+
+class TestSliceImage:
+    """Test cutting images into tiles."""
+
+    def test_tile_origins_cover_axis(self) -> None:
+        """Test the last tile is aligned to the end of the axis."""
+        assert tile_origins(1000, 400, 320) == [0, 320, 600]
+        assert tile_origins(400, 400, 320) == [0]
+        assert tile_origins(300, 400, 320) == [0]
+
+    def test_slices_views_with_offsets(self) -> None:
+        """Test tiles are views of the image at their offsets."""
+        image = np.arange(100 * 180 * 3, dtype=np.uint8).reshape(100, 180, 3)
+
+        grid = slice_image(image, tile_size=64, overlap=0.25)
+
+        assert grid.grid == (4, 2)
+        assert grid.offsets[:4, 0].tolist() == [0, 48, 96, 116]
+        assert grid.offsets[::4, 1].tolist() == [0, 36]
+        assert all(tile.shape == (64, 64, 3) for tile in grid.tiles)
+        assert all(np.shares_memory(tile, image) for tile in grid.tiles)
+        x, y = grid.offsets[5].astype(int)
+        np.testing.assert_array_equal(grid.tiles[5], image[y : y + 64, x : x + 64])
+
+    def test_small_image_is_one_tile(self) -> None:
+        """Test images smaller than a tile are not padded."""
+        grid = slice_image(np.zeros((50, 40, 3), dtype=np.uint8), 640, 0.2)
+
+        assert grid.grid == (1, 1)
+        assert grid.tiles[0].shape == (50, 40, 3)
+
+
+class TestMergeTileDetections:
+    """Test cross-tile merging."""
+
+    def test_shifts_and_merges_duplicates(self) -> None:
+        """Test an object seen by two overlapping tiles is kept once."""
+        offsets = np.array([[0, 0], [48, 0]], dtype=np.float32)
+        results = [
+            arrays([[50, 10, 60, 20], [5, 5, 15, 15]], [0.9, 0.8], [0, 1]),
+            arrays([[2, 10, 12, 20]], [0.7], [0]),  # Same object, shifted by 48
+        ]
+
+        merged = merge_tile_detections(results, offsets, iou=0.5)
+
+        assert merged.conf.tolist() == pytest.approx([0.9, 0.8])
+        np.testing.assert_allclose(merged.xyxy, [[50, 10, 60, 20], [5, 5, 15, 15]])
+
+    def test_keeps_overlapping_boxes_of_other_classes(self) -> None:
+        """Test NMS across tiles is class-aware."""
+        offsets = np.array([[0, 0], [0, 0]], dtype=np.float32)
+        results = [
+            arrays([[0, 0, 10, 10]], [0.9], [0]),
+            arrays([[0, 0, 10, 10]], [0.8], [1]),
+        ]
+
+        assert len(merge_tile_detections(results, offsets, iou=0.5)) == 2
+
+    def test_no_detections(self) -> None:
+        """Test tiles without detections merge to an empty set."""
+        offsets = np.zeros((2, 2), dtype=np.float32)
+        results = [DetectionArrays.empty(), DetectionArrays.empty()]
+
+        assert len(merge_tile_detections(results, offsets, iou=0.5)) == 0
+
+    def test_max_det(self) -> None:
+        """Test merged detections are capped, keeping the best scores."""
+        offsets = np.array([[0, 0], [100, 0]], dtype=np.float32)
+        results = [
+            arrays([[0, 0, 10, 10], [20, 0, 30, 10]], [0.5, 0.9], [0, 0]),
+            arrays([[0, 0, 10, 10]], [0.7], [0]),
+        ]
+
+        merged = merge_tile_detections(results, offsets, iou=0.5, max_det=2)
+
+        assert merged.conf.tolist() == pytest.approx([0.9, 0.7])
+
+
+class TestPredictTiled:
+    """Test running tiles through a model."""
+
+    def test_batches_tiles(self) -> None:
+        """Test tiles are run in batches and boxes mapped to the image."""
+        calls: list[int] = []
+
+        def predict(
+            images: list[np.ndarray], confidence: float, iou: float
+        ) -> list[DetectionArrays]:
+            calls.append(len(images))
+            return [arrays([[1, 2, 11, 12]], [0.9], [0]) for _ in images]
+
+        image = np.zeros((100, 180, 3), dtype=np.uint8)
+        with patch("yolo_api.tiling.settings") as mock_settings:
+            mock_settings.tiling_max_tiles = 64
+            mock_settings.tiling_batch_size = 4
+            detections, stats = predict_tiled(
+                predict, image, TilingParams(tile_size=64, overlap=0.25), 0.25, 0.45
+            )
+
+        assert calls == [4, 4]
+        assert stats.tiles == 8
+        assert stats.grid == (4, 2)
+        assert len(stats.batch_times) == 2
+        assert stats.detections_before_merge == 8
+        assert len(detections) == 8
+        np.testing.assert_allclose(detections.xyxy.min(axis=0), [1, 2, 11, 12])
+        np.testing.assert_allclose(detections.xyxy.max(axis=0), [117, 38, 127, 48])
+
+    def test_include_full_image(self) -> None:
+        """Test the whole frame runs as an extra tile at offset zero."""
+        seen: list[tuple[int, ...]] = []
+
+        def predict(
+            images: list[np.ndarray], confidence: float, iou: float
+        ) -> list[DetectionArrays]:
+            seen.extend(image.shape for image in images)
+            return [DetectionArrays.empty() for _ in images]
+
+        image = np.zeros((64, 128, 3), dtype=np.uint8)
+        tiling = TilingParams(tile_size=64, overlap=0, include_full_image=True)
+        _, stats = predict_tiled(predict, image, tiling, 0.25, 0.45)
+
+        assert stats.tiles == 3
+        assert seen[-1] == (64, 128, 3)
+        assert count_tiles(64, 128, tiling) == stats.tiles
+
+    def test_deadline_between_batches(self) -> None:
+        """Test no more tile batches run once the deadline has passed."""
+        calls: list[int] = []
+
+        def predict(
+            images: list[np.ndarray], confidence: float, iou: float
+        ) -> list[DetectionArrays]:
+            calls.append(len(images))
+            time.sleep(0.05)
+            return [DetectionArrays.empty() for _ in images]
+
+        image = np.zeros((100, 180, 3), dtype=np.uint8)
+        tiling = TilingParams(tile_size=64, overlap=0.25)
+        with patch("yolo_api.tiling.settings") as mock_settings:
+            mock_settings.tiling_max_tiles = 64
+            mock_settings.tiling_batch_size = 4
+            with pytest.raises(DeadlineExceededError):
+                predict_tiled(
+                    predict,
+                    image,
+                    tiling,
+                    0.25,
+                    0.45,
+                    deadline=time.perf_counter() + 0.01,
+                )
+
+        assert calls == [4]
+        assert count_tiles(100, 180, tiling) == 8
+
+    def test_too_many_tiles(self) -> None:
+        """Test the tile count is bounded."""
+        image = np.zeros((640, 640, 3), dtype=np.uint8)
+
+        with patch("yolo_api.tiling.settings") as mock_settings:
+            mock_settings.tiling_max_tiles = 4
+            with pytest.raises(ResourceLimitError):
+                predict_tiled(
+                    lambda images, c, i: [], image, TilingParams(tile_size=64), 0.25, 0.45
+                )
+
+
+class TestTilingParams:
+    """Test the tiling option of inference requests."""
+
+    def test_query_string_values(self) -> None:
+        """Test tiling can be enabled from query and form fields."""
+        assert InferenceParams(model_id="m", tiling="true").tiling == TilingParams()  # type: ignore[arg-type]
+        assert InferenceParams(model_id="m", tiling="false").tiling is None  # type: ignore[arg-type]
+        params = InferenceParams(model_id="m", tiling='{"tile_size": 512}')  # type: ignore[arg-type]
+        assert params.tiling is not None
+        assert params.tiling.tile_size == 512
@@ -261,3 +261,44 @@ class TestTrainingManager:
         assert "on_train_start" in callbacks
         assert callable(callbacks["on_train_epoch_end"])
         assert callable(callbacks["on_train_start"])
+
+    def test_export_before_completed(
+        self,
+        training_manager: TrainingManager,
+        sample_config: TrainingConfig,
+        tmp_training_dir: Path,
+    ) -> None:
+        """Test serving formats are exported before the job is completed."""
+        from datetime import datetime
+
+        from yolo_api.config import settings
+        from yolo_api.models import TrainingStatus
+
+        job_id = "test_job_123"
+        training_manager.jobs[job_id] = TrainingStatus(
+            job_id=job_id,
+            status="running",
+            progress=0.0,
+            total_epochs=sample_config.epochs,
+            started_at=datetime.now(),
+        )
+        seen: list[tuple[str, bool]] = []
+        registry = Mock()
+
+        def export(*args: Any) -> None:
+            seen.append((training_manager.jobs[job_id].status, registry.called))
+
+        with (
+            patch("ultralytics.YOLO"),
+            patch.object(training_manager, "_extract_dataset"),
+            patch.object(training_manager, "_create_data_yaml"),
+            patch.object(training_manager, "_export_for_serving", side_effect=export),
+            patch.object(training_manager, "_update_registry", registry),
+            patch.object(settings, "export_after_training", True),
+            patch.object(settings, "warmup_trained_models", False),
+        ):
+            training_manager._train_sync(job_id, sample_config, "", tmp_training_dir)
+
+        assert seen == [("running", False)]
+        assert training_manager.jobs[job_id].status == "completed"
+        registry.assert_called_once_with(job_id)
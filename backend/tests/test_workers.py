@@ -0,0 +1,112 @@
+"""Tests for process-pool inference workers."""
+
+from collections.abc import Iterator
+
+import numpy as np
+import pytest
+
+from yolo_api.exceptions import InferenceError, ModelNotFoundError
+from yolo_api.workers import (
+    ProcessWorkerPool,
+    _rebuild_error,
+    pack_images,
+    packed_size,
+    unpack_images,
+)
+
+
+@pytest.fixture
+def pool() -> Iterator[ProcessWorkerPool]:
+    """Create a single-worker pool and stop it afterwards."""
+    pool = ProcessWorkerPool(num_workers=1)
+    yield pool
+    pool.close()
+
+
+class TestSharedMemoryTransport:
+    """Test packing images into a shared buffer."""
+
+    def test_pack_unpack_round_trip(self) -> None:
+        """Test images of different shapes survive packing unchanged."""
+        rng = np.random.default_rng(0)
+        images = [
+            rng.integers(0, 255, (48, 64, 3), dtype=np.uint8),
+            rng.integers(0, 255, (20, 30, 3), dtype=np.uint8),
+        ]
+        buffer = memoryview(bytearray(packed_size(images)))
+
+        layout = pack_images(images, buffer)
+        unpacked = unpack_images(buffer, layout)
+
+        assert [offset for offset, _ in layout] == [0, 48 * 64 * 3]
+        for original, restored in zip(images, unpacked, strict=True):
+            np.testing.assert_array_equal(original, restored)
+
+    def test_rebuild_error_keeps_type(self) -> None:
+        """Test API exceptions raised in a worker keep their class."""
+        error = _rebuild_error("ModelNotFoundError", "Model 'x' not found", 404)
+
+        assert isinstance(error, ModelNotFoundError)
+        assert error.message == "Model 'x' not found"
+        assert error.status_code == 404
+
+    def test_rebuild_error_unknown_type(self) -> None:
+        """Test unknown exception names become InferenceError."""
+        error = _rebuild_error("ZeroDivisionError", "boom", 500)
+
+        assert isinstance(error, InferenceError)
+
+
+class TestProcessWorkerPool:
+    """Test ProcessWorkerPool class."""
+
+    def test_routing_is_stable(self) -> None:
+        """Test a model is always routed to the same worker."""
+        pool = ProcessWorkerPool(num_workers=4)
+
+        assert pool.worker_for("model_a") == pool.worker_for("model_a")
+        assert {pool.worker_for(f"m{i}") for i in range(50)} == {0, 1, 2, 3}
+
+    def test_worker_error_propagates(self, pool: ProcessWorkerPool) -> None:
+        """Test errors inside the worker surface with their original type."""
+        image = np.zeros((32, 32, 3), dtype=np.uint8)
+
+        with pytest.raises(ModelNotFoundError):
+            pool.predict_batch("nonexistent", [image, image])
+
+        assert pool._workers[0].shm is not None
+        assert pool.stats()["workers"][0]["alive"] is True
+
+    def test_dead_worker_restarted(self, pool: ProcessWorkerPool) -> None:
+        """Test a worker that died while idle is restarted on the next request."""
+        pool.start()
+        old_process = pool._workers[0].process
+        assert old_process is not None
+        old_process.kill()
+        old_process.join()
+
+        with pytest.raises(ModelNotFoundError):
+            pool.load_model("nonexistent")
+
+        worker = pool._workers[0]
+        assert worker.restarts == 1
+        assert worker.process is not None and worker.process.is_alive()
+
+    def test_crash_during_request(
+        self, pool: ProcessWorkerPool, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a crash mid-request fails that request and restarts the worker."""
+        pool.start()
+        worker = pool._workers[0]
+        assert worker.process is not None
+        worker.process.kill()
+        worker.process.join()
+        # Skip the liveness check so the request hits the dead pipe
+        monkeypatch.setattr(ProcessWorkerPool, "_is_alive", staticmethod(lambda w: True))
+
+        with pytest.raises(InferenceError, match="crashed"):
+            pool.load_model("nonexistent")
+
+        monkeypatch.undo()
+        assert worker.restarts == 1
+        assert worker.process is not None and worker.process.is_alive()
@@ -553,7 +553,7 @@ export interface ModelInfo {
   model_id: string;
   name: string;
   yolo_version: 'v5' | 'v8' | 'v11';
-  model_size: 'n' | 's' | 'm' | 'l' | 'x';
+  model_size: 'n' | 's' | 'm' | 'l' | 'x' | 'custom';
   classes: string[];
   created_at: string;
   metrics?: any;